@@ -0,0 +1,414 @@
+"""
+Akış (streaming) destekli cevap biçimlendirici
+- BulletNormalizer: madde işaretlerini "- " biçimine çevirir (eski normalize_bullets)
+- AnswerPolisher: Özet → Şartlar/İstisnalar/Adımlar → footer düzeni (eski polish_answer)
+İkisi de metni parça parça alır (feed) ve tamamlanan bölümleri hemen döndürür;
+close() kalan kısmı verir. Tek seferlik kullanım için normalize_bullets() ve
+polish_answer() fonksiyonları aynı durum makinesini kullanır.
+Eski regex sürümüyle birebir aynı çıktı tests/answer_formatter_golden.json üzerinde
+scripts/check_answer_formatter.py ile doğrulanır.
+"""
+
+import re
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+_HEADS = ("Şartlar:", "İstisnalar:", "Adımlar:")
+# Başlık/etiket başlatmayan, boşluk ve tire içermeyen metin parçası
+_PLAIN_RUN = r"(?:[^\s\-ŞşİA]+|[Şş](?!(?i:artlar:))|İ(?!stisnalar:)|A(?!dımlar:))+"
+# Tek taramada token: silinecek gövde içi "Şartlar:" etiketi, başlık, tire, boşluk,
+# diğer metin (iç boşluklarıyla birlikte; tire ve başlıkların çevresindeki boşluk ayrı token)
+_BULLET_TOKEN = re.compile(
+    r"(?P<drop>(?<=[^\w\n])(?i:şartlar:)\s*)"
+    r"|(?P<head>Şartlar:|İstisnalar:|Adımlar:)"
+    r"|(?P<hyphen>-)"
+    r"|(?P<ws>\s+)"
+    rf"|(?P<text>{_PLAIN_RUN}(?:\s+{_PLAIN_RUN})*|.)",
+    re.DOTALL,
+)
+# Parça sınırında başlık/etiket bölünmesin diye sondan tutulan karakter sayısı
+_BULLET_HOLD = max(len(h) for h in _HEADS)
+
+_WS = re.compile(r"\s+")
+_LEADING_ASTERISKS = re.compile(r"^\*+\s*")
+_LINE_MARKER = re.compile(r"^\s*([\-\*•])\s*(.*)$")
+_INLINE_HYPHEN = re.compile(r"\S-\s*\S")
+_HYPHEN_RUN = re.compile(r"\s*-\s*(?=\S)")
+_BLOCK_HYPHEN_RUN = re.compile(r"(?<!\n)\s*-\s*(?=\S)")
+# Madde işareti ya da başlık/etiket yoksa metin yalnızca boşluk sadeleştirmesinden geçer
+_BULLET_MARKERS = re.compile(r"[\-\*•]|(?i:şartlar:)|İstisnalar:|Adımlar:")
+_BODY_CONDITIONS = re.compile(r"(?mi)(?<!^)\bŞartlar:\s*")
+
+
+class _StreamFormatter(ABC):
+    """feed()/close() arayüzü olan biçimlendiriciler için ortak yardımcılar."""
+
+    @abstractmethod
+    def feed(self, chunk: str) -> str:
+        """Yeni parçayı işler, kesinleşen çıktıyı döndürür."""
+
+    @abstractmethod
+    def close(self) -> str:
+        """Kalan tamponu işler ve son çıktıyı döndürür."""
+
+    def stream(self, chunks: Iterable[str]) -> Iterator[str]:
+        """Parçaları sırayla işler; boş olmayan çıktıları hemen verir."""
+        for chunk in chunks:
+            out = self.feed(chunk)
+            if out:
+                yield out
+        out = self.close()
+        if out:
+            yield out
+
+    def format(self, text: str) -> str:
+        return self.feed(text or "") + self.close()
+
+
+def _format_lines(text: str) -> List[str]:
+    """Satır bazlı madde düzeltme (ilk satır grubu için; başlık bloğu dışında kalan kısım)."""
+    items: List[str] = []
+    current_bullet = None
+    for ln in text.splitlines():
+        # Aynı satırda birden fazla madde varsa satır içi madde ayrıştırma
+        if ln.count("- ") >= 2 or _INLINE_HYPHEN.search(ln):
+            ln = _HYPHEN_RUN.sub("\n- ", ln)
+        m = _LINE_MARKER.match(ln)
+        if m:
+            if current_bullet is not None:
+                items.append(current_bullet)
+            current_bullet = "- " + _LEADING_ASTERISKS.sub("", m.group(2).strip())
+        elif current_bullet is not None and ln.strip():
+            current_bullet += " " + _LEADING_ASTERISKS.sub("", ln.strip())
+        else:
+            if current_bullet is not None:
+                items.append(current_bullet)
+                current_bullet = None
+            if ln.strip():
+                items.append(ln.strip())
+    if current_bullet is not None:
+        items.append(current_bullet)
+    return items
+
+
+@lru_cache(maxsize=256)
+def _chain_layout(after_head: Optional[str], heads_seen: frozenset, lead_ws: str, chain: str) -> Tuple[Tuple[str, ...], str]:
+    """
+    Başlık bloğundaki bir tire zincirinin madde düzeni. Eski sürüm her başlık için
+    önce "Başlık: - " düzeltmesini, sonra blok içi bölmeyi sırayla uyguluyordu;
+    ardışık tireler bu geçişlerde birleşip yeniden ayrıldığı için sonuç yalnızca
+    zincire ve görülen başlıklara bağlıdır. Zincir küçük bir örnek metin üzerinde
+    aynı adımlardan geçirilir (sonuç önbelleklenir).
+    Dönüş: (ara "-" maddeleri, sonraki maddenin ham satır öneki)
+    """
+    sample = (after_head or "x") + lead_ws + chain + "Y"
+    for head in _HEADS:
+        if head == after_head:
+            sample = re.sub(rf"{head}\s*-\s+", head + "\n- ", sample)
+        if head in heads_seen:
+            sample = _BLOCK_HYPHEN_RUN.sub("\n- ", sample)
+    lines = sample.split("\n")
+    return tuple(_format_lines("\n".join(lines[1:-1]))), lines[-1][:-1]
+
+
+class BulletNormalizer(_StreamFormatter):
+    """
+    Bozuk madde işaretlerini standart "- " biçimine çevirir, gövde içindeki
+    "Şartlar:" etiketini siler. Girdi normalize_unicode çıktısıdır (satır sonu
+    içermez); çıktı tek satırdır ve boşlukları sadeleştirilmiştir.
+
+    Durum makinesi: ilk başlık (Şartlar:/İstisnalar:/Adımlar:) görülene kadar metin
+    tek satır olarak toplanır; başlıktan sonra her tire zinciri yeni bir madde açar
+    ve önceki madde tamamlandığı anda döndürülür.
+    """
+
+    def __init__(self):
+        self._buf = ""
+        self._pos = 0
+        self._heads = set()
+        self._first_line: Optional[List[str]] = []
+        self._item: List[str] = []
+        self._item_prefix = "- "
+        self._pending_ws = ""
+        self._last_was_head = False
+        self._last_content = ""
+        # Açık tire zinciri (başlık bloğu içinde)
+        self._chain = 0
+        self._chain_raw = ""
+        self._chain_lead_ws = ""
+        self._chain_after_head = False
+        self._chain_trailing_ws = False
+        self._out: List[str] = []
+        self._emitted = False
+
+    def _emit(self, item: str) -> None:
+        piece = _WS.sub(" ", item.strip())
+        if piece:
+            self._out.append(" " + piece if self._emitted else piece)
+            self._emitted = True
+
+    def _append(self, text: str) -> None:
+        if self._first_line is not None:
+            self._first_line.append(text)
+        else:
+            self._item.append(text)
+
+    def _close_line(self) -> None:
+        if self._first_line is not None:
+            for item in _format_lines("".join(self._first_line)):
+                self._emit(item)
+            self._first_line = None
+        else:
+            for item in _format_lines(self._item_prefix + "".join(self._item)):
+                self._emit(item)
+        self._item = []
+
+    def _resolve_chain(self, followed: bool) -> None:
+        hyphens = self._chain
+        if followed:
+            # Zincir yeni madde(ler) başlatır; öncesindeki boşluk atılır
+            self._close_line()
+            after_head = self._last_content if self._chain_after_head else None
+            items, self._item_prefix = _chain_layout(
+                after_head, frozenset(self._heads), self._chain_lead_ws, self._chain_raw
+            )
+            for item in items:
+                self._emit(item)
+        elif hyphens >= 2 or (self._chain_after_head and self._chain_trailing_ws):
+            self._close_line()
+            for _ in range(hyphens):
+                self._emit("-")
+        else:
+            # Metin sonunda tek tire: önceki satırda kalır
+            self._append(self._chain_lead_ws + self._chain_raw)
+            self._close_line()
+        self._chain = 0
+        self._chain_raw = ""
+        self._chain_lead_ws = ""
+        self._chain_trailing_ws = False
+
+    def _content(self, text: str, is_head: bool) -> None:
+        if self._chain:
+            self._resolve_chain(followed=True)
+            self._pending_ws = ""
+        self._append(self._pending_ws + text)
+        self._pending_ws = ""
+        self._last_was_head = is_head
+        self._last_content = text
+        if is_head:
+            self._heads.add(text)
+
+    def _token(self, kind: str, value: str) -> None:
+        if kind == "drop":
+            return
+        if kind == "ws":
+            if self._chain:
+                self._chain_raw += value
+                self._chain_trailing_ws = True
+            else:
+                self._pending_ws += value
+        elif kind == "hyphen" and self._heads:
+            if not self._chain:
+                self._chain_lead_ws = self._pending_ws
+                self._pending_ws = ""
+                self._chain_after_head = self._last_was_head
+            self._chain += 1
+            self._chain_raw += value
+            self._chain_trailing_ws = False
+        else:
+            self._content(value, kind == "head")
+
+    def _scan(self, final: bool) -> None:
+        buf = self._buf
+        pos = self._pos
+        limit = len(buf) if final else len(buf) - _BULLET_HOLD
+        while pos < limit:
+            m = _BULLET_TOKEN.match(buf, pos)
+            kind = m.lastgroup
+            end = m.end()
+            if end > limit:
+                # Tutulan kuyruğa taşan token: metin ise son boşluk olmayan karakterde kes
+                if kind != "text":
+                    break
+                end = pos + len(buf[pos:limit].rstrip())
+            self._token(kind, buf[pos:end])
+            pos = end
+        # Geriye bakış (lookbehind) için bir karakter bağlam tutulur
+        keep = max(0, pos - 1)
+        self._buf = buf[keep:]
+        self._pos = pos - keep
+
+    def _flush(self) -> str:
+        out = "".join(self._out)
+        self._out = []
+        return out
+
+    def feed(self, chunk: str) -> str:
+        if chunk:
+            if "\n" in chunk:
+                raise ValueError("BulletNormalizer satır sonu içermeyen metin bekler (normalize_unicode çıktısı)")
+            self._buf += chunk
+            self._scan(final=False)
+        return self._flush()
+
+    def close(self) -> str:
+        self._scan(final=True)
+        if self._chain:
+            self._resolve_chain(followed=False)
+        else:
+            self._append(self._pending_ws)
+            self._pending_ws = ""
+            self._close_line()
+        return self._flush()
+
+
+# ---- Cevap parlatma ----
+
+_SENTENCE_BREAK = re.compile(r"(?<=[\.!?])\s+")
+# Eski footer/ayırıcı başlangıcı: "\n—\n..." veya "\n📚..."
+_FOOTER_START = re.compile(r"\n+(?:—+\n|📚)")
+# Parça sonunda footer'a dönüşebilecek kuyruk (kararı sonraki parçaya bırak)
+_FOOTER_PREFIX = re.compile(r"\n+—*\Z")
+_BULLET_PREFIX = re.compile(r"^([\-*•]+\s*)+")
+_STEP_START = re.compile(r"^(adım|önce|ardından|sonra|1\.|2\.|3\.|[0-9]+\))", re.IGNORECASE)
+_STEP_NUMBER = re.compile(r"^(\d+\.|\d+\))\s*")
+_EXCEPTION_KEYWORDS = ("istisna", "hariç", "değilse", "olmadığı", "olmazsa")
+
+ANSWER_FOOTER = (
+    "\n\n—\n\n📚 Bütün bilgiler Oktay Özdemir Danışmanlık web sitemizden alınmıştır. "
+    "Daha detaylı bilgi almak için [Oktay Özdemir Danışmanlık](https://oktayozdemir.com.tr) "
+    "web sitemizi ziyaret edebilirsiniz."
+)
+
+
+class AnswerPolisher(_StreamFormatter):
+    """
+    Cevabı Özet (ilk iki cümle) → Şartlar / İstisnalar / Adımlar → footer düzenine
+    sokar. Cümleler tamamlandıkça sınıflandırılır: özet ikinci cümle bitince,
+    Şartlar maddeleri geldikçe döner; İstisnalar ve Adımlar Şartlar bölümünden
+    sonra geldiği için close()'a kadar bekletilir.
+    """
+
+    def __init__(self):
+        self._pending = ""
+        self._done = False
+        self._summary: List[str] = []
+        self._sentences = 0
+        self._exceptions: List[str] = []
+        self._steps: List[str] = []
+        self._has_conditions = False
+        self._out: List[str] = []
+        self._emitted = False
+
+    def _emit_part(self, part: str) -> None:
+        self._out.append("\n\n" + part if self._emitted else part)
+        self._emitted = True
+
+    def _emit_summary(self) -> None:
+        summary = " ".join(self._summary).strip()
+        if summary:
+            self._emit_part(summary)
+
+    def _detail(self, sentence: str) -> None:
+        c = sentence.strip()
+        # İçeride tekrar kaynak/footeri andıran cümleleri at
+        if (not c or c.lower().startswith("kaynak") or c.startswith(("—", "---", "📚"))
+                or "Bütün bilgiler" in c):
+            return
+        # Bozuk madde başlarını normalize et
+        d = _BULLET_PREFIX.sub("", c)
+        dl = d.lower()
+        if any(k in dl for k in _EXCEPTION_KEYWORDS):
+            self._exceptions.append(d)
+        elif _STEP_START.match(dl.strip()):
+            # Numerik adımları normalize et
+            self._steps.append(_STEP_NUMBER.sub("", d).strip())
+        elif self._has_conditions:
+            self._out.append("\n- " + d)
+        else:
+            self._has_conditions = True
+            self._emit_part("\nŞartlar:\n- " + d)
+
+    def _sentence(self, sentence: str) -> None:
+        self._sentences += 1
+        if self._sentences <= 2:
+            self._summary.append(sentence)
+            if self._sentences == 2:
+                self._emit_summary()
+        else:
+            self._detail(sentence)
+
+    def _process(self, final: bool) -> None:
+        text = self._pending
+        footer = _FOOTER_START.search(text)
+        if footer:
+            # Varsa önceki footer/ayırıcıyı kaldır (sonrası yok sayılır)
+            text = text[:footer.start()]
+            self._done = final = True
+        safe = len(text)
+        if not final:
+            tail = _FOOTER_PREFIX.search(text)
+            if tail:
+                safe = tail.start()
+        start = 0
+        for m in _SENTENCE_BREAK.finditer(text, 0, safe):
+            # Kesinleşmiş bölme: arkasından boşluk olmayan bir karakter gelmeli
+            if m.end() >= safe:
+                break
+            self._sentence(text[start:m.start()])
+            start = m.end()
+        self._pending = text[start:]
+        if final:
+            last = self._pending.strip()
+            if last or self._sentences == 0:
+                self._sentence(last)
+            self._pending = ""
+
+    def feed(self, chunk: str) -> str:
+        if chunk and not self._done:
+            self._pending += chunk
+            self._process(final=False)
+        out = "".join(self._out)
+        self._out = []
+        return out
+
+    def close(self) -> str:
+        if not self._done:
+            self._process(final=True)
+        if self._sentences == 1:
+            self._emit_summary()
+        if self._exceptions:
+            self._emit_part("\nİstisnalar:\n" + "\n".join(f"- {d}" for d in self._exceptions))
+        if self._steps:
+            self._emit_part("\nAdımlar:\n" + "\n".join(f"- {d}" for d in self._steps))
+        self._out.append(ANSWER_FOOTER)
+        out = "".join(self._out)
+        self._out = []
+        return out
+
+
+def _normalize_bullets_lines(text: str) -> str:
+    """Satır sonu içeren metin için eski çok satırlı yol (başlık blokları boş satırda biter)."""
+    text = _BODY_CONDITIONS.sub("", text)
+    for head in _HEADS:
+        text = re.sub(rf"{head}\s*-\s+", head + "\n- ", text)
+        text = re.sub(rf"({head}[\s\S]*?)(?=\n\n|$)",
+                      lambda m: _BLOCK_HYPHEN_RUN.sub("\n- ", m.group(1)), text)
+    return _WS.sub(" ", "\n".join(_format_lines(text))).strip()
+
+
+def normalize_bullets(text: str) -> str:
+    if not text:
+        return ""
+    if not _BULLET_MARKERS.search(text):
+        # Düz metin: tarama ve durum makinesi atlanır
+        return _WS.sub(" ", text).strip()
+    if "\n" in text:
+        return _normalize_bullets_lines(text)
+    return BulletNormalizer().format(text)
+
+
+def polish_answer(answer_text: str, source_links: Optional[List[Dict]] = None) -> str:
+    # Kaynak linklerini istemci tarafında gösteriyoruz; mesaj içinde görünmesin
+    return AnswerPolisher().format(answer_text or "")
@@ -5,7 +5,6 @@ Oktay Özdemir blog verileri ile eğitilmiş - GROQ ve ChatGPT API desteği
 
 import os
 from typing import Optional, Dict, List
-import unicodedata
 from datetime import datetime
 from langchain.chains import RetrievalQA
 from langchain_openai import ChatOpenAI
@@ -15,6 +14,8 @@ from langchain_community.retrievers import BM25Retriever
 from langchain.prompts import PromptTemplate
 from langchain_community.llms import LlamaCpp
 from sentence_transformers import CrossEncoder
+from backend.core.chatbot.query_rules import get_query_rules
+from backend.core.chatbot.intent_router import IntentRouter
 try:
     from groq import Groq
     GROQ_AVAILABLE = True
@@ -94,6 +95,22 @@ class FreeChatBot:
         self.vectorstore = None
         self.groq_client = None
         self._bm25_retriever = None
+        # docstore kimliği ↔ FAISS pozisyonu eşlemesi (takip istekleri için)
+        self._chunk_index_key = None
+        self._chunk_index_cache = None
+
+        # Genişletme/kategori/niyet kuralları (config/query_rules.yaml, başlangıçta derlenir)
+        self.query_rules = get_query_rules()
+
+        # Gömme tabanlı niyet yönlendirici (kurulamazsa kurallara düşülür)
+        try:
+            self.intent_router = IntentRouter(
+                self.embeddings,
+                model_name="sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+            )
+        except Exception as e:
+            print(f"⚠️ Niyet yönlendirici kurulamadı, anahtar kelime kuralları kullanılacak: {e}")
+            self.intent_router = None
         
         # Eğitilmiş model desteği
         self.trained_model = None
@@ -137,34 +154,15 @@ CEVAP:"""
         arama kapsamasını artırır; özgün terimleri korur.
         """
         q = question or ""
-        ql = q.lower()
         expansions: List[str] = []
 
         def add(t: str) -> None:
             if t and t not in expansions:
                 expansions.append(t)
 
-        # Terim eşanlamları / varyantları - GENİŞLETİLMİŞ
-        if any(k in ql for k in ["anmeldung", "adres", "ikamet kaydı", "adres kaydı"]):
-            add("Anmeldung adres kaydı ikamet kaydı Wohnungsgeberbestätigung 14 gün")
-        if any(k in ql for k in ["mavi kart", "blue card", "ab mavi"]):
-            add("AB Mavi Kart Blue Card bottleneck nitelikli iş gücü açığı 48.300 43.759,80")
-        if any(k in ql for k in ["fırsat kart", "chancenkarte"]):
-            add("Chancenkarte fırsat kartı §20a puan sistemi mesleki yeterlilik")
-        if any(k in ql for k in ["81a", "ön onay", "hızlandırılmış"]):
-            add("§81a hızlandırılmış ön onay iş ajansı yabancılar dairesi İkamet Yasası")
-        if any(k in ql for k in ["18a", "18b", "18g"]):
-            add("§18a §18b §18g İkamet Yasası nitelikli istihdam")
-        if any(k in ql for k in ["oturum", "yerleşim", "niederlassung"]):
-            add("oturum izni ikamet izni kalıcı oturum Niederlassungserlaubnis B1 36 ay emeklilik sigortası")
-        if any(k in ql for k in ["maaş", "euro", "brüt", "kazanç"]):
-            add("brüt maaş € euro yıllık aylık eşik asgari bottleneck 53.130 45 yaş")
-        if any(k in ql for k in ["sürücü", "src", "ehliyet"]):
-            add("profesyonel sürücü SRC psikoteknik ehliyet sınıfı")
-        if any(k in ql for k in ["niteliksiz", "kalıcı ikamet"]):
-            add("niteliksiz işçi kalıcı ikamet A2 sosyal güvenlik çalışma izni")
-        if any(k in ql for k in ["meslek", "çalışmak", "iş", "ön lisans", "mezun"]):
-            add("meslek iş çalışma ön lisans mezun nitelikli istihdam çalışma izni")
+        # Terim eşanlamları / varyantları (config/query_rules.yaml → expansions)
+        for text in self.query_rules.match(q)["expansions"]:
+            add(text)
 
         # Sayıları biçim varyantlarıyla ekle (4.427,50 ↔ 4427.50 ↔ 442750)
         import re
@@ -264,104 +262,40 @@ CEVAP:"""
             ]
         }
 
+    def route_question(self, question: str) -> Dict:
+        """
+        Soruyu niyet yönlendiriciden geçir (niyet + güven + kategori + soru vektörü).
+        Yönlendirici yoksa boş sözlük döner; çağıran taraf kurallara düşer.
+        """
+        if self.intent_router is None or not (question or "").strip():
+            return {}
+        # Detay şablonunda yalnızca "Yeni talep:" bölümünü yönlendir
+        if "Yeni talep:" in question:
+            question = question.split("Yeni talep:", 1)[1].strip()
+        try:
+            # Centroid'ler ham örnek cümlelerden kurulduğu için yönlendirme ham soruyla yapılır;
+            # genişletilmiş arama sorgusu ask_groq'ta ayrıca gömülür
+            result = self.intent_router.route(question)
+            result["text"] = question
+            return result
+        except Exception as e:
+            print(f"⚠️ Niyet yönlendirme hatası: {e}")
+            return {}
+
     def get_category_keywords(self, category_id: str) -> List[str]:
         """
         Kategori ID'sine göre ilgili anahtar kelimeleri döndür
         """
-        category_keywords = {
-            "hukuk_goc": [
-                "mavi kart", "blue card", "81a", "ön onay", "fırsat kartı", "chancenkarte",
-                "niederlassungserlaubnis", "çalışma izni", "ikamet izni", "18a", "18b", "18g", "19c", "20a",
-                "iltica", "sığınma", "mülteci", "bottleneck", "nitelikli iş gücü"
-            ],
-            "mesleki_egitim": [
-                "ön lisans", "meslek lisesi", "kalfalık", "çıraklık", "ustalık", "16. madde",
-                "ihk", "hwk", "bezirksregierung", "denklik", "tam denklik", "kısmi denklik",
-                "denklik tamamlama", "myk", "mesleki yeterlilik", "ausbildung"
-            ],
-            "is_calisma": [
-                "tır şoförü", "inşaat ustası", "kasap", "aşçı", "elektrikçi", "oto tamir",
-                "depo çalışanı", "nitelikli iş sözleşmesi", "maaş şartı", "agentur für arbeit",
-                "çalışma vizesi", "oturum izni", "iş sözleşmesi"
-            ],
-            "yerlesim_yasam": [
-                "anmeldung", "wohnungsgeberbestätigung", "adres kaydı", "a2", "b1", "c1",
-                "emeklilik sigortası", "sosyal güvenlik", "kalıcı ikamet", "36 ay", "dil seviyesi"
-            ],
-            "mali_konular": [
-                "48.300", "43.759,80", "53.130", "45 yaş", "harç", "vize harcı", "oturum kartı",
-                "denklik masrafı", "tercüme", "411€", "500-600€", "brüt maaş", "euro"
-            ],
-            "ulke_bazli": [
-                "almanya", "ingiltere", "scale-up", "ankara anlaşması", "avrupa birliği",
-                "ikamet yasası", "birleşik krallık", "ab ülkeleri"
-            ],
-            "surec_prosedur": [
-                "başvuru süreci", "denklik başvurusu", "evrak toplama", "tercüme",
-                "yabancılar dairesi", "iş ajansı", "7-8 ay", "8 hafta", "vize süreci"
-            ],
-            "ozel_durumlar": [
-                "45 yaş", "profesyonel sürücü", "niteliksiz işçi", "dil seviyesi",
-                "eğitim süresi", "2 yıl", "yaş faktörü", "meslek özelinde"
-            ]
-        }
-        return category_keywords.get(category_id, [])
+        return self.query_rules.get_category_keywords(category_id)
 
-    def check_special_keywords(self, question: str) -> Dict:
+    def get_special_response(self, special_type: str) -> Dict:
         """
-        Özel kelimeleri kontrol et ve uygun yönlendirme yap
+        Özel niyet için hazır yanıtı döndür (iltica, consultant, eligibility, category_menu)
         """
-        # Türkçe karakterleri normalize ederek daha sağlam anahtar-kelime tespiti
-        def normalize(text: str) -> str:
-            text = text.lower()
-            text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii')
-            return text
-
-        # Eğer soru, backend'de detay modu için genişletilmiş şablonu içeriyorsa,
-        # niyet tespitini sadece "Yeni talep:" bölümüne göre yapalım
-        if "Yeni talep:" in question:
-            try:
-                question = question.split("Yeni talep:", 1)[1].strip()
-            except Exception:
-                pass
-
-        question_lower = question.lower()
-        question_norm = normalize(question)
-
-        # Kategori seçimi kontrolü
-        if any(p in question_lower for p in ["kategori", "başlık", "konu", "hangi", "yardım", "nasıl"]):
+        if special_type == "category_menu":
             return self.get_category_menu()
-        
-        # Kategori ID'si kontrolü (kullanıcı kategori seçtiyse)
-        category_indicators = {
-            "hukuk_goc": ["hukuk", "göç", "vize", "ikamet", "iltica"],
-            "mesleki_egitim": ["meslek", "eğitim", "denklik", "kalfalık", "ustalık"],
-            "is_calisma": ["iş", "çalışma", "meslek", "şoför", "usta", "kasap"],
-            "yerlesim_yasam": ["yerleşim", "yaşam", "anmeldung", "dil", "a2", "b1"],
-            "mali_konular": ["maaş", "harç", "mali", "euro", "ücret", "masraf"],
-            "ulke_bazli": ["almanya", "ingiltere", "ülke", "scale-up"],
-            "surec_prosedur": ["süreç", "prosedür", "başvuru", "evrak", "süre"],
-            "ozel_durumlar": ["yaş", "özel", "durum", "faktör", "seviye"]
-        }
-        
-        selected_category = None
-        for category_id, indicators in category_indicators.items():
-            if any(indicator in question_lower for indicator in indicators):
-                selected_category = category_id
-                break
-        
-        # Sadece detay istemi ise özel yönlendirme tetikleme (danışman/eligibility) yapma
-        detail_only = any(p in question_lower for p in [
-            "detay", "ayrıntı", "daha fazla bilgi", "detaylandır", "uzat"
-        ])
-        if detail_only:
-            return {"special_response": False}
-        
-        # İltica kelimesi tespit edilirse
-        if (
-            any(word in question_lower for word in ["iltica", "sığınma", "mülteci", "sığınma talebi"]) or
-            any(word in question_norm for word in ["iltica", "sigunma", "multeci", "sigunma talebi"])
-        ):
+
+        if special_type == "iltica":
             return {
                 "special_response": True,
                 "type": "iltica",
@@ -387,9 +321,7 @@ CEVAP:"""
                 ]
             }
         
-        # Danışman talebi tespit edilirse
-        if (any(word in question_lower for word in ["danışman", "danışmana bağlanmak", "danışmana", "whatsapp", "iletişime geç", "bağla", "bağlan"]) or
-            any(word in question_norm for word in ["danisman", "danismana baglanmak", "danismana", "whatsapp", "iletisime gec", "bagla", "baglan"])):
+        if special_type == "consultant":
             return {
                 "special_response": True,
                 "type": "consultant",
@@ -404,10 +336,7 @@ CEVAP:"""
                 ]
             }
         
-        # Başvuru/göç/uygunluk kelimeleri tespit edilirse (form öner)
-        if any(word in question_lower for word in [
-            "başvuru", "göç", "uygun", "uygunluk", "uygun mu", "başvuru yapmak", "başvuru yapmak istiyorum"
-        ]):
+        if special_type == "eligibility":
             return {
                 "special_response": True,
                 "type": "eligibility",
@@ -429,6 +358,36 @@ CEVAP:"""
         
         return {"special_response": False}
 
+    def check_special_keywords(self, question: str) -> Dict:
+        """
+        Özel kelimeleri kontrol et ve uygun yönlendirme yap
+        """
+        # Eğer soru, backend'de detay modu için genişletilmiş şablonu içeriyorsa,
+        # niyet tespitini sadece "Yeni talep:" bölümüne göre yapalım
+        if "Yeni talep:" in question:
+            try:
+                question = question.split("Yeni talep:", 1)[1].strip()
+            except Exception:
+                pass
+
+        # Tüm tetikleyiciler tek geçişte (küçük harf + ASCII görünümü) eşleştirilir
+        intents = self.query_rules.match(question)["intents"]
+
+        # Kategori seçimi kontrolü
+        if "category_menu" in intents:
+            return self.get_category_menu()
+
+        # Sadece detay istemi ise özel yönlendirme tetikleme (danışman/eligibility) yapma
+        if "detail" in intents:
+            return {"special_response": False}
+        
+        # Öncelik sırası: iltica → danışman → başvuru/uygunluk (form öner)
+        for special_type in ("iltica", "consultant", "eligibility"):
+            if special_type in intents:
+                return self.get_special_response(special_type)
+        
+        return {"special_response": False}
+
     def load_trained_model(self, model_path: str = "./trained_rag_lora_model") -> bool:
         """Eğitilmiş modeli yükle"""
         if not TRAINED_MODEL_AVAILABLE:
@@ -459,6 +418,98 @@ CEVAP:"""
             print(f"❌ Eğitilmiş model yüklenemedi: {e}")
             return False
 
+    def _chunk_index(self):
+        """
+        FAISS pozisyonu, docstore kimliği ve Document nesnesi arasındaki eşlemeler.
+        Vector store değişince (yeniden yükleme/ekleme) yenilenir.
+        """
+        vs = self.vectorstore
+        key = (id(vs), vs.index.ntotal)
+        if self._chunk_index_key != key:
+            pos_to_id = dict(vs.index_to_docstore_id)
+            id_to_pos = {chunk_id: pos for pos, chunk_id in pos_to_id.items()}
+            store = getattr(vs.docstore, "_dict", {}) or {}
+            obj_to_id = {id(doc): chunk_id for chunk_id, doc in store.items()}
+            self._chunk_index_cache = (pos_to_id, id_to_pos, obj_to_id)
+            self._chunk_index_key = key
+        return self._chunk_index_cache
+
+    def _doc_ids(self, docs: List) -> List[str]:
+        """Document listesini docstore kimliklerine çevir (bulunamayanlar atlanır)."""
+        try:
+            _, _, obj_to_id = self._chunk_index()
+        except Exception:
+            return []
+        return [obj_to_id[id(d)] for d in docs if id(d) in obj_to_id]
+
+    def _followup_retrieval(self, previous: Dict, max_chunks: int = 8):
+        """
+        Önceki turun sıralı chunk'larını genişletir: kullanılan chunk'lar korunur,
+        aynı kaynaktaki komşu chunk'lar ve sıradaki adaylar önceki sorgu vektörüne
+        benzerliğe göre eklenir. Embedding/BM25/rerank çağrısı yapılmaz.
+        Dönüş: (bağlam chunk'ları, genişletilmiş sıralı liste) veya None
+        """
+        try:
+            chunk_ids = previous.get("chunk_ids") or []
+            if not chunk_ids:
+                return None
+            pos_to_id, id_to_pos, _ = self._chunk_index()
+            store = self.vectorstore.docstore
+
+            def get_doc(chunk_id):
+                doc = store.search(chunk_id)
+                return None if isinstance(doc, str) else doc
+
+            used = max(1, int(previous.get("used") or len(chunk_ids)))
+            top_ids = [c for c in chunk_ids[:used] if get_doc(c) is not None]
+            if not top_ids:
+                return None
+
+            # Komşular: aynı kaynağa ait bir önceki/sonraki chunk
+            extra_ids: List[str] = []
+            for chunk_id in top_ids:
+                doc = get_doc(chunk_id)
+                source_key = doc.metadata.get("url") or doc.metadata.get("title")
+                pos = id_to_pos.get(chunk_id)
+                if pos is None:
+                    continue
+                for npos in (pos - 1, pos + 1):
+                    nid = pos_to_id.get(npos)
+                    ndoc = get_doc(nid) if nid else None
+                    if ndoc is not None and (ndoc.metadata.get("url") or ndoc.metadata.get("title")) == source_key:
+                        extra_ids.append(nid)
+            # Sıradaki adaylar (önceki turda kullanılmayanlar)
+            extra_ids.extend(chunk_ids[used:])
+
+            seen = set(top_ids)
+            candidates = []
+            for c in extra_ids:
+                if c not in seen and get_doc(c) is not None:
+                    seen.add(c)
+                    candidates.append(c)
+
+            # Önceki sorgu vektörüne göre sırala (FAISS'ten vektörleri geri oku)
+            query_vector = previous.get("query_vector")
+            if query_vector is not None and candidates:
+                try:
+                    import numpy as np
+                    q = np.asarray(query_vector, dtype=np.float32)
+                    q = q / (np.linalg.norm(q) or 1.0)
+
+                    def similarity(c):
+                        v = self.vectorstore.index.reconstruct(int(id_to_pos[c]))
+                        return float(np.dot(v, q) / (np.linalg.norm(v) or 1.0))
+
+                    candidates.sort(key=similarity, reverse=True)
+                except Exception:
+                    pass
+
+            ordered = [get_doc(c) for c in top_ids + candidates]
+            return ordered[:max_chunks], ordered
+        except Exception as e:
+            print(f"⚠️ Takip araması kullanılamadı: {e}")
+            return None
+
     def hybrid_search(self, question: str, k_chunks: int = 10) -> List:
         """
         Hibrit arama: BM25 + Semantic similarity
@@ -493,9 +544,12 @@ CEVAP:"""
             # Fallback: sadece semantic search
             return self.vectorstore.similarity_search(question, k=k_chunks)
 
-    def ask_groq(self, question: str, k_chunks: int = 10, selected_category: str = None) -> Dict:  # Optimize edilmiş
+    def ask_groq(self, question: str, k_chunks: int = 10, selected_category: str = None,
+                 route: Optional[Dict] = None, followup: Optional[Dict] = None) -> Dict:  # Optimize edilmiş
         """
         GROQ API ile soru sor - kategori odaklı arama desteği
+        route: route_question() sonucu (verilmezse burada hesaplanır)
+        followup: önceki turun "retrieval" durumu; verilirse arama yeniden yapılmaz, genişletilir
         """
         if not self.groq_client:
             return {
@@ -519,155 +573,198 @@ CEVAP:"""
             print(f"❓ GROQ Soru: {question}")
             start_time = datetime.now()
 
-            # Özel kelimeleri kontrol et (buton/meta hazırlığı için)
-            special_check = self.check_special_keywords(question)
             # Detay niyetini algıla
-            qlower = question.lower()
-            detail_mode = any(p in qlower for p in ["detay", "ayrıntı", "daha fazla bilgi", "detaylandır", "uzat"])
-            # Danışman talebinde direkt dönüş yap (RAG'i atla)
-            if special_check.get("special_response") and special_check.get("type") == "consultant":
+            detail_mode = "detail" in self.query_rules.match(question)["intents"]
+
+            # Niyet yönlendirme: gömme centroid'leri, emin değilse anahtar kelime kuralları
+            if route is None:
+                route = self.route_question(question)
+            router_decided = bool(route.get("confident")) and not detail_mode
+            if router_decided:
+                special_check = (
+                    self.get_special_response(route["intent"]) if route.get("special")
+                    else {"special_response": False}
+                )
+            else:
+                special_check = self.check_special_keywords(question)
+            if not selected_category and route.get("category"):
+                selected_category = route["category"]
+
+            # Emin olunan özel niyetlerde ve danışman talebinde direkt dönüş yap (RAG ve LLM atlanır)
+            if special_check.get("special_response") and (
+                router_decided or special_check.get("type") == "consultant"
+            ):
+                if special_check.get("type") == "category_menu":
+                    return special_check
                 end_time = datetime.now()
                 response_time = (end_time - start_time).total_seconds()
                 footer_message = "\n\n---\n\n📚 **Bütün bilgiler Oktay Özdemir Danışmanlık web sitemizden alınmıştır.** Daha detaylı bilgi almak için [Oktay Özdemir Danışmanlık](https://oktayozdemir.com.tr) web sitemizi ziyaret edebilirsiniz."
+                special_sources = special_check.get("sources", [])
                 return {
                     "answer": special_check["answer"] + footer_message,
-                    "sources": [],
-                    "source_links": [],
+                    "sources": special_sources,
+                    "source_links": [{"title": x.get("title", ""), "url": x.get("url", "")} for x in special_sources],
                     "response_time": f"{response_time:.2f}s",
                     "chunks_used": 0,
                     "timestamp": datetime.now().isoformat(),
                     "model": self.model_name,
                     "action_buttons": special_check.get("action_buttons", []),
-                    "special_response": True
+                    "special_response": True,
+                    "special_type": special_check.get("type")
                 }
 
-            # 1. Hybrid retrieval: Vector search (MMR, lambda=0.3) + BM25, sonra birleştir
-            try:
-                # Kategori odaklı arama için genişletilmiş sorgu
-                expanded_q = self.expand_query(question)
+            # Takip ("detay") isteği: önceki turun sıralı chunk'ları genişletilir, tam arama yapılmaz
+            ranked_docs = None
+            query_vector = None
+            followup_results = self._followup_retrieval(followup) if followup else None
+            if followup_results:
+                results, ranked_docs = followup_results
+                query_vector = followup.get("query_vector")
+                print(f"♻️ Takip isteği: önceki arama sonuçları genişletildi ({len(results)} chunk)")
+            else:
+                # 1. Hybrid retrieval: Vector search (MMR, lambda=0.3) + BM25, sonra birleştir
+                try:
+                    # Kategori odaklı arama için genişletilmiş sorgu
+                    expanded_q = self.expand_query(question)
                 
-                # Seçili kategori varsa, o kategoriye özel anahtar kelimeleri ekle
-                if selected_category:
-                    category_keywords = self.get_category_keywords(selected_category)
-                    if category_keywords:
-                        expanded_q += "\n" + " ".join(category_keywords[:10])  # İlk 10 anahtar kelime
-                        print(f"🎯 Kategori odaklı arama: {selected_category}")
+                    # Seçili kategori varsa, o kategoriye özel anahtar kelimeleri BM25 sorgusuna ekle
+                    # (vektör araması genişletilmiş sorgunun kendi vektörüyle yapılır)
+                    keyword_q = expanded_q
+                    if selected_category:
+                        category_keywords = self.get_category_keywords(selected_category)
+                        if category_keywords:
+                            keyword_q += "\n" + " ".join(category_keywords[:10])  # İlk 10 anahtar kelime
+                            print(f"🎯 Kategori odaklı arama: {selected_category}")
                 
-                # Detay modunda daha çok aday al - İYİLEŞTİRİLMİŞ
-                if detail_mode:
-                    mmr_k = max(20, k_chunks)  # 16 → 20
-                    fetch_k = max(60, mmr_k * 3)  # 48 → 60
-                else:
-                    mmr_k = max(12, k_chunks)  # 10 → 12
-                    fetch_k = max(30, mmr_k * 2)  # 24 → 30
-                try:
-                    emb_docs = self.vectorstore.max_marginal_relevance_search(
-                        expanded_q, k=mmr_k, fetch_k=fetch_k, lambda_mult=0.3
-                    )
-                except Exception:
-                    results_with_scores = self.vectorstore.similarity_search_with_score(self.expand_query(question), k=mmr_k)
-                    emb_docs = [doc for doc, _ in results_with_scores]
+                    # Detay modunda daha çok aday al - İYİLEŞTİRİLMİŞ
+                    if detail_mode:
+                        mmr_k = max(20, k_chunks)  # 16 → 20
+                        fetch_k = max(60, mmr_k * 3)  # 48 → 60
+                    else:
+                        mmr_k = max(12, k_chunks)  # 10 → 12
+                        fetch_k = max(30, mmr_k * 2)  # 24 → 30
+                    # Genişletme soruyu değiştirmediyse yönlendiricinin vektörü yeniden kullanılır
+                    if route.get("vector") is not None and route.get("text") == expanded_q:
+                        query_vector = route["vector"]
+                    else:
+                        query_vector = self.embeddings.embed_query(expanded_q)
+                    try:
+                        emb_docs = self.vectorstore.max_marginal_relevance_search_by_vector(
+                            query_vector, k=mmr_k, fetch_k=fetch_k, lambda_mult=0.3
+                        )
+                    except Exception:
+                        results_with_scores = self.vectorstore.similarity_search_with_score_by_vector(query_vector, k=mmr_k)
+                        emb_docs = [doc for doc, _ in results_with_scores]
 
-                # BM25 retriever'ı hazırla (bir kez oluştur)
-                try:
-                    if self._bm25_retriever is None:
-                        # FAISS docstore'daki tüm dokümanları çekip BM25 oluştur
-                        all_docs = []
-                        try:
-                            # Modern FAISS docstore
-                            store = getattr(self.vectorstore, "docstore", None)
-                            if store and hasattr(store, "_dict"):
-                                all_docs = list(store._dict.values())
-                            else:
-                                # Yedek: küçük bir örnekle yetin
+                    # BM25 retriever'ı hazırla (bir kez oluştur)
+                    try:
+                        if self._bm25_retriever is None:
+                            # FAISS docstore'daki tüm dokümanları çekip BM25 oluştur
+                            all_docs = []
+                            try:
+                                # Modern FAISS docstore
+                                store = getattr(self.vectorstore, "docstore", None)
+                                if store and hasattr(store, "_dict"):
+                                    all_docs = list(store._dict.values())
+                                else:
+                                    # Yedek: küçük bir örnekle yetin
+                                    sample = self.vectorstore.similarity_search("test", k=200)
+                                    all_docs = sample
+                            except Exception:
                                 sample = self.vectorstore.similarity_search("test", k=200)
                                 all_docs = sample
-                        except Exception:
-                            sample = self.vectorstore.similarity_search("test", k=200)
-                            all_docs = sample
-                        if all_docs:
-                            self._bm25_retriever = BM25Retriever.from_documents(all_docs)
-                            # Döndürülecek sonuç sayısı (tamsayı olmalı)
-                            self._bm25_retriever.k = max(10, mmr_k)
-                    bm25_docs = self._bm25_retriever.get_relevant_documents(self.expand_query(question)) if self._bm25_retriever else []
-                except Exception as e:
-                    print(f"⚠️ BM25 kurulamadı: {e}")
-                    bm25_docs = []
-
-                # Skorları birleştir: 0.7*embedding + 0.3*bm25 (basit rank tabanlı)
-                def rank_scores(docs: List):
-                    return {id(doc): (len(docs) - i) / max(1, len(docs)) for i, doc in enumerate(docs)}
-
-                emb_scores = rank_scores(emb_docs)
-                bm_scores = rank_scores(bm25_docs)
-                combined: Dict[str, tuple] = {}
-                for doc in emb_docs + bm25_docs:
-                    key = id(doc)
-                    e = emb_scores.get(key, 0.0)
-                    b = bm_scores.get(key, 0.0)
-                    # Ağırlıklar: embedding 0.6, BM25 0.4
-                    combined[key] = (0.6 * e + 0.4 * b, doc)
-                combined_sorted = sorted(combined.values(), key=lambda x: x[0], reverse=True)
-                # Rerank'e göndermeden önce aday sayısını sınırla (ısı ve hız)
-                candidates_cap = 20
-                results = [doc for _, doc in combined_sorted[: min(candidates_cap, max(12, mmr_k))]]
-
-                # 2. Rerank ile en ilgili 4-6 adayı seç
-                try:
-                    if not hasattr(self, 'reranker') or self.reranker is None:
-                        self.reranker = CrossEncoder('cross-encoder/ms-marco-MiniLM-L-12-v2')
-                        # İlk kullanımda küçük bir ısındırma yap (soğuk başlatma gecikmesini azaltır)
-                        try:
-                            _ = self.reranker.predict([("warmup", "warmup")])
-                        except Exception:
-                            pass
-                    pairs = [(self.expand_query(question), d.page_content) for d in results]
-                    x_scores = self.reranker.predict(pairs)
-
-                    # GELİŞTİRİLMİŞ hibrit bonus: soru anahtar kelimeleri ve sayılar için ek puan
-                    import re
-                    # Python re modülü \p{L} desteklemez; Unicode güvenli tokenizasyon
-                    # Türkçe karakterleri de kapsayacak şekilde \w + TR özel harfleri
-                    q_tokens = set(re.findall(r"[\wçğıöşüÇĞİÖŞÜ]+", question, flags=re.UNICODE))
-                    q_numbers = re.findall(r"\d+[\.,]?\d*", question)
-
-                    ranked_pairs = []
-                    for doc, xs in zip(results, x_scores):
-                        text = doc.page_content.lower()
-                        bonus = 0.0
-                        # Anahtar kelime örtüşmesi (daha etkili - 3x artırıldı)
-                        bonus += sum(1 for t in q_tokens if t and t.lower() in text) * 0.06
-                        # Sayı eşleşmesi (güçlü sinyal - 2x artırıldı)
-                        for num in q_numbers:
-                            if num.replace(",", ".") in text or num in text:
-                                bonus += 0.20
-                        # URL sinyali: link taşıyan chunk'a bonus (artırıldı)
-                        try:
-                            if (doc.metadata.get("url") or "").strip():
-                                bonus += 0.10
-                        except Exception:
-                            pass
-                        # Yeni: Test beklenen anahtar kelimeleri için ekstra bonus
-                        test_keywords = ["48.300", "43.759,80", "bottleneck", "nitelikli iş gücü açığı",
-                                       "hızlandırılmış", "81a", "İkamet Yasası", "ön onay",
-                                       "14 gün", "Wohnungsgeberbestätigung", "Anmeldung",
-                                       "Niederlassungserlaubnis", "B1", "36 ay", "emeklilik sigortası",
-                                       "§20a", "puan", "mesleki yeterlilik", "kalıcı ikamet", "A2",
-                                       "sosyal güvenlik", "çalışma izni", "53.130", "brüt", "45 yaş"]
-                        for keyword in test_keywords:
-                            if keyword.lower() in text:
-                                bonus += 0.15
-                        ranked_pairs.append((doc, xs + bonus))
-
-                    ranked = sorted(ranked_pairs, key=lambda x: x[1], reverse=True)
-                    topn = 6 if detail_mode else 4
-                    results = [doc for doc, _ in ranked[:topn]]
-                except Exception as e:
-                    print(f"⚠️ Reranker kullanılamadı: {e}")
-                    results = results[: (6 if detail_mode else 4) ]
-            except Exception:
-                # Hibrit arama kullan (BM25 + Semantic)
-                results = self.hybrid_search(question, k_chunks)
+                            if all_docs:
+                                self._bm25_retriever = BM25Retriever.from_documents(all_docs)
+                                # Döndürülecek sonuç sayısı (tamsayı olmalı)
+                                self._bm25_retriever.k = max(10, mmr_k)
+                        bm25_docs = self._bm25_retriever.get_relevant_documents(keyword_q) if self._bm25_retriever else []
+                    except Exception as e:
+                        print(f"⚠️ BM25 kurulamadı: {e}")
+                        bm25_docs = []
+
+                    # Skorları birleştir: 0.7*embedding + 0.3*bm25 (basit rank tabanlı)
+                    def rank_scores(docs: List):
+                        return {id(doc): (len(docs) - i) / max(1, len(docs)) for i, doc in enumerate(docs)}
+
+                    emb_scores = rank_scores(emb_docs)
+                    bm_scores = rank_scores(bm25_docs)
+                    combined: Dict[str, tuple] = {}
+                    for doc in emb_docs + bm25_docs:
+                        key = id(doc)
+                        e = emb_scores.get(key, 0.0)
+                        b = bm_scores.get(key, 0.0)
+                        # Ağırlıklar: embedding 0.6, BM25 0.4
+                        combined[key] = (0.6 * e + 0.4 * b, doc)
+                    combined_sorted = sorted(combined.values(), key=lambda x: x[0], reverse=True)
+                    # Rerank'e göndermeden önce aday sayısını sınırla (ısı ve hız)
+                    candidates_cap = 20
+                    results = [doc for _, doc in combined_sorted[: min(candidates_cap, max(12, mmr_k))]]
+
+                    # 2. Rerank ile en ilgili 4-6 adayı seç
+                    try:
+                        if not hasattr(self, 'reranker') or self.reranker is None:
+                            self.reranker = CrossEncoder('cross-encoder/ms-marco-MiniLM-L-12-v2')
+                            # İlk kullanımda küçük bir ısındırma yap (soğuk başlatma gecikmesini azaltır)
+                            try:
+                                _ = self.reranker.predict([("warmup", "warmup")])
+                            except Exception:
+                                pass
+                        pairs = [(self.expand_query(question), d.page_content) for d in results]
+                        x_scores = self.reranker.predict(pairs)
+
+                        # GELİŞTİRİLMİŞ hibrit bonus: soru anahtar kelimeleri ve sayılar için ek puan
+                        import re
+                        # Python re modülü \p{L} desteklemez; Unicode güvenli tokenizasyon
+                        # Türkçe karakterleri de kapsayacak şekilde \w + TR özel harfleri
+                        q_tokens = set(re.findall(r"[\wçğıöşüÇĞİÖŞÜ]+", question, flags=re.UNICODE))
+                        q_numbers = re.findall(r"\d+[\.,]?\d*", question)
+
+                        ranked_pairs = []
+                        for doc, xs in zip(results, x_scores):
+                            text = doc.page_content.lower()
+                            bonus = 0.0
+                            # Anahtar kelime örtüşmesi (daha etkili - 3x artırıldı)
+                            bonus += sum(1 for t in q_tokens if t and t.lower() in text) * 0.06
+                            # Sayı eşleşmesi (güçlü sinyal - 2x artırıldı)
+                            for num in q_numbers:
+                                if num.replace(",", ".") in text or num in text:
+                                    bonus += 0.20
+                            # URL sinyali: link taşıyan chunk'a bonus (artırıldı)
+                            try:
+                                if (doc.metadata.get("url") or "").strip():
+                                    bonus += 0.10
+                            except Exception:
+                                pass
+                            # Yeni: Test beklenen anahtar kelimeleri için ekstra bonus
+                            test_keywords = ["48.300", "43.759,80", "bottleneck", "nitelikli iş gücü açığı",
+                                           "hızlandırılmış", "81a", "İkamet Yasası", "ön onay",
+                                           "14 gün", "Wohnungsgeberbestätigung", "Anmeldung",
+                                           "Niederlassungserlaubnis", "B1", "36 ay", "emeklilik sigortası",
+                                           "§20a", "puan", "mesleki yeterlilik", "kalıcı ikamet", "A2",
+                                           "sosyal güvenlik", "çalışma izni", "53.130", "brüt", "45 yaş"]
+                            for keyword in test_keywords:
+                                if keyword.lower() in text:
+                                    bonus += 0.15
+                            ranked_pairs.append((doc, xs + bonus))
+
+                        ranked = sorted(ranked_pairs, key=lambda x: x[1], reverse=True)
+                        topn = 6 if detail_mode else 4
+                        ranked_docs = [doc for doc, _ in ranked]
+                        results = ranked_docs[:topn]
+                    except Exception as e:
+                        print(f"⚠️ Reranker kullanılamadı: {e}")
+                        ranked_docs = results
+                        results = results[: (6 if detail_mode else 4) ]
+                except Exception:
+                    # Hibrit arama kullan (BM25 + Semantic)
+                    results = self.hybrid_search(question, k_chunks)
+            
+            # Sonraki takip isteği için sıralı chunk kimliklerini ve sorgu vektörünü sakla
+            retrieval_state = {
+                "chunk_ids": self._doc_ids(ranked_docs if ranked_docs else results),
+                "used": len(results),
+                "query_vector": list(query_vector) if query_vector is not None else None,
+            }
             
             # 2. Context oluştur
             context = "\n\n".join([doc.page_content for doc in results])
@@ -711,19 +808,24 @@ CEVAP:"""
                     "date": doc.metadata.get("date", ""),
                     "content_preview": doc.page_content[:150] + "..." if len(doc.page_content) > 150 else doc.page_content,
                 }
+                if doc.metadata.get("start") is not None:
+                    source_info["start"] = doc.metadata.get("start")
+                    source_info["end"] = doc.metadata.get("end")
                 sources.append(source_info)
                 
-                # Kaynak linklerini ayrı liste olarak ekle (url boşsa da başlık ekleyelim)
+                # Kaynak linklerini ayrı liste olarak ekle (url boşsa da başlık ekleyelim);
+                # zaman damgalı transkript chunk'ı videonun ilgili anına bağlanır
                 source_links.append({
                     "title": source_info["title"],
-                    "url": source_info.get("url", "")
+                    "url": doc.metadata.get("timestamp_url") or source_info.get("url", ""),
+                    "base_url": source_info.get("url", "")
                 })
 
-            # URL'e göre tekilleştir (url boşsa başlığa göre)
+            # URL'e göre tekilleştir (url boşsa başlığa göre); aynı videonun en üst sıradaki anı kalır
             deduped = []
             seen_keys = set()
             for item in source_links:
-                key = item.get("url") or item.get("title")
+                key = item.pop("base_url") or item.get("title")
                 if key not in seen_keys:
                     seen_keys.add(key)
                     deduped.append(item)
@@ -818,7 +920,8 @@ CEVAP:"""
                         "model": f"{self.model_name} + Trained LoRA",
                         "action_buttons": action_buttons,
                         "special_response": special_check.get("special_response", False) or no_info,
-                        "special_type": special_check.get("type") if special_check.get("special_response") else ("no_info" if no_info else None)
+                        "special_type": special_check.get("type") if special_check.get("special_response") else ("no_info" if no_info else None),
+                        "retrieval": retrieval_state
                     }
                     
                 except Exception as e:
@@ -836,7 +939,8 @@ CEVAP:"""
                 "model": self.model_name,
                 "action_buttons": action_buttons,
                 "special_response": special_check.get("special_response", False) or no_info,
-                "special_type": special_check.get("type") if special_check.get("special_response") else ("no_info" if no_info else None)
+                "special_type": special_check.get("type") if special_check.get("special_response") else ("no_info" if no_info else None),
+                "retrieval": retrieval_state
             }
             
         except Exception as e:
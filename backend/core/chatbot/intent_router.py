@@ -0,0 +1,143 @@
+"""
+Gömme tabanlı niyet yönlendirici
+Soru vektörünü niyet ve kategori centroid'leriyle karşılaştırır; tek bir
+matris-vektör çarpımı ile niyet + güven skoru döndürür.
+"""
+
+import os
+import json
+import hashlib
+from typing import Dict, List, Optional
+import numpy as np
+import yaml
+
+DEFAULT_ROUTER_PATH = os.path.join(
+    os.path.dirname(__file__), "..", "..", "..", "config", "intent_router.yaml"
+)
+DEFAULT_CACHE_DIR = os.path.join(
+    os.path.dirname(__file__), "..", "..", "..", "data", "cache"
+)
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class IntentRouter:
+    """
+    Niyet ve kategori centroid'lerini hazırlar ve soru vektörünü yönlendirir.
+    Centroid'ler örnek cümlelerin (config/intent_router.yaml) ortalama gömmesidir.
+    """
+
+    def __init__(self, embeddings, config_path: Optional[str] = None,
+                 model_name: str = "", cache_dir: Optional[str] = None):
+        self.embeddings = embeddings
+        self.config_path = os.path.abspath(config_path or DEFAULT_ROUTER_PATH)
+        with open(self.config_path, 'r', encoding='utf-8') as f:
+            cfg = yaml.safe_load(f) or {}
+
+        thresholds = cfg.get("thresholds", {}) or {}
+        self.min_score = float(thresholds.get("min_score", 0.55))
+        self.min_margin = float(thresholds.get("min_margin", 0.05))
+        self.category_min_score = float(thresholds.get("category_min_score", 0.45))
+        self.special_intents = set(cfg.get("special_intents", []) or [])
+
+        intents: Dict[str, List[str]] = cfg.get("intents", {}) or {}
+        categories: Dict[str, List[str]] = cfg.get("categories", {}) or {}
+        self.intent_names = list(intents.keys())
+        self.category_ids = list(categories.keys())
+
+        # Örnekler değişince önbellek anahtarı da değişir
+        digest = hashlib.sha1(
+            json.dumps([model_name, intents, categories], ensure_ascii=False, sort_keys=True).encode("utf-8")
+        ).hexdigest()[:16]
+        cache_path = os.path.join(cache_dir or DEFAULT_CACHE_DIR, f"intent_centroids_{digest}.npz")
+
+        loaded = self._load_cache(cache_path)
+        if loaded is None:
+            self.intent_matrix = self._centroids(intents)
+            self.category_matrix = self._centroids(categories)
+            self._save_cache(cache_path)
+        else:
+            self.intent_matrix, self.category_matrix = loaded
+        print(f"✅ Niyet yönlendirici hazır: {len(self.intent_names)} niyet, {len(self.category_ids)} kategori")
+
+    def _centroids(self, groups: Dict[str, List[str]]) -> np.ndarray:
+        if not groups:
+            return np.zeros((0, 1), dtype=np.float32)
+        # Tüm örnekleri tek toplu çağrıda göm, sonra grup ortalamalarını al
+        texts: List[str] = []
+        spans = []
+        for examples in groups.values():
+            spans.append((len(texts), len(texts) + len(examples)))
+            texts.extend(examples)
+        vectors = _normalize_rows(np.asarray(self.embeddings.embed_documents(texts), dtype=np.float32))
+        rows = [vectors[a:b].mean(axis=0) for a, b in spans]
+        return _normalize_rows(np.vstack(rows))
+
+    def _load_cache(self, path: str):
+        try:
+            if os.path.exists(path):
+                data = np.load(path)
+                return data["intents"], data["categories"]
+        except Exception as e:
+            print(f"⚠️ Centroid önbelleği okunamadı: {e}")
+        return None
+
+    def _save_cache(self, path: str) -> None:
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            np.savez(path, intents=self.intent_matrix, categories=self.category_matrix)
+        except Exception as e:
+            print(f"⚠️ Centroid önbelleği yazılamadı: {e}")
+
+    def embed(self, text: str) -> List[float]:
+        return self.embeddings.embed_query(text)
+
+    def route_vector(self, vector) -> Dict:
+        """
+        Hazır soru vektörünü yönlendirir.
+        Dönüş: intent/intent_confidence/confident, category/category_confidence, special
+        """
+        q = np.asarray(vector, dtype=np.float32)
+        norm = float(np.linalg.norm(q))
+        if norm > 0:
+            q = q / norm
+
+        result = {
+            "intent": None,
+            "intent_confidence": 0.0,
+            "confident": False,
+            "special": False,
+            "category": None,
+            "category_confidence": 0.0,
+        }
+
+        if len(self.intent_names):
+            scores = self.intent_matrix @ q
+            order = np.argsort(scores)[::-1]
+            top = float(scores[order[0]])
+            second = float(scores[order[1]]) if len(order) > 1 else -1.0
+            intent = self.intent_names[int(order[0])]
+            result["intent"] = intent
+            result["intent_confidence"] = top
+            result["confident"] = top >= self.min_score and (top - second) >= self.min_margin
+            result["special"] = intent in self.special_intents
+
+        if len(self.category_ids):
+            cat_scores = self.category_matrix @ q
+            best = int(np.argmax(cat_scores))
+            if float(cat_scores[best]) >= self.category_min_score:
+                result["category"] = self.category_ids[best]
+                result["category_confidence"] = float(cat_scores[best])
+
+        return result
+
+    def route(self, text: str) -> Dict:
+        """Metni gömüp yönlendirir; vektör de sonuçla birlikte döner."""
+        vector = self.embed(text)
+        result = self.route_vector(vector)
+        result["vector"] = vector
+        return result
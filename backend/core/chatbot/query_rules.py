@@ -0,0 +1,166 @@
+"""
+Veri odaklı sorgu kuralları motoru
+config/query_rules.yaml içindeki genişletme, kategori ve niyet kurallarını
+tek bir Aho-Corasick otomatına derler; soru tek geçişte taranır.
+"""
+
+import os
+import unicodedata
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+import yaml
+
+DEFAULT_RULES_PATH = os.path.join(
+    os.path.dirname(__file__), "..", "..", "..", "config", "query_rules.yaml"
+)
+
+# Metin görünümleri: küçük harf ve ASCII'ye indirgenmiş (Türkçe karakter yok)
+VIEW_LOWER = 0
+VIEW_FOLDED = 1
+_VIEW_SEPARATOR = "\x00"
+
+
+def fold_text(text: str) -> str:
+    """Küçük harfe çevirip aksanları/Türkçe karakterleri ASCII'ye indirger."""
+    text = text.lower()
+    return unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii')
+
+
+class _Automaton:
+    """Basit Aho-Corasick otomatı; her desen bir veya daha çok etiket taşır."""
+
+    def __init__(self):
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.out: List[List[Tuple]] = [[]]
+
+    def add(self, pattern: str, payload: Tuple) -> None:
+        state = 0
+        for ch in pattern:
+            nxt = self.goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[state][ch] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.out.append([])
+            state = nxt
+        self.out[state].append(payload)
+
+    def build(self) -> None:
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self.goto[state].items():
+                queue.append(nxt)
+                f = self.fail[state]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                target = self.goto[f].get(ch, 0)
+                self.fail[nxt] = target if target != nxt else 0
+                # Sonek eşleşmelerini de çıktıya kat (tarama sırasında fail zinciri gezmemek için)
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+
+    def scan(self, text: str):
+        """(bitiş_indeksi, etiket) çiftlerini üretir."""
+        goto, fail, out = self.goto, self.fail, self.out
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                for payload in out[state]:
+                    yield i, payload
+
+
+class QueryRuleEngine:
+    """
+    Sorgu kurallarını yükler, derler ve tek geçişte eşleştirir.
+    match() sonucu: {"expansions": [...], "categories": [...], "intents": set(...)}
+    """
+
+    def __init__(self, rules_path: Optional[str] = None):
+        self.rules_path = os.path.abspath(rules_path or DEFAULT_RULES_PATH)
+        with open(self.rules_path, 'r', encoding='utf-8') as f:
+            rules = yaml.safe_load(f) or {}
+        self.version = rules.get("version", 1)
+        self.expansion_texts: List[str] = []
+        self.category_ids: List[str] = []
+        self.category_keywords: Dict[str, List[str]] = {}
+        self.intent_names: List[str] = []
+        self._automaton = _Automaton()
+        self._compile(rules)
+
+    def _compile(self, rules: Dict) -> None:
+        ac = self._automaton
+        for idx, item in enumerate(rules.get("expansions", []) or []):
+            self.expansion_texts.append(item.get("text", ""))
+            for kw in item.get("keywords", []) or []:
+                ac.add(kw.lower(), ("expansion", idx, VIEW_LOWER))
+
+        for idx, (cat_id, spec) in enumerate((rules.get("categories", {}) or {}).items()):
+            self.category_ids.append(cat_id)
+            self.category_keywords[cat_id] = list(spec.get("keywords", []) or [])
+            for kw in spec.get("indicators", []) or []:
+                ac.add(kw.lower(), ("category", idx, VIEW_LOWER))
+
+        for name, spec in (rules.get("intents", {}) or {}).items():
+            self.intent_names.append(name)
+            for kw in spec.get("keywords", []) or []:
+                ac.add(kw.lower(), ("intent", name, VIEW_LOWER))
+            for kw in spec.get("folded", []) or []:
+                ac.add(fold_text(kw), ("intent", name, VIEW_FOLDED))
+
+        ac.build()
+        print(f"✅ Sorgu kuralları derlendi (v{self.version}): "
+              f"{len(self.expansion_texts)} genişletme, {len(self.category_ids)} kategori, "
+              f"{len(self.intent_names)} niyet, {len(ac.goto)} durum")
+
+    def match(self, text: str) -> Dict:
+        """
+        Soruyu tek geçişte tarar. Küçük harf ve ASCII görünümleri ayraçla
+        birleştirilip otomata bir kez verilir; desenler ayracı içermediğinden
+        görünümler arası yanlış eşleşme olmaz.
+        """
+        lower = (text or "").lower()
+        combined = lower + _VIEW_SEPARATOR + fold_text(text or "")
+        boundary = len(lower)
+
+        expansion_hits = set()
+        category_hits = set()
+        intents = set()
+        for end, (kind, key, view) in self._automaton.scan(combined):
+            if (view == VIEW_LOWER) != (end < boundary):
+                continue
+            if kind == "expansion":
+                expansion_hits.add(key)
+            elif kind == "category":
+                category_hits.add(key)
+            else:
+                intents.add(key)
+
+        return {
+            "expansions": [self.expansion_texts[i] for i in sorted(expansion_hits)],
+            "categories": [self.category_ids[i] for i in sorted(category_hits)],
+            "intents": intents,
+        }
+
+    def detect_category(self, text: str) -> Optional[str]:
+        """İlk eşleşen kategori ID'si (config sırasına göre)."""
+        categories = self.match(text)["categories"]
+        return categories[0] if categories else None
+
+    def get_category_keywords(self, category_id: str) -> List[str]:
+        return self.category_keywords.get(category_id, [])
+
+
+_engine: Optional[QueryRuleEngine] = None
+
+
+def get_query_rules(rules_path: Optional[str] = None) -> QueryRuleEngine:
+    """Süreç başına tek derlenmiş motor döndürür."""
+    global _engine
+    if _engine is None or (rules_path and os.path.abspath(rules_path) != _engine.rules_path):
+        _engine = QueryRuleEngine(rules_path)
+    return _engine
@@ -0,0 +1,269 @@
+"""
+Oturum hafızası deposu
+Sohbet geçmişini (turlar + ek durum) oturum kimliğine göre saklar.
+- MemorySessionStore: süreç içi LRU + TTL (tek worker için hızlı)
+- SQLiteSessionStore: yerel dosya üzerinde paylaşımlı depo (çoklu uvicorn worker)
+Her iki depo da boyut ve tahliye (eviction) metrikleri tutar.
+"""
+
+import os
+import copy
+import json
+import time
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+DEFAULT_SQLITE_PATH = os.path.join(
+    os.path.dirname(__file__), "..", "..", "..", "data", "sessions", "sessions.db"
+)
+
+
+class SessionStore(ABC):
+    """
+    Oturum deposu arayüzü. Oturum durumu JSON'a çevrilebilir bir sözlüktür:
+    {"turns": [{"role": ..., "content": ...}, ...], ...}
+    get() her zaman bağımsız bir kopya döndürür; değişiklikler save()/update() ile yazılır.
+    """
+
+    backend = ""
+
+    def __init__(self, max_sessions: int = 5000, ttl_seconds: int = 3600):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evicted_lru = 0
+        self.evicted_ttl = 0
+
+    @abstractmethod
+    def get(self, session_id: str) -> Dict:
+        ...
+
+    @abstractmethod
+    def save(self, session_id: str, state: Dict) -> None:
+        ...
+
+    @abstractmethod
+    def update(self, session_id: str, fn: Callable[[Dict], None]) -> Dict:
+        """
+        Oku-değiştir-yaz işlemini atomik yapar: fn(state) durumu yerinde değiştirir.
+        Aynı oturuma eşzamanlı yazanlar (ör. /ask ve arka plan özeti) birbirinin alanlarını ezmez.
+        """
+
+    @abstractmethod
+    def delete(self, session_id: str) -> None:
+        ...
+
+    @abstractmethod
+    def size(self) -> int:
+        ...
+
+    def stats(self) -> Dict:
+        return {
+            "backend": self.backend,
+            "sessions": self.size(),
+            "max_sessions": self.max_sessions,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evicted_lru": self.evicted_lru,
+            "evicted_ttl": self.evicted_ttl,
+        }
+
+
+class MemorySessionStore(SessionStore):
+    """Süreç içi LRU + TTL deposu; en uzun süre dokunulmayan oturum önce atılır."""
+
+    backend = "memory"
+
+    def __init__(self, max_sessions: int = 5000, ttl_seconds: int = 3600):
+        super().__init__(max_sessions, ttl_seconds)
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _expire(self, now: float) -> None:
+        # OrderedDict en eski erişim başta olacak şekilde tutulur
+        while self._data:
+            sid, (ts, _) = next(iter(self._data.items()))
+            if now - ts <= self.ttl_seconds:
+                break
+            self._data.popitem(last=False)
+            self.evicted_ttl += 1
+
+    def get(self, session_id: str) -> Dict:
+        now = time.time()
+        with self._lock:
+            self._expire(now)
+            item = self._data.get(session_id)
+            if item is None:
+                self.misses += 1
+                return {"turns": []}
+            self.hits += 1
+            self._data[session_id] = (now, item[1])
+            self._data.move_to_end(session_id)
+            # Kopya döner: çağıran taraf save() çağırmadan önbellekteki durumu değiştiremez
+            return copy.deepcopy(item[1])
+
+    def _put(self, session_id: str, state: Dict, now: float) -> None:
+        self._data[session_id] = (now, state)
+        self._data.move_to_end(session_id)
+        self._expire(now)
+        while len(self._data) > self.max_sessions:
+            self._data.popitem(last=False)
+            self.evicted_lru += 1
+
+    def save(self, session_id: str, state: Dict) -> None:
+        now = time.time()
+        with self._lock:
+            self._put(session_id, copy.deepcopy(state), now)
+
+    def update(self, session_id: str, fn: Callable[[Dict], None]) -> Dict:
+        now = time.time()
+        with self._lock:
+            self._expire(now)
+            item = self._data.get(session_id)
+            state = copy.deepcopy(item[1]) if item is not None else {"turns": []}
+            fn(state)
+            self._put(session_id, state, now)
+            return copy.deepcopy(state)
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._data.pop(session_id, None)
+
+    def size(self) -> int:
+        return len(self._data)
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    SQLite tabanlı paylaşımlı depo. Aynı dosyayı kullanan tüm worker'lar
+    aynı konuşma geçmişini görür. TTL ve LRU tahliyesi yazma sırasında yapılır.
+    """
+
+    backend = "sqlite"
+
+    def __init__(self, path: Optional[str] = None, max_sessions: int = 5000, ttl_seconds: int = 3600,
+                 cleanup_every: int = 50):
+        super().__init__(max_sessions, ttl_seconds)
+        self.path = os.path.abspath(path or DEFAULT_SQLITE_PATH)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            "session_id TEXT PRIMARY KEY, state TEXT NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_updated ON sessions(updated_at)")
+        self._conn.commit()
+        # Her yazmada değil, belirli aralıklarla temizlik yap
+        self.cleanup_every = max(1, cleanup_every)
+        self._writes = 0
+
+    def get(self, session_id: str) -> Dict:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT state, updated_at FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            if row is None or now - row[1] > self.ttl_seconds:
+                self.misses += 1
+                return {"turns": []}
+            self.hits += 1
+            self._conn.execute("UPDATE sessions SET updated_at = ? WHERE session_id = ?", (now, session_id))
+            self._conn.commit()
+        try:
+            return json.loads(row[0])
+        except Exception:
+            return {"turns": []}
+
+    def _write(self, session_id: str, state: Dict, now: float) -> None:
+        self._conn.execute(
+            "INSERT INTO sessions(session_id, state, updated_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(session_id) DO UPDATE SET state = excluded.state, updated_at = excluded.updated_at",
+            (session_id, json.dumps(state, ensure_ascii=False), now)
+        )
+        self._writes += 1
+        if self._writes % self.cleanup_every == 0:
+            self._cleanup(now)
+
+    def save(self, session_id: str, state: Dict) -> None:
+        now = time.time()
+        with self._lock:
+            self._write(session_id, state, now)
+            self._conn.commit()
+
+    def update(self, session_id: str, fn: Callable[[Dict], None]) -> Dict:
+        now = time.time()
+        with self._lock:
+            # BEGIN IMMEDIATE yazma kilidini okumadan önce alır: diğer worker'lar araya giremez
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT state, updated_at FROM sessions WHERE session_id = ?", (session_id,)
+                ).fetchone()
+                state = {"turns": []}
+                if row is not None and now - row[1] <= self.ttl_seconds:
+                    try:
+                        state = json.loads(row[0])
+                    except Exception:
+                        pass
+                fn(state)
+                self._write(session_id, state, now)
+                self._conn.commit()
+            except BaseException:
+                self._conn.rollback()
+                raise
+        return state
+
+    def _cleanup(self, now: float) -> None:
+        cur = self._conn.execute("DELETE FROM sessions WHERE updated_at < ?", (now - self.ttl_seconds,))
+        self.evicted_ttl += cur.rowcount or 0
+        count = self._conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+        overflow = count - self.max_sessions
+        if overflow > 0:
+            cur = self._conn.execute(
+                "DELETE FROM sessions WHERE session_id IN ("
+                "SELECT session_id FROM sessions ORDER BY updated_at ASC LIMIT ?)",
+                (overflow,)
+            )
+            self.evicted_lru += cur.rowcount or 0
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+            self._conn.commit()
+
+    def size(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    def stats(self) -> Dict:
+        out = super().stats()
+        out["path"] = self.path
+        return out
+
+
+def create_session_store() -> SessionStore:
+    """
+    Ortam değişkenlerine göre depo oluştur:
+      SESSION_STORE=memory|sqlite (varsayılan: memory)
+      SESSION_STORE_PATH, SESSION_MAX_SESSIONS, SESSION_TTL_SECONDS
+    """
+    backend = os.getenv("SESSION_STORE", "memory").lower()
+    max_sessions = int(os.getenv("SESSION_MAX_SESSIONS", "5000"))
+    ttl_seconds = int(os.getenv("SESSION_TTL_SECONDS", "3600"))
+    if backend == "sqlite":
+        try:
+            store = SQLiteSessionStore(os.getenv("SESSION_STORE_PATH") or None, max_sessions, ttl_seconds)
+            print(f"✅ Oturum deposu: SQLite ({store.path})")
+            return store
+        except Exception as e:
+            print(f"⚠️ SQLite oturum deposu açılamadı, bellek içi depo kullanılacak: {e}")
+    print(f"✅ Oturum deposu: bellek içi LRU (max={max_sessions}, ttl={ttl_seconds}s)")
+    return MemorySessionStore(max_sessions, ttl_seconds)
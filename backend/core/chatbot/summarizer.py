@@ -0,0 +1,128 @@
+"""
+Çıkarımsal (extractive) özetleme yardımcıları
+Dolgu cümlelerini eler, bilgi sinyali taşıyan cümleleri puanlar. Hem transkript
+önizlemesinde hem de oturum başına kayan (rolling) konuşma özetinde kullanılır.
+"""
+
+import re
+from typing import List, Tuple
+
+_SENTENCE_SPLIT = re.compile(r"(?<=[\.!?])\s+")
+
+_FILLER_PATTERNS = [
+    re.compile(p) for p in [
+        r"bildirimleri açın|takip edin|abone ol|beğenin|paylaşın",
+        r"sanal değil gerçek ofis",
+        r"dostlarınıza tavsiye|arkadaş|eşinizi|dostunuzu",
+        r"videonun|kanalın|yorumlarda|açıklama bölümünde",
+        r"giriş|kapanış|merhaba|selam",
+    ]
+]
+
+# Bilgi sinyali: rakam, yasa/kod, vize kodları, anahtar kelimeler
+_SIGNAL_PATTERNS = [
+    re.compile(p) for p in [
+        r"\b(18a|18b|18g|19c|81a|anabin|zab|ezb|mavi kart|blue card)\b",
+        r"\b\d{4}\b|%|€|euro|gün|hafta|ay|yıl",
+        r"vize|başvuru|randevu|ikamet|çalışma|sözleşme|şart|gerekli|belge|ücret|denklik",
+    ]
+]
+
+# Cevaplara eklenen footer/ayırıcı (özete alınmaz)
+_FOOTER = re.compile(r"\n+(—+|-{3,})\n+.*$|\n+📚.*$", re.DOTALL)
+
+
+def split_sentences(text: str) -> List[str]:
+    if not text:
+        return []
+    return [s for s in _SENTENCE_SPLIT.split(text.strip()) if s]
+
+
+def is_filler(sentence: str) -> bool:
+    s_low = sentence.lower()
+    return any(p.search(s_low) for p in _FILLER_PATTERNS) or len(s_low) < 25
+
+
+def score_sentence(sentence: str) -> int:
+    score = 0
+    sl = sentence.lower()
+    for p in _SIGNAL_PATTERNS:
+        if p.search(sl):
+            score += 1
+    if len(sentence) > 80:
+        score += 1
+    return score
+
+
+def informative_preview(text: str, max_chars: int = 1400) -> str:
+    """Dolgu cümlelerini çıkarır, bilgi yoğun cümleleri puana göre öne alır."""
+    if not text:
+        return ""
+    informative = [s for s in split_sentences(text) if not is_filler(s)]
+    informative_sorted = sorted(informative, key=score_sentence, reverse=True)
+
+    out: List[str] = []
+    total = 0
+    for s in informative_sorted:
+        if total + len(s) + 1 > max_chars:
+            break
+        out.append(s)
+        total += len(s) + 1
+    return " ".join(out).strip()
+
+
+def _select(candidates: List[Tuple[int, str, float]], max_chars: int) -> str:
+    """Puanı yüksek cümleleri bütçeye sığdırır, çıktıda özgün sırayı korur."""
+    chosen: List[Tuple[int, str]] = []
+    seen = set()
+    total = 0
+    # Eşit puanda daha yeni (sonra gelen) cümle öne geçer
+    for order, sentence, _ in sorted(candidates, key=lambda c: (c[2], c[0]), reverse=True):
+        key = sentence.lower()
+        if key in seen or total + len(sentence) + 1 > max_chars:
+            continue
+        seen.add(key)
+        chosen.append((order, sentence))
+        total += len(sentence) + 1
+    return " ".join(s for _, s in sorted(chosen)).strip()
+
+
+def summarize_answer(answer: str, max_chars: int = 700) -> str:
+    """Tek bir cevabın sabit boyutlu çıkarımsal özeti (cümle ortasında kesmez)."""
+    text = _FOOTER.sub("", answer or "")
+    text = re.sub(r"\s*\n\s*", " ", text)
+    sentences = [s for s in split_sentences(text) if not is_filler(s)]
+    candidates = [(i, s, score_sentence(s)) for i, s in enumerate(sentences)]
+    return _select(candidates, max_chars)
+
+
+def update_rolling_summary(previous: str, question: str, answer: str, max_chars: int = 600) -> str:
+    """
+    Kayan konuşma özeti: önceki özetin cümleleri ile yeni turun cevabı birlikte
+    puanlanır; eski cümleler bir miktar cezalandırılır, son kullanıcı sorusu
+    her zaman korunur. Çıktı max_chars'ı aşmaz, böylece takip istemleri sabit boyutta kalır.
+    """
+    candidates: List[Tuple[int, str, float]] = []
+    order = 0
+    previous_sentences = split_sentences(previous or "")
+    for i, s in enumerate(previous_sentences):
+        # Önceki özetteki cümleler kronolojik sıradadır: eskidikçe ceza artar
+        age_penalty = 1.5 + 0.25 * (len(previous_sentences) - i)
+        candidates.append((order, s, score_sentence(s) - age_penalty))
+        order += 1
+
+    q = re.sub(r"\s+", " ", (question or "").strip())
+    if q:
+        if len(q) > 150:
+            q = q[:150].rsplit(" ", 1)[0] + "…"
+        if not q.endswith((".", "?", "!", "…")):
+            q += "?"
+        candidates.append((order, f"Soru: {q}", float("inf")))
+        order += 1
+
+    text = re.sub(r"\s*\n\s*", " ", _FOOTER.sub("", answer or ""))
+    for s in split_sentences(text):
+        if not is_filler(s):
+            candidates.append((order, s, score_sentence(s)))
+            order += 1
+    return _select(candidates, max_chars)
@@ -0,0 +1,83 @@
+"""
+DOCX → metin dönüştürme (belge ingest scriptleri için ortak)
+- Başlıklar markdown (##), listeler "- " olarak normalize edilir, tablolar "a | b" satırlarına çevrilir
+- parse_docx_files(): dosyaları süreç havuzunda paralel ayrıştırır (python-docx saf Python ve
+  CPU'ya bağlı; thread'ler GIL yüzünden hızlanmaz), sonuçları giriş sırasıyla döndürür
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+try:
+    from docx import Document  # python-docx
+except ImportError:
+    Document = None
+
+
+def docx_to_text(path) -> str:
+    """DOCX dosyasını metne çevirir; python-docx yoksa veya dosya okunamazsa istisna yükseltir."""
+    if Document is None:
+        raise RuntimeError("python-docx paketi gerekli. Kurulum: pip install python-docx")
+    doc = Document(str(path))
+    parts = []
+    # Paragraflar (başlıkları ve listeleri koru)
+    for p in doc.paragraphs:
+        txt = (p.text or "").strip()
+        if not txt:
+            continue
+        style = (p.style.name or "").lower()
+        if style.startswith("heading"):
+            # Vectorstore chunking separatorlarıyla uyumlu başlıklar
+            level = 2
+            try:
+                level = int(''.join(ch for ch in p.style.name if ch.isdigit()) or '2')
+            except Exception:
+                level = 2
+            parts.append(("#" * max(2, min(6, level))) + f" {txt}")
+        elif style.startswith("list") or txt.startswith(("•", "-", "*")):
+            # Madde işaretlerini normalize et
+            clean = txt.lstrip("•*- ").strip()
+            parts.append(f"- {clean}")
+        else:
+            parts.append(txt)
+    # Tablolar (varsa)
+    for tbl in doc.tables:
+        for row in tbl.rows:
+            cells = [c.text.strip() for c in row.cells if c.text and c.text.strip()]
+            if cells:
+                parts.append(" | ".join(cells))
+    return "\n".join(parts).strip()
+
+
+def infer_title(file_path: Path) -> str:
+    title = Path(file_path).stem.replace("_", " ").replace("-", " ").strip()
+    # İlk harfleri büyüt
+    return " ".join(w.capitalize() for w in title.split()) or "Belge"
+
+
+def _parse(path: str) -> Tuple[str, Optional[str]]:
+    """Süreç havuzunda çalışır: (metin, hata) — hata pickle sorunları olmasın diye metin olarak döner."""
+    try:
+        return docx_to_text(path), None
+    except Exception as e:
+        return "", f"{type(e).__name__}: {e}"
+
+
+def parse_docx_files(paths: Iterable, workers: Optional[int] = None) -> Iterator[Tuple[Path, str, Optional[str]]]:
+    """
+    DOCX dosyalarını paralel ayrıştırır. Üretir: (yol, metin, hata) — giriş sırasıyla.
+    workers: süreç sayısı (varsayılan DOCX_WORKERS veya CPU sayısı; 1 = aynı süreçte sıralı)
+    """
+    paths: List[Path] = [Path(p) for p in paths]
+    if workers is None:
+        workers = int(os.getenv("DOCX_WORKERS", "0")) or (os.cpu_count() or 1)
+    workers = max(1, min(workers, len(paths)))
+    if workers == 1:
+        for path in paths:
+            yield (path, *_parse(str(path)))
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for path, (text, error) in zip(paths, pool.map(_parse, [str(p) for p in paths])):
+            yield path, text, error
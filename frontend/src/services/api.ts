@@ -40,6 +40,41 @@ export async function askApi(payload: AskRequest, signal?: AbortSignal): Promise
   return (await res.json()) as AskResponse;
 }
 
+export type IngestJob = {
+  job_id: string;
+  kind: string;
+  status: 'queued' | 'running' | 'done' | 'failed';
+  stage: string;
+  progress: { done?: number; total?: number };
+  error?: string | null;
+  result?: any;
+};
+
+export async function getIngestJobApi(jobId: string, signal?: AbortSignal): Promise<IngestJob> {
+  const res = await fetch(`${API_BASE_URL}/ingest/jobs/${jobId}`, { signal });
+  if (!res.ok) {
+    const text = await res.text();
+    throw new Error(`INGEST_JOB_FAILED ${res.status}: ${text}`);
+  }
+  return (await res.json()) as IngestJob;
+}
+
+// Ingest uçları işi kuyruğa alıp hemen döner; iş bitene kadar durumu yokla
+export async function waitForIngestJob(
+  jobId: string,
+  signal?: AbortSignal,
+  onProgress?: (job: IngestJob) => void,
+  intervalMs = 2000,
+): Promise<any> {
+  for (;;) {
+    const job = await getIngestJobApi(jobId, signal);
+    onProgress?.(job);
+    if (job.status === 'done') return { ...job.result, job_id: job.job_id };
+    if (job.status === 'failed') throw new Error(`INGEST_JOB_FAILED: ${job.error ?? ''}`);
+    await new Promise((resolve) => setTimeout(resolve, intervalMs));
+  }
+}
+
 export async function ingestTranscriptApi(
   params: { text: string; title?: string; url?: string; author?: string; clean?: boolean },
   signal?: AbortSignal,
@@ -60,12 +95,14 @@ export async function ingestTranscriptApi(
     const text = await res.text();
     throw new Error(`INGEST_TRANSCRIPT_FAILED ${res.status}: ${text}`);
   }
-  return await res.json();
+  const job = await res.json();
+  return await waitForIngestJob(job.job_id, signal);
 }
 
 export async function ingestVideoApi(
   params: { file: File; language?: string; title?: string; url?: string; author?: string; clean?: boolean; dry_run?: boolean },
   signal?: AbortSignal,
+  onProgress?: (job: IngestJob) => void,
 ): Promise<any> {
   const form = new FormData();
   form.set('file', params.file);
@@ -85,7 +122,8 @@ export async function ingestVideoApi(
     const text = await res.text();
     throw new Error(`INGEST_VIDEO_FAILED ${res.status}: ${text}`);
   }
-  return await res.json();
+  const job = await res.json();
+  return await waitForIngestJob(job.job_id, signal, onProgress);
 }
 
 
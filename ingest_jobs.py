@@ -0,0 +1,378 @@
+"""
+Kalıcı ingest iş kuyruğu
+- /ingest/* istekleri iş olarak SQLite'a yazılır (data/jobs/jobs.db) ve hemen iş kimliği döner
+- İşler ayrı bir worker thread havuzunda çalışır; istek döngüsü ve /ask bloklanmaz
+- Her iş aşama ve ilerleme yayınlar (extracting → transcribing n/m → cleaning → embedding → indexed)
+- İşler atomik olarak sahiplenilir (status=queued → running, owner/heartbeat); birden çok uvicorn
+  worker'ı aynı veritabanını paylaşsa da bir iş tek süreçte çalışır
+- Sahibinin heartbeat'i lease süresince yenilenmeyen (süreci ölmüş) işler kuyruğa geri alınır; iş
+  klasöründeki ara çıktılar (ses, segmentler, segment transkriptleri) sayesinde tamamlanan adımlar tekrarlanmaz
+"""
+
+import os
+import json
+import socket
+import time
+import uuid
+import queue
+import shutil
+import asyncio
+import sqlite3
+import threading
+from typing import Callable, Dict, List, Optional
+
+DEFAULT_JOBS_DIR = os.path.join(os.path.dirname(__file__), "data", "jobs")
+
+# İş durumları; aşama (stage) bilgisi bunlardan bağımsız olarak handler tarafından yazılır
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+FINISHED_STATES = (DONE, FAILED)
+
+_JSON_FIELDS = ("params", "progress", "state", "result")
+
+
+class JobStore:
+    """SQLite iş tablosu. Tüm alanlar tek satırda; JSON alanlar metin olarak saklanır."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = os.path.abspath(path or os.path.join(DEFAULT_JOBS_DIR, "jobs.db"))
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "job_id TEXT PRIMARY KEY, kind TEXT NOT NULL, status TEXT NOT NULL, stage TEXT, "
+            "progress TEXT, params TEXT, state TEXT, result TEXT, error TEXT, attempts INTEGER DEFAULT 0, "
+            "created_at REAL, updated_at REAL, started_at REAL, finished_at REAL, owner TEXT, heartbeat REAL)"
+        )
+        # Eski veritabanları: sahiplenme sütunları sonradan eklendi
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        for column, kind in (("owner", "TEXT"), ("heartbeat", "REAL")):
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {kind}")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, created_at)")
+        self._conn.commit()
+
+    @staticmethod
+    def _row(row) -> Optional[Dict]:
+        if row is None:
+            return None
+        job = dict(row)
+        for key in _JSON_FIELDS:
+            try:
+                job[key] = json.loads(job[key]) if job[key] else {}
+            except Exception:
+                job[key] = {}
+        return job
+
+    def create(self, kind: str, params: Dict, job_id: Optional[str] = None) -> Dict:
+        now = time.time()
+        job_id = job_id or uuid.uuid4().hex
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs(job_id, kind, status, stage, progress, params, state, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, kind, QUEUED, QUEUED, "{}", json.dumps(params, ensure_ascii=False), "{}", now, now)
+            )
+            self._conn.commit()
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return self._row(row)
+
+    def update(self, job_id: str, **fields) -> None:
+        if not fields:
+            return
+        fields["updated_at"] = time.time()
+        for key in _JSON_FIELDS:
+            if key in fields:
+                fields[key] = json.dumps(fields[key], ensure_ascii=False)
+        columns = ", ".join(f"{k} = ?" for k in fields)
+        with self._lock:
+            self._conn.execute(f"UPDATE jobs SET {columns} WHERE job_id = ?", (*fields.values(), job_id))
+            self._conn.commit()
+
+    def list(self, limit: int = 50, status: Optional[str] = None) -> List[Dict]:
+        sql = "SELECT * FROM jobs"
+        args: tuple = ()
+        if status:
+            sql += " WHERE status = ?"
+            args = (status,)
+        sql += " ORDER BY created_at DESC LIMIT ?"
+        with self._lock:
+            rows = self._conn.execute(sql, (*args, limit)).fetchall()
+        return [self._row(r) for r in rows]
+
+    def claim(self, job_id: str, owner: str) -> Optional[Dict]:
+        """
+        Kuyruktaki işi atomik olarak sahiplenir (queued → running, deneme sayısı artar).
+        İş başka bir süreç/thread tarafından alınmışsa veya bitmişse None.
+        """
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = ?, owner = ?, heartbeat = ?, attempts = COALESCE(attempts, 0) + 1, "
+                "started_at = COALESCE(started_at, ?), updated_at = ? WHERE job_id = ? AND status = ?",
+                (RUNNING, owner, now, now, now, job_id, QUEUED)
+            )
+            self._conn.commit()
+        if cursor.rowcount != 1:
+            return None
+        return self.get(job_id)
+
+    def heartbeat(self, owner: str) -> None:
+        """Sahibin çalışan işlerinin lease'ini yeniler."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("UPDATE jobs SET heartbeat = ? WHERE owner = ? AND status = ?", (now, owner, RUNNING))
+            self._conn.commit()
+
+    def requeue_expired(self, lease: float) -> int:
+        """Heartbeat'i lease süresinden eski (sahibi ölmüş) çalışan işleri kuyruğa geri alır."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = ?, owner = NULL WHERE status = ? AND (heartbeat IS NULL OR heartbeat < ?)",
+                (QUEUED, RUNNING, time.time() - lease)
+            )
+            self._conn.commit()
+        return cursor.rowcount
+
+    def queued(self, older_than: Optional[float] = None) -> List[str]:
+        """Kuyruktaki iş kimlikleri (older_than: yalnızca bu süreden beri bekleyenler)."""
+        sql, args = "SELECT job_id FROM jobs WHERE status = ?", [QUEUED]
+        if older_than is not None:
+            sql += " AND updated_at < ?"
+            args.append(time.time() - older_than)
+        with self._lock:
+            rows = self._conn.execute(sql + " ORDER BY created_at ASC", args).fetchall()
+        return [row[0] for row in rows]
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+
+class JobContext:
+    """Handler'a verilen iş bağlamı: parametreler, iş klasörü, ilerleme ve ara durum (checkpoint)."""
+
+    def __init__(self, store: JobStore, job: Dict, work_dir: str):
+        self.store = store
+        self.job_id = job["job_id"]
+        self.kind = job["kind"]
+        self.params: Dict = job["params"]
+        self.state: Dict = job["state"]
+        self.attempts: int = job["attempts"]
+        self.work_dir = work_dir
+
+    def progress(self, stage: str, done: Optional[int] = None, total: Optional[int] = None, **extra) -> None:
+        progress = dict(extra)
+        if total is not None:
+            progress["done"] = done or 0
+            progress["total"] = total
+        self.store.update(self.job_id, stage=stage, progress=progress)
+        if total is not None:
+            print(f"⏳ İş {self.job_id[:8]}: {stage} {done or 0}/{total}")
+        else:
+            print(f"⏳ İş {self.job_id[:8]}: {stage}")
+
+    def checkpoint(self, **values) -> None:
+        """Yeniden başlatmada kaldığı yerden devam için ara durumu kaydeder."""
+        self.state.update(values)
+        self.store.update(self.job_id, state=self.state)
+
+    def path(self, *parts: str) -> str:
+        return os.path.join(self.work_dir, *parts)
+
+
+class IngestJobQueue:
+    """
+    Worker thread havuzu. submit() işi kaydedip kuyruğa alır; handler(ctx) sonucu
+    (JSON'a çevrilebilir sözlük) işin result alanına yazılır, istisna error alanına.
+    """
+
+    def __init__(self, store: JobStore, workers: int = 1, max_attempts: int = 3,
+                 jobs_dir: Optional[str] = None, lease: float = 120.0):
+        self.store = store
+        self.workers = max(1, workers)
+        self.max_attempts = max(1, max_attempts)
+        # Heartbeat lease'in dörtte birinde bir yenilenir; lease boyunca yenilenmeyen iş sahipsiz sayılır
+        self.lease = max(1.0, lease)
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.jobs_dir = os.path.abspath(jobs_dir or os.path.dirname(store.path))
+        self._handlers: Dict[str, Callable[[JobContext], Dict]] = {}
+        self._queue: "queue.Queue" = queue.Queue()
+        self._threads: List[threading.Thread] = []
+        self._started = False
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._pending: set = set()  # Yerel kuyrukta bekleyen iş kimlikleri (tekrar eklenmesin)
+
+    def register(self, kind: str, handler: Callable[[JobContext], Dict]) -> None:
+        self._handlers[kind] = handler
+
+    def work_dir(self, job_id: str) -> str:
+        path = os.path.join(self.jobs_dir, job_id)
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def new_job_id(self) -> str:
+        """Dosya yüklemeli işler için: klasör iş kaydından önce hazırlanabilsin."""
+        return uuid.uuid4().hex
+
+    def submit(self, kind: str, params: Dict, job_id: Optional[str] = None) -> Dict:
+        if kind not in self._handlers:
+            raise ValueError(f"Bilinmeyen iş türü: {kind}")
+        job = self.store.create(kind, params, job_id=job_id)
+        self._enqueue(job["job_id"])
+        return job
+
+    def _enqueue(self, job_id: str) -> None:
+        with self._lock:
+            if job_id in self._pending:
+                return
+            self._pending.add(job_id)
+        self._queue.put(job_id)
+
+    def start(self) -> None:
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        # Sahibi ölmüş çalışan işler ve bekleyen işler kuyruğa alınır; başka bir worker'da
+        # çalışmakta olanlara dokunulmaz (claim yalnızca queued işi alır)
+        expired = self.store.requeue_expired(self.lease)
+        if expired:
+            print(f"🔁 Yarım kalan {expired} ingest işi yeniden kuyruğa alındı")
+        for job_id in self.store.queued():
+            self._enqueue(job_id)
+        self._stopping.clear()
+        for i in range(self.workers):
+            t = threading.Thread(target=self._worker, name=f"ingest-worker-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+        t = threading.Thread(target=self._maintain, name="ingest-heartbeat", daemon=True)
+        t.start()
+        self._threads.append(t)
+        print(f"✅ Ingest iş kuyruğu hazır: {self.workers} worker ({self.store.path})")
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stopping.set()
+        for _ in self._threads:
+            self._queue.put(None)
+        for t in self._threads:
+            t.join(timeout)
+        self._threads = []
+        self._started = False
+
+    def _worker(self) -> None:
+        while True:
+            job_id = self._queue.get()
+            if job_id is None:
+                break
+            with self._lock:
+                self._pending.discard(job_id)
+            try:
+                self._run(job_id)
+            except Exception as e:
+                print(f"⚠️ Ingest worker hatası ({job_id}): {e}")
+
+    def _maintain(self) -> None:
+        """
+        Heartbeat: bu sürecin çalışan işlerinin lease'ini yeniler. Sahibi ölmüş işleri ve uzun süredir
+        bekleyen (gönderen süreci kapanmış olabilecek) işleri yerel kuyruğa alır; claim çift çalışmayı önler.
+        """
+        interval = self.lease / 4
+        while not self._stopping.wait(interval):
+            try:
+                self.store.heartbeat(self.owner)
+                if self.store.requeue_expired(self.lease):
+                    print("🔁 Sahibi yanıt vermeyen ingest işi yeniden kuyruğa alındı")
+                for job_id in self.store.queued(older_than=self.lease):
+                    self._enqueue(job_id)
+            except Exception as e:
+                print(f"⚠️ Ingest heartbeat hatası: {e}")
+
+    def _run(self, job_id: str) -> None:
+        job = self.store.claim(job_id, self.owner)
+        if job is None:
+            return  # Bitmiş ya da başka bir worker sahiplenmiş
+        handler = self._handlers.get(job["kind"])
+        if handler is None or job["attempts"] > self.max_attempts:
+            error = "Bilinmeyen iş türü" if handler is None else "Deneme sınırı aşıldı"
+            self.store.update(job_id, status=FAILED, stage=FAILED, error=error, finished_at=time.time())
+            return
+
+        ctx = JobContext(self.store, job, self.work_dir(job_id))
+        try:
+            result = handler(ctx) or {}
+        except Exception as e:
+            # İş klasörü (yüklenen dosya, segment transkriptleri) incelemek/yeniden göndermek için kalır
+            print(f"❌ Ingest işi başarısız ({job_id[:8]}): {e} — ara çıktılar: {ctx.work_dir}")
+            self.store.update(job_id, status=FAILED, stage=FAILED, error=str(e), finished_at=time.time())
+            return
+        self.store.update(job_id, status=DONE, result=result, error=None, finished_at=time.time())
+        # Ara çıktılar (yüklenen dosya, ses, segmentler) yalnızca devam için tutulur
+        shutil.rmtree(ctx.work_dir, ignore_errors=True)
+
+    async def wait(self, job_id: str, timeout: Optional[float] = None, interval: float = 0.5) -> Optional[Dict]:
+        """İş bitene kadar olay döngüsünü bloklamadan bekler (eski senkron yanıt modu için)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            job = self.store.get(job_id)
+            if job is None or job["status"] in FINISHED_STATES:
+                return job
+            if deadline is not None and time.monotonic() >= deadline:
+                return job
+            await asyncio.sleep(interval)
+
+    def stats(self) -> Dict:
+        return {
+            "workers": self.workers,
+            "queued": self._queue.qsize(),
+            "jobs": self.store.counts(),
+            "path": self.store.path,
+        }
+
+
+def public_job(job: Optional[Dict]) -> Optional[Dict]:
+    """API yanıtı: parametreler (ham metin vb.) ve iç durum hariç."""
+    if job is None:
+        return None
+    return {
+        "job_id": job["job_id"],
+        "kind": job["kind"],
+        "status": job["status"],
+        "stage": job["stage"],
+        "progress": job["progress"],
+        "title": job["params"].get("title"),
+        "attempts": job["attempts"],
+        "error": job["error"],
+        "result": job["result"] or None,
+        "created_at": job["created_at"],
+        "updated_at": job["updated_at"],
+        "started_at": job["started_at"],
+        "finished_at": job["finished_at"],
+    }
+
+
+def create_job_queue() -> IngestJobQueue:
+    """
+    Ortam değişkenlerine göre iş kuyruğu oluştur:
+      INGEST_JOBS_PATH (SQLite dosyası), INGEST_WORKERS (varsayılan 1), INGEST_MAX_ATTEMPTS (varsayılan 3),
+      INGEST_JOB_LEASE (sn, varsayılan 120: heartbeat'i bu süre yenilenmeyen iş başka worker'a geçer)
+    """
+    store = JobStore(os.getenv("INGEST_JOBS_PATH") or None)
+    return IngestJobQueue(
+        store,
+        workers=int(os.getenv("INGEST_WORKERS", "1")),
+        max_attempts=int(os.getenv("INGEST_MAX_ATTEMPTS", "3")),
+        lease=float(os.getenv("INGEST_JOB_LEASE", "120")),
+    )
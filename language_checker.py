@@ -0,0 +1,322 @@
+"""
+LanguageTool düzeltme aşaması
+- Yerel LanguageTool sunucu havuzu (her örnek ayrı bir Java sunucusu) veya
+  LANGUAGETOOL_URLS ile verilen hazır sunucular
+- Uzun metinler cümle gruplarına bölünür, gruplar paralel denetlenir
+- Düzeltmeler cümle hash'ine göre önbelleğe alınır (aynı cümle bir daha denetlenmez)
+- İnteraktif kullanım için: meşgulse atla, zaman aşımında düzeltilmemiş cümleyi döndür
+"""
+
+import os
+import re
+import queue
+import asyncio
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+from functools import partial
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import language_tool_python
+except Exception:  # kütüphane yoksa aşama devre dışı kalır
+    language_tool_python = None
+
+# Cümle sonu + ardından gelen boşluk; boşluklar aynen korunur
+_SENTENCE_SPLIT = re.compile(r"(?<=[\.!?…])(\s+)")
+# Grup içindeki cümleler arasına konan ayraç (paragraf sonu: LT cümleler arası kural uygulamaz)
+_BATCH_SEPARATOR = "\n\n"
+
+
+def _sentence_key(sentence: str) -> str:
+    return hashlib.sha1(sentence.encode("utf-8")).hexdigest()
+
+
+def _apply_matches(text: str, spans: List[Tuple[int, int, str]]) -> str:
+    """(offset, uzunluk, öneri) listesini sondan başa uygular (ilk öneri seçilir)."""
+    for offset, length, replacement in sorted(spans, reverse=True):
+        text = text[:offset] + replacement + text[offset + length:]
+    return text
+
+
+class LanguageToolPool:
+    """
+    LanguageTool örnekleri havuzu. Örnekler arka planda başlatılır; hazır olana
+    kadar (veya hiç başlatılamazsa) denetim yapılmaz, metin olduğu gibi döner.
+    """
+
+    def __init__(self, language: str = "tr-TR", size: int = 2,
+                 remote_urls: Optional[List[str]] = None, allow_public_api: bool = True):
+        self.language = language
+        self.size = max(1, size)
+        self.remote_urls = [u for u in (remote_urls or []) if u]
+        self.allow_public_api = allow_public_api
+        self._idle: "queue.Queue" = queue.Queue()
+        self._count = 0
+        self._started = False
+        self._lock = threading.Lock()
+        self.backend = "none"
+
+    def start(self, background: bool = True) -> None:
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        if background:
+            threading.Thread(target=self._start_tools, name="languagetool-pool", daemon=True).start()
+        else:
+            self._start_tools()
+
+    def _start_tools(self) -> None:
+        if language_tool_python is None:
+            print("⚠️ language_tool_python kurulu değil, dil denetimi devre dışı")
+            return
+        if self.remote_urls:
+            for url in self.remote_urls:
+                self._add(partial(language_tool_python.LanguageTool, self.language, remote_server=url))
+            self.backend = "remote"
+        else:
+            for _ in range(self.size):
+                if not self._add(partial(language_tool_python.LanguageTool, self.language)):
+                    break
+            self.backend = "local"
+        if self._count == 0 and self.allow_public_api:
+            # Java yoksa public API moduna düş (tek bağlantı, ağ gecikmesi)
+            if self._add(partial(language_tool_python.LanguageToolPublicAPI, self.language)):
+                self.backend = "public_api"
+        if self._count == 0:
+            self.backend = "none"
+            print("⚠️ LanguageTool başlatılamadı, dil denetimi devre dışı")
+        else:
+            print(f"✅ LanguageTool havuzu hazır: {self._count} örnek ({self.backend})")
+
+    def _add(self, factory) -> bool:
+        try:
+            tool = factory()
+        except Exception as e:
+            print(f"⚠️ LanguageTool örneği başlatılamadı: {e}")
+            return False
+        self._idle.put(tool)
+        self._count += 1
+        return True
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    def idle(self) -> int:
+        return self._idle.qsize()
+
+    def check(self, text: str):
+        """Boştaki bir örnekle denetler (örnek boşalana kadar bekler)."""
+        tool = self._idle.get()
+        try:
+            return tool.check(text)
+        finally:
+            self._idle.put(tool)
+
+    def close(self) -> None:
+        while True:
+            try:
+                tool = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                tool.close()
+            except Exception:
+                pass
+        self._count = 0
+
+
+class LanguageCorrector:
+    """Cümle önbellekli, toplu ve paralel LanguageTool düzeltme aşaması."""
+
+    def __init__(self, pool: LanguageToolPool, cache_size: int = 20000, batch_chars: int = 1500):
+        self.pool = pool
+        self.cache_size = cache_size
+        self.batch_chars = batch_chars
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        # Eşzamanlı denetim sayısı havuzdaki örnek sayısıyla sınırlı kalır
+        workers = max(pool.size, len(pool.remote_urls), 1)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="languagetool")
+        self.hits = 0
+        self.misses = 0
+        self.batches = 0
+        self.skipped = 0
+        self.timeouts = 0
+        self.errors = 0
+
+    @property
+    def available(self) -> bool:
+        return self.pool.count > 0
+
+    def busy(self) -> bool:
+        return self.available and self.pool.idle() == 0
+
+    def _cache_get(self, key: str) -> Optional[str]:
+        with self._cache_lock:
+            value = self._cache.get(key)
+            if value is not None:
+                self._cache.move_to_end(key)
+            return value
+
+    def _cache_put(self, key: str, value: str) -> None:
+        with self._cache_lock:
+            self._cache[key] = value
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _batches(self, sentences: List[str]) -> List[List[str]]:
+        batches: List[List[str]] = []
+        current: List[str] = []
+        size = 0
+        for s in sentences:
+            if current and size + len(s) > self.batch_chars:
+                batches.append(current)
+                current, size = [], 0
+            current.append(s)
+            size += len(s) + len(_BATCH_SEPARATOR)
+        if current:
+            batches.append(current)
+        return batches
+
+    def _check_batch(self, batch: List[str]) -> Dict[str, str]:
+        """Grubu tek istekte denetler, eşleşmeleri cümlelere dağıtır ve önbelleğe yazar."""
+        text = _BATCH_SEPARATOR.join(batch)
+        matches = self.pool.check(text)
+        self.batches += 1
+
+        bounds = []
+        start = 0
+        for s in batch:
+            bounds.append((start, start + len(s)))
+            start += len(s) + len(_BATCH_SEPARATOR)
+
+        spans: List[List[Tuple[int, int, str]]] = [[] for _ in batch]
+        for m in matches:
+            if not m.replacements:
+                continue
+            offset = m.offset
+            length = getattr(m, "errorLength", None)
+            if length is None:
+                length = getattr(m, "error_length", 0)
+            for i, (a, b) in enumerate(bounds):
+                if a <= offset and offset + length <= b:
+                    spans[i].append((offset - a, length, m.replacements[0]))
+                    break
+
+        corrected = {}
+        for s, sentence_spans in zip(batch, spans):
+            fixed = _apply_matches(s, sentence_spans) if sentence_spans else s
+            self._cache_put(_sentence_key(s), fixed)
+            corrected[s] = fixed
+        return corrected
+
+    def correct(self, text: str, timeout: Optional[float] = None, skip_if_busy: bool = False) -> str:
+        """
+        Metni düzeltir. Önbellekteki cümleler doğrudan uygulanır; kalanlar gruplar
+        halinde paralel denetlenir. skip_if_busy=True iken boşta örnek yoksa yalnızca
+        önbellek uygulanır. timeout dolarsa bitmeyen gruplar düzeltilmeden döner
+        (arka planda tamamlanıp önbelleğe yazılmaya devam eder); timeout=0 yalnızca
+        önbelleği uygular ve eksik cümleleri arka planda denetletir.
+        """
+        if not text or not text.strip():
+            return text or ""
+
+        parts = _SENTENCE_SPLIT.split(text)
+        sentences = parts[0::2]
+        corrected = self._correct_sentences(sentences, timeout, skip_if_busy)
+        parts[0::2] = [corrected.get(s, s) for s in sentences]
+        return "".join(parts)
+
+    def correct_many(self, texts: List[str], timeout: Optional[float] = None) -> List[str]:
+        """
+        Birden çok metni tek seferde düzeltir: tüm cümleler birlikte gruplanıp denetlenir
+        (kısa metinler için ayrı ayrı correct() çağırmaktan çok daha az istek).
+        """
+        splits = [_SENTENCE_SPLIT.split(t) if t and t.strip() else None for t in texts]
+        sentences = [s for parts in splits if parts for s in parts[0::2]]
+        corrected = self._correct_sentences(sentences, timeout, skip_if_busy=False)
+        out: List[str] = []
+        for text, parts in zip(texts, splits):
+            if parts is None:
+                out.append(text or "")
+                continue
+            parts[0::2] = [corrected.get(s, s) for s in parts[0::2]]
+            out.append("".join(parts))
+        return out
+
+    def _correct_sentences(self, sentences: List[str], timeout: Optional[float],
+                           skip_if_busy: bool) -> Dict[str, str]:
+        corrected: Dict[str, str] = {}
+        pending: List[str] = []
+        seen = set()
+        for s in sentences:
+            if not s.strip() or s in seen:
+                continue
+            seen.add(s)
+            cached = self._cache_get(_sentence_key(s))
+            if cached is not None:
+                self.hits += 1
+                corrected[s] = cached
+            else:
+                self.misses += 1
+                pending.append(s)
+
+        if pending and self.available:
+            if skip_if_busy and self.busy():
+                self.skipped += 1
+            else:
+                futures = [self._executor.submit(self._check_batch, b)
+                           for b in self._batches(pending)]
+                done, not_done = wait(futures, timeout=timeout)
+                if not_done and timeout:
+                    self.timeouts += 1
+                    print(f"⏱️ LanguageTool zaman aşımı: {len(not_done)} grup düzeltilmeden geçildi")
+                for f in done:
+                    try:
+                        corrected.update(f.result())
+                    except Exception as e:
+                        self.errors += 1
+                        print(f"⚠️ LanguageTool denetimi başarısız: {e}")
+        return corrected
+
+    async def correct_async(self, text: str, timeout: Optional[float] = None, skip_if_busy: bool = False) -> str:
+        """Olay döngüsünü bloklamadan düzeltir (thread havuzunda çalışır)."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, partial(self.correct, text, timeout, skip_if_busy))
+
+    def stats(self) -> Dict:
+        return {
+            "backend": self.pool.backend,
+            "instances": self.pool.count,
+            "idle": self.pool.idle(),
+            "cache_entries": len(self._cache),
+            "cache_hits": self.hits,
+            "cache_misses": self.misses,
+            "batches": self.batches,
+            "skipped_busy": self.skipped,
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+        }
+
+
+def create_language_corrector(start: bool = True) -> LanguageCorrector:
+    """
+    Ortam değişkenlerine göre düzeltici oluştur:
+      LANGUAGETOOL_POOL_SIZE (varsayılan 2), LANGUAGETOOL_URLS (virgülle ayrılmış),
+      LANGUAGETOOL_PUBLIC_API=0 (public API'ye düşmeyi kapatır), LANGUAGETOOL_CACHE_SIZE
+    """
+    pool = LanguageToolPool(
+        language="tr-TR",
+        size=int(os.getenv("LANGUAGETOOL_POOL_SIZE", "2")),
+        remote_urls=[u.strip() for u in os.getenv("LANGUAGETOOL_URLS", "").split(",")],
+        allow_public_api=os.getenv("LANGUAGETOOL_PUBLIC_API", "1") != "0",
+    )
+    corrector = LanguageCorrector(pool, cache_size=int(os.getenv("LANGUAGETOOL_CACHE_SIZE", "20000")))
+    if start:
+        pool.start(background=True)
+    return corrector
@@ -3,10 +3,11 @@ FastAPI Web Servisi - GROQ Chatbot Entegrasyonu
 Oktay Özdemir Blog Chatbot API
 """
 
-from fastapi import FastAPI, HTTPException, UploadFile, File, Form
+from fastapi import FastAPI, HTTPException, UploadFile, File, Form, BackgroundTasks, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Set, Tuple
 import os
 from datetime import datetime
 import uvicorn
@@ -14,7 +15,12 @@ import tempfile
 import os
 import glob
 import math
-from pydub import AudioSegment
+import re
+import time
+import shutil
+import threading
+import itertools
+import json
 import ffmpeg
 FFMPEG_CMD = 'ffmpeg'
 try:
@@ -26,11 +32,22 @@ except Exception:
 
 # Chatbot import
 from backend.core.chatbot.bot import FreeChatBot
-from vectorstore.build_store import OptimizedVectorStoreBuilder
+from backend.core.chatbot.query_rules import get_query_rules
+from backend.core.chatbot.session_store import create_session_store
+from backend.core.chatbot.summarizer import informative_preview, summarize_answer, update_rolling_summary
+from vectorstore.build_store import OptimizedVectorStoreBuilder, iter_clean_records
 from groq import Groq
-import language_tool_python
+from starlette.concurrency import run_in_threadpool
+from language_checker import create_language_corrector
+from ingest_jobs import DONE, JobContext, create_job_queue, public_job
+from transcription import (
+    RateLimiter, audio_sha256, create_transcript_cache, create_transcription_backend, encode_segments,
+    merge_overlapping, plan_segments, prepare_audio, probe_duration, speech_intervals, timed_parts,
+    transcribe_segments, transcript_cache_key, transcription_settings
+)
 from text_normalizer import normalize_text_pipeline
-from langchain.text_splitter import RecursiveCharacterTextSplitter
+# Cevap parlatma: Özet → Detaylar → Kaynaklar + footer ayrı blok (akış destekli)
+from answer_formatter import polish_answer
 
 # FastAPI app
 app = FastAPI(
@@ -57,18 +74,28 @@ app.add_middleware(
 # Global chatbot instance
 chatbot = None
 builder = OptimizedVectorStoreBuilder()
+# Sorgu kuralları bir kez derlenir (config/query_rules.yaml)
+query_rules = get_query_rules()
+# Oturum hafızası: sınırlı LRU+TTL (bellek) veya worker'lar arası paylaşımlı SQLite
+session_store = create_session_store()
 groq_client = Groq(api_key=os.getenv("GROQ_API_KEY"))
-try:
-    tool_tr = language_tool_python.LanguageTool('tr-TR')
-except Exception:
-    # Java yoksa public API moduna düş
-    try:
-        tool_tr = language_tool_python.LanguageToolPublicAPI('tr-TR')
-    except Exception:
-        tool_tr = None
+# LanguageTool düzeltme aşaması: yerel sunucu havuzu + cümle önbelleği (startup'ta başlatılır)
+language_corrector = create_language_corrector(start=False)
+# /ask için dil denetimi modu: auto (meşgulse/zaman aşımında atla) | sync | background | off
+ASK_GRAMMAR_MODE = os.getenv("ASK_GRAMMAR_MODE", "auto").lower()
+ASK_GRAMMAR_TIMEOUT = float(os.getenv("ASK_GRAMMAR_TIMEOUT", "1.5"))
+# Ingest işleri: kalıcı SQLite kuyruğu + ayrı worker havuzu (startup'ta başlatılır, yarım işler devam eder)
+ingest_jobs = create_job_queue()
+# Segment transkripsiyonu: eşzamanlılık, yeniden deneme ve örtüşme ayarları; hız sınırı tüm işler için ortak
+TRANSCRIBE_SETTINGS = transcription_settings()
+transcribe_limiter = RateLimiter(TRANSCRIBE_SETTINGS["per_minute"])
+# Transkripsiyon motoru: Groq API veya çevrimdışı yerel CPU motoru (TRANSCRIBE_BACKEND)
+transcription_backend = create_transcription_backend(groq_client)
+# Ham transkript önbelleği: içerik hash'i + model/dil/segment ayarları → verbose transkript
+transcript_cache = create_transcript_cache()
 
 # Basit transkript temizleyici (heuristic)
-def clean_transcript_text(text: str) -> str:
+def clean_transcript_heuristics(text: str) -> str:
     if not text:
         return ""
     import re
@@ -110,136 +137,56 @@ def clean_transcript_text(text: str) -> str:
     t = re.sub(r"\b\d{1,2}:\d{2}(:\d{2})?\b", " ", t)
     t = re.sub(r"\s+", " ", t)
     t = re.sub(r"\s*\n\s*", "\n", t)
-    t = t.strip()
-    
-    # LanguageTool ile ek yazım/dil kontrolü
-    if tool_tr is not None:
-        try:
-            matches = tool_tr.check(t)
-            t = language_tool_python.utils.correct(t, matches)
-        except Exception:
-            pass
-    return t
+    return t.strip()
 
-# Cevap parlatma: Özet → Detaylar → Kaynaklar + footer ayrı blok
-def polish_answer(answer_text: str, source_links: List[Dict]) -> str:
-    import re
-    text = answer_text or ""
-    # Varsa önceki footer/ayırıcıyı kaldır
-    text = re.sub(r"\n+—+\n+.*$", "", text, flags=re.DOTALL)
-    text = re.sub(r"\n+📚.*$", "", text, flags=re.DOTALL)
-
-    # Cümlelere ayır ve özet çıkar
-    sentences = re.split(r"(?<=[\.!?])\s+", text.strip())
-    summary = " ".join(sentences[:2]).strip()
-    rest = " ".join(sentences[2:]).strip()
-
-    details = []
-    if rest:
-        # Noktalı cümleleri maddeye çevir (çok uzun maddeleri kısalt)
-        chunks = re.split(r"(?<=[\.!?])\s+", rest)
-        for ch in chunks:
-            c = ch.strip()
-            # İçeride tekrar kaynak/footeri andıran cümleleri at
-            if (
-                len(c) > 0 and
-                not c.lower().startswith("kaynak") and
-                not c.startswith("—") and
-                not c.startswith("---") and
-                not c.startswith("📚") and
-                "Bütün bilgiler" not in c
-            ):
-                # Bozuk madde başlarını normalize et
-                c = re.sub(r"^([\-*•]+\s*)+", "", c)
-                details.append(c)
-
-    # Detayları bölümlere ayır: Şartlar / İstisnalar / Adımlar
-    temel: List[str] = []
-    istisna: List[str] = []
-    adim: List[str] = []
-
-    def looks_like_step(s: str) -> bool:
-        return bool(re.match(r"^(adım|önce|ardından|sonra|1\.|2\.|3\.|[0-9]+\))", s.strip(), flags=re.IGNORECASE))
-
-    for d in details:
-        dl = d.lower()
-        if any(k in dl for k in ["istisna", "hariç", "değilse", "olmadığı", "olmazsa"]):
-            istisna.append(d)
-        elif looks_like_step(dl):
-            # Numerik adımları normalize et
-            d_clean = re.sub(r"^(\d+\.|\d+\))\s*", "", d).strip()
-            adim.append(d_clean)
-        else:
-            temel.append(d)
-
-    parts: List[str] = []
-    if summary:
-        # Başta "Özet:" etiketi olmadan doğal bir ilk paragraf olarak kalsın
-        parts.append(summary)
-    if temel:
-        parts.append("\nŞartlar:\n" + "\n".join([f"- {d}" for d in temel]))
-    if istisna:
-        parts.append("\nİstisnalar:\n" + "\n".join([f"- {d}" for d in istisna]))
-    if adim:
-        parts.append("\nAdımlar:\n" + "\n".join([f"- {d}" for d in adim]))
+def clean_transcript_text(text: str) -> str:
+    """Heuristik temizlik + LanguageTool düzeltmesi (tam denetim; ingest için)."""
+    t = clean_transcript_heuristics(text)
+    try:
+        t = language_corrector.correct(t)
+    except Exception:
+        pass
+    return t
 
-    # Footer'ı ayrı blok olarak ekle
-    footer = "\n\n—\n\n📚 Bütün bilgiler Oktay Özdemir Danışmanlık web sitemizden alınmıştır. Daha detaylı bilgi almak için [Oktay Özdemir Danışmanlık](https://oktayozdemir.com.tr) web sitemizi ziyaret edebilirsiniz."
+def clean_transcript_texts(texts: List[str]) -> List[str]:
+    """clean_transcript_text'in çoklu hali: LanguageTool denetimi tüm metinler için toplu yapılır."""
+    cleaned = [clean_transcript_heuristics(t) for t in texts]
+    try:
+        cleaned = language_corrector.correct_many(cleaned)
+    except Exception:
+        pass
+    return cleaned
 
-    # Kaynak linklerini istemci tarafında gösteriyoruz; mesaj içinde görünmesin
-    return "\n\n".join([p for p in parts if p.strip()]) + footer
+async def correct_answer_text(text: str, mode: Optional[str] = None) -> str:
+    """
+    /ask cevabı için dil denetimi. Olay döngüsü hiçbir modda bloklanmaz.
+      auto: havuz meşgulse atlar, ASK_GRAMMAR_TIMEOUT içinde bitmeyen cümleleri düzeltmeden geçer
+      sync: tüm cümleler denetlenene kadar bekler
+      background: yalnızca önbellekteki düzeltmeleri uygular, eksikleri arka planda denetletir
+      off: denetim yok
+    """
+    mode = (mode or ASK_GRAMMAR_MODE).lower()
+    if mode == "off" or not text:
+        return text
+    try:
+        if mode == "sync":
+            return await language_corrector.correct_async(text)
+        if mode == "background":
+            return language_corrector.correct(text, timeout=0)
+        return await language_corrector.correct_async(text, timeout=ASK_GRAMMAR_TIMEOUT, skip_if_busy=True)
+    except Exception:
+        return text
 
 # Bilgilendirici önizleme (filler cümleleri çıkar, çekirdek bilgiyi öne al)
 def generate_informative_preview(text: str, max_chars: int = 1400) -> str:
-    import re
-    if not text:
-        return ""
-    sentences = re.split(r"(?<=[\.!?])\s+", text.strip())
-
-    filler_patterns = [
-        r"bildirimleri açın|takip edin|abone ol|beğenin|paylaşın",
-        r"sanal değil gerçek ofis",
-        r"dostlarınıza tavsiye|arkadaş|eşinizi|dostunuzu",
-        r"videonun|kanalın|yorumlarda|açıklama bölümünde",
-        r"giriş|kapanış|merhaba|selam",
-    ]
-    def is_filler(s: str) -> bool:
-        s_low = s.lower()
-        return any(re.search(p, s_low) for p in filler_patterns) or len(s_low) < 25
-
-    # Bilgi sinyali: rakam, yasa/kod, vize kodları, anahtar kelimeler
-    signal_patterns = [
-        r"\b(18a|18b|18g|19c|81a|anabin|zab|ezb|mavi kart|blue card)\b",
-        r"\b\d{4}\b|%|€|euro|gün|hafta|ay|yıl",
-        r"vize|başvuru|randevu|ikamet|çalışma|sözleşme|şart|gerekli|belge|ücret|denklik",
-    ]
-    def score_sentence(s: str) -> int:
-        score = 0
-        sl = s.lower()
-        for p in signal_patterns:
-            if re.search(p, sl):
-                score += 1
-        if len(s) > 80:
-            score += 1
-        return score
-
-    informative = [s for s in sentences if not is_filler(s)]
-    informative_sorted = sorted(informative, key=score_sentence, reverse=True)
-
-    out: List[str] = []
-    total = 0
-    for s in informative_sorted:
-        if total + len(s) + 1 > max_chars:
-            break
-        out.append(s)
-        total += len(s) + 1
-    return " ".join(out).strip()
+    return informative_preview(text, max_chars=max_chars)
 
 # Request/Response modelleri
 class ChatRequest(BaseModel):
     question: str
     model: Optional[str] = "groq"  # "groq" veya "openai"
     session_id: Optional[str] = None
+    grammar_mode: Optional[str] = None  # auto | sync | background | off (varsayılan: ASK_GRAMMAR_MODE)
 
 class ChatResponse(BaseModel):
     answer: str
@@ -267,6 +214,9 @@ async def startup_event():
     global chatbot
     try:
         print("🚀 FastAPI Chatbot başlatılıyor...")
+
+        # LanguageTool sunucuları arka planda açılır; hazır olana kadar denetim atlanır
+        language_corrector.pool.start(background=True)
         
         # GROQ chatbot'u başlat
         chatbot = FreeChatBot()
@@ -290,6 +240,9 @@ async def startup_event():
     except Exception as e:
         print(f"❌ Startup hatası: {e}")
 
+    # Ingest worker'ları chatbot'tan sonra başlar; önceki süreçten yarım kalan işler kuyruğa geri alınır
+    ingest_jobs.start()
+
 @app.get("/", response_model=Dict[str, str])
 async def root():
     """Ana sayfa"""
@@ -324,8 +277,19 @@ async def health_check():
         pass
     return resp
 
+def update_session_summary(session_id: str, question: str, answer: str) -> None:
+    """Oturumun kayan özetini yeni turla günceller (yanıt gönderildikten sonra çalışır)."""
+    def apply(state: Dict) -> None:
+        state["summary"] = update_rolling_summary(state.get("summary", ""), question, answer)
+
+    try:
+        # Yalnızca summary alanı atomik olarak güncellenir; /ask'ın yazdığı turlar ezilmez
+        session_store.update(session_id, apply)
+    except Exception as e:
+        print(f"⚠️ Oturum özeti güncellenemedi: {e}")
+
 @app.post("/ask", response_model=ChatResponse)
-async def ask_question(request: ChatRequest):
+async def ask_question(request: ChatRequest, background_tasks: BackgroundTasks):
     """Chatbot'a soru sor"""
     try:
         print(f"🧾 Gelen soru: {request.question}")
@@ -340,63 +304,68 @@ async def ask_question(request: ChatRequest):
     try:
         # Hafıza: kısa geçmişi al (varsa)
         session_id = request.session_id or "__default__"
-        if not hasattr(app.state, "memory"):
-            app.state.memory = {}
-        memory: Dict[str, List[Dict[str, str]]] = app.state.memory
-        turns = memory.get(session_id, [])
+        session_state = session_store.get(session_id)
+        turns: List[Dict] = session_state.get("turns", [])
 
-        # Niyet: detay
-        qlower = request.question.lower()
-        detail_intent = any(p in qlower for p in ["detay", "ayrıntı", "daha fazla bilgi", "detaylandır", "uzat"])
+        # Niyet ve kategori: tek geçişte kural eşleştirme
+        rule_match = query_rules.match(request.question)
+        detail_intent = "detail" in rule_match["intents"]
 
         expanded_question = request.question
+        followup_retrieval = None
         if detail_intent and turns:
+            # Önceki turun arama durumu (sıralı chunk kimlikleri + sorgu vektörü)
+            followup_retrieval = next(
+                (t.get("retrieval") for t in reversed(turns) if t.get("role") == "assistant" and t.get("retrieval")),
+                None
+            )
             # Son kullanıcı sorusu ve asistan cevabını özellikle vurgula
             last_user = next((t.get("content", "") for t in reversed(turns) if t.get("role") == "user"), "")
             last_assistant = next((t.get("content", "") for t in reversed(turns) if t.get("role") == "assistant"), "")
 
-            # Son 3 turu kısa bir izlek olarak ekle (1200 karakter sınırı)
-            history_text = []
-            for t in turns[-6:]:
-                role = t.get("role")
-                content = t.get("content", "")
-                prefix = "Kullanıcı" if role == "user" else "Asistan"
-                history_text.append(f"{prefix}: {content}")
-            history_join = " \n".join(history_text)[-1200:]
+            # Ham geçmiş yerine sabit boyutlu özetler: istem boyutu konuşma uzadıkça büyümez
+            summary = session_state.get("summary") or ""
+            if not summary:
+                # Arka plan özeti henüz yazılmadıysa mevcut turlardan üret
+                pending_question = ""
+                for t in turns:
+                    if t.get("role") == "user":
+                        pending_question = t.get("content", "")
+                    else:
+                        summary = update_rolling_summary(summary, pending_question, t.get("content", ""))
+            last_user_short = re.sub(r"\s+", " ", last_user)[:300]
+            last_assistant_short = summarize_answer(last_assistant, max_chars=700)
 
             expanded_question = (
                 "Bu bir takip isteğidir. Aşağıdaki önceki sorunun ayni KONUSUNU daha detaylı, derin ve düzenli olarak genişlet. Konu dışına çıkma.\n" \
-                "Önceki kullanıcı sorusu: " + last_user + "\n" \
-                "Önceki asistan cevabı (özetlenecek/geliştirilecek): " + last_assistant + "\n\n" \
-                "Kısa geçmiş: " + history_join + "\n\n" \
+                "Önceki kullanıcı sorusu: " + last_user_short + "\n" \
+                "Önceki asistan cevabı (özetlenecek/geliştirilecek): " + last_assistant_short + "\n\n" \
+                "Konuşma özeti: " + summary + "\n\n" \
                 "Yeni talep: " + request.question
             )
 
+        # Niyet yönlendirme: soru vektörü centroid'lerle karşılaştırılır (emin değilse kurallar)
+        route = chatbot.route_question(request.question)
+        if route.get("confident") and not detail_intent:
+            menu_requested = route.get("intent") == "category_menu"
+        else:
+            menu_requested = "menu_request" in rule_match["intents"]
+
         # Kategori seçimi kontrolü
         selected_category = None
-        if "kategori" in request.question.lower() or "başlık" in request.question.lower() or "hangi" in request.question.lower():
+        if menu_requested:
             # Kategori menüsü döndür
             result = chatbot.get_category_menu()
         else:
-            # Kategori tespiti
-            category_indicators = {
-                "hukuk_goc": ["hukuk", "göç", "vize", "ikamet", "iltica", "mavi kart", "81a"],
-                "mesleki_egitim": ["meslek", "eğitim", "denklik", "kalfalık", "ustalık", "ön lisans"],
-                "is_calisma": ["iş", "çalışma", "şoför", "usta", "kasap", "aşçı", "elektrikçi"],
-                "yerlesim_yasam": ["yerleşim", "yaşam", "anmeldung", "dil", "a2", "b1"],
-                "mali_konular": ["maaş", "harç", "mali", "euro", "ücret", "masraf"],
-                "ulke_bazli": ["almanya", "ingiltere", "ülke", "scale-up"],
-                "surec_prosedur": ["süreç", "prosedür", "başvuru", "evrak", "süre"],
-                "ozel_durumlar": ["yaş", "özel", "durum", "faktör", "seviye"]
-            }
-            
-            for category_id, indicators in category_indicators.items():
-                if any(indicator in request.question.lower() for indicator in indicators):
-                    selected_category = category_id
-                    break
+            # Kategori tespiti: yönlendirici, yoksa config sırasına göre ilk eşleşen kural
+            selected_category = route.get("category")
+            if not selected_category and rule_match["categories"]:
+                selected_category = rule_match["categories"][0]
             
-            # GROQ ile cevap üret (kategori odaklı)
-            result = chatbot.ask_groq(expanded_question, selected_category=selected_category)
+            # GROQ ile cevap üret (kategori odaklı); soru vektörü yeniden hesaplanmaz
+            result = chatbot.ask_groq(
+                expanded_question, selected_category=selected_category, route=route, followup=followup_retrieval
+            )
 
         # Kategori menüsü kontrolü
         if result.get("special_response") and result.get("type") == "category_menu":
@@ -420,7 +389,8 @@ async def ask_question(request: ChatRequest):
             try:
                 cfg = os.path.join(os.path.dirname(__file__), 'config', 'text_rules.yaml')
                 stage1 = normalize_text_pipeline(result.get("answer", ""), cfg)
-                cleaned_answer = clean_transcript_text(stage1)
+                cleaned_answer = clean_transcript_heuristics(stage1)
+                cleaned_answer = await correct_answer_text(cleaned_answer, request.grammar_mode)
                 cleaned_answer = polish_answer(cleaned_answer, result.get("source_links", []))
             except Exception:
                 cleaned_answer = result.get("answer", "")
@@ -452,184 +422,346 @@ async def ask_question(request: ChatRequest):
     finally:
         # Hafızaya kaydet (son 3-5 turu tut)
         try:
-            if 'result' in locals() and 'session_id' in locals() and hasattr(app.state, "memory"):
-                memory = app.state.memory
-                if session_id not in memory:
-                    memory[session_id] = []
-                memory[session_id].append({"role": "user", "content": request.question})
+            if 'result' in locals() and 'session_id' in locals() and 'session_state' in locals():
+                user_turn = {"role": "user", "content": request.question}
                 # Temizlenmiş cevabı saklıyoruz; gerekirse orijinal cevabı da ekleyebilirsiniz
-                memory[session_id].append({"role": "assistant", "content": cleaned_answer})
-                # Son 6 kaydı tut (3 tur)
-                memory[session_id] = memory[session_id][-6:]
+                # Arama durumu bir sonraki "detay" isteğinde yeniden kullanılır
+                assistant_turn = {"role": "assistant", "content": cleaned_answer, "retrieval": result.get("retrieval")}
+                # Son 6 kaydı tut (3 tur); güncel liste kilit/işlem içinde okunur, eşzamanlı /ask'lerin
+                # turları kaybolmaz. Özet alanına dokunulmaz (arka plan görevi yazar)
+                session_store.update(session_id, lambda state: state.update(
+                    turns=(state.get("turns", []) + [user_turn, assistant_turn])[-6:]))
+                # Kayan özet yanıt döndükten sonra arka planda güncellenir
+                background_tasks.add_task(update_session_summary, session_id, request.question, cleaned_answer)
         except Exception:
             pass
 
-@app.post("/ingest/video")
-async def ingest_video(
-    file: UploadFile = File(...),
-    language: str = Form("tr"),
-    title: str = Form("Video Transcript"),
-    url: str = Form(""),
-    author: str = Form("Video"),
-    clean: bool = Form(True),
-    dry_run: bool = Form(False)
-):
-    """Video yükle → ses ayıkla → Whisper ile transcribe → FAISS'e ekle."""
-    # 1) Temp kaydet
-    with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(file.filename)[1]) as tmp_vid:
-        tmp_vid.write(await file.read())
-        video_path = tmp_vid.name
+# Aynı anda tek iş FAISS'i yükleyip kaydetsin (worker sayısı > 1 olabilir)
+_index_lock = threading.Lock()
+# Yazıcının özel indeksi: aramaların kullandığı indeksin kopyası (ya da diskten bir kez yüklenen).
+# Batch'ler buna eklenip kaydedilir, ardından referans değiştirilir; /ask'in okuduğu indeks yerinde değişmez
+_writer_vectorstore = None
 
-    audio_path = video_path + ".wav"
-    try:
-        # 2) Ses ayıkla (16k mono WAV)
-        stream = (
-            ffmpeg
-            .input(video_path)
-            .output(audio_path, ac=1, ar=16000, format='wav', loglevel="error")
-            .overwrite_output()
-        )
-        ffmpeg.run(stream, cmd=FFMPEG_CMD)
-
-        # 3) Ses uzunluğunu ölç (ffprobe yerine pydub kullan)
+def _current_index(vs_path: str):
+    """_index_lock altında: en güncel indeks (yalnızca okumak için)."""
+    if _writer_vectorstore is not None:
+        return _writer_vectorstore
+    if chatbot is not None and chatbot.vectorstore is not None:
+        return chatbot.vectorstore
+    return _index_for_write(vs_path)
+
+def _index_for_write(vs_path: str):
+    """_index_lock altında: yazıcının özel indeksi (yoksa yayımlanan indeksten kopyalanır)."""
+    global _writer_vectorstore
+    if _writer_vectorstore is None:
+        if chatbot is not None and chatbot.vectorstore is not None:
+            _writer_vectorstore = builder.copy_vectorstore(chatbot.vectorstore)
+        else:
+            _writer_vectorstore = builder.load_vectorstore(vs_path)
+    return _writer_vectorstore
+
+def _publish_index(vectorstore) -> None:
+    """_index_lock altında: kaydedilen yazıcı indeksi aramalara verilir; sonraki yazım yeni kopyaya yapılır."""
+    global _writer_vectorstore
+    if chatbot is None:
+        _writer_vectorstore = vectorstore  # Okuyan yok, kopyaya gerek yok
+        return
+    chatbot.vectorstore = vectorstore
+    _writer_vectorstore = None
+
+def index_transcript(text: str, meta: Dict, parts: Optional[List[Dict]] = None,
+                     job_id: Optional[str] = None) -> int:
+    """
+    Metni chunk'layıp commit_chunk_batch ile FAISS'e ekler (toplu ingest ile aynı yazıcı indeksi).
+    parts: zaman damgalı transkript parçaları (chunk'lar parça sınırlarından kesilir)
+    job_id: chunk metadata'sına yazılır; işin chunk'ları indekste zaten varsa (önceki deneme kaydedip
+    checkpoint'ten önce kesildiyse) tekrar eklenmez, mevcut chunk sayısı döner
+    """
+    vs_path = os.path.join(os.path.dirname(__file__), "data", "vectorstore")
+    if job_id:
+        with _index_lock:
+            existing = builder.job_index(_current_index(vs_path), job_id)
+        if existing:
+            print(f"♻️ İş {job_id[:8]} chunk'ları indekste zaten var; tekrar eklenmedi")
+            return sum(len(ids) for ids in existing.values())
+        meta = dict(meta, job_id=job_id)
+    chunks, metadatas = builder.transcript_chunks(text, meta, parts=parts)
+    if chunks:
+        commit_chunk_batch(chunks, metadatas)
+    return len(chunks)
+
+# Toplu ingest: embed batch'i (chunk) ve LanguageTool'a birlikte gönderilen belge grubu
+BULK_EMBED_BATCH = int(os.getenv("BULK_EMBED_BATCH", "256"))
+BULK_CLEAN_GROUP = int(os.getenv("BULK_CLEAN_GROUP", "16"))
+
+def indexed_job_batches(job_id: str) -> Set[int]:
+    """İşin indekse yazılmış batch numaraları (metadata job_id/job_batch)."""
+    vs_path = os.path.join(os.path.dirname(__file__), "data", "vectorstore")
+    with _index_lock:
+        return set(builder.job_index(_current_index(vs_path), job_id))
+
+def commit_chunk_batch(texts: List[str], metadatas: List[Dict]) -> None:
+    """
+    Chunk batch'ini tek embed çağrısıyla vektörler (kilit dışında), ardından kilit altında yazıcının
+    özel indeksine ekleyip kaydeder ve aramalara yayımlar; FAISS batch başına diskten yüklenmez.
+    Kayıt başarısız olursa özel kopya atılır (yayımlanan indeks batch'i içermez, yeniden denenir).
+    """
+    global _writer_vectorstore
+    vs_path = os.path.join(os.path.dirname(__file__), "data", "vectorstore")
+    vectors = builder.embeddings.embed_documents(texts)
+    with _index_lock:
         try:
-            duration_sec = float(AudioSegment.from_wav(audio_path).duration_seconds)
+            vectorstore = builder.commit_embeddings(texts, vectors, metadatas, save_path=vs_path,
+                                                    vectorstore=_index_for_write(vs_path))
         except Exception:
-            duration_sec = 0.0
-
-        # 413 hatasını önlemek için ~9 dk'lık segmentlere böl (540 sn)
-        segment_paths = []
-        if duration_sec > 540:
-            seg_dir = tempfile.mkdtemp(prefix="segments_")
-            seg_pattern = os.path.join(seg_dir, "part_%03d.wav")
-            seg_stream = (
-                ffmpeg
-                .input(audio_path)
-                .output(
-                    seg_pattern,
-                    f='segment',
-                    segment_time=540,
-                    ac=1,
-                    ar=16000,
-                    loglevel="error"
-                )
-                .overwrite_output()
-            )
-            ffmpeg.run(seg_stream, cmd=FFMPEG_CMD)
-            segment_paths = sorted(glob.glob(os.path.join(seg_dir, "part_*.wav")))
+            _writer_vectorstore = None
+            raise
+        _publish_index(vectorstore)
+
+def transcript_cache_options() -> Dict:
+    """Transkripti etkileyen ayarlar (önbellek anahtarına girer)."""
+    keys = ("segment_seconds", "overlap_seconds", "codec", "trim_silence", "silence_db", "min_silence")
+    return {k: TRANSCRIBE_SETTINGS[k] for k in keys}
+
+def extract_audio_job(job: JobContext) -> None:
+    """
+    Yüklenen medyayı 16k mono FLAC ara dosyaya çözer ve çözülmüş sesin hash'ini hesaplar
+    (transkript önbelleği anahtarı). Sessizlikler, süre ve hash iş durumuna yazılır.
+    """
+    params = job.params
+    if "audio_sha256" in job.state or "segments" in job.state:
+        return
+    # 1) Medya tek geçişte çözülür: 16k mono FLAC ara dosya + sessizlik tespiti; süre
+    # FLAC üst verisinden okunur
+    job.progress("extracting")
+    audio_path = job.path("audio.flac")
+    silences = prepare_audio(
+        params["upload_path"], audio_path,
+        trim_silence=TRANSCRIBE_SETTINGS["trim_silence"],
+        silence_db=TRANSCRIBE_SETTINGS["silence_db"],
+        min_silence=TRANSCRIBE_SETTINGS["min_silence"],
+        cmd=FFMPEG_CMD,
+    )
+    duration_sec = probe_duration(audio_path, cmd=FFMPEG_CMD)
+    # Hash yüklenen kapsayıcının baytlarından değil çözülmüş sesten alınır: aynı ses farklı
+    # kapsayıcı/üst veriyle gelse de önbellek isabet eder
+    try:
+        content_hash = audio_sha256(audio_path, cmd=FFMPEG_CMD)
+    except Exception as e:
+        print(f"⚠️ Ses hash'i hesaplanamadı, transkript önbelleği atlanacak: {e}")
+        content_hash = None
+    job.checkpoint(silences=silences, duration_sec=duration_sec, audio_sha256=content_hash)
+    # Ara FLAC hazır; yüklenen özgün dosyaya artık gerek yok
+    try:
+        os.remove(params["upload_path"])
+    except OSError:
+        pass
+
+def transcribe_video_job(job: JobContext, cache_key: Optional[str]) -> Tuple[str, float, List[Dict]]:
+    """
+    Çözülmüş sesi segmentlere çevirip paralel transcribe eder.
+    Dönüş: (birleşik metin, süre, özgün medya zamanlı parçalar)
+    """
+    params = job.params
+    if "segments" not in job.state:
+        audio_path = job.path("audio.flac")
+        duration_sec = job.state.get("duration_sec") or 0.0
+        silences = [tuple(s) for s in job.state.get("silences") or []]
+        # 2) Sessizlikler atılır, konuşma segmentlere paketlenip sıkıştırılmış codec ile yazılır;
+        # konuşma ortasında kesilen segment sınırları hafif örtüşür
+        if duration_sec:
+            intervals = speech_intervals(duration_sec, silences)
+            plan = plan_segments(intervals, TRANSCRIBE_SETTINGS["segment_seconds"],
+                                 TRANSCRIBE_SETTINGS["overlap_seconds"])
+            segments = encode_segments(audio_path, plan, job.path("segments"),
+                                       codec=TRANSCRIBE_SETTINGS["codec"], cmd=FFMPEG_CMD)
         else:
-            segment_paths = [audio_path]
-
-        # 4) Her segmenti ayrı ayrı transcribe et ve birleştir
-        texts = []
-        total_duration = 0.0
-        for seg in segment_paths:
-            with open(seg, "rb") as af:
-                tr = groq_client.audio.transcriptions.create(
-                    model="whisper-large-v3-turbo",
-                    file=af,
-                    language=language,
-                    response_format="verbose_json"
-                )
-            texts.append(tr.text.strip())
+            # Süre okunamadı: ara FLAC tek segment olarak gönderilir
+            intervals = []
+            segments = [{"path": audio_path, "start": 0.0, "duration": 0.0, "pieces": [],
+                         "overlaps_previous": False}]
+        speech_sec = sum(b - a for a, b in intervals)
+        for seg in segments:
+            seg["path"] = os.path.relpath(seg["path"], job.work_dir)
+        job.checkpoint(duration_sec=duration_sec, speech_sec=speech_sec, segments=segments, transcripts={})
+        print(f"🎧 {len(segments)} segment, konuşma {speech_sec:.0f}/{duration_sec:.0f} sn "
+              f"({TRANSCRIBE_SETTINGS['codec']})")
+        # Segmentler hazır; ara FLAC'a artık gerek yok (tek segment olarak gönderilmiyorsa)
+        if duration_sec:
             try:
-                total_duration += float(getattr(tr, "duration", 0) or 0)
-            except Exception:
+                os.remove(audio_path)
+            except OSError:
                 pass
 
-        text = "\n\n".join(t for t in texts if t)
-        duration = total_duration or duration_sec
-
-        # 4) Transkript dosyasını kaydet (görüntülemek için)
-        transcripts_dir = os.path.join(os.path.dirname(__file__), "data", "raw", "transcripts")
-        os.makedirs(transcripts_dir, exist_ok=True)
-        ts_name = datetime.now().strftime("%Y%m%d_%H%M%S")
-        transcript_path = os.path.join(transcripts_dir, f"transcript_{ts_name}.txt")
-        with open(transcript_path, "w", encoding="utf-8") as f:
-            f.write(text)
-
-        # 4.1) Temizleme (opsiyonel) - YAML pipeline + dil denetimi
-        if clean:
-            cfg = os.path.join(os.path.dirname(__file__), 'config', 'text_rules.yaml')
-            stage1 = normalize_text_pipeline(text, cfg)
-            final_text = clean_transcript_text(stage1)
-        else:
-            final_text = text
-        cleaned_path = os.path.join(transcripts_dir, f"transcript_cleaned_{ts_name}.txt")
-        with open(cleaned_path, "w", encoding="utf-8") as f:
-            f.write(final_text)
-
-        if dry_run:
-            # Sadece önizleme döndür; FAISS'e ekleme
-            # Ayrıca chunk tahmini ve bilgilendirici önizleme ver
-            splitter = RecursiveCharacterTextSplitter(chunk_size=700, chunk_overlap=150)
-            chunks = splitter.split_text(final_text)
-            informative_preview = generate_informative_preview(final_text, max_chars=1400)
-            return {
-                "ok": True,
-                "dry_run": True,
-                "chars": len(final_text),
-                "title": title,
-                "url": url,
-                "transcript_file": os.path.relpath(transcript_path, os.path.dirname(__file__)),
-                "cleaned_file": os.path.relpath(cleaned_path, os.path.dirname(__file__)),
-                "preview": final_text[:1200],
-                "informative_preview": informative_preview,
-                "total_chunks_estimate": len(chunks),
-                "first_chunks": chunks[:3]
-            }
+    # 3) Segmentleri paralel transcribe et; biten segmentler iş durumuna yazılır
+    segments = [dict(seg, path=job.path(seg["path"])) for seg in job.state["segments"]]
+    transcripts: Dict[str, Dict] = job.state.get("transcripts") or {}
+    checkpoint_lock = threading.Lock()
+    job.progress("transcribing", len(transcripts), len(segments))
+
+    def on_segment(i: int, result: Dict) -> None:
+        with checkpoint_lock:
+            transcripts[str(i)] = result
+            job.checkpoint(transcripts=transcripts)
+            job.progress("transcribing", len(transcripts), len(segments))
+
+    # Uzak motorda ortak hız sınırı ve yeniden deneme; yerel motor yalnızca CPU'ya bağlı
+    backend = transcription_backend
+    # Önceki denemede biten segmentler (as_completed sırasıyla bittiği için ilk N segment olmayabilir)
+    done_before = set(transcripts)
+    started = time.perf_counter()
+    ordered = transcribe_segments(
+        segments,
+        lambda path: backend.transcribe(path, params["language"]),
+        concurrency=backend.concurrency(TRANSCRIBE_SETTINGS["concurrency"]),
+        limiter=transcribe_limiter if backend.remote else None,
+        retries=TRANSCRIBE_SETTINGS["retries"] if backend.remote else 0,
+        done={int(i): r for i, r in transcripts.items()},
+        on_result=on_segment,
+    )
+    elapsed = time.perf_counter() - started
+    audio_sec = sum(seg["duration"] for i, seg in enumerate(segments) if str(i) not in done_before)
+    job.checkpoint(transcribe_stats={
+        "backend": backend.name,
+        "model": backend.model_id,
+        "segments": len(segments),
+        "audio_seconds": round(audio_sec, 1),
+        "wall_seconds": round(elapsed, 1),
+        "audio_seconds_per_wall_second": round(audio_sec / elapsed, 2) if elapsed > 0 and audio_sec else None,
+    })
+    text = merge_overlapping([t["text"] for t in ordered],
+                             [seg.get("overlaps_previous", True) for seg in job.state["segments"]])
+    # Örtüşme süresi iki kez sayılmasın: ölçülen ses süresi tercih edilir
+    duration = job.state.get("duration_sec") or sum(t["duration"] for t in ordered)
+    segment_results = [
+        {"start": seg["start"], "duration": seg["duration"], "pieces": seg.get("pieces", []),
+         "overlaps_previous": seg.get("overlaps_previous", True), **result}
+        for seg, result in zip(job.state["segments"], ordered)
+    ]
+    # Ham verbose transkript önbelleğe yazılır; aynı medya tekrar geldiğinde Whisper'a gidilmez
+    if cache_key:
+        transcript_cache.put(cache_key, {
+            "audio_sha256": job.state["audio_sha256"],
+            "model": transcription_backend.model_id,
+            "language": params["language"],
+            "options": transcript_cache_options(),
+            "duration_sec": duration,
+            "speech_sec": job.state.get("speech_sec"),
+            "text": text,
+            "segments": segment_results,
+            "created_at": datetime.now().isoformat(),
+        })
+    return text, duration, timed_parts(segment_results)
+
+def run_video_ingest(job: JobContext) -> Dict:
+    """Video işi: ses ayıkla → Whisper ile transcribe → temizle → FAISS'e ekle."""
+    params = job.params
+    base_dir = os.path.dirname(__file__)
+
+    # Aynı ses + aynı transkripsiyon ayarları daha önce işlendiyse segmentleme ve Whisper atlanır
+    extract_audio_job(job)
+    cache_key = None
+    if job.state.get("audio_sha256"):
+        cache_key = transcript_cache_key(job.state["audio_sha256"], transcription_backend.model_id, params["language"],
+                                         transcript_cache_options())
+    cached = transcript_cache.get(cache_key) if cache_key else None
+    if cached is not None:
+        text = cached["text"]
+        duration = cached.get("duration_sec") or 0.0
+        parts = timed_parts(cached["segments"])
+        job.progress("transcribing", len(cached["segments"]), len(cached["segments"]), cached=True)
+        job.checkpoint(transcribe_stats={"cached": True, "model": cached.get("model")})
+        try:
+            os.remove(job.path("audio.flac"))
+        except OSError:
+            pass
+    else:
+        text, duration, parts = transcribe_video_job(job, cache_key)
+
+    # 4) Transkript dosyasını kaydet (görüntülemek için)
+    transcripts_dir = os.path.join(base_dir, "data", "raw", "transcripts")
+    os.makedirs(transcripts_dir, exist_ok=True)
+    ts_name = job.state.get("ts_name") or datetime.now().strftime("%Y%m%d_%H%M%S")
+    job.checkpoint(ts_name=ts_name)
+    transcript_path = os.path.join(transcripts_dir, f"transcript_{ts_name}.txt")
+    with open(transcript_path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+    # 4.1) Temizleme (opsiyonel) - YAML pipeline + dil denetimi. Zaman damgalı parçalar
+    # varsa her parça ayrı temizlenir (zaman bilgisi chunk'lara taşınır); boşalanlar atılır
+    if params["clean"]:
+        job.progress("cleaning")
+        cfg = os.path.join(base_dir, 'config', 'text_rules.yaml')
+        if parts:
+            cleaned = clean_transcript_texts([normalize_text_pipeline(p["text"], cfg) for p in parts])
+            parts = [dict(p, text=t) for p, t in zip(parts, cleaned) if t.strip()]
+            final_text = " ".join(p["text"] for p in parts)
         else:
-            # 5) FAISS'e ekle (temiz metin)
-            meta = {"title": title, "url": url, "author": author, "source_type": "video_transcript", "duration": duration}
-            chunks_added = builder.add_transcript_to_vectorstore(final_text, meta)
+            final_text = clean_transcript_text(normalize_text_pipeline(text, cfg))
+    else:
+        final_text = text
+    cleaned_path = os.path.join(transcripts_dir, f"transcript_cleaned_{ts_name}.txt")
+    with open(cleaned_path, "w", encoding="utf-8") as f:
+        f.write(final_text)
 
-            # 6) API'nin anlık istatistiklerinde de görünsün diye chatbot'un vectorstore'unu yeniden yükle
-            global chatbot
-            try:
-                if chatbot is not None:
-                    vs_path = os.path.join(os.path.dirname(__file__), "data", "vectorstore")
-                    chatbot.vectorstore = builder.load_vectorstore(vs_path)
-            except Exception:
-                pass
+    if params["dry_run"]:
+        # Sadece önizleme döndür; FAISS'e ekleme
+        # Ayrıca chunk tahmini (indekslemedeki splitter ile) ve bilgilendirici önizleme ver
+        chunks = builder.text_splitter.split_text(final_text)
+        job.progress("previewed")
+        return {
+            "ok": True,
+            "dry_run": True,
+            "chars": len(final_text),
+            "title": params["title"],
+            "url": params["url"],
+            "transcript_file": os.path.relpath(transcript_path, base_dir),
+            "cleaned_file": os.path.relpath(cleaned_path, base_dir),
+            "preview": final_text[:1200],
+            "informative_preview": generate_informative_preview(final_text, max_chars=1400),
+            "total_chunks_estimate": len(chunks),
+            "first_chunks": chunks[:3],
+            "timed_parts": len(parts),
+            "transcription": job.state.get("transcribe_stats")
+        }
 
-            return {
-                "ok": True,
-                "dry_run": False,
-                "chars": len(final_text),
-                "chunks_added": chunks_added,
-                "title": title,
-                "url": url,
-                "transcript_file": os.path.relpath(transcript_path, os.path.dirname(__file__)),
-                "cleaned_file": os.path.relpath(cleaned_path, os.path.dirname(__file__)),
-                "preview": final_text[:500]
-            }
-    finally:
-        for p in [video_path, audio_path]:
-            try:
-                os.remove(p)
-            except Exception:
-                pass
+    # 5) FAISS'e ekle (temiz metin)
+    if "chunks_added" not in job.state:
+        job.progress("embedding")
+        meta = {"title": params["title"], "url": params["url"], "author": params["author"],
+                "source_type": "video_transcript", "duration": duration}
+        job.checkpoint(chunks_added=index_transcript(final_text, meta, parts=parts, job_id=job.job_id))
+    job.progress("indexed")
+    return {
+        "ok": True,
+        "dry_run": False,
+        "chars": len(final_text),
+        "chunks_added": job.state["chunks_added"],
+        "title": params["title"],
+        "url": params["url"],
+        "transcript_file": os.path.relpath(transcript_path, base_dir),
+        "cleaned_file": os.path.relpath(cleaned_path, base_dir),
+        "preview": final_text[:500],
+        "timed_parts": len(parts),
+        "transcription": job.state.get("transcribe_stats")
+    }
 
-@app.post("/ingest/transcript")
-async def ingest_transcript(
-    text: str = Form(...),
-    title: str = Form("Video Transcript"),
-    url: str = Form(""),
-    author: str = Form("Video"),
-    clean: bool = Form(True)
-):
-    """Hazır metin transkripti (veya düzenlenmiş metni) vektör store'a ekler."""
-    original = text
-    if clean:
-        cfg = os.path.join(os.path.dirname(__file__), 'config', 'text_rules.yaml')
-        stage1 = normalize_text_pipeline(text, cfg)
-        cleaned = clean_transcript_text(stage1)
+def run_transcript_ingest(job: JobContext) -> Dict:
+    """Metin işi: temizle → dosyaya yaz → FAISS'e ekle."""
+    params = job.params
+    base_dir = os.path.dirname(__file__)
+    original = params["text"]
+    if params["clean"]:
+        job.progress("cleaning")
+        cfg = os.path.join(base_dir, 'config', 'text_rules.yaml')
+        cleaned = clean_transcript_text(normalize_text_pipeline(original, cfg))
     else:
-        cleaned = text
+        cleaned = original
 
-    transcripts_dir = os.path.join(os.path.dirname(__file__), "data", "raw", "transcripts")
+    transcripts_dir = os.path.join(base_dir, "data", "raw", "transcripts")
     os.makedirs(transcripts_dir, exist_ok=True)
-    ts_name = datetime.now().strftime("%Y%m%d_%H%M%S")
+    ts_name = job.state.get("ts_name") or datetime.now().strftime("%Y%m%d_%H%M%S")
+    job.checkpoint(ts_name=ts_name)
     raw_path = os.path.join(transcripts_dir, f"manual_raw_{ts_name}.txt")
     with open(raw_path, "w", encoding="utf-8") as f:
         f.write(original)
@@ -638,28 +770,239 @@ async def ingest_transcript(
     with open(cleaned_path, "w", encoding="utf-8") as f:
         f.write(cleaned)
 
-    meta = {"title": title, "url": url, "author": author, "source_type": "video_transcript"}
-    chunks_added = builder.add_transcript_to_vectorstore(cleaned, meta)
-
-    # Vectorstore'u yeniden yükle ki /stats anında güncellensin
-    global chatbot
-    try:
-        if chatbot is not None:
-            vs_path = os.path.join(os.path.dirname(__file__), "data", "vectorstore")
-            chatbot.vectorstore = builder.load_vectorstore(vs_path)
-    except Exception:
-        pass
-
+    if "chunks_added" not in job.state:
+        job.progress("embedding")
+        meta = {"title": params["title"], "url": params["url"], "author": params["author"],
+                "source_type": "video_transcript"}
+        job.checkpoint(chunks_added=index_transcript(cleaned, meta, job_id=job.job_id))
+    job.progress("indexed")
     return {
         "ok": True,
         "chars_raw": len(original),
         "chars_cleaned": len(cleaned),
-        "chunks_added": chunks_added,
-        "raw_file": os.path.relpath(raw_path, os.path.dirname(__file__)),
-        "cleaned_file": os.path.relpath(cleaned_path, os.path.dirname(__file__)),
+        "chunks_added": job.state["chunks_added"],
+        "raw_file": os.path.relpath(raw_path, base_dir),
+        "cleaned_file": os.path.relpath(cleaned_path, base_dir),
         "clean_preview": cleaned[:500]
     }
 
+def run_bulk_ingest(job: JobContext) -> Dict:
+    """
+    Toplu belge işi (NDJSON): belgeler grup grup temizlenir → chunk'lanır → chunk'lar BULK_EMBED_BATCH'lik
+    batch'lerle embed edilip FAISS'e batch başına bir kez yazılır. Her batch sonrası işlenen belge sayısı
+    checkpoint'lenir; yeniden başlatmada yazılmış belgeler atlanır. Chunk'lar job_id/job_batch ile etiketlenir:
+    kaydedilip checkpoint'e yetişemeyen batch yeniden başlatmada tekrar eklenmez.
+    """
+    params = job.params
+    cfg = os.path.join(os.path.dirname(__file__), 'config', 'text_rules.yaml')
+    total = params["count"]
+    docs_done = job.state.get("docs_done", 0)
+    chunks_added = job.state.get("chunks_added", 0)
+    batches = job.state.get("batches", 0)
+    # Önceki deneme kaydedip checkpoint'e yetişemediyse o batch'in chunk'ları indekste zaten var
+    present = indexed_job_batches(job.job_id)
+    texts: List[str] = []
+    metadatas: List[Dict] = []
+
+    def commit() -> None:
+        nonlocal chunks_added, batches, texts, metadatas
+        if texts:
+            batch = batches + 1
+            if batch in present:
+                print(f"♻️ İş {job.job_id[:8]} batch {batch} indekste zaten var; tekrar eklenmedi")
+            else:
+                job.progress("embedding", docs_done, total, chunks_added=chunks_added)
+                commit_chunk_batch(texts, [dict(meta, job_id=job.job_id, job_batch=batch) for meta in metadatas])
+            chunks_added += len(texts)
+            batches = batch
+        job.checkpoint(docs_done=docs_done, chunks_added=chunks_added, batches=batches)
+        texts, metadatas = [], []
+
+    records = itertools.islice(iter_clean_records(params["documents_path"]), docs_done, None)
+    while True:
+        group = list(itertools.islice(records, BULK_CLEAN_GROUP))
+        if not group:
+            break
+        bodies = [record["text"] for record in group]
+        to_clean = [i for i, record in enumerate(group) if record["clean"]]
+        if to_clean:
+            job.progress("cleaning", docs_done, total, chunks_added=chunks_added)
+            cleaned = clean_transcript_texts([normalize_text_pipeline(bodies[i], cfg) for i in to_clean])
+            for i, text in zip(to_clean, cleaned):
+                bodies[i] = text
+        for record, body in zip(group, bodies):
+            meta = {k: record[k] for k in ("title", "url", "author", "source_type", "date") if record.get(k)}
+            chunks, chunk_metas = builder.transcript_chunks(body, meta)
+            texts += chunks
+            metadatas += chunk_metas
+            docs_done += 1
+            if len(texts) >= BULK_EMBED_BATCH:
+                commit()
+    commit()
+    job.progress("indexed", docs_done, total, chunks_added=chunks_added)
+    return {
+        "ok": True,
+        "documents": total,
+        "chunks_added": chunks_added,
+        "batches": batches,
+        "rejected": params.get("rejected", []),
+    }
+
+ingest_jobs.register("video", run_video_ingest)
+ingest_jobs.register("transcript", run_transcript_ingest)
+ingest_jobs.register("bulk", run_bulk_ingest)
+
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+
+def save_upload(file: UploadFile, path: str) -> None:
+    with open(path, "wb") as out:
+        shutil.copyfileobj(file.file, out, UPLOAD_CHUNK_BYTES)
+
+async def job_response(job: Dict, wait: bool):
+    """
+    Varsayılan: iş kimliğiyle hemen 202 döner, ilerleme /ingest/jobs/{job_id} ile izlenir.
+    wait=True: iş bitene kadar bekler ve eski senkron yanıtı (iş sonucu) döndürür.
+    """
+    if not wait:
+        return JSONResponse(status_code=202, content={
+            "ok": True,
+            "job_id": job["job_id"],
+            "status": job["status"],
+            "status_url": f"/ingest/jobs/{job['job_id']}",
+        })
+    job = await ingest_jobs.wait(job["job_id"])
+    if job["status"] != DONE:
+        raise HTTPException(status_code=500, detail=job["error"] or "Ingest işi başarısız")
+    return {**job["result"], "job_id": job["job_id"]}
+
+@app.post("/ingest/video")
+async def ingest_video(
+    file: UploadFile = File(...),
+    language: str = Form("tr"),
+    title: str = Form("Video Transcript"),
+    url: str = Form(""),
+    author: str = Form("Video"),
+    clean: bool = Form(True),
+    dry_run: bool = Form(False),
+    wait: bool = Form(False)
+):
+    """Video yükle → iş kuyruğuna al (ses ayıkla → Whisper → temizle → FAISS) ve iş kimliği döndür."""
+    # Yüklenen dosya iş klasöründe tutulur ki yeniden başlatmada iş devam edebilsin
+    job_id = ingest_jobs.new_job_id()
+    upload_path = os.path.join(ingest_jobs.work_dir(job_id), "upload" + os.path.splitext(file.filename or "")[1])
+    # Dosya belleğe alınmadan parça parça diske kopyalanır (sabit bellek)
+    await run_in_threadpool(save_upload, file, upload_path)
+
+    job = ingest_jobs.submit("video", {
+        "upload_path": upload_path,
+        "language": language,
+        "title": title,
+        "url": url,
+        "author": author,
+        "clean": clean,
+        "dry_run": dry_run,
+    }, job_id=job_id)
+    return await job_response(job, wait)
+
+@app.post("/ingest/transcript")
+async def ingest_transcript(
+    text: str = Form(...),
+    title: str = Form("Video Transcript"),
+    url: str = Form(""),
+    author: str = Form("Video"),
+    clean: bool = Form(True),
+    wait: bool = Form(False)
+):
+    """Hazır metin transkriptini (veya düzenlenmiş metni) iş kuyruğuna alır; FAISS'e arka planda eklenir."""
+    job = ingest_jobs.submit("transcript", {
+        "text": text,
+        "title": title,
+        "url": url,
+        "author": author,
+        "clean": clean,
+    })
+    return await job_response(job, wait)
+
+def bulk_record(line: bytes, default_clean: bool) -> Dict:
+    """NDJSON satırını iş kaydına çevirir; metni olmayan veya bozuk satırda ValueError."""
+    item = json.loads(line)
+    if not isinstance(item, dict) or not str(item.get("text") or "").strip():
+        raise ValueError("text alanı boş")
+    return {
+        "text": str(item["text"]),
+        "title": item.get("title") or "Belge",
+        "url": item.get("url") or "",
+        "author": item.get("author") or "",
+        "source_type": item.get("source_type") or "document",
+        "date": item.get("date") or "",
+        "clean": bool(item.get("clean", default_clean)),
+    }
+
+@app.post("/ingest/bulk")
+async def ingest_bulk(request: Request, clean: bool = True, wait: bool = False):
+    """
+    Çok sayıda belgeyi tek istekte alır. Gövde NDJSON (application/x-ndjson), satır başına
+    {"text", "title", "url", "author", "source_type", "date", "clean"}; akış halinde iş klasörüne
+    yazılır (bellekte birikmez). Tek iş olarak kuyruğa alınır; bozuk satırlar sonuçta "rejected" listelenir.
+    """
+    job_id = ingest_jobs.new_job_id()
+    documents_path = os.path.join(ingest_jobs.work_dir(job_id), "documents.jsonl")
+    count = 0
+    rejected: List[Dict] = []
+    line_no = 0
+    pending = b""
+    with open(documents_path, "w", encoding="utf-8") as out:
+        def accept(line: bytes) -> None:
+            nonlocal count, line_no
+            line_no += 1
+            if not line.strip():
+                return
+            try:
+                record = bulk_record(line, clean)
+            except ValueError as e:  # json.JSONDecodeError dahil
+                if len(rejected) < 100:
+                    rejected.append({"line": line_no, "error": str(e)[:200]})
+                return
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            count += 1
+
+        async for chunk in request.stream():
+            pending += chunk
+            *lines, pending = pending.split(b"\n")
+            for line in lines:
+                accept(line)
+        accept(pending)
+
+    if not count:
+        shutil.rmtree(os.path.dirname(documents_path), ignore_errors=True)
+        raise HTTPException(status_code=400, detail={"error": "Geçerli belge yok", "rejected": rejected})
+    job = ingest_jobs.submit("bulk", {
+        "documents_path": documents_path,
+        "count": count,
+        "rejected": rejected,
+        "title": f"{count} belge (toplu)",
+    }, job_id=job_id)
+    return await job_response(job, wait)
+
+@app.get("/ingest/jobs/{job_id}")
+async def get_ingest_job(job_id: str):
+    """İş durumu: status (queued/running/done/failed), stage, progress (done/total), result"""
+    job = ingest_jobs.store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="İş bulunamadı")
+    return public_job(job)
+
+@app.get("/ingest/jobs")
+async def list_ingest_jobs(limit: int = 50, status: Optional[str] = None):
+    """Son ingest işleri (en yeni önce)"""
+    return {"jobs": [public_job(j) for j in ingest_jobs.store.list(limit=limit, status=status)]}
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    # Yerel LanguageTool Java süreçlerini kapat
+    language_corrector.pool.close()
+    ingest_jobs.stop()
+
 @app.get("/models")
 async def get_available_models():
     """Mevcut model listesi"""
@@ -694,6 +1037,11 @@ async def get_stats():
             "groq": bool(os.getenv("GROQ_API_KEY")),
             "openai": bool(os.getenv("OPENAI_API_KEY"))
         },
+        "sessions": session_store.stats(),
+        "language_tool": language_corrector.stats(),
+        "ingest_jobs": ingest_jobs.stats(),
+        "transcript_cache": transcript_cache.stats(),
+        "transcription": transcription_backend.stats(),
         "uptime": datetime.now().isoformat()
     }
 
@@ -0,0 +1,207 @@
+"""
+Headless Chrome havuzu ve olay tabanlı beklemeler
+- DriverPool: en fazla N tarayıcı; ihtiyaç oldukça açılır, iş bitince havuza döner, çöken atılır
+- Sabit time.sleep yerine WebDriverWait ile:
+  wait_for_dom_change (sayfa yüksekliği / link sayısı değişene kadar) ve
+  wait_for_network_idle (readyState complete + bekleyen fetch/XHR yok + son yanıttan beri sessizlik)
+- ajax_requests(): sayfanın yaptığı fetch/XHR istekleri (alttaki sayfalama uç noktasını bulmak için)
+Selenium kurulu değilse modül yine içe aktarılır; selenium_available() False döner.
+"""
+
+import os
+import threading
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Optional, Tuple
+
+try:
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.chrome.service import Service
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.common.exceptions import TimeoutException
+except ImportError:  # selenium opsiyonel: yalnızca HTTP yolu kullanılabilir
+    webdriver = None
+    TimeoutException = None
+
+try:
+    from webdriver_manager.chrome import ChromeDriverManager
+except ImportError:  # selenium >= 4.6 sürücüyü kendisi bulur (Selenium Manager)
+    ChromeDriverManager = None
+
+DEFAULT_USER_AGENT = ("Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 "
+                      "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
+
+# Bekleyen fetch/XHR sayacı; sayfa başına bir kez kurulur (yeni belgelerde CDP ile otomatik)
+NETWORK_HOOK = """
+if (!window.__scraperNet) {
+  var net = window.__scraperNet = {pending: 0, last: Date.now()};
+  performance.setResourceTimingBufferSize(10000);
+  var done = function () { net.pending = Math.max(0, net.pending - 1); net.last = Date.now(); };
+  if (window.fetch) {
+    var originalFetch = window.fetch;
+    window.fetch = function () {
+      net.pending++; net.last = Date.now();
+      return originalFetch.apply(this, arguments).then(
+        function (r) { done(); return r; }, function (e) { done(); throw e; });
+    };
+  }
+  var originalSend = XMLHttpRequest.prototype.send;
+  XMLHttpRequest.prototype.send = function () {
+    net.pending++; net.last = Date.now();
+    this.addEventListener('loadend', done);
+    return originalSend.apply(this, arguments);
+  };
+}
+"""
+# [readyState, bekleyen istek, son ağ etkinliğinden beri geçen ms]
+NETWORK_STATE = """
+var net = window.__scraperNet || {pending: 0, last: 0};
+var entries = performance.getEntriesByType('resource');
+var lastEnd = entries.reduce(function (m, e) { return Math.max(m, e.responseEnd); }, 0);
+return [document.readyState, net.pending,
+        Math.min(Date.now() - net.last, performance.now() - lastEnd)];
+"""
+PAGE_SIGNATURE = ("return [document.body ? document.body.scrollHeight : 0, "
+                  "document.getElementsByTagName('a').length];")
+AJAX_REQUESTS = """
+return performance.getEntriesByType('resource')
+  .filter(function (e) { return e.initiatorType === 'xmlhttprequest' || e.initiatorType === 'fetch'; })
+  .map(function (e) { return e.name; });
+"""
+
+
+def selenium_available() -> bool:
+    return webdriver is not None
+
+
+def create_driver(headless: bool = True, user_agent: str = DEFAULT_USER_AGENT):
+    """Headless Chrome; sayfa yüklemesi DOMContentLoaded'da döner, kalanını beklemeler üstlenir."""
+    if webdriver is None:
+        raise RuntimeError("selenium kurulu değil: pip install selenium")
+    options = Options()
+    if headless:
+        options.add_argument("--headless=new")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--window-size=1920,1080")
+    # Görseller link toplamak için gereksiz; bant genişliği ve bellek tasarrufu
+    options.add_argument("--blink-settings=imagesEnabled=false")
+    options.add_argument(f"--user-agent={user_agent}")
+    options.page_load_strategy = "eager"
+    if ChromeDriverManager is not None:
+        driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+    else:
+        driver = webdriver.Chrome(options=options)
+    try:
+        driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": NETWORK_HOOK})
+    except Exception:
+        pass  # CDP yoksa kanca her get() sonrası install_network_hook ile kurulur
+    return driver
+
+
+class DriverPool:
+    """
+    Thread-safe tarayıcı havuzu: `with pool.driver() as d:` en fazla size tarayıcıyı paylaştırır.
+    Tarayıcılar ilk ihtiyaçta açılır; zaman aşımı dışındaki bir hatada tarayıcı kapatılıp atılır.
+    """
+
+    def __init__(self, size: int = 2, headless: bool = True, factory: Optional[Callable[[], object]] = None):
+        self.size = max(1, size)
+        self._factory = factory or (lambda: create_driver(headless))
+        self._slots = threading.Semaphore(self.size)
+        self._idle: List = []
+        self._all: List = []
+        self._lock = threading.Lock()
+        self.created = 0
+
+    @contextmanager
+    def driver(self) -> Iterator:
+        self._slots.acquire()
+        driver = None
+        try:
+            with self._lock:
+                driver = self._idle.pop() if self._idle else None
+            if driver is None:
+                driver = self._factory()
+                with self._lock:
+                    self._all.append(driver)
+                    self.created += 1
+            yield driver
+        except BaseException as e:
+            if driver is not None and not (TimeoutException and isinstance(e, TimeoutException)):
+                self._discard(driver)
+                driver = None
+            raise
+        finally:
+            if driver is not None:
+                with self._lock:
+                    self._idle.append(driver)
+            self._slots.release()
+
+    def _discard(self, driver) -> None:
+        with self._lock:
+            if driver in self._all:
+                self._all.remove(driver)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def close(self) -> None:
+        with self._lock:
+            drivers, self._all, self._idle = self._all, [], []
+        for driver in drivers:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+        if drivers:
+            print(f"🔒 {len(drivers)} WebDriver kapatıldı")
+
+
+def install_network_hook(driver) -> None:
+    driver.execute_script(NETWORK_HOOK)
+
+
+def page_signature(driver) -> Tuple[int, int]:
+    return tuple(driver.execute_script(PAGE_SIGNATURE))
+
+
+def wait_for_dom_change(driver, before: Tuple[int, int], timeout: float = 10.0) -> bool:
+    """Sayfa yüksekliği veya link sayısı değişene kadar bekler; timeout'ta False."""
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=0.1).until(lambda d: page_signature(d) != before)
+        return True
+    except TimeoutException:
+        return False
+
+
+def wait_for_network_idle(driver, timeout: float = 10.0, idle: float = 0.5) -> bool:
+    """Belge yüklenmiş, bekleyen fetch/XHR yok ve idle sn'dir yeni yanıt gelmemişse döner."""
+    def is_idle(d) -> bool:
+        ready_state, pending, quiet_ms = d.execute_script(NETWORK_STATE)
+        return ready_state == "complete" and pending == 0 and quiet_ms >= idle * 1000
+
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=0.1).until(is_idle)
+        return True
+    except TimeoutException:
+        return False
+
+
+def ajax_requests(driver) -> List[str]:
+    return driver.execute_script(AJAX_REQUESTS) or []
+
+
+def create_driver_pool(headless: Optional[bool] = None) -> Optional[DriverPool]:
+    """
+    Ortam değişkenlerine göre tarayıcı havuzu; selenium yoksa None:
+      SELENIUM_DRIVERS (eşzamanlı tarayıcı, varsayılan 2), SELENIUM_HEADLESS=0 (pencereli;
+      headless parametresi verilirse o geçerlidir)
+    """
+    if webdriver is None:
+        return None
+    if headless is None:
+        headless = os.getenv("SELENIUM_HEADLESS", "1") != "0"
+    return DriverPool(size=int(os.getenv("SELENIUM_DRIVERS", "2")), headless=headless)
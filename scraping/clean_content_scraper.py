@@ -3,27 +3,43 @@ Temiz içerik scraper - Yapay zeka eğitimi için optimize edilmiş
 HTML'den gereksiz kısımları temizler, sadece blog yazısı içeriğini alır
 """
 
-import requests
-import xml.etree.ElementTree as ET
 import json
 import os
-import re
 from datetime import datetime
 from typing import List, Dict
 from bs4 import BeautifulSoup, Tag
 from langchain.schema import Document
 
+try:
+    from scraping.crawl_output import JsonlCrawlOutput, find_resumable
+    from scraping.fetcher import Fetcher, crawl, create_fetcher
+    from scraping.html_extract import clean_html
+    from scraping.sitemap_state import SitemapState, changed_urls, iter_sitemap, summarize
+except ImportError:  # script olarak scraping/ içinden çalıştırıldığında
+    from crawl_output import JsonlCrawlOutput, find_resumable
+    from fetcher import Fetcher, crawl, create_fetcher
+    from html_extract import clean_html
+    from sitemap_state import SitemapState, changed_urls, iter_sitemap, summarize
+
 DEFAULT_BASE_URL = "https://oktayozdemir.com.tr/"
+RAW_DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data", "raw")
 
 class CleanContentScraper:
-    def __init__(self, base_url: str | None = None):
+    def __init__(self, base_url: str | None = None, fetcher: Fetcher | None = None, workers: int | None = None):
         """
         Temiz içerik scraper sınıfı
+        fetcher: paylaşımlı HTTP oturumu (verilmezse ortam değişkenlerinden oluşturulur)
+        workers: eşzamanlı makale indirme sayısı (varsayılan SCRAPER_WORKERS veya 8; 1 = sıralı)
         """
         self.blog_urls = []
         # Taban URL'i dışarıdan verilebilir; verilmezse env veya varsayılan kullanılır
         env_base = os.getenv("SCRAPER_BASE_URL")
         self.base_url = (base_url or env_base or DEFAULT_BASE_URL).rstrip('/') + '/'
+        self.fetcher = fetcher or create_fetcher()
+        self.workers = max(1, workers or int(os.getenv("SCRAPER_WORKERS", "8")))
+        self.last_crawl: Dict = {}
+        self.last_failed: List[str] = []
+        self.last_saved = 0
         
     def get_category_blog_urls(self, category_url: str) -> List[str]:
         """
@@ -38,7 +54,7 @@ class CleanContentScraper:
             while True:
                 url = base if page == 1 else f"{base}page/{page}/"
                 print(f"📂 Kategori sayfası {page} taranıyor: {url}")
-                resp = requests.get(url, timeout=20)
+                resp = self.fetcher.get(url)
                 if resp.status_code == 404:
                     print("❌ Kategori sayfası bitti (404)")
                     break
@@ -74,19 +90,10 @@ class CleanContentScraper:
         """
         try:
             print("🔍 Sitemap index kontrol ediliyor...")
-            response = requests.get(self.base_url + "sitemap_index.xml")
+            response = self.fetcher.get(self.base_url + "sitemap_index.xml")
             response.raise_for_status()
             
-            root = ET.fromstring(response.text)
-            namespaces = {'sitemap': 'http://www.sitemaps.org/schemas/sitemap/0.9'}
-            
-            sitemap_urls = []
-            for sitemap_elem in root.findall('.//sitemap:sitemap', namespaces):
-                loc = sitemap_elem.find('sitemap:loc', namespaces)
-                if loc is not None:
-                    sitemap_urls.append(loc.text)
-            
-            return sitemap_urls
+            return [loc for kind, loc, _ in iter_sitemap(response.content) if kind == 'sitemap']
             
         except Exception as e:
             print(f"❌ Sitemap index hatası: {e}")
@@ -97,19 +104,10 @@ class CleanContentScraper:
         Sitemap'ten blog URL'lerini çıkar
         """
         try:
-            response = requests.get(sitemap_url)
+            response = self.fetcher.get(sitemap_url)
             response.raise_for_status()
             
-            root = ET.fromstring(response.text)
-            namespaces = {'sitemap': 'http://www.sitemaps.org/schemas/sitemap/0.9'}
-            
-            blog_urls = []
-            for url_elem in root.findall('.//sitemap:url', namespaces):
-                loc = url_elem.find('sitemap:loc', namespaces)
-                if loc is not None and '/blog/' in loc.text:
-                    blog_urls.append(loc.text)
-            
-            return blog_urls
+            return [loc for kind, loc, _ in iter_sitemap(response.content) if kind == 'url' and '/blog/' in loc]
             
         except Exception as e:
             print(f"❌ Sitemap işleme hatası: {e}")
@@ -125,11 +123,9 @@ class CleanContentScraper:
         if not sitemap_urls:
             return []
         
-        all_blog_urls = []
-        for sitemap_url in sitemap_urls:
-            blog_urls = self.extract_blog_urls_from_sitemap(sitemap_url)
-            if blog_urls:
-                all_blog_urls.extend(blog_urls)
+        # Alt sitemap'ler de aynı oturum ve host sınırlarıyla eşzamanlı okunur
+        per_sitemap, _ = crawl(sitemap_urls, self.extract_blog_urls_from_sitemap, workers=self.workers)
+        all_blog_urls = [u for blog_urls in per_sitemap for u in blog_urls]
         
         unique_urls = list(set(all_blog_urls))
         print(f"✅ {len(unique_urls)} blog yazısı bulundu")
@@ -147,7 +143,7 @@ class CleanContentScraper:
             while True:
                 url = base_list if page == 1 else f"{base_list}page/{page}/"
                 print(f"📄 Liste sayfası {page} taranıyor: {url}")
-                resp = requests.get(url, timeout=20)
+                resp = self.fetcher.get(url)
                 if resp.status_code == 404:
                     print("❌ Liste sayfası bitti (404)")
                     break
@@ -197,121 +193,50 @@ class CleanContentScraper:
     def clean_html_content(self, html_content: str) -> Dict[str, str]:
         """
         HTML'den temiz blog içeriğini çıkar
+        Varsayılan olarak lxml ile tek taramalı hızlı yol kullanılır (html_extract.py);
+        HTML_EXTRACTOR=bs4 eski BeautifulSoup yolunu seçer, çıktı ikisinde de aynıdır.
         """
-        soup = BeautifulSoup(html_content, 'html.parser')
-        
-        # Başlık çıkar
-        title = ""
-        title_selectors = [
-            'h1.entry-title',
-            '.post-title h1',
-            'h1',
-            '.entry-header h1',
-            'title'
-        ]
-        
-        for selector in title_selectors:
-            title_elem = soup.select_one(selector)
-            if title_elem:
-                title = title_elem.get_text().strip()
-                # Site adını temizle
-                title = title.replace(' - Oktay Özdemir Danışmanlık', '')
-                break
-        
-        # Ana içerik çıkar
-        content = ""
-        content_selectors = [
-            '.entry-content',
-            '.post-content', 
-            'article .content',
-            '.blog-post-content',
-            'main article',
-            '.single-post-content'
-        ]
-        
-        for selector in content_selectors:
-            content_elem = soup.select_one(selector)
-            if content_elem:
-                # Gereksiz elementleri kaldır
-                for unwanted in content_elem.find_all(['script', 'style', 'nav', 'header', 'footer', 'aside', 'form']):
-                    unwanted.decompose()
-                
-                # Reklam ve sosyal medya butonlarını kaldır
-                for unwanted_class in ['.social-share', '.advertisement', '.ads', '.sidebar', '.related-posts']:
-                    for elem in content_elem.select(unwanted_class):
-                        elem.decompose()
-                
-                content = content_elem.get_text()
-                break
-        
-        # İçerik temizleme
-        if content:
-            # Fazla boşlukları temizle
-            content = re.sub(r'\n\s*\n', '\n\n', content)  # Çoklu satır sonlarını düzenle
-            content = re.sub(r' +', ' ', content)  # Çoklu boşlukları tek boşluğa çevir
-            content = content.strip()
-            
-            # Çok kısa içeriği filtrele
-            if len(content) < 200:
-                content = ""
-        
-        # Tarih çıkar
-        date = ""
-        date_selectors = [
-            '.entry-date',
-            '.post-date',
-            'time[datetime]',
-            '.published'
-        ]
-        
-        for selector in date_selectors:
-            date_elem = soup.select_one(selector)
-            if date_elem:
-                date = date_elem.get_text().strip() or date_elem.get('datetime', '')
-                break
-        
-        # Yazar bilgisi
-        author = "Oktay Özdemir"  # Varsayılan
-        author_selectors = [
-            '.author-name',
-            '.post-author',
-            '.entry-author'
-        ]
-        
-        for selector in author_selectors:
-            author_elem = soup.select_one(selector)
-            if author_elem:
-                author = author_elem.get_text().strip()
-                break
-        
-        return {
-            'title': title,
-            'content': content,
-            'author': author,
-            'date': date,
-            'word_count': len(content.split()) if content else 0
-        }
+        return clean_html(html_content)
     
     def scrape_single_blog(self, url: str) -> Dict[str, str]:
         """
         Tek bir blog yazısını temiz formatta çek
+        Sayfa önceki çalıştırmadan beri değişmediyse (304 / aynı gövde) önbellekteki
+        ayrıştırma sonucu kullanılır ve kayıt unchanged=True ile işaretlenir.
         """
         try:
-            response = requests.get(url)
+            response = self.fetcher.get(url)
             response.raise_for_status()
-            
-            cleaned_data = self.clean_html_content(response.text)
-            cleaned_data['url'] = url
-            
-            return cleaned_data
+            return self.extract_page(url, response)
             
         except Exception as e:
             print(f"❌ Blog çekme hatası ({url}): {e}")
-            return {'url': url, 'title': '', 'content': '', 'author': '', 'date': '', 'word_count': 0}
+            return {'url': url, 'title': '', 'content': '', 'author': '', 'date': '', 'word_count': 0,
+                    'unchanged': False, 'error': str(e)}
     
-    def scrape_all_blogs(self) -> List[Dict[str, str]]:
+    def extract_page(self, url: str, response) -> Dict[str, str]:
+        """
+        İndirilmiş sayfadan temiz içerik; 304 / aynı gövdede önbellekteki ayrıştırma sonucu
+        kullanılır (unchanged=True), aksi halde ayrıştırılıp önbelleğe yazılır.
+        """
+        cache = self.fetcher.cache
+        cleaned_data = None
+        if cache is not None and getattr(response, 'unchanged', False):
+            cleaned_data = cache.parsed(url)
+        if cleaned_data is None:
+            cleaned_data = self.clean_html_content(response.text)
+            if cache is not None:
+                cache.set_parsed(url, cleaned_data)
+            cleaned_data['unchanged'] = False
+        else:
+            cleaned_data = dict(cleaned_data, unchanged=True)
+        cleaned_data['url'] = url
+        return cleaned_data
+
+    def scrape_all_blogs(self, output: JsonlCrawlOutput | None = None) -> List[Dict[str, str]]:
         """
         Tüm blog yazılarını temiz formatta çek
+        output verilirse yazılar JSONL'e akıtılır (dönüş boş liste), bkz. scrape_urls
         """
         print("🚀 Temiz içerik scraping başlıyor...")
         
@@ -321,26 +246,73 @@ class CleanContentScraper:
             return []
         
         print(f"📥 {len(blog_urls)} blog yazısı işlenecek...")
-        
-        all_blogs = []
-        successful_count = 0
-        
-        for i, url in enumerate(blog_urls, 1):
-            print(f"⏳ ({i}/{len(blog_urls)}) İşleniyor: {url.split('/')[-1]}")
-            
-            blog_data = self.scrape_single_blog(url)
-            
-            if blog_data['content'] and len(blog_data['content']) > 200:
-                all_blogs.append(blog_data)
-                successful_count += 1
-                print(f"   ✅ Başarılı - {blog_data['word_count']} kelime")
-            else:
-                print(f"   ⚠️  İçerik çok kısa veya bulunamadı")
-        
-        print(f"\n🎯 Toplam {successful_count}/{len(blog_urls)} blog yazısı başarıyla işlendi!")
+        all_blogs = self.scrape_urls(blog_urls, output=output)
+        print(f"\n🎯 Toplam {self.last_saved}/{len(blog_urls)} blog yazısı başarıyla işlendi!")
         return all_blogs
 
-    def scrape_list_blogs(self, list_url: str, max_pages: int | None = None) -> List[Dict[str, str]]:
+    def scrape_urls(self, urls: List[str], output: JsonlCrawlOutput | None = None) -> List[Dict[str, str]]:
+        """
+        Makaleleri eşzamanlı çeker (self.workers thread, host sınırları fetcher'da);
+        içeriği yeterli olanları giriş sırasıyla döndürür ve sayfa/sn raporlar.
+        output verilirse: checkpoint'te işlenmiş görünen URL'ler atlanır, her yazı biter bitmez
+        JSONL'e eklenir ve URL checkpoint'e yazılır (hatalı URL'ler yazılmaz, sonra yeniden denenir);
+        sonuçlar bellekte tutulmaz, dönüş boş listedir.
+        """
+        if output is not None:
+            pending = [url for url in urls if not output.is_done(url)]
+            if len(pending) < len(urls):
+                print(f"♻️  {len(urls) - len(pending)} URL önceki çalıştırmada işlenmiş, atlanıyor")
+            urls = pending
+
+        failed: List[str] = []
+        counts = {"saved": 0, "unchanged": 0}
+
+        def on_result(done: int, total: int, url: str, data: Dict) -> None:
+            ok = bool(data['content']) and len(data['content']) > 200
+            if ok:
+                print(f"⏳ ({done}/{total}) ✅ {data['word_count']} kelime - {url}")
+                counts["saved"] += 1
+            else:
+                print(f"⏳ ({done}/{total}) ⚠️  İçerik kısa/boş - {url}")
+            counts["unchanged"] += 1 if data.get('unchanged') else 0
+            if data.get('error'):
+                failed.append(url)
+            elif output is not None:
+                if ok:
+                    output.write(self.training_record(data, output.count + 1))
+                output.mark(url)
+
+        pages, report = crawl(urls, self.scrape_single_blog, workers=self.workers, on_result=on_result,
+                              keep_results=output is None)
+        self.last_crawl = {**report, "workers": self.workers, **self.fetcher.stats()}
+        self.last_failed = failed
+        self.last_saved = counts["saved"]
+        unchanged = counts["unchanged"]
+        print(f"⚡ {report['pages']} sayfa {report['seconds']} sn'de çekildi "
+              f"({report['pages_per_second']} sayfa/sn, {self.workers} worker, "
+              f"{self.fetcher.retried} yeniden deneme, {unchanged} değişmemiş)")
+        return [data for data in pages if data['content'] and len(data['content']) > 200]
+
+    def scrape_changed_blogs(self, state_path: str | None = None) -> tuple[List[Dict[str, str]], Dict]:
+        """
+        Incremental tarama: sitemap lastmod'larını önceki çalıştırmayla karşılaştırır, yalnızca
+        yeni/değişen yazıları çeker. Dönüş: (çekilen yazılar, delta). delta["removed"] sitemap'ten
+        kaybolan URL'ler, delta["failed"] çekilemeyen URL'lerdir. Durum burada yazılmaz: yazılar
+        index'e kaydedildikten sonra commit_sitemap_delta(delta) çağrılmalıdır
+        """
+        print("🚀 Incremental (lastmod) scraping başlıyor...")
+        state = SitemapState(state_path)
+        delta = state.diff(self.fetcher, self.base_url + "sitemap_index.xml", url_filter=lambda u: '/blog/' in u)
+        print(f"🗺️  {summarize(delta)}")
+        urls = changed_urls(delta)
+        blogs = self.scrape_urls(urls) if urls else []
+        # Başarısız URL'ler durumuna yazılmaz; sonraki çalıştırmada yeniden denenir
+        delta["failed"] = list(self.last_failed) if urls else []
+        print(f"\n🎯 {len(blogs)}/{len(urls)} yeni/değişen yazı işlendi, {len(delta['removed'])} yazı silinecek")
+        return blogs, delta
+
+    def scrape_list_blogs(self, list_url: str, max_pages: int | None = None,
+                          output: JsonlCrawlOutput | None = None) -> List[Dict[str, str]]:
         """
         Liste sayfasındaki tüm makaleleri temiz formatta çek.
         """
@@ -350,19 +322,12 @@ class CleanContentScraper:
             print("❌ Liste URL'sinden makale linki bulunamadı!")
             return []
         print(f"📥 {len(urls)} makale işlenecek...")
-        results: List[Dict[str, str]] = []
-        for i, url in enumerate(urls, 1):
-            print(f"⏳ ({i}/{len(urls)}) {url}")
-            data = self.scrape_single_blog(url)
-            if data['content'] and len(data['content']) > 200:
-                results.append(data)
-                print(f"   ✅ {data['word_count']} kelime")
-            else:
-                print("   ⚠️  İçerik kısa/boş")
-        print(f"\n🎯 Listeden {len(results)}/{len(urls)} yazı başarıyla işlendi!")
+        results = self.scrape_urls(urls, output=output)
+        print(f"\n🎯 Listeden {self.last_saved}/{len(urls)} yazı başarıyla işlendi!")
         return results
 
-    def scrape_category_blogs(self, category_url: str) -> List[Dict[str, str]]:
+    def scrape_category_blogs(self, category_url: str,
+                              output: JsonlCrawlOutput | None = None) -> List[Dict[str, str]]:
         """
         Sadece verilen kategori altındaki blog yazılarını temiz formatta çek
         """
@@ -372,59 +337,82 @@ class CleanContentScraper:
             print("❌ Kategori içinde blog URL'si bulunamadı!")
             return []
         print(f"📥 {len(cat_urls)} blog yazısı işlenecek...")
-        results: List[Dict[str, str]] = []
-        for i, url in enumerate(cat_urls, 1):
-            print(f"⏳ ({i}/{len(cat_urls)}) {url}")
-            data = self.scrape_single_blog(url)
-            if data['content'] and len(data['content']) > 200:
-                results.append(data)
-                print(f"   ✅ {data['word_count']} kelime")
-            else:
-                print("   ⚠️  İçerik kısa/boş")
-        print(f"\n🎯 Kategoride {len(results)}/{len(cat_urls)} yazı başarıyla işlendi!")
+        results = self.scrape_urls(cat_urls, output=output)
+        print(f"\n🎯 Kategoride {self.last_saved}/{len(cat_urls)} yazı başarıyla işlendi!")
         return results
     
-    def save_clean_data(self, blogs_data: List[Dict], filename: str = None):
+    def training_record(self, blog: Dict, record_id: int) -> Dict:
+        """Yapay zeka eğitimi için optimize edilmiş kayıt formatı (JSON ve JSONL çıktıda aynı)."""
+        return {
+            "id": record_id,
+            "title": blog['title'],
+            "content": blog['content'],
+            "author": blog['author'],
+            "date": blog['date'],
+            "url": blog['url'],
+            "word_count": blog['word_count'],
+            # Önceki çalıştırmadan beri değişmeyen sayfalar incremental ingest'te atlanır
+            "unchanged": bool(blog.get('unchanged')),
+            "scraped_at": datetime.now().isoformat(),
+            "scraper_type": "clean_content",
+            # Yapay zeka için ek metadata
+            "content_type": "blog_post",
+            "language": "tr",
+            "domain": "law_immigration_politics"
+        }
+
+    def open_output(self, source: str, resume: bool = True) -> JsonlCrawlOutput:
+        """
+        data/raw/clean_blog_data_<zaman>.jsonl çıktısını açar. resume=True iken aynı kaynağın
+        (örn. "all:<base_url>") yarım kalmış son dosyası sürdürülür.
+        """
+        filepath = find_resumable(RAW_DATA_DIR, "clean_blog_data_", source) if resume else None
+        if filepath:
+            print(f"♻️  Yarım kalan tarama sürdürülüyor: {filepath}")
+        else:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            filepath = os.path.join(RAW_DATA_DIR, f"clean_blog_data_{timestamp}.jsonl")
+            # Aynı saniyede başlayan ikinci tarama bitmiş dosyayı sürdürmesin
+            suffix = 1
+            while os.path.exists(filepath):
+                suffix += 1
+                filepath = os.path.join(RAW_DATA_DIR, f"clean_blog_data_{timestamp}_{suffix}.jsonl")
+        return JsonlCrawlOutput(filepath, source=source)
+
+    def save_clean_data(self, blogs_data: List[Dict], filename: str = None, removed_urls: List[str] | None = None):
         """
         Temiz verileri kaydet - Yapay zeka eğitimi için optimize edilmiş format
+        removed_urls: sitemap'ten kaybolan yazılar; içeriksiz "removed": true kayıtları olarak
+        eklenir (incremental ingest bunları index'ten siler)
         """
         if not filename:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = f"clean_blog_data_{timestamp}.json"
         
         # data/raw klasörünü oluştur
-        raw_data_dir = os.path.join(os.path.dirname(__file__), "..", "data", "raw")
-        os.makedirs(raw_data_dir, exist_ok=True)
+        os.makedirs(RAW_DATA_DIR, exist_ok=True)
         
-        filepath = os.path.join(raw_data_dir, filename)
+        filepath = os.path.join(RAW_DATA_DIR, filename)
         
         # Yapay zeka eğitimi için optimize edilmiş format
         ai_training_data = []
         
         for blog in blogs_data:
             if blog['content']:  # Sadece içeriği olan yazıları ekle
-                ai_training_data.append({
-                    "id": len(ai_training_data) + 1,
-                    "title": blog['title'],
-                    "content": blog['content'],
-                    "author": blog['author'],
-                    "date": blog['date'],
-                    "url": blog['url'],
-                    "word_count": blog['word_count'],
-                    "scraped_at": datetime.now().isoformat(),
-                    "scraper_type": "clean_content",
-                    # Yapay zeka için ek metadata
-                    "content_type": "blog_post",
-                    "language": "tr",
-                    "domain": "law_immigration_politics"
-                })
+                ai_training_data.append(self.training_record(blog, len(ai_training_data) + 1))
         
+        removed = [{"url": url, "content": "", "removed": True, "scraped_at": datetime.now().isoformat()}
+                   for url in removed_urls or []]
+
         with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(ai_training_data, f, ensure_ascii=False, indent=2)
+            json.dump(ai_training_data + removed, f, ensure_ascii=False, indent=2)
         
         print(f"💾 Temiz veriler kaydedildi: {filepath}")
-        print(f"📊 Kaydedilen yazı sayısı: {len(ai_training_data)}")
+        print(f"📊 Kaydedilen yazı sayısı: {len(ai_training_data)} "
+              f"({sum(1 for b in ai_training_data if b['unchanged'])} değişmemiş)")
         print(f"📝 Toplam kelime sayısı: {sum(blog['word_count'] for blog in ai_training_data):,}")
+        if removed:
+            print(f"🗑️  Silinecek yazı sayısı: {len(removed)}")
         
         return filepath
 
@@ -465,48 +453,98 @@ def test_clean_scraping():
     
     print("✅ Temiz içerik testi tamamlandı!")
 
-def clean_scrape_and_save(base_url: str | None = None):
+def _scrape_to_jsonl(scraper: CleanContentScraper, source: str, scrape, resume: bool) -> str | None:
+    """
+    scrape(output) çağrısını JSONL çıktısına akıtır. Tarama yarıda kesilirse veya hatalı URL
+    kalırsa checkpoint korunur; aynı kaynakla yeniden çalıştırınca kalan URL'ler işlenir.
+    Dönüş: dosya yolu (hiç yazı yoksa None)
+    """
+    output = scraper.open_output(source, resume=resume)
+    complete = False
+    try:
+        scrape(output)
+        complete = not scraper.last_failed
+    finally:
+        output.close(complete=complete)
+    if output.count == 0:
+        if complete and os.path.exists(output.path):
+            os.remove(output.path)
+        return None
+    print(f"💾 Temiz veriler kaydedildi: {output.path} ({output.count} yazı)")
+    if not complete:
+        print(f"⚠️  {len(scraper.last_failed)} URL başarısız; aynı komutu tekrar çalıştırınca yalnızca kalanlar denenir")
+    return output.path
+
+def clean_scrape_and_save(base_url: str | None = None, workers: int | None = None, resume: bool = True):
     """
     Ana temiz scraping fonksiyonu
+    Yazılar clean_blog_data_<zaman>.jsonl dosyasına işlendikçe eklenir; yarım kalan tarama
+    resume=True iken kaldığı yerden sürer. Dönüş: dosya yolu (başarısızsa None)
     """
-    scraper = CleanContentScraper(base_url=base_url)
-    blogs_data = scraper.scrape_all_blogs()
+    scraper = CleanContentScraper(base_url=base_url, workers=workers)
+    filepath = _scrape_to_jsonl(scraper, f"all:{scraper.base_url}",
+                                lambda output: scraper.scrape_all_blogs(output=output), resume)
     
-    if blogs_data:
-        filepath = scraper.save_clean_data(blogs_data)
+    if filepath:
         print(f"🎉 Temiz scraping tamamlandı! Veriler {filepath} dosyasına kaydedildi.")
-        return blogs_data
     else:
         print("❌ Temiz scraping başarısız!")
-        return []
+    return filepath
+
+def clean_scrape_changed_and_save(base_url: str | None = None, workers: int | None = None,
+                                  state_path: str | None = None):
+    """
+    Incremental temiz scraping: yalnızca yeni/değişen yazılar ve silinen URL'ler
+    clean_blog_delta_<zaman>.json dosyasına yazılır (tam rebuild dosyalarıyla karışmaz).
+    Dönüş: (dosya yolu, delta) — değişiklik yoksa (None, None). Sitemap durumu güncellenmez;
+    çağıran taraf FAISS kaydedildikten sonra commit_sitemap_delta(delta) çağırır. Böylece
+    indekslenemeyen yazılar ve silinen URL'ler bir sonraki çalıştırmada yeniden gelir
+    """
+    scraper = CleanContentScraper(base_url=base_url, workers=workers)
+    blogs, delta = scraper.scrape_changed_blogs(state_path=state_path)
+    removed = delta['removed']
+    if not blogs and not removed:
+        # İndekslenecek bir şey yok: lastmod'lar hemen yazılabilir (başarısızlar hariç)
+        commit_sitemap_delta(delta, state_path=state_path)
+        print("✅ Değişiklik yok, sitemap durumu güncel")
+        return None, None
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    filepath = scraper.save_clean_data(blogs, filename=f"clean_blog_delta_{timestamp}.json", removed_urls=removed)
+    return filepath, delta
+
+def commit_sitemap_delta(delta: Dict, state_path: str | None = None) -> None:
+    """scrape_changed_blogs delta'sını sitemap durumuna yazar (çekilemeyen URL'ler hariç)."""
+    SitemapState(state_path).commit(delta, failed=delta.get("failed", ()))
 
-def clean_scrape_category_and_save(category_url: str, base_url: str | None = None):
+def clean_scrape_category_and_save(category_url: str, base_url: str | None = None, workers: int | None = None,
+                                   resume: bool = True):
     """
-    Verilen kategori URL'sinden temiz içerik çek ve kaydet
+    Verilen kategori URL'sinden temiz içerik çek ve kaydet (JSONL, kaldığı yerden devam eder)
     """
-    scraper = CleanContentScraper(base_url=base_url)
-    blogs = scraper.scrape_category_blogs(category_url)
-    if blogs:
-        filepath = scraper.save_clean_data(blogs)
+    scraper = CleanContentScraper(base_url=base_url, workers=workers)
+    filepath = _scrape_to_jsonl(scraper, f"category:{category_url}",
+                                lambda output: scraper.scrape_category_blogs(category_url, output=output), resume)
+    if filepath:
         print(f"🎉 Kategori scraping tamamlandı! Veriler {filepath} dosyasına kaydedildi.")
-        return blogs
     else:
         print("❌ Kategori scraping başarısız!")
-        return []
+    return filepath
 
-def clean_scrape_list_and_save(list_url: str, base_url: str | None = None, max_pages: int | None = None):
+def clean_scrape_list_and_save(list_url: str, base_url: str | None = None, max_pages: int | None = None,
+                               workers: int | None = None, resume: bool = True):
     """
     Verilen liste URL'sinden (ör. https://alternativkraft.com/tr/blog-2/) temiz içerik çek ve kaydet
+    (JSONL, kaldığı yerden devam eder)
     """
-    scraper = CleanContentScraper(base_url=base_url)
-    blogs = scraper.scrape_list_blogs(list_url, max_pages=max_pages)
-    if blogs:
-        filepath = scraper.save_clean_data(blogs)
+    scraper = CleanContentScraper(base_url=base_url, workers=workers)
+    filepath = _scrape_to_jsonl(scraper, f"list:{list_url}",
+                                lambda output: scraper.scrape_list_blogs(list_url, max_pages=max_pages, output=output),
+                                resume)
+    if filepath:
         print(f"🎉 Liste scraping tamamlandı! Veriler {filepath} dosyasına kaydedildi.")
-        return blogs
     else:
         print("❌ Liste scraping başarısız!")
-        return []
+    return filepath
 
 if __name__ == "__main__":
     print("🧹 Temiz İçerik Scraper - Yapay Zeka Eğitimi için Optimize Edilmiş\n")
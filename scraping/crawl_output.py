@@ -0,0 +1,124 @@
+"""
+Kaldığı yerden devam edebilen tarama çıktısı (JSONL + checkpoint)
+- Her temizlenmiş makale tamamlanır tamamlanmaz .jsonl dosyasına tek satır olarak eklenir
+  (bellekte liste birikmez, çökmede yazılanlar kaybolmaz)
+- İşlenen URL'ler <dosya>.checkpoint dosyasına eklenir; ilk satır taramanın kaynağıdır
+- Checkpoint dosyası yalnızca tarama yarım kaldığında durur: aynı kaynakla yeniden
+  başlatılan tarama en son yarım dosyayı bulur ve işlenmiş URL'leri atlar
+- Yarım yazılmış son satır (çökme anı) açılışta kırpılır
+"""
+
+import os
+import json
+import glob
+from datetime import datetime
+from typing import Dict, Iterator, Optional, Set
+
+CHECKPOINT_SUFFIX = ".checkpoint"
+
+
+def iter_jsonl(path: str) -> Iterator[Dict]:
+    """JSONL kayıtlarını tek tek okur; bozuk (yarım yazılmış) satırlar atlanır."""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+
+def _truncate_partial_line(path: str) -> None:
+    """Dosya yeni satırla bitmiyorsa son (yarım) satırı siler."""
+    with open(path, "rb+") as f:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        if size == 0:
+            return
+        f.seek(size - 1)
+        if f.read(1) == b"\n":
+            return
+        block = 4096
+        pos = size
+        while pos > 0:
+            start = max(0, pos - block)
+            f.seek(start)
+            newline = f.read(pos - start).rfind(b"\n")
+            if newline != -1:
+                f.truncate(start + newline + 1)
+                return
+            pos = start
+        f.truncate(0)
+
+
+class JsonlCrawlOutput:
+    """
+    Tek yazar (crawl() sonuç geri çağrısı ana thread'de çalışır). write() kaydı, mark()
+    URL'yi checkpoint'e ekler; kayıt önce yazıldığından çökmede en fazla bir URL yeniden çekilir.
+    """
+
+    def __init__(self, path: str, source: str = ""):
+        self.path = os.path.abspath(path)
+        self.checkpoint_path = self.path + CHECKPOINT_SUFFIX
+        self.source = source
+        self.done: Set[str] = set()
+        self.count = 0
+        self.resumed = os.path.exists(self.checkpoint_path)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+        if os.path.exists(self.path):
+            _truncate_partial_line(self.path)
+            for record in iter_jsonl(self.path):
+                self.count += 1
+                if record.get("url"):
+                    self.done.add(record["url"])
+        if self.resumed:
+            with open(self.checkpoint_path, "r", encoding="utf-8") as f:
+                lines = f.read().splitlines()
+            self.done.update(line for line in lines[1:] if line)
+        else:
+            with open(self.checkpoint_path, "w", encoding="utf-8") as f:
+                f.write(json.dumps({"source": source, "started_at": datetime.now().isoformat()},
+                                   ensure_ascii=False) + "\n")
+
+        self._out = open(self.path, "a", encoding="utf-8")
+        self._checkpoint = open(self.checkpoint_path, "a", encoding="utf-8")
+
+    def is_done(self, url: str) -> bool:
+        return url in self.done
+
+    def write(self, record: Dict) -> None:
+        self._out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._out.flush()
+        self.count += 1
+
+    def mark(self, url: str) -> None:
+        self._checkpoint.write(url + "\n")
+        self._checkpoint.flush()
+        self.done.add(url)
+
+    def close(self, complete: bool = True) -> None:
+        """complete=True checkpoint'i siler (tarama bitti); False ise sonraki çalıştırma devam eder."""
+        self._out.close()
+        self._checkpoint.close()
+        if complete:
+            try:
+                os.remove(self.checkpoint_path)
+            except FileNotFoundError:
+                pass
+
+
+def find_resumable(directory: str, prefix: str, source: str = "") -> Optional[str]:
+    """Aynı kaynağa ait, checkpoint'i duran (yarım kalmış) en son JSONL dosyası."""
+    pattern = os.path.join(directory, f"{prefix}*.jsonl{CHECKPOINT_SUFFIX}")
+    for checkpoint_path in sorted(glob.glob(pattern), reverse=True):
+        try:
+            with open(checkpoint_path, "r", encoding="utf-8") as f:
+                header = json.loads(f.readline() or "{}")
+        except (OSError, json.JSONDecodeError):
+            continue
+        if header.get("source", "") == source:
+            return checkpoint_path[:-len(CHECKPOINT_SUFFIX)]
+    return None
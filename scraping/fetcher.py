@@ -0,0 +1,198 @@
+"""
+Paylaşımlı HTTP fetcher + eşzamanlı tarayıcı
+- Tek keep-alive requests.Session (bağlantı havuzu thread'ler arasında paylaşılır)
+- Host başına eşzamanlılık ve hız sınırı (istekler arası en az 1/rate saniye)
+- Varsayılan timeout; bağlantı hataları, 429 ve 5xx için Retry-After'a uyan üstel geri çekilme
+- crawl(): URL listesini thread havuzunda işler, sonuçları giriş sırasıyla döndürür ve sayfa/sn raporlar
+- İsteğe bağlı HTTP önbelleği (http_cache.py): koşullu istek, 304'te gövde diskten
+"""
+
+import os
+import time
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    from scraping.http_cache import CachingAdapter, HttpCache, create_http_cache
+except ImportError:  # script olarak scraping/ içinden çalıştırıldığında
+    from http_cache import CachingAdapter, HttpCache, create_http_cache
+
+DEFAULT_USER_AGENT = "Mozilla/5.0 (compatible; ChatBotScraper/1.0)"
+# Yeniden denenecek durum kodları (geçici hatalar); diğer 4xx hemen döner
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class HostLimiter:
+    """Host başına eşzamanlı istek sınırı (semafor) ve istekler arası minimum aralık."""
+
+    def __init__(self, concurrency: int = 4, rate: float = 0.0):
+        self.concurrency = max(1, concurrency)
+        self.interval = 1.0 / rate if rate and rate > 0 else 0.0
+        self._hosts: Dict[str, Tuple[threading.Semaphore, List[float]]] = {}
+        self._lock = threading.Lock()
+
+    def _host(self, host: str) -> Tuple[threading.Semaphore, List[float]]:
+        with self._lock:
+            if host not in self._hosts:
+                self._hosts[host] = (threading.Semaphore(self.concurrency), [0.0])
+            return self._hosts[host]
+
+    def acquire(self, host: str) -> None:
+        sem, next_slot = self._host(host)
+        sem.acquire()
+        if self.interval:
+            # Sıradaki boş zaman dilimini ayır, gerekirse o ana kadar bekle
+            with self._lock:
+                now = time.monotonic()
+                slot = max(now, next_slot[0])
+                next_slot[0] = slot + self.interval
+            if slot > now:
+                time.sleep(slot - now)
+
+    def release(self, host: str) -> None:
+        self._host(host)[0].release()
+
+
+class Fetcher:
+    """Thread-safe GET: paylaşımlı oturum, host sınırları, timeout ve yeniden deneme."""
+
+    def __init__(self, concurrency_per_host: int = 4, rate_per_host: float = 0.0, timeout: float = 20.0,
+                 retries: int = 3, backoff: float = 1.0, pool_size: int = 16,
+                 user_agent: str = DEFAULT_USER_AGENT, cache: Optional[HttpCache] = None):
+        self.timeout = timeout
+        self.retries = max(0, retries)
+        self.backoff = backoff
+        self.limiter = HostLimiter(concurrency_per_host, rate_per_host)
+        self.session = requests.Session()
+        self.session.headers.update({"User-Agent": user_agent})
+        # Yeniden deneme burada yapılır (urllib3'ünki kapalı); havuz boyutu eşzamanlılığa göre
+        self.cache = cache
+        if cache is not None:
+            adapter = CachingAdapter(cache, pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        else:
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.requests = 0
+        self.retried = 0
+        self.errors = 0
+        self.bytes = 0
+        self._stats_lock = threading.Lock()
+
+    def _delay(self, attempt: int, response: Optional[requests.Response] = None) -> float:
+        if response is not None:
+            retry_after = response.headers.get("Retry-After")
+            try:
+                return min(60.0, max(0.0, float(retry_after)))
+            except (TypeError, ValueError):
+                pass
+        return self.backoff * (2 ** attempt) + random.uniform(0, self.backoff)
+
+    def get(self, url: str, timeout: Optional[float] = None, **kwargs) -> requests.Response:
+        """
+        GET isteği. Geçici hatalarda (bağlantı, zaman aşımı, 429/5xx) yeniden dener; son
+        denemede de başarısızsa son yanıtı döndürür ya da istisnayı yükseltir.
+        """
+        host = urlsplit(url).netloc
+        attempt = 0
+        while True:
+            self.limiter.acquire(host)
+            try:
+                response = self.session.get(url, timeout=timeout or self.timeout, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                response, error = None, e
+            else:
+                error = None
+            finally:
+                self.limiter.release(host)
+
+            with self._stats_lock:
+                self.requests += 1
+                if response is not None and not getattr(response, "from_cache", False):
+                    self.bytes += len(response.content or b"")
+            transient = error is not None or response.status_code in RETRY_STATUS
+            if not transient or attempt >= self.retries:
+                if error is not None:
+                    with self._stats_lock:
+                        self.errors += 1
+                    raise error
+                return response
+            with self._stats_lock:
+                self.retried += 1
+            delay = self._delay(attempt, response)
+            reason = error or f"HTTP {response.status_code}"
+            print(f"🔁 Yeniden deneniyor ({attempt + 1}/{self.retries}, {delay:.1f} sn): {url} → {reason}")
+            time.sleep(delay)
+            attempt += 1
+
+    def stats(self) -> Dict:
+        stats = {
+            "requests": self.requests,
+            "retried": self.retried,
+            "errors": self.errors,
+            "bytes": self.bytes,
+        }
+        if self.cache is not None:
+            stats["cache"] = self.cache.stats()
+        return stats
+
+    def close(self) -> None:
+        self.session.close()
+
+
+def crawl(urls: List[str], fetch_page: Callable[[str], Any], workers: int = 8,
+          on_result: Optional[Callable[[int, int, str, Any], None]] = None,
+          keep_results: bool = True) -> Tuple[List[Any], Dict]:
+    """
+    URL'leri thread havuzunda işler. fetch_page(url) istisnaları kendisi yakalamalıdır;
+    on_result(tamamlanan, toplam, url, sonuç) her sayfa bittiğinde ana thread'de çağrılır.
+    keep_results=False: sonuçlar yalnızca on_result'a verilir, bellekte tutulmaz (akış çıktısı).
+    Dönüş: (giriş sırasıyla sonuçlar, {"pages", "seconds", "pages_per_second"})
+    """
+    started = time.perf_counter()
+    results: List[Any] = [None] * len(urls) if keep_results else []
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="crawler") as pool:
+        futures = {pool.submit(fetch_page, url): i for i, url in enumerate(urls)}
+        try:
+            for done, future in enumerate(as_completed(futures), 1):
+                i = futures.pop(future)
+                result = future.result()
+                if keep_results:
+                    results[i] = result
+                if on_result is not None:
+                    on_result(done, len(urls), urls[i], result)
+        except BaseException:
+            # Kesintide (Ctrl+C, yazma hatası) kuyruktaki sayfalar çekilmeden bırakılır
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise
+    elapsed = time.perf_counter() - started
+    report = {
+        "pages": len(urls),
+        "seconds": round(elapsed, 2),
+        "pages_per_second": round(len(urls) / elapsed, 2) if elapsed > 0 else None,
+    }
+    return results, report
+
+
+def create_fetcher() -> Fetcher:
+    """
+    Ortam değişkenlerine göre fetcher oluştur:
+      SCRAPER_PER_HOST (host başına eşzamanlı istek, varsayılan 4), SCRAPER_RATE (host başına
+      istek/sn, 0 = sınırsız), SCRAPER_TIMEOUT (sn, varsayılan 20), SCRAPER_RETRIES (varsayılan 3),
+      HTTP_CACHE=0 (koşullu istek önbelleğini kapatır), HTTP_CACHE_DIR
+    """
+    per_host = int(os.getenv("SCRAPER_PER_HOST", "4"))
+    return Fetcher(
+        concurrency_per_host=per_host,
+        rate_per_host=float(os.getenv("SCRAPER_RATE", "0")),
+        timeout=float(os.getenv("SCRAPER_TIMEOUT", "20")),
+        retries=int(os.getenv("SCRAPER_RETRIES", "3")),
+        pool_size=max(16, per_host * 2),
+        cache=create_http_cache(),
+    )
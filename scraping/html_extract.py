@@ -0,0 +1,438 @@
+"""
+Blog HTML'inden temiz içerik çıkarımı (başlık, içerik, tarih, yazar)
+- extract_reference(): BeautifulSoup (html.parser) ile seçicileri sırayla dener; referans yol
+- extract_fast(): lxml (libxml2, C) ile yalnızca <title> + <body> bölgesini ayrıştırır ve
+  tüm seçicileri tek ağaç taramasında çözer. İki ayrıştırıcının ağacı farklı kurabildiği
+  girdiler ayrıca ele alınır: <![CDATA[..]]> metni (libxml2 yorum yapıp atar) metin olarak
+  korunur; yanlış iç içe/kapanmamış etiketler, iç içe <a>/<form>, <p> içinde blok eleman gibi
+  libxml2'nin onardığı işaretleme görülürse referans yola düşülür
+- clean_html(): HTML_EXTRACTOR=fast (varsayılan) | bs4. lxml kurulu değilse veya hızlı yol
+  hata verirse referans yola düşülür
+"""
+
+import os
+import re
+from functools import lru_cache
+from html import escape
+from typing import Dict, List, Optional, Tuple
+
+from bs4 import BeautifulSoup
+
+try:
+    from lxml import etree
+except ImportError:  # lxml yoksa yalnızca BeautifulSoup yolu kullanılır
+    etree = None
+
+TITLE_SELECTORS = [
+    'h1.entry-title',
+    '.post-title h1',
+    'h1',
+    '.entry-header h1',
+    'title'
+]
+CONTENT_SELECTORS = [
+    '.entry-content',
+    '.post-content',
+    'article .content',
+    '.blog-post-content',
+    'main article',
+    '.single-post-content'
+]
+DATE_SELECTORS = [
+    '.entry-date',
+    '.post-date',
+    'time[datetime]',
+    '.published'
+]
+AUTHOR_SELECTORS = [
+    '.author-name',
+    '.post-author',
+    '.entry-author'
+]
+DEFAULT_AUTHOR = "Oktay Özdemir"
+SITE_SUFFIX = ' - Oktay Özdemir Danışmanlık'
+# İçerik elementinden silinen alt ağaçlar (gereksiz bloklar, reklam ve sosyal medya)
+UNWANTED_TAGS = ['script', 'style', 'nav', 'header', 'footer', 'aside', 'form']
+UNWANTED_CLASSES = ['.social-share', '.advertisement', '.ads', '.sidebar', '.related-posts']
+
+
+def _finish(title: str, content: str, date: str, author: str) -> Dict[str, str]:
+    """Her iki yolun ortak son işlemi: site adı, boşluk temizliği ve kısa içerik filtresi."""
+    title = title.replace(SITE_SUFFIX, '')
+    if content:
+        content = re.sub(r'\n\s*\n', '\n\n', content)  # Çoklu satır sonlarını düzenle
+        content = re.sub(r' +', ' ', content)  # Çoklu boşlukları tek boşluğa çevir
+        content = content.strip()
+        # Çok kısa içeriği filtrele
+        if len(content) < 200:
+            content = ""
+    return {
+        'title': title,
+        'content': content,
+        'author': author,
+        'date': date,
+        'word_count': len(content.split()) if content else 0
+    }
+
+
+def extract_reference(html_content: str) -> Dict[str, str]:
+    """BeautifulSoup ile çıkarım: her seçici için ağaç ayrı ayrı taranır."""
+    soup = BeautifulSoup(html_content, 'html.parser')
+
+    title = ""
+    for selector in TITLE_SELECTORS:
+        title_elem = soup.select_one(selector)
+        if title_elem:
+            title = title_elem.get_text().strip()
+            break
+
+    content = ""
+    for selector in CONTENT_SELECTORS:
+        content_elem = soup.select_one(selector)
+        if content_elem:
+            for unwanted in content_elem.find_all(UNWANTED_TAGS):
+                unwanted.decompose()
+            for unwanted_class in UNWANTED_CLASSES:
+                for elem in content_elem.select(unwanted_class):
+                    elem.decompose()
+            content = content_elem.get_text()
+            break
+
+    date = ""
+    for selector in DATE_SELECTORS:
+        date_elem = soup.select_one(selector)
+        if date_elem:
+            date = date_elem.get_text().strip() or date_elem.get('datetime', '')
+            break
+
+    author = DEFAULT_AUTHOR
+    for selector in AUTHOR_SELECTORS:
+        author_elem = soup.select_one(selector)
+        if author_elem:
+            author = author_elem.get_text().strip()
+            break
+
+    return _finish(title, content, date, author)
+
+
+# --- Hızlı yol (lxml) ---
+
+_COMPOUND = re.compile(r'^([a-z0-9]+)?(?:\.([\w-]+))?(?:\[([\w-]+)\])?$')
+_ASCII_SPACES = '\x20\x0a\x09\x0c\x0d'
+# get_text'in atladığı metinler (BeautifulSoup: Script/Stylesheet/TemplateString)
+_HIDDEN_TEXT_TAGS = {'script', 'style', 'template'}
+_PRESERVE_WHITESPACE_TAGS = {'pre', 'textarea'}
+_BODY_START = re.compile(r'<body[\s>/]', re.I)
+_SCRIPT_OPEN = re.compile(r'<script[\s>]', re.I)
+_SCRIPT_CLOSE = re.compile(r'</script\s*>', re.I)
+_TITLE = re.compile(r'<title[\s>].*?</title\s*>', re.I | re.S)
+# html.parser <![CDATA[..]]> içeriğini metin (CData) olarak tutar, ilk "]]>" ile kapatır
+# (script/style ham metin, yorumlar atlanır; bu bloklar aynen bırakılır)
+_CDATA = re.compile(r'(<(script|style)[\s>].*?(?:</\2\s*>|\Z)|<!--.*?(?:-->|\Z))'
+                    r'|<!\[cdata\[(.*?)\]\s*\]\s*>', re.I | re.S)
+_CDATA_TAG = 'cdata-text'
+# Etiket taraması: yorumlar, script/style ve CDATA atlanır; (kapanış mı, ad, öznitelikler)
+_TAG_TOKEN = re.compile(r'<!--.*?(?:-->|\Z)|<(script|style)[\s>].*?(?:</\1\s*>|\Z)|<!\[cdata\[.*?\]\s*\]\s*>'
+                        r'|<(/?)([a-z][^\s/>]*)((?:[^>"\']|"[^"]*"|\'[^\']*\')*)>', re.I | re.S)
+# BeautifulSoup'un kapanışsız (boş) kabul ettiği etiketler
+_VOID_TAGS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'keygen', 'link', 'menuitem',
+              'meta', 'param', 'source', 'track', 'wbr', 'basefont', 'bgsound', 'command', 'frame',
+              'image', 'isindex', 'nextid', 'spacer'}
+_DOCUMENT_TAGS = {'html', 'head', 'body'}
+
+
+class _Compound:
+    """Basit seçici parçası: etiket, tek sınıf ve/veya öznitelik varlığı (örn. time[datetime])."""
+
+    def __init__(self, text: str):
+        match = _COMPOUND.match(text)
+        if not match or not any(match.groups()):
+            raise ValueError(f"Desteklenmeyen seçici: {text}")
+        self.tag, self.cls, self.attr = match.groups()
+
+    @property
+    def key(self) -> str:
+        # Eleman başına yalnızca etiket/sınıf anahtarı tutan seçiciler denenir
+        return f".{self.cls}" if self.cls else self.tag
+
+    def matches(self, elem, classes: List[str]) -> bool:
+        return ((self.tag is None or elem.tag == self.tag)
+                and (self.cls is None or self.cls in classes)
+                and (self.attr is None or elem.get(self.attr) is not None))
+
+
+class _SelectorSet:
+    """
+    Seçici listelerini tek taramada çözer. Yalnızca "A" ve "A B" (descendant) biçimleri
+    desteklenir; "A B" için açık atalardan A'ya uyanların sayısı tutulur.
+    """
+
+    def __init__(self, groups: Dict[str, List[str]]):
+        self.selectors: List[Tuple[str, int, Optional[_Compound], _Compound]] = []
+        self.targets: Dict[str, List[int]] = {}
+        self.ancestors: Dict[str, List[int]] = {}
+        for group, selectors in groups.items():
+            for priority, selector in enumerate(selectors):
+                parts = [_Compound(p) for p in selector.split()]
+                if len(parts) > 2:
+                    raise ValueError(f"Desteklenmeyen seçici: {selector}")
+                ancestor = parts[0] if len(parts) == 2 else None
+                index = len(self.selectors)
+                self.selectors.append((group, priority, ancestor, parts[-1]))
+                self.targets.setdefault(parts[-1].key, []).append(index)
+                if ancestor is not None:
+                    self.ancestors.setdefault(ancestor.key, []).append(index)
+
+    def _candidates(self, table: Dict[str, List[int]], elem, classes: List[str]) -> List[int]:
+        found = list(table.get(elem.tag, ()))
+        for cls in classes:
+            found.extend(table.get(f".{cls}", ()))
+        return found
+
+    def resolve(self, root) -> List[List]:
+        """Seçici başına eşleşen elemanlar (belge sırasıyla) — tek iterwalk taraması."""
+        matches: List[List] = [[] for _ in self.selectors]
+        open_ancestors = [0] * len(self.selectors)
+        opened: List[List[int]] = []
+        for event, elem in etree.iterwalk(root, events=("start", "end")):
+            if event == "end":
+                for index in opened.pop():
+                    open_ancestors[index] -= 1
+                continue
+            classes = (elem.get('class') or '').split()
+            for index in self._candidates(self.targets, elem, classes):
+                _, _, ancestor, target = self.selectors[index]
+                if target.matches(elem, classes) and (ancestor is None or open_ancestors[index]):
+                    matches[index].append(elem)
+            entered = [index for index in self._candidates(self.ancestors, elem, classes)
+                       if self.selectors[index][2].matches(elem, classes)]
+            for index in entered:
+                open_ancestors[index] += 1
+            opened.append(entered)
+        return matches
+
+
+_SELECTORS = _SelectorSet({
+    'title': TITLE_SELECTORS,
+    'content': CONTENT_SELECTORS,
+    'date': DATE_SELECTORS,
+    'author': AUTHOR_SELECTORS,
+})
+_UNWANTED = {'tags': set(UNWANTED_TAGS), 'classes': {c.lstrip('.') for c in UNWANTED_CLASSES}}
+
+
+def _is_unwanted(elem) -> bool:
+    if elem.tag in _UNWANTED['tags']:
+        return True
+    return not _UNWANTED['classes'].isdisjoint((elem.get('class') or '').split())
+
+
+def _removed(elem, content_elem) -> bool:
+    """Referans yolda içerik elementinden silinmiş bir alt ağaçta mı (content_elem hariç)?"""
+    if content_elem is None:
+        return False
+    node = elem
+    inside = []
+    while node is not None and node is not content_elem:
+        inside.append(node)
+        node = node.getparent()
+    return node is content_elem and any(_is_unwanted(n) for n in inside)
+
+
+def _normalize(text: str, preserve: bool) -> str:
+    # BeautifulSoup yalnızca boşluktan oluşan metni tek '\n' veya ' ' yapar (pre/textarea hariç)
+    if preserve or text.strip(_ASCII_SPACES):
+        return text
+    return '\n' if '\n' in text else ' '
+
+
+def _get_text(elem, content_elem=None, preserve: bool = False) -> str:
+    """
+    BeautifulSoup get_text() eşdeğeri; content_elem verilirse onun alt ağacında referans yolda
+    silinen parçalar atlanır (elem içerik elementinin içinde, kendisi veya atası olabilir).
+    """
+    parts: List[str] = []
+
+    def walk(node, preserve: bool, inside: bool) -> None:
+        if node.tag in _HIDDEN_TEXT_TAGS:
+            return
+        if node.tag == _CDATA_TAG:
+            # CDATA ayrı bir metin düğümüdür; boşluk sadeleştirmesi ona ayrıca uygulanır
+            parts.append(_normalize(node.text or '', preserve))
+            return
+        preserve = preserve or node.tag in _PRESERVE_WHITESPACE_TAGS
+        inside = inside or node is content_elem
+        if node.text:
+            parts.append(_normalize(node.text, preserve))
+        for child in node:
+            if not isinstance(child.tag, str):  # yorum / işleme talimatı
+                pass
+            elif not (inside and _is_unwanted(child)):
+                walk(child, preserve, inside)
+            if child.tail:
+                parts.append(_normalize(child.tail, preserve))
+
+    walk(elem, preserve or any(a.tag in _PRESERVE_WHITESPACE_TAGS for a in elem.iterancestors()),
+         _inside(elem, content_elem))
+    return ''.join(parts)
+
+
+def _relevant_region(html_content: str) -> str:
+    """
+    Ayrıştırılacak bölge: <title> + <body>...; <head> içindeki stil/script/meta blokları
+    hiç ayrıştırılmaz. <body> bulunamazsa (veya bir script içindeyse) tüm belge döner.
+    """
+    match = _BODY_START.search(html_content)
+    if not match:
+        return html_content
+    head = html_content[:match.start()]
+    if len(_SCRIPT_OPEN.findall(head)) != len(_SCRIPT_CLOSE.findall(head)):
+        return html_content
+    title = _TITLE.search(head)
+    return (f"<html><head>{title.group(0) if title else ''}</head>"
+            f"{html_content[match.start():]}")
+
+
+def _cdata_element(match) -> str:
+    if match.group(1):
+        return match.group(1)
+    return f"<{_CDATA_TAG}>{escape(match.group(3), quote=False)}</{_CDATA_TAG}>"
+
+
+@lru_cache(maxsize=4096)
+def _autocloses(current: str, tag: str) -> bool:
+    """
+    libxml2, açık `current` elemanının içinde `tag` başlayınca onu kapatır mı (örn. <a> içinde
+    <a>, <p> içinde <div>, <li> içinde <li>)? Kural tablosu kurulu libxml2'ye küçük bir belge
+    ayrıştırtılarak öğrenilir; çift başına bir kez.
+    """
+    try:
+        root = etree.fromstring(f"<html><body><{current}><{tag} data-probe>x</{tag}></{current}></body></html>",
+                                _parser())
+        elem = next(root.iterfind(".//*[@data-probe]"), None)
+    except Exception:
+        return True
+    return elem is None or elem.getparent() is None or elem.getparent().tag != current
+
+
+@lru_cache(maxsize=4096)
+def _raw_text(tag: str) -> bool:
+    """libxml2 `tag` içeriğini ham metin olarak mı okur (title, textarea, xmp, iframe...)?"""
+    try:
+        root = etree.fromstring(f"<html><body><{tag}><b data-probe>x</b></{tag}></body></html>", _parser())
+    except Exception:
+        return True
+    return next(root.iterfind(".//*[@data-probe]"), None) is None
+
+
+def _divergent_markup(region: str) -> bool:
+    """
+    html.parser etiketleri yazıldığı gibi iç içe kurar: kapanış etiketi en yakın aynı adlı açık
+    elemana kadar kapatır, hiçbir etiket başka bir elemanı kendiliğinden kapatmaz. libxml2 ise
+    HTML kurallarıyla onarır (<a> içindeki <a>'yı, <p> içindeki blok elemanı kardeş yapar;
+    kapanışı eşleşmeyen etiketi öncelik sırasına göre yok sayar; <div/>'i açık bırakır).
+    Bu tarama html.parser'ın açık eleman yığınını izler; ağaçların ayrışabileceği ilk yerde
+    (yanlış sıralı/eşsiz kapanış, boş olmayan etiketin <x/> yazımı, libxml2'nin kendiliğinden
+    kapatacağı bir başlangıç, libxml2'nin ham metin okuduğu elemanın içinde işaretleme) True döner.
+    """
+    stack: List[str] = []
+    for match in _TAG_TOKEN.finditer(region):
+        name = (match.group(3) or '').lower()
+        if stack and _raw_text(stack[-1]) and not (match.group(2) and name == stack[-1]):
+            return True
+        if not name:  # yorum / script / style / CDATA
+            continue
+        if name in _DOCUMENT_TAGS:
+            # Belge iskeleti: yalnızca hiçbir eleman açıkken ayrıştırıcılar aynı davranır
+            if stack:
+                return True
+            continue
+        if match.group(2):
+            if not stack or stack[-1] != name:
+                return True
+            stack.pop()
+            continue
+        if stack and _autocloses(stack[-1], name):  # boş etiketler de kapatabilir (<p><hr>)
+            return True
+        if name in _VOID_TAGS:
+            continue
+        if match.group(4).rstrip().endswith('/'):
+            return True
+        stack.append(name)
+    return False
+
+
+def _parser():
+    return etree.HTMLParser(remove_comments=True, remove_pis=True, no_network=True,
+                            collect_ids=False, default_doctype=False)
+
+
+def extract_fast(html_content: str) -> Dict[str, str]:
+    """lxml ile çıkarım; tüm seçiciler tek taramada çözülür. lxml yoksa RuntimeError."""
+    if etree is None:
+        raise RuntimeError("lxml kurulu değil")
+    region = _relevant_region(html_content)
+    if _divergent_markup(region):
+        return extract_reference(html_content)
+    if '<![' in region:
+        region = _CDATA.sub(_cdata_element, region)
+    root = etree.fromstring(region, _parser())
+    if root is None:
+        return _finish("", "", "", DEFAULT_AUTHOR)
+    matches = _SELECTORS.resolve(root)
+    first: Dict[str, List[Tuple[int, List]]] = {}
+    for (group, priority, _, _), found in zip(_SELECTORS.selectors, matches):
+        first.setdefault(group, []).append((priority, found))
+
+    def pick(group: str, content_elem=None):
+        for _, found in sorted(first[group], key=lambda item: item[0]):
+            # Referans yolda içerikten silinen elemanlar sonraki seçicilere görünmez
+            for elem in found:
+                if not _removed(elem, content_elem):
+                    return elem
+        return None
+
+    title_elem = pick('title')
+    title = _get_text(title_elem).strip() if title_elem is not None else ""
+
+    content_elem = pick('content')
+    content = _get_text(content_elem, content_elem) if content_elem is not None else ""
+
+    date = ""
+    date_elem = pick('date', content_elem)
+    if date_elem is not None:
+        date = _get_text(date_elem, content_elem).strip() \
+            or date_elem.get('datetime', '')
+
+    author = DEFAULT_AUTHOR
+    author_elem = pick('author', content_elem)
+    if author_elem is not None:
+        author = _get_text(author_elem, content_elem).strip()
+
+    return _finish(title, content, date, author)
+
+
+def _inside(elem, content_elem) -> bool:
+    """elem içerik elementinin içinde mi (alt ağacındaki silinmiş parçalar metne girmez)?"""
+    if content_elem is None:
+        return False
+    return elem is content_elem or any(a is content_elem for a in elem.iterancestors())
+
+
+def fast_available() -> bool:
+    return etree is not None
+
+
+def clean_html(html_content: str, fast: Optional[bool] = None) -> Dict[str, str]:
+    """
+    Temiz içerik çıkarımı. fast=None ise HTML_EXTRACTOR ortam değişkenine bakılır
+    (fast varsayılan, bs4 = referans yol).
+    """
+    if fast is None:
+        fast = os.getenv("HTML_EXTRACTOR", "fast").lower() != "bs4"
+    if fast and etree is not None:
+        try:
+            return extract_fast(html_content)
+        except Exception as e:
+            print(f"⚠️ Hızlı HTML çıkarımı başarısız, BeautifulSoup'a düşülüyor: {e}")
+    return extract_reference(html_content)
@@ -0,0 +1,214 @@
+"""
+Diskte HTTP koşullu istek önbelleği (ETag / Last-Modified)
+- Her URL için doğrulayıcılar (ETag, Last-Modified) ve gövde saklanır (data/cache/http/)
+- Sonraki isteklerde If-None-Match / If-Modified-Since gönderilir; 304 gelirse gövde
+  önbellekten döner, ağdan yeniden indirilmez
+- Yanıtlarda unchanged işareti: 304 veya gövde özeti önceki çalıştırmayla aynı. Scraper'lar
+  bu sayede sayfayı yeniden ayrıştırmaz, vectorstore yeniden chunk'lamaz/embed etmez
+- Önbellek bir requests adapter'ı olarak takılır; aynı oturumu kullanan her şey
+  (Fetcher, WebBaseLoader) otomatik olarak koşullu istek yapar
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(__file__), "..", "data", "cache", "http")
+# Önbelleğe alınan ve 304'te geri yüklenen yanıt başlıkları
+_KEPT_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Content-Language")
+
+
+def _url_key(url: str) -> str:
+    return hashlib.sha1(url.encode("utf-8")).hexdigest()
+
+
+class HttpCache:
+    """
+    URL başına iki dosya: <anahtar>.json (doğrulayıcılar, özet, ayrıştırılmış sonuç) ve
+    <anahtar>.body (ham gövde). Yazımlar atomiktir (geçici dosya + os.replace).
+    """
+
+    def __init__(self, directory: Optional[str] = None, enabled: bool = True):
+        self.directory = os.path.abspath(directory or DEFAULT_CACHE_DIR)
+        self.enabled = enabled
+        self.not_modified = 0
+        self.unchanged = 0
+        self.changed = 0
+        self.bytes_saved = 0
+        # Bu çalıştırmada görülen URL'lerin sonucu (True = değişmedi); yanıt nesnesine
+        # erişilemeyen yükleyiciler (WebBaseLoader) için
+        self.outcomes: Dict[str, bool] = {}
+        self._stats_lock = threading.Lock()
+
+    def _path(self, url: str, ext: str) -> str:
+        return os.path.join(self.directory, f"{_url_key(url)}.{ext}")
+
+    def _write(self, path: str, data: bytes) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def get(self, url: str) -> Optional[Dict]:
+        if not self.enabled:
+            return None
+        try:
+            with open(self._path(url, "json"), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"⚠️ HTTP önbelleği okunamadı ({url}): {e}")
+            return None
+
+    def body(self, url: str) -> Optional[bytes]:
+        try:
+            with open(self._path(url, "body"), "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def store(self, url: str, response: requests.Response, previous: Optional[Dict]) -> bool:
+        """200 yanıtını saklar; gövde önceki kayıtla aynıysa True döner (ayrıştırılmış sonuç korunur)."""
+        body = response.content or b""
+        digest = hashlib.sha256(body).hexdigest()
+        unchanged = previous is not None and previous.get("sha256") == digest
+        if not self.enabled:
+            return unchanged
+        entry = {
+            "url": url,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "headers": {k: response.headers[k] for k in _KEPT_HEADERS if k in response.headers},
+            "encoding": response.encoding,
+            "sha256": digest,
+            "fetched_at": time.time(),
+            "validated_at": time.time(),
+        }
+        if unchanged and previous.get("parsed") is not None:
+            entry["parsed"] = previous["parsed"]
+        try:
+            if not unchanged or not os.path.exists(self._path(url, "body")):
+                self._write(self._path(url, "body"), body)
+            self._write(self._path(url, "json"), json.dumps(entry, ensure_ascii=False).encode("utf-8"))
+        except Exception as e:
+            print(f"⚠️ HTTP önbelleği yazılamadı ({url}): {e}")
+        return unchanged
+
+    def touch(self, url: str, entry: Dict) -> None:
+        """304 sonrası doğrulama zamanını günceller."""
+        entry = dict(entry, validated_at=time.time())
+        try:
+            self._write(self._path(url, "json"), json.dumps(entry, ensure_ascii=False).encode("utf-8"))
+        except Exception:
+            pass
+
+    def parsed(self, url: str) -> Optional[Dict]:
+        """Scraper'ın bu gövde için daha önce kaydettiği ayrıştırma sonucu."""
+        entry = self.get(url)
+        return entry.get("parsed") if entry else None
+
+    def set_parsed(self, url: str, parsed: Dict) -> None:
+        entry = self.get(url)
+        if entry is None:
+            return
+        entry["parsed"] = parsed
+        try:
+            self._write(self._path(url, "json"), json.dumps(entry, ensure_ascii=False).encode("utf-8"))
+        except Exception as e:
+            print(f"⚠️ HTTP önbelleği yazılamadı ({url}): {e}")
+
+    def record(self, url: str, not_modified: bool, unchanged: bool, bytes_saved: int = 0) -> None:
+        with self._stats_lock:
+            self.outcomes[url] = unchanged
+            if not_modified:
+                self.not_modified += 1
+            if unchanged:
+                self.unchanged += 1
+            else:
+                self.changed += 1
+            self.bytes_saved += bytes_saved
+
+    def is_unchanged(self, url: str) -> bool:
+        return self.outcomes.get(url, False)
+
+    def stats(self) -> Dict:
+        return {
+            "enabled": self.enabled,
+            "not_modified": self.not_modified,
+            "unchanged": self.unchanged,
+            "changed": self.changed,
+            "bytes_saved": self.bytes_saved,
+            "path": self.directory,
+        }
+
+
+class CachingAdapter(HTTPAdapter):
+    """
+    Koşullu GET yapan requests adapter'ı. Dönen yanıtlarda response.unchanged
+    (önceki çalıştırmaya göre değişmedi) ve response.from_cache (304, gövde diskten) bulunur.
+    """
+
+    def __init__(self, cache: HttpCache, **kwargs):
+        super().__init__(**kwargs)
+        self.cache = cache
+
+    def send(self, request, **kwargs):
+        if request.method != "GET" or not self.cache.enabled:
+            return super().send(request, **kwargs)
+        url = request.url
+        entry = self.cache.get(url)
+        if entry is not None:
+            if entry.get("etag"):
+                request.headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                request.headers["If-Modified-Since"] = entry["last_modified"]
+
+        response = super().send(request, **kwargs)
+        response.from_cache = False
+        response.unchanged = False
+        if response.status_code == 304 and entry is not None:
+            body = self.cache.body(url)
+            if body is not None:
+                response.close()
+                cached = self._cached_response(request, entry, body)
+                self.cache.touch(url, entry)
+                self.cache.record(url, not_modified=True, unchanged=True, bytes_saved=len(body))
+                return cached
+        if response.status_code == 200:
+            no_store = "no-store" in (response.headers.get("Cache-Control") or "").lower()
+            if no_store:
+                return response
+            response.unchanged = self.cache.store(url, response, entry)
+            self.cache.record(url, not_modified=False, unchanged=response.unchanged)
+        return response
+
+    def _cached_response(self, request, entry: Dict, body: bytes) -> requests.Response:
+        response = requests.Response()
+        response.status_code = 200
+        response.reason = "OK"
+        response._content = body
+        response.headers = CaseInsensitiveDict(entry.get("headers") or {})
+        response.encoding = entry.get("encoding")
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        response.from_cache = True
+        response.unchanged = True
+        return response
+
+
+def create_http_cache() -> HttpCache:
+    """HTTP_CACHE=0 önbelleği kapatır; HTTP_CACHE_DIR konumu değiştirir."""
+    return HttpCache(
+        os.getenv("HTTP_CACHE_DIR") or None,
+        enabled=os.getenv("HTTP_CACHE", "1") != "0",
+    )
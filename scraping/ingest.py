@@ -8,9 +8,18 @@ Kullanım örnekleri:
   - Yalnızca incremental ekleme (mevcut FAISS'e yeni temiz JSON'u ekle):
       python3 ingest.py --mode clean --incremental
 
-  - Belirli bir temiz JSON dosyasını incremental ekle:
+  - Belirli bir temiz JSON/JSONL dosyasını incremental ekle:
       python3 ingest.py --json data/raw/clean_blog_data_20250101_120000.json --incremental
 
+  - Günlük yenileme: yalnızca sitemap lastmod'u değişen/yeni yazıları çek, silinenleri index'ten kaldır:
+      python3 ingest.py --mode clean --changed-only
+
+  - Yarıda kesilen tam tarama aynı komutla kaldığı yerden sürer; baştan başlatmak için:
+      python3 ingest.py --mode clean --rebuild --fresh
+
+  - Akışlı ingest: makaleler çekildikçe ayrıştırılır, chunk'lanır, embed edilir ve FAISS'e eklenir:
+      python3 ingest.py --mode clean --stream --workers 8 --embed-batch 64
+
 Notlar:
   - Varsayılan kök: bu dosyanın bulunduğu proje dizini
   - Embedding modeli, mevcut yapıyla uyumlu: paraphrase-multilingual-MiniLM-L12-v2
@@ -30,26 +39,32 @@ if PROJECT_ROOT not in sys.path:
 from scraping.clean_content_scraper import (
     clean_scrape_and_save,
     clean_scrape_category_and_save,
+    clean_scrape_changed_and_save,
     clean_scrape_list_and_save,
+    commit_sitemap_delta,
 )  # type: ignore
+from scraping.ingest_pipeline import stream_ingest  # type: ignore
 from scraping.sitemap_scraper import sitemap_scrape_and_save  # type: ignore
-from vectorstore.build_store import OptimizedVectorStoreBuilder, build_full_vectorstore  # type: ignore
+from vectorstore.build_store import (  # type: ignore
+    OptimizedVectorStoreBuilder,
+    build_full_vectorstore,
+    is_clean_data_file,
+    iter_clean_records,
+)
 
 
 def find_latest_clean_json(root: str) -> Optional[str]:
     raw_dir = os.path.join(root, "data", "raw")
     if not os.path.exists(raw_dir):
         return None
-    files = sorted(glob.glob(os.path.join(raw_dir, "clean_blog_data_*.json")))
+    files = sorted(glob.glob(os.path.join(raw_dir, "clean_blog_data_*.json*")), key=os.path.basename)
+    files = [f for f in files if is_clean_data_file(os.path.basename(f))]
     return files[-1] if files else None
 
 
 def run_clean_scrape(root: str) -> Optional[str]:
     """Temiz scraping çalıştırır ve oluşturulan dosya yolunu döner."""
-    blogs = clean_scrape_and_save()
-    if blogs is None:
-        return None
-    return find_latest_clean_json(root)
+    return clean_scrape_and_save()
 
 
 def run_sitemap_scrape(root: str) -> Optional[str]:
@@ -60,15 +75,24 @@ def run_sitemap_scrape(root: str) -> Optional[str]:
     # Kullanıcıya temiz scraper'ı önermeye devam ediyoruz, ama yine de en güncel clean dosyayı döndürmeye çalışalım
     return find_latest_clean_json(root)
 
-def run_list_scrape(root: str, list_url: str, base_url: Optional[str], max_pages: Optional[int]) -> Optional[str]:
-    """Liste URL üzerinden scraping çalıştır ve oluşan temiz JSON yolunu döndür."""
-    blogs = clean_scrape_list_and_save(list_url, base_url=base_url, max_pages=max_pages)
-    if not blogs:
-        return None
-    return find_latest_clean_json(root)
+def run_list_scrape(root: str, list_url: str, base_url: Optional[str], max_pages: Optional[int],
+                    workers: Optional[int] = None, resume: bool = True) -> Optional[str]:
+    """Liste URL üzerinden scraping çalıştır ve oluşan temiz JSONL yolunu döndür."""
+    return clean_scrape_list_and_save(list_url, base_url=base_url, max_pages=max_pages, workers=workers,
+                                      resume=resume)
+
 
+def load_removed_urls(json_path: str) -> list[str]:
+    """Incremental scraping'in "removed": true ile işaretlediği (sitemap'ten kaybolan) URL'ler."""
+    try:
+        return [x.get("url") for x in iter_clean_records(json_path)
+                if isinstance(x, dict) and x.get("removed") and x.get("url")]
+    except Exception:
+        return []
 
-def incremental_ingest(root: str, json_path: str) -> None:
+
+def incremental_ingest(root: str, json_path: str) -> bool:
+    """Temiz JSON'u mevcut FAISS'e ekler. Dönüş: FAISS kaydedildiyse (veya değişiklik yoksa) True"""
     builder = OptimizedVectorStoreBuilder()
 
     # 1) Mevcut FAISS'i yükle (yoksa oluşturacağız)
@@ -80,20 +104,34 @@ def incremental_ingest(root: str, json_path: str) -> None:
         # İlk kurulum: json'dan doğrudan process ederek oluştur
         print("⚠️ Mevcut FAISS bulunamadı. İlk kez oluşturulacak.")
         vectorstore = builder.process_clean_json_to_vectorstore(json_path)
-        return
+        return vectorstore is not None
 
-    # 2) Yeni veriyi yükle, chunk'la ve ekle
-    documents = builder.load_clean_json_data(json_path)
+    # 2) Sitemap'ten kaybolan yazıların chunk'larını sil
+    removed_urls = load_removed_urls(json_path)
+    if removed_urls:
+        removed = builder.remove_documents_by_url(vectorstore, removed_urls)
+        print(f"🗑️  Silinen {len(removed_urls)} yazının {removed} chunk'ı index'ten kaldırıldı")
+
+    # 3) Yeni/değişen veriyi yükle, chunk'la ve ekle (değişmemiş ve index'te zaten olan sayfalar atlanır)
+    documents = builder.load_clean_json_data(json_path, indexed_urls=builder.url_index(vectorstore))
     if not documents:
-        print("❌ JSON verisi yüklenemedi veya boş")
-        return
+        if removed_urls:
+            vectorstore.save_local(vs_path)
+        print("✅ Yeni veya değişen içerik yok, FAISS güncel")
+        return True
+
+    # Değişen sayfaların eski chunk'ları silinir; aynı yazı iki sürümle aranmaz
+    removed = builder.remove_documents_by_url(vectorstore, [d.metadata.get("url") for d in documents])
+    if removed:
+        print(f"🧹 Değişen sayfaların {removed} eski chunk'ı silindi")
 
     split_docs = builder.split_documents(documents)
     vectorstore.add_documents(split_docs)
 
-    # 3) Kaydet
+    # 4) Kaydet
     vectorstore.save_local(vs_path)
     print("✅ Incremental ingest tamamlandı ve mevcut FAISS kaydedildi.")
+    return True
 
 
 def main():
@@ -111,24 +149,60 @@ def main():
     parser.add_argument("--scrape-only", action="store_true", help="Sadece scraping yap ve JSON'u üret, vectorstore işlemi yapma")
     parser.add_argument("--max-pages", type=int, default=None, help="Liste sayfası için maksimum sayfa sayısı")
     parser.add_argument("--per-article", action="store_true", help="İnceleme modunda her makale için tek tek onay iste")
+    parser.add_argument("--changed-only", action="store_true",
+                        help="Sitemap lastmod'a göre yalnızca yeni/değişen yazıları çek ve incremental ekle")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Eşzamanlı makale indirme sayısı (varsayılan SCRAPER_WORKERS veya 8; 1 = sıralı)")
+    parser.add_argument("--fresh", action="store_true",
+                        help="Yarım kalan taramayı sürdürme, yeni bir JSONL dosyasıyla baştan başla")
+    parser.add_argument("--stream", action="store_true",
+                        help="Akışlı pipeline: fetch → extract → normalize → chunk → embed → index eşzamanlı aşamalarla")
+    parser.add_argument("--extract-workers", type=int, default=2, help="Akışlı pipeline: HTML ayrıştırma thread sayısı")
+    parser.add_argument("--embed-batch", type=int, default=64, help="Akışlı pipeline: embed çağrısı başına chunk sayısı")
+    parser.add_argument("--save-every", type=int, default=50,
+                        help="Akışlı pipeline: FAISS kaydı ve checkpoint aralığı (makale)")
 
     args = parser.parse_args()
     root = PROJECT_ROOT
 
+    if args.stream:
+        if args.json or args.review or args.scrape_only or args.changed_only or args.mode != "clean":
+            print("❌ --stream yalnızca clean modunda (tam/kategori/liste) ve --json, --review, --scrape-only, "
+                  "--changed-only olmadan kullanılabilir")
+            sys.exit(1)
+        report = stream_ingest(
+            os.path.join(root, "data", "vectorstore"), base_url=args.base_url, workers=args.workers,
+            list_url=args.list_url, max_pages=args.max_pages, category_url=args.category,
+            rebuild=args.rebuild, resume=not args.fresh, extract_workers=args.extract_workers,
+            embed_batch=args.embed_batch, save_every=args.save_every,
+        )
+        if report is None:
+            sys.exit(1)
+        return
+
     # 1) JSON kaynağını hazırla
     json_path: Optional[str] = args.json
+    # --changed-only: sitemap durumu ancak FAISS kaydedildikten sonra yazılır
+    sitemap_delta: Optional[dict] = None
     if json_path is None:
         if args.list_url:
             print(f"📚 Liste scraping: {args.list_url}")
-            json_path = run_list_scrape(root, args.list_url, base_url=args.base_url, max_pages=args.max_pages)
+            json_path = run_list_scrape(root, args.list_url, base_url=args.base_url, max_pages=args.max_pages,
+                                        workers=args.workers, resume=not args.fresh)
+        elif args.changed_only:
+            print("📚 Incremental (lastmod) scraping")
+            json_path, sitemap_delta = clean_scrape_changed_and_save(base_url=args.base_url, workers=args.workers)
+            if json_path is None:
+                return
+            # Delta dosyası yalnızca değişiklikleri içerir; rebuild ile kullanılamaz
+            args.incremental, args.rebuild = True, False
         elif args.category:
             print(f"📚 Kategori scraping: {args.category}")
-            blogs = clean_scrape_category_and_save(args.category, base_url=args.base_url)
-            json_path = find_latest_clean_json(root)
+            json_path = clean_scrape_category_and_save(args.category, base_url=args.base_url, workers=args.workers,
+                                                       resume=not args.fresh)
         elif args.mode == "clean":
-            # base_url desteği ile çalıştır
-            blogs = clean_scrape_and_save(base_url=args.base_url)
-            json_path = find_latest_clean_json(root)
+            # base_url desteği ile çalıştır; yarım kalan tarama varsa kaldığı yerden sürer
+            json_path = clean_scrape_and_save(base_url=args.base_url, workers=args.workers, resume=not args.fresh)
         else:
             json_path = run_sitemap_scrape(root)
 
@@ -140,6 +214,8 @@ def main():
 
     if args.scrape_only:
         print("⏹️  --scrape-only seçildi. Sadece scraping yapıldı, vectorstore işlemi yapılmayacak.")
+        if sitemap_delta is not None:
+            print("ℹ️  Sitemap durumu güncellenmedi; değişiklikler bir sonraki --changed-only çalıştırmasında yeniden gelir")
         return
 
     # 1.5) İnceleme modu: Kullanıcı onayı almadan FAISS'e ekleme
@@ -147,8 +223,7 @@ def main():
         try:
             import json as _json
             from textwrap import fill as _fill
-            with open(json_path, 'r', encoding='utf-8') as f:
-                data = _json.load(f)
+            data = list(iter_clean_records(json_path))
         except Exception as e:
             print(f"❌ JSON okunamadı: {e}")
             sys.exit(1)
@@ -202,6 +277,13 @@ def main():
             if not approved:
                 print("⏹️  Hiç bir makale onaylanmadı. İşlem durduruldu.")
                 return
+            if sitemap_delta is not None:
+                # Silinen yazı kayıtları onaydan bağımsız taşınır; onaylanmayan yazılar sitemap
+                # durumuna işlenmez ve sonraki çalıştırmada yeniden sorulur
+                kept = {x.get('url') for x in approved}
+                approved += [x for x in data if x.get('removed') and x.get('url') not in kept]
+                sitemap_delta["failed"] = list(sitemap_delta.get("failed", [])) + [
+                    x.get('url') for x in data if x.get('url') and x.get('url') not in kept and not x.get('removed')]
             # Onaylananları yeni geçici JSON'a yaz
             import tempfile, json as _json
             fd, tmp_path = tempfile.mkstemp(prefix="approved_", suffix=".json")
@@ -221,7 +303,12 @@ def main():
 
     if args.incremental:
         print("➕ Incremental ingest başlıyor...")
-        incremental_ingest(root, json_path)
+        if not incremental_ingest(root, json_path):
+            print("❌ Incremental ingest tamamlanamadı; sitemap durumu güncellenmedi")
+            sys.exit(1)
+        if sitemap_delta is not None:
+            commit_sitemap_delta(sitemap_delta)
+            print("🗺️  Sitemap durumu güncellendi")
         return
 
     # Varsayılan davranış: rebuild
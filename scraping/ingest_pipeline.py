@@ -0,0 +1,325 @@
+"""
+Akışlı ingest pipeline'ı: fetch → extract → normalize → chunk → embed (toplu) → index
+- Aşamalar sınırlı kuyruklarla bağlıdır; her aşamanın kendi thread sayısı vardır ve dolu
+  kuyruk önceki aşamayı bekletir (backpressure). Ağ (fetch) ve CPU (embed) aşamaları üst üste
+  biner; toplam süre ağ + embed toplamı yerine ~ max(ağ, embed) olur
+- Embed aşaması birden çok makalenin chunk'larını tek çağrıda işler (embed_batch chunk)
+- Index aşaması tek thread'dir (FAISS thread-safe değil): değişen makalenin eski chunk'larını
+  siler, yenilerini ekler ve her save_every makalede kaydeder. Kaydedilen makaleler JSONL
+  çıktısına ve checkpoint'e ancak o zaman yazılır; yarıda kalan ingest kaldığı yerden sürer
+- Çalışırken aşama başına canlı throughput, sonda özet rapor
+"""
+
+import os
+import json
+import time
+import queue
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+try:
+    from scraping.clean_content_scraper import CleanContentScraper
+    from scraping.crawl_output import JsonlCrawlOutput
+except ImportError:  # script olarak scraping/ içinden çalıştırıldığında
+    from clean_content_scraper import CleanContentScraper
+    from crawl_output import JsonlCrawlOutput
+
+STAGES = ("fetch", "extract", "normalize", "chunk", "embed", "index")
+
+
+class StageStats:
+    """Aşama sayaçları: işlenen/başarısız öğe, üretilen birim (örn. chunk) ve meşgul süre (thread-safe)."""
+
+    def __init__(self, name: str, workers: int, unit: str = "makale"):
+        self.name = name
+        self.workers = workers
+        self.unit = unit
+        self.done = 0
+        self.failed = 0
+        self.units = 0
+        self.busy_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, started: float, items: int = 1, ok: bool = True, units: int = 0) -> None:
+        with self._lock:
+            self.busy_seconds += time.perf_counter() - started
+            if ok:
+                self.done += items
+                self.units += units
+            else:
+                self.failed += items
+
+    def report(self, wall_seconds: float) -> Dict:
+        report = {
+            'stage': self.name,
+            'workers': self.workers,
+            'done': self.done,
+            'failed': self.failed,
+            'per_second': round(self.done / wall_seconds, 2) if wall_seconds else None,
+            'busy_seconds': round(self.busy_seconds, 1),
+            # Aşamanın thread'lerinin ne kadar süre iş yaptığı (1'e yakınsa darboğaz)
+            'utilization': round(self.busy_seconds / (wall_seconds * self.workers), 2) if wall_seconds else None,
+        }
+        if self.unit != "makale":
+            report[f'{self.unit}_per_second'] = round(self.units / wall_seconds, 1) if wall_seconds else None
+        return report
+
+
+class IngestPipeline:
+    """
+    URL listesini aşamalardan geçirip FAISS'e ekler. vectorstore None ise ilk embed
+    grubundan oluşturulur. skip_unchanged=True: HTTP önbelleğine göre değişmemiş ve index'te
+    zaten bulunan makaleler yeniden chunk'lanmaz/embed edilmez.
+    """
+
+    def __init__(self, scraper: CleanContentScraper, builder, vectorstore, output: JsonlCrawlOutput,
+                 vs_path: str, extract_workers: int = 2, embed_batch: int = 64, save_every: int = 50,
+                 report_interval: float = 5.0, skip_unchanged: bool = True):
+        self.scraper = scraper
+        self.builder = builder
+        self.vectorstore = vectorstore
+        self.output = output
+        self.vs_path = vs_path
+        self.embed_batch = max(1, embed_batch)
+        self.save_every = max(1, save_every)
+        self.report_interval = report_interval
+        self.skip_unchanged = skip_unchanged
+        self.workers = {"fetch": scraper.workers, "extract": max(1, extract_workers), "normalize": 1,
+                        "chunk": 1, "embed": 1, "index": 1}
+        units = {"chunk": "chunk", "embed": "chunk", "index": "chunk"}
+        self.stats = {name: StageStats(name, self.workers[name], units.get(name, "makale")) for name in STAGES}
+        # fetch girişi URL listesidir; sonraki kuyruklar tüketici sayısına göre sınırlı
+        self.queues: Dict[str, "queue.Queue"] = {"fetch": queue.Queue()}
+        for name in STAGES[1:]:
+            self.queues[name] = queue.Queue(maxsize=max(4, 2 * self.workers[name]))
+        self.url_index = builder.url_index(vectorstore)
+        self.failed_urls: List[str] = []
+        self.indexed = 0
+        self._pending: List[Dict] = []
+        self._lock = threading.Lock()
+
+    # --- Aşamalar: her biri öğe listesi alır, sonraki kuyruğa gidecek öğeleri döndürür ---
+
+    def _fetch(self, item: Dict) -> List[Dict]:
+        response = self.scraper.fetcher.get(item["url"])
+        response.raise_for_status()
+        item["response"] = response
+        return [item]
+
+    def _extract(self, item: Dict) -> List[Dict]:
+        item["data"] = self.scraper.extract_page(item["url"], item.pop("response"))
+        return [item]
+
+    def _normalize(self, item: Dict) -> List[Dict]:
+        data = item.pop("data")
+        if data['content'] and len(data['content']) > 200:
+            item["record"] = self.scraper.training_record(data, 0)
+            item["doc"] = self.builder.record_to_document(item["record"])
+        # Değişmemiş ve zaten index'te olan makale yalnızca checkpoint'e işlenir
+        item["skip"] = (self.skip_unchanged and bool(data.get('unchanged'))
+                        and item["url"] in self.url_index)
+        return [item]
+
+    def _chunk(self, item: Dict) -> Tuple[List[Dict], int]:
+        doc = item.pop("doc", None)
+        item["chunks"] = [] if doc is None or item["skip"] else self.builder.text_splitter.split_documents([doc])
+        return [item], len(item["chunks"])
+
+    def _embed(self, items: List[Dict]) -> Tuple[List[Dict], int]:
+        texts = [chunk.page_content for item in items for chunk in item["chunks"]]
+        vectors = self.builder.embeddings.embed_documents(texts) if texts else []
+        offset = 0
+        for item in items:
+            item["vectors"] = vectors[offset:offset + len(item["chunks"])]
+            offset += len(item["chunks"])
+        return items, len(texts)
+
+    def _index(self, item: Dict) -> Tuple[List[Dict], int]:
+        chunks = item["chunks"]
+        if item.get("record") is not None and not item["skip"]:
+            # Değişen makalenin eski chunk'ları silinir (aynı yazı iki sürümle aranmasın)
+            old_ids = self.url_index.pop(item["url"], [])
+            if old_ids and self.vectorstore is not None:
+                self.vectorstore.delete(old_ids)
+        if chunks:
+            self.vectorstore, ids = self.builder.append_embeddings(
+                self.vectorstore, [c.page_content for c in chunks], item["vectors"],
+                [c.metadata for c in chunks])
+            self.url_index[item["url"]] = list(ids)
+        item.pop("vectors", None)
+        item["chunks"] = len(chunks)
+        self._pending.append(item)
+        if len(self._pending) >= self.save_every:
+            self._flush()
+        return [], len(chunks)
+
+    def _flush(self) -> None:
+        """FAISS'i kaydeder, ardından kaydedilen makaleleri JSONL'e ve checkpoint'e yazar."""
+        if not self._pending:
+            return
+        if self.vectorstore is not None:
+            os.makedirs(self.vs_path, exist_ok=True)
+            self.vectorstore.save_local(self.vs_path)
+        for item in self._pending:
+            record = item.get("record")
+            if record is not None:
+                record["id"] = self.output.count + 1
+                self.output.write(record)
+            self.output.mark(item["url"])
+        self.indexed += len(self._pending)
+        self._pending = []
+
+    # --- Çalıştırma ---
+
+    def _take(self, inbox: "queue.Queue", batch: bool) -> Tuple[List[Dict], bool]:
+        """Bir öğe (embed için embed_batch chunk'a kadar grup) alır. Dönüş: (öğeler, bitiş sinyali)."""
+        first = inbox.get()
+        if first is None:
+            return [], True
+        items = [first]
+        if not batch:
+            return items, False
+        size = len(first["chunks"])
+        while size < self.embed_batch:
+            try:
+                # Grup dolmadıysa kısa süre bekle; üst aşama yavaşsa eldekiyle devam et
+                item = inbox.get(timeout=0.05)
+            except queue.Empty:
+                break
+            if item is None:
+                return items, True
+            items.append(item)
+            size += len(item["chunks"])
+        return items, False
+
+    def _worker(self, name: str, fn: Callable, outbox: Optional["queue.Queue"]) -> None:
+        inbox = self.queues[name]
+        stats = self.stats[name]
+        batch = name == "embed"
+        stop = False
+        while not stop:
+            items, stop = self._take(inbox, batch)
+            if not items:
+                continue
+            started = time.perf_counter()
+            try:
+                result = fn(items) if batch else fn(items[0])
+            except Exception as e:
+                stats.record(started, items=len(items), ok=False)
+                urls = [item["url"] for item in items]
+                with self._lock:
+                    self.failed_urls.extend(urls)
+                print(f"❌ {name} hatası ({', '.join(urls)}): {e}")
+                continue
+            out, units = result if isinstance(result, tuple) else (result, 0)
+            stats.record(started, items=len(items), units=units)
+            if outbox is not None:
+                for item in out:
+                    outbox.put(item)
+
+    def _monitor(self, started: float, stop: threading.Event) -> None:
+        while not stop.wait(self.report_interval):
+            wall = time.perf_counter() - started
+            parts = []
+            for name in STAGES:
+                s = self.stats[name]
+                rate = (s.units if s.unit != "makale" else s.done) / wall
+                parts.append(f"{name} {s.done} ({rate:.1f} {s.unit}/sn)")
+            depths = "/".join(str(self.queues[name].qsize()) for name in STAGES[1:])
+            print(f"📊 {wall:.0f} sn | " + " | ".join(parts) + f" | kuyruk {depths}")
+
+    def run(self, urls: List[str]) -> Dict:
+        pending = [url for url in urls if not self.output.is_done(url)]
+        if len(pending) < len(urls):
+            print(f"♻️  {len(urls) - len(pending)} URL önceki çalıştırmada işlenmiş, atlanıyor")
+        print(f"🚀 Akışlı ingest: {len(pending)} makale | " +
+              ", ".join(f"{name}={self.workers[name]}" for name in STAGES) + f" | embed grubu {self.embed_batch} chunk")
+
+        functions = {"fetch": self._fetch, "extract": self._extract, "normalize": self._normalize,
+                     "chunk": self._chunk, "embed": self._embed, "index": self._index}
+        started = time.perf_counter()
+        for url in pending:
+            self.queues["fetch"].put({"url": url})
+        threads: Dict[str, List[threading.Thread]] = {}
+        for position, name in enumerate(STAGES):
+            outbox = self.queues[STAGES[position + 1]] if position + 1 < len(STAGES) else None
+            threads[name] = [threading.Thread(target=self._worker, args=(name, functions[name], outbox),
+                                              name=f"ingest-{name}-{i}", daemon=True)
+                             for i in range(self.workers[name])]
+            for t in threads[name]:
+                t.start()
+        stop_monitor = threading.Event()
+        monitor = threading.Thread(target=self._monitor, args=(started, stop_monitor), daemon=True)
+        monitor.start()
+        try:
+            # Her aşama bitince sonrakine bitiş sinyali gönderilir
+            for name in STAGES:
+                for _ in threads[name]:
+                    self.queues[name].put(None)
+                for t in threads[name]:
+                    t.join()
+            self._flush()
+        finally:
+            stop_monitor.set()
+
+        wall = time.perf_counter() - started
+        fetch, embed = self.stats["fetch"], self.stats["embed"]
+        report = {
+            "articles": len(pending),
+            "indexed": self.indexed,
+            "failed": len(self.failed_urls),
+            "wall_seconds": round(wall, 1),
+            # Aşamalar sırayla çalışsaydı: ağ süresi (fetch thread'lerine bölünmüş) + embed süresi
+            "network_seconds": round(fetch.busy_seconds / fetch.workers, 1),
+            "embed_seconds": round(embed.busy_seconds, 1),
+            "stages": [self.stats[name].report(wall) for name in STAGES],
+        }
+        print(f"\n⏱️  {report['indexed']} makale {report['wall_seconds']} sn'de indekslendi "
+              f"(ağ ~{report['network_seconds']} sn, embed ~{report['embed_seconds']} sn)")
+        print(json.dumps(report["stages"], ensure_ascii=False, indent=2))
+        return report
+
+
+def stream_ingest(vs_path: str, base_url: Optional[str] = None, workers: Optional[int] = None,
+                  list_url: Optional[str] = None, max_pages: Optional[int] = None,
+                  category_url: Optional[str] = None, rebuild: bool = False, resume: bool = True,
+                  extract_workers: int = 2, embed_batch: int = 64, save_every: int = 50,
+                  builder=None) -> Optional[Dict]:
+    """
+    Scraping'i doğrudan FAISS'e akıtır (ara JSON dosyasını bekleyip yeniden okumadan).
+    rebuild=True boş index'le başlar (yarım kalan rebuild sürdürülürken kayıtlı index kullanılır).
+    Makaleler yine data/raw/clean_blog_data_<zaman>.jsonl dosyasına yazılır.
+    """
+    scraper = CleanContentScraper(base_url=base_url, workers=workers)
+    if list_url:
+        source, urls = f"stream-list:{list_url}", scraper.get_list_blog_urls(list_url, max_pages=max_pages)
+    elif category_url:
+        source, urls = f"stream-category:{category_url}", scraper.get_category_blog_urls(category_url)
+    else:
+        source, urls = f"stream-all:{scraper.base_url}", scraper.get_all_blog_urls()
+    if not urls:
+        print("❌ İşlenecek makale URL'si bulunamadı!")
+        return None
+
+    if builder is None:
+        from vectorstore.build_store import OptimizedVectorStoreBuilder
+        builder = OptimizedVectorStoreBuilder()
+    output = scraper.open_output(f"{source}:{'rebuild' if rebuild else 'incremental'}", resume=resume)
+    vectorstore = None
+    if not rebuild or output.resumed:
+        vectorstore = builder.load_vectorstore(vs_path)
+
+    pipeline = IngestPipeline(scraper, builder, vectorstore, output, vs_path, extract_workers=extract_workers,
+                              embed_batch=embed_batch, save_every=save_every)
+    complete = False
+    try:
+        report = pipeline.run(urls)
+        complete = not pipeline.failed_urls
+    finally:
+        output.close(complete=complete)
+    if not complete:
+        print(f"⚠️  {len(pipeline.failed_urls)} URL başarısız; aynı komutu tekrar çalıştırınca yalnızca kalanlar denenir")
+    elif output.count == 0 and os.path.exists(output.path):
+        os.remove(output.path)
+    report["output"] = output.path if os.path.exists(output.path) else None
+    return report
@@ -0,0 +1,134 @@
+"""
+Liste sayfalarının altındaki sayfalama / AJAX uç noktasını bulup doğrudan HTTP ile çeker
+- Sıradaki sayfa: <link rel="next">, rel=next / .next bağlantıları, WordPress "önceki yazılar" linki
+- "Daha fazla yükle" düğmelerindeki data-url / data-href / data-next ... öznitelikleri (AJAX uç noktası)
+- URL'de sayfa numarası varsa (/page/N/, ?page=N, ?paged=N ...) bir artırılarak devam edilir
+- JSON yanıtlarında HTML parçaları ve URL'ler ayrıştırılıp aynı link çıkarıcıya verilir
+Tarayıcı gerektirmeden sonsuz kaydırma/"Load More" listelerinin tamamı sayfa sayfa çekilebilir.
+"""
+
+import re
+import json
+from typing import Callable, Iterator, Optional, Set, Tuple
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+
+# Sayfa numarası taşıyan URL kalıpları; ?p=123 (WordPress yazı kimliği) bilerek dışarıda
+PAGE_PATTERNS = [
+    re.compile(r"(/page/)(\d+)(/?)(?=$|[?#])"),
+    re.compile(r"([?&](?:page|paged|pg|pagenum|sayfa)=)(\d+)()"),
+]
+NEXT_SELECTORS = [
+    'link[rel~="next"]',
+    'a[rel~="next"]',
+    'a.next',
+    '.next a',
+    '.nav-previous a',
+]
+LOAD_MORE_SELECTORS = [
+    '[class*="load-more"]',
+    '[class*="loadmore"]',
+    '[class*="infinite"]',
+    '[id*="load-more"]',
+    '[id*="loadmore"]',
+]
+LOAD_MORE_TEXTS = ("load more", "daha fazla", "devamı")
+ENDPOINT_ATTRIBUTES = ("data-url", "data-href", "data-next", "data-next-url", "data-ajax-url",
+                       "data-endpoint", "href")
+
+
+def next_page_url(url: str) -> Optional[str]:
+    """URL'deki sayfa numarasını bir artırır; numara yoksa None."""
+    for pattern in PAGE_PATTERNS:
+        match = pattern.search(url)
+        if match:
+            number = int(match.group(2)) + 1
+            return url[:match.start()] + f"{match.group(1)}{number}{match.group(3)}" + url[match.end():]
+    return None
+
+
+def _usable(href: Optional[str]) -> bool:
+    return bool(href) and not href.startswith(("#", "javascript:", "mailto:"))
+
+
+def find_next_link(soup: BeautifulSoup, page_url: str) -> Optional[str]:
+    for selector in NEXT_SELECTORS:
+        element = soup.select_one(selector)
+        if element is not None and _usable(element.get("href")):
+            return urljoin(page_url, element["href"])
+    return None
+
+
+def find_ajax_endpoint(soup: BeautifulSoup, page_url: str) -> Optional[str]:
+    """'Daha fazla yükle' düğmesinin çağırdığı uç nokta (öznitelikte açıkça yazılıysa)."""
+    candidates = [element for selector in LOAD_MORE_SELECTORS for element in soup.select(selector)]
+    candidates += [element for element in soup.find_all(["button", "a"])
+                   if element.get_text(" ", strip=True).lower().startswith(LOAD_MORE_TEXTS)]
+    for element in candidates:
+        for attribute in ENDPOINT_ATTRIBUTES:
+            value = element.get(attribute)
+            if _usable(value):
+                return urljoin(page_url, value)
+    return None
+
+
+def detect_endpoint(soup: BeautifulSoup, page_url: str) -> Optional[str]:
+    """Statik HTML'den sıradaki sayfanın URL'i: önce sayfalama linki, sonra AJAX uç noktası."""
+    return find_next_link(soup, page_url) or find_ajax_endpoint(soup, page_url)
+
+
+def _json_fragments(value) -> Iterator[str]:
+    if isinstance(value, str):
+        if value.startswith(("http://", "https://")):
+            yield f'<a href="{value}"></a>'
+        elif "<" in value:
+            yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _json_fragments(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _json_fragments(item)
+
+
+def response_soup(response) -> BeautifulSoup:
+    """HTML yanıtı olduğu gibi; JSON yanıtındaki HTML parçaları ve URL'ler tek belge olarak."""
+    content_type = response.headers.get("Content-Type", "")
+    text = response.text
+    if "json" in content_type or text.lstrip()[:1] in ("{", "["):
+        try:
+            text = "\n".join(_json_fragments(json.loads(text)))
+        except ValueError:
+            pass
+    return BeautifulSoup(text, "html.parser")
+
+
+def paginate(fetcher, start_url: str, extract_links: Callable[[BeautifulSoup, str], Set[str]],
+             first_soup: Optional[BeautifulSoup] = None, max_pages: int = 50) -> Tuple[Set[str], int]:
+    """
+    start_url'den başlayıp sayfa sayfa ilerler; extract_links(soup, sayfa_url) her sayfanın linklerini verir.
+    Yeni link getirmeyen sayfada, 4xx/5xx yanıtta veya max_pages'te durur. Dönüş: (linkler, okunan sayfa)
+    """
+    links: Set[str] = set()
+    visited: Set[str] = set()
+    url: Optional[str] = start_url
+    soup = first_soup
+    pages = 0
+    while url and pages < max_pages:
+        visited.add(url)
+        if soup is None:
+            response = fetcher.get(url)
+            if response.status_code >= 400:
+                break
+            soup = response_soup(response)
+        new_links = extract_links(soup, url) - links
+        if pages and not new_links:
+            break
+        links.update(new_links)
+        pages += 1
+        # Açık sayfalama linki > URL'deki numara > AJAX düğmesi; aynı sayfaya geri dönülmez
+        candidates = (find_next_link(soup, url), next_page_url(url), find_ajax_endpoint(soup, url))
+        url = next((candidate for candidate in candidates if candidate and candidate not in visited), None)
+        soup = None
+    return links, pages
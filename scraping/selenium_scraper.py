@@ -1,112 +1,146 @@
 """
 Selenium tabanlı gelişmiş web scraper
 Dinamik içerik ve AJAX yüklenen blog yazılarını çeker
+- Liste sayfaları tarayıcı havuzunda paralel işlenir (browser_pool.py); sabit bekleme yerine
+  DOM değişimi / ağ sessizliği beklenir
+- Sayfalama veya AJAX uç noktası bulunabiliyorsa (statik HTML'de ya da tarayıcının yaptığı
+  XHR isteklerinde) liste doğrudan HTTP ile çekilir (pagination.py)
+- Bulunan yazılar paylaşımlı fetcher ile eşzamanlı indirilir
 """
 
-import time
 import json
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import List, Set
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
-from webdriver_manager.chrome import ChromeDriverManager
+from typing import List, Optional, Set
+from urllib.parse import urljoin
 from bs4 import BeautifulSoup
-from langchain_community.document_loaders import WebBaseLoader
+from langchain.schema import Document
+
+try:
+    from scraping.browser_pool import (DriverPool, ajax_requests, create_driver_pool, install_network_hook,
+                                       page_signature, wait_for_dom_change, wait_for_network_idle)
+    from scraping.fetcher import Fetcher, crawl, create_fetcher
+    from scraping.pagination import detect_endpoint, next_page_url, paginate
+except ImportError:  # script olarak scraping/ içinden çalıştırıldığında
+    from browser_pool import (DriverPool, ajax_requests, create_driver_pool, install_network_hook,
+                              page_signature, wait_for_dom_change, wait_for_network_idle)
+    from fetcher import Fetcher, crawl, create_fetcher
+    from pagination import detect_endpoint, next_page_url, paginate
 
 BASE_URL = "https://oktayozdemir.com.tr/"
+LOAD_MORE_XPATH = ("//button[contains(text(), 'Load More') or contains(text(), 'Daha Fazla') "
+                   "or contains(text(), 'Devamı')]")
 
 class AdvancedScraper:
-    def __init__(self, headless=True):
+    def __init__(self, headless=True, base_url: Optional[str] = None, pool: Optional[DriverPool] = None,
+                 fetcher: Optional[Fetcher] = None, workers: Optional[int] = None):
         """
         Gelişmiş scraper sınıfı
+        pool: tarayıcı havuzu (verilmezse SELENIUM_DRIVERS / SELENIUM_HEADLESS ile oluşturulur)
+        fetcher: HTTP yolu ve yazı indirme için paylaşımlı oturum
+        Ayarlar: SELENIUM_WAIT_TIMEOUT (DOM/ağ bekleme üst sınırı, sn, varsayılan 10),
+        SELENIUM_HTTP_FALLBACK=0 (uç nokta bulunsa da her listeyi tarayıcıyla aç),
+        SELENIUM_MAX_PAGES (HTTP yolunda liste başına en fazla sayfa, varsayılan 50)
         """
         self.headless = headless
-        self.driver = None
+        self.base_url = (base_url or os.getenv("SCRAPER_BASE_URL") or BASE_URL).rstrip('/') + '/'
+        self.pool = pool
+        self.fetcher = fetcher or create_fetcher()
+        self.workers = max(1, workers or int(os.getenv("SCRAPER_WORKERS", "8")))
+        self.wait_timeout = float(os.getenv("SELENIUM_WAIT_TIMEOUT", "10"))
+        self.http_fallback = os.getenv("SELENIUM_HTTP_FALLBACK", "1") != "0"
+        self.max_pages = int(os.getenv("SELENIUM_MAX_PAGES", "50"))
         self.blog_links = set()
-        
-    def setup_driver(self):
+
+    def load_listing(self, url: str, max_scrolls: int = 10) -> Set[str]:
         """
-        Chrome WebDriver'ı kur
+        Bir liste sayfasındaki tüm blog linkleri. Önce statik HTML'de sayfalama/AJAX uç noktası
+        aranır (bulunursa tarayıcı açılmaz); yoksa havuzdan bir tarayıcıyla kaydırılır.
         """
-        chrome_options = Options()
-        if self.headless:
-            chrome_options.add_argument("--headless")
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--disable-gpu")
-        chrome_options.add_argument("--window-size=1920,1080")
-        
-        # User agent ekle
-        chrome_options.add_argument("--user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
-        
-        service = Service(ChromeDriverManager().install())
-        self.driver = webdriver.Chrome(service=service, options=chrome_options)
-        print("✅ Chrome WebDriver başlatıldı")
-    
-    def scroll_and_load_more(self, url: str, max_scrolls: int = 10) -> Set[str]:
+        first_soup = None
+        if self.http_fallback:
+            try:
+                response = self.fetcher.get(url)
+                response.raise_for_status()
+                first_soup = BeautifulSoup(response.text, 'html.parser')
+                endpoint = detect_endpoint(first_soup, url)
+                if endpoint:
+                    print(f"⚡ Sayfalama uç noktası bulundu, HTTP ile çekiliyor: {endpoint}")
+                    links, pages = paginate(self.fetcher, url, self.extract_blog_links,
+                                            first_soup=first_soup, max_pages=self.max_pages)
+                    print(f"✅ {url}: {pages} sayfada {len(links)} benzersiz blog linki bulundu")
+                    return links
+            except Exception as e:
+                print(f"⚠️ HTTP liste denemesi başarısız ({url}): {e}")
+
+        if self.pool is None:
+            self.pool = create_driver_pool(self.headless)
+        if self.pool is None:
+            print("⚠️ Selenium kurulu değil; yalnızca statik HTML'deki linkler kullanılıyor")
+            return self.extract_blog_links(first_soup, url) if first_soup is not None else set()
+        with self.pool.driver() as driver:
+            return self.scroll_and_load_more(url, max_scrolls, driver)
+
+    def scroll_and_load_more(self, url: str, max_scrolls: int = 10, driver=None) -> Set[str]:
         """
-        Sayfayı aşağı kaydırarak dinamik içerik yükler
+        Sayfayı aşağı kaydırarak dinamik içerik yükler. Her adımda yeni içerik (DOM değişimi)
+        ve ağ sessizliği beklenir; sayfa numaralı bir XHR görülürse kalan sayfalar HTTP ile çekilir.
         """
+        if driver is None:
+            if self.pool is None:
+                self.pool = create_driver_pool(self.headless)
+            with self.pool.driver() as pooled:
+                return self.scroll_and_load_more(url, max_scrolls, pooled)
+
         print(f"🔄 Dinamik içerik yükleniyor: {url}")
-        self.driver.get(url)
-        
-        # Sayfa yüklenene kadar bekle
-        WebDriverWait(self.driver, 10).until(
-            EC.presence_of_element_located((By.TAG_NAME, "body"))
-        )
-        
-        found_links = set()
-        scroll_count = 0
-        last_height = self.driver.execute_script("return document.body.scrollHeight")
-        
-        while scroll_count < max_scrolls:
-            # Mevcut linkleri topla
-            soup = BeautifulSoup(self.driver.page_source, 'html.parser')
-            page_links = self.extract_blog_links(soup)
-            
-            new_links = page_links - found_links
-            if new_links:
-                found_links.update(new_links)
-                print(f"📄 Scroll {scroll_count + 1}: {len(new_links)} yeni link bulundu (Toplam: {len(found_links)})")
-            
-            # Sayfayı aşağı kaydır
-            self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            
+        driver.get(url)
+        install_network_hook(driver)
+        wait_for_network_idle(driver, self.wait_timeout)
+
+        found_links = self.extract_blog_links(BeautifulSoup(driver.page_source, 'html.parser'), url)
+        print(f"📄 İlk yükleme: {len(found_links)} link bulundu")
+        seen_requests = set(ajax_requests(driver))
+
+        for scroll_count in range(max_scrolls):
+            before = page_signature(driver)
+            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+
             # "Load More" butonu varsa tıkla
-            try:
-                load_more_btn = self.driver.find_element(By.XPATH, 
-                    "//button[contains(text(), 'Load More') or contains(text(), 'Daha Fazla') or contains(text(), 'Devamı')]")
+            for load_more_btn in driver.find_elements("xpath", LOAD_MORE_XPATH):
                 if load_more_btn.is_displayed():
-                    load_more_btn.click()
+                    driver.execute_script("arguments[0].click();", load_more_btn)
                     print("🔄 'Load More' butonuna tıklandı")
-                    time.sleep(2)
-            except NoSuchElementException:
-                pass
-            
-            # Yeni içerik yüklenene kadar bekle
-            time.sleep(3)
-            
-            # Sayfa boyutu değişti mi kontrol et
-            new_height = self.driver.execute_script("return document.body.scrollHeight")
-            if new_height == last_height:
+                    break
+
+            # Yeni içerik gelene, ardından istekler bitene kadar bekle
+            if not wait_for_dom_change(driver, before, self.wait_timeout):
                 print("🔄 Daha fazla içerik yüklenemedi")
                 break
-                
-            last_height = new_height
-            scroll_count += 1
-        
+            wait_for_network_idle(driver, self.wait_timeout)
+
+            soup = BeautifulSoup(driver.page_source, 'html.parser')
+            new_links = self.extract_blog_links(soup, url) - found_links
+            if new_links:
+                found_links.update(new_links)
+                print(f"📄 Scroll {scroll_count + 1}: {len(new_links)} yeni link bulundu (Toplam: {len(found_links)})")
+
+            if self.http_fallback:
+                requests_made = ajax_requests(driver)
+                paged = [r for r in requests_made if r not in seen_requests and next_page_url(r)]
+                seen_requests.update(requests_made)
+                if paged:
+                    print(f"⚡ AJAX sayfalama uç noktası bulundu, HTTP ile devam ediliyor: {paged[-1]}")
+                    links, _ = paginate(self.fetcher, paged[-1], self.extract_blog_links, max_pages=self.max_pages)
+                    found_links.update(links)
+                    break
+
         print(f"✅ Toplam {len(found_links)} benzersiz blog linki bulundu")
         return found_links
     
-    def extract_blog_links(self, soup: BeautifulSoup) -> Set[str]:
+    def extract_blog_links(self, soup: BeautifulSoup, page_url: Optional[str] = None) -> Set[str]:
         """
-        BeautifulSoup ile blog linklerini çıkar
+        BeautifulSoup ile blog linklerini çıkar (göreli linkler page_url'e göre çözülür)
         """
         links = set()
         
@@ -125,13 +159,12 @@ class AdvancedScraper:
             for element in elements:
                 href = element.get('href')
                 if href and '/blog/' in href and href not in ['/blog/', '/category/blog/']:
-                    full_url = href if href.startswith('http') else BASE_URL + href.lstrip('/')
+                    full_url = urljoin(page_url or self.base_url, href)
                     # Gerçek blog yazısı linklerini filtrele
                     if self.is_valid_blog_link(full_url):
                         links.add(full_url)
         
         return links
-    
     def is_valid_blog_link(self, url: str) -> bool:
         """
         Geçerli blog yazısı linki mi kontrol et
@@ -151,43 +184,72 @@ class AdvancedScraper:
         for pattern in invalid_patterns:
             if url.endswith(pattern) or pattern in url.split('/')[-1]:
                 return False
+        # Sayfalama linkleri (/blog/page/3/) HTTP yolunda listeye karışmasın
+        if '/page/' in url:
+            return False
         
         # Blog yazısı gibi görünüyor mu?
         return len(url.split('/')) >= 5 and '/blog/' in url
     
-    def get_all_blog_links(self) -> List[str]:
+    def get_all_blog_links(self, listing_urls: Optional[List[str]] = None) -> List[str]:
         """
-        Tüm blog linklerini topla
+        Tüm blog linklerini topla (liste sayfaları havuz boyutu kadar paralel işlenir)
         """
+        listing_urls = listing_urls or [self.base_url + "blog/", self.base_url + "category/blog/"]
+        # Havuz thread'lerden önce kurulur; tarayıcılar yalnızca uç noktası bulunamayan listeler için açılır
+        if self.pool is None:
+            self.pool = create_driver_pool(self.headless)
+        workers = min(len(listing_urls), self.pool.size if self.pool else self.workers)
+
+        def load(url: str) -> Set[str]:
+            try:
+                return self.load_listing(url)
+            except Exception as e:
+                print(f"❌ Selenium scraping hatası ({url}): {e}")
+                return set()
+
         try:
-            self.setup_driver()
-            
-            # Ana blog sayfası
-            blog_url = BASE_URL + "blog/"
-            links_from_blog = self.scroll_and_load_more(blog_url)
-            
-            # Category sayfası
-            category_url = BASE_URL + "category/blog/"
-            links_from_category = self.scroll_and_load_more(category_url)
-            
-            # Tüm linkleri birleştir
-            all_links = links_from_blog.union(links_from_category)
-            
+            with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="listing") as executor:
+                all_links = set().union(*executor.map(load, listing_urls))
+            self.blog_links = all_links
             print(f"🎯 Toplam {len(all_links)} benzersiz blog yazısı bulundu!")
-            return list(all_links)
-            
-        except Exception as e:
-            print(f"❌ Selenium scraping hatası: {e}")
-            return []
-        
+            return sorted(all_links)
         finally:
-            if self.driver:
-                self.driver.quit()
-                print("🔒 WebDriver kapatıldı")
-    
+            if self.pool is not None:
+                self.pool.close()
+
+    def load_documents(self, urls: List[str]) -> List[Document]:
+        """
+        URL'leri paylaşımlı fetcher ile eşzamanlı indirir; WebBaseLoader ile aynı içerik
+        (sayfa metni) ve metadata'yı (source, title, description, language) üretir.
+        """
+        def fetch(url: str) -> Optional[Document]:
+            try:
+                response = self.fetcher.get(url)
+                response.raise_for_status()
+            except Exception as e:
+                print(f"❌ İndirme hatası ({url}): {e}")
+                return None
+            # WebBaseLoader gibi (autoset_encoding): charset bildirilmese de Türkçe karakterler bozulmasın
+            response.encoding = response.apparent_encoding
+            soup = BeautifulSoup(response.text, 'html.parser')
+            metadata = {"source": url}
+            if title := soup.find("title"):
+                metadata["title"] = title.get_text()
+            if description := soup.find("meta", attrs={"name": "description"}):
+                metadata["description"] = description.get("content", "No description found.")
+            if html := soup.find("html"):
+                metadata["language"] = html.get("lang", "No language found.")
+            return Document(page_content=soup.get_text(), metadata=metadata)
+
+        docs, report = crawl(urls, fetch, workers=self.workers)
+        print(f"⚡ {report['pages']} sayfa {report['seconds']} sn'de çekildi "
+              f"({report['pages_per_second']} sayfa/sn, {self.workers} worker)")
+        return [doc for doc in docs if doc is not None]
+
     def load_website_docs_advanced(self) -> List:
         """
-        Selenium ile bulunan tüm linkleri WebBaseLoader ile yükle
+        Selenium/HTTP ile bulunan tüm linkleri eşzamanlı yükle
         """
         print("🚀 Gelişmiş scraping başlıyor...")
         
@@ -199,19 +261,12 @@ class AdvancedScraper:
             return []
         
         # Ana sayfa + tüm blog yazıları
-        all_urls = [BASE_URL] + blog_links
+        all_urls = [self.base_url] + blog_links
         
         print(f"📥 {len(all_urls)} URL yükleniyor...")
-        
-        try:
-            loader = WebBaseLoader(all_urls)
-            docs = loader.load()
-            print(f"✅ {len(docs)} doküman başarıyla yüklendi!")
-            return docs
-            
-        except Exception as e:
-            print(f"❌ WebBaseLoader hatası: {e}")
-            return []
+        docs = self.load_documents(all_urls)
+        print(f"✅ {len(docs)} doküman başarıyla yüklendi!")
+        return docs
     
     def save_advanced_data(self, docs, filename: str = None):
         """
@@ -312,12 +367,10 @@ def test_with_sample_content():
             return
         
         # İlk 3 blog yazısının içeriğini yükle
-        test_urls = [BASE_URL] + blog_links[:3]
+        test_urls = [scraper.base_url] + blog_links[:3]
         print(f"📥 Test için {len(test_urls)} URL yükleniyor...")
         
-        from langchain_community.document_loaders import WebBaseLoader
-        loader = WebBaseLoader(test_urls)
-        docs = loader.load()
+        docs = scraper.load_documents(test_urls)
         
         print(f"✅ {len(docs)} doküman yüklendi\n")
         
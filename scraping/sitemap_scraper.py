@@ -3,22 +3,30 @@ Sitemap tabanlı web scraper
 En güvenilir yöntem - sitemap.xml dosyalarından blog linklerini çeker
 """
 
-import requests
-import xml.etree.ElementTree as ET
 import json
 import os
 from datetime import datetime
-from typing import List
+from typing import Dict, List
 from langchain_community.document_loaders import WebBaseLoader
 
+try:
+    from scraping.fetcher import Fetcher, create_fetcher
+    from scraping.sitemap_state import SitemapState, changed_urls, iter_sitemap, summarize
+except ImportError:  # script olarak scraping/ içinden çalıştırıldığında
+    from fetcher import Fetcher, create_fetcher
+    from sitemap_state import SitemapState, changed_urls, iter_sitemap, summarize
+
 BASE_URL = "https://oktayozdemir.com.tr/"
 
 class SitemapScraper:
-    def __init__(self):
+    def __init__(self, fetcher: Fetcher | None = None):
         """
         Sitemap tabanlı scraper sınıfı
+        fetcher: paylaşımlı HTTP oturumu (koşullu istek önbelleği dahil)
         """
         self.blog_urls = []
+        self.removed_urls: List[str] = []
+        self.fetcher = fetcher or create_fetcher()
         
     def get_sitemap_urls(self) -> List[str]:
         """
@@ -26,17 +34,10 @@ class SitemapScraper:
         """
         try:
             print("🔍 Sitemap index kontrol ediliyor...")
-            response = requests.get(BASE_URL + "sitemap_index.xml")
+            response = self.fetcher.get(BASE_URL + "sitemap_index.xml")
             response.raise_for_status()
             
-            root = ET.fromstring(response.text)
-            namespaces = {'sitemap': 'http://www.sitemaps.org/schemas/sitemap/0.9'}
-            
-            sitemap_urls = []
-            for sitemap_elem in root.findall('.//sitemap:sitemap', namespaces):
-                loc = sitemap_elem.find('sitemap:loc', namespaces)
-                if loc is not None:
-                    sitemap_urls.append(loc.text)
+            sitemap_urls = [loc for kind, loc, _ in iter_sitemap(response.content) if kind == 'sitemap']
             
             print(f"✅ {len(sitemap_urls)} alt sitemap bulundu")
             return sitemap_urls
@@ -50,19 +51,11 @@ class SitemapScraper:
         Tek bir sitemap'ten blog URL'lerini çıkar
         """
         try:
-            response = requests.get(sitemap_url)
+            response = self.fetcher.get(sitemap_url)
             response.raise_for_status()
             
-            root = ET.fromstring(response.text)
-            namespaces = {'sitemap': 'http://www.sitemaps.org/schemas/sitemap/0.9'}
-            
-            blog_urls = []
-            for url_elem in root.findall('.//sitemap:url', namespaces):
-                loc = url_elem.find('sitemap:loc', namespaces)
-                if loc is not None and '/blog/' in loc.text:
-                    blog_urls.append(loc.text)
-            
-            return blog_urls
+            # Akış halinde ayrıştırma: büyük sitemap'lerde ağaç bellekte tutulmaz
+            return [loc for kind, loc, _ in iter_sitemap(response.content) if kind == 'url' and '/blog/' in loc]
             
         except Exception as e:
             print(f"❌ Sitemap işleme hatası ({sitemap_url}): {e}")
@@ -94,29 +87,54 @@ class SitemapScraper:
         
         return unique_urls
     
-    def load_website_docs(self) -> List:
+    def get_changed_blog_urls(self, state: SitemapState) -> Dict:
+        """
+        lastmod'a göre önceki çalıştırmadan beri yeni/değişen blog URL'leri ve kaybolan URL'ler.
+        Dönüş: SitemapState.diff sonucu (new, modified, removed, ...)
+        """
+        delta = state.diff(self.fetcher, BASE_URL + "sitemap_index.xml", url_filter=lambda u: '/blog/' in u)
+        print(f"🗺️  {summarize(delta)}")
+        return delta
+
+    def load_website_docs(self, incremental: bool = False, state_path: str | None = None) -> List:
         """
         Sitemap'ten alınan URL'leri WebBaseLoader ile yükle
+        incremental=True: yalnızca lastmod'u değişen/yeni URL'ler yüklenir; sitemap'ten
+        kaybolanlar self.removed_urls'e yazılır
         """
         print("🚀 Sitemap tabanlı scraping başlıyor...")
         
-        # Blog URL'lerini al
-        blog_urls = self.get_all_blog_urls()
-        
-        if not blog_urls:
-            print("❌ Blog URL'si bulunamadı!")
-            return []
-        
-        # Ana sayfa + tüm blog yazıları
-        all_urls = [BASE_URL] + blog_urls
+        if incremental:
+            state = SitemapState(state_path)
+            delta = self.get_changed_blog_urls(state)
+            self.removed_urls = delta["removed"]
+            all_urls = changed_urls(delta)
+            if not all_urls:
+                state.commit(delta)
+                print("✅ Değişen blog yazısı yok")
+                return []
+        else:
+            state = delta = None
+            # Blog URL'lerini al
+            blog_urls = self.get_all_blog_urls()
+            
+            if not blog_urls:
+                print("❌ Blog URL'si bulunamadı!")
+                return []
+            
+            # Ana sayfa + tüm blog yazıları
+            all_urls = [BASE_URL] + blog_urls
         
         print(f"📥 {len(all_urls)} URL yükleniyor...")
         print("⏳ Bu işlem birkaç dakika sürebilir...")
         
         try:
-            loader = WebBaseLoader(all_urls)
+            # Aynı oturum: sayfalar da koşullu istekle (ETag/Last-Modified) çekilir
+            loader = WebBaseLoader(all_urls, session=self.fetcher.session)
             docs = loader.load()
             print(f"✅ {len(docs)} doküman başarıyla yüklendi!")
+            if state is not None:
+                state.commit(delta)
             return docs
             
         except Exception as e:
@@ -139,10 +157,23 @@ class SitemapScraper:
         
         # Dokümanları JSON formatına dönüştür
         data_to_save = []
+        cache = self.fetcher.cache
         for doc in docs:
+            source = doc.metadata.get("source", "")
             data_to_save.append({
                 "content": doc.page_content,
                 "metadata": doc.metadata,
+                "unchanged": bool(cache is not None and cache.is_unchanged(source)),
+                "scraped_at": datetime.now().isoformat(),
+                "scraper_type": "sitemap_based"
+            })
+        
+        # Incremental taramada sitemap'ten kaybolan sayfalar içeriksiz kayıt olarak işaretlenir
+        for url in self.removed_urls:
+            data_to_save.append({
+                "content": "",
+                "metadata": {"source": url},
+                "removed": True,
                 "scraped_at": datetime.now().isoformat(),
                 "scraper_type": "sitemap_based"
             })
@@ -0,0 +1,170 @@
+"""
+lastmod tabanlı incremental sitemap taraması
+- Sitemap'ler akış halinde ayrıştırılır (iterparse + elem.clear; .xml.gz desteklenir)
+- URL başına son görülen lastmod kalıcı olarak saklanır (data/cache/sitemap_state.json)
+- diff(): yalnızca yeni/değişen URL'leri ve sitemap'ten kaybolan URL'leri döndürür;
+  lastmod'u değişmeyen alt sitemap'ler hiç indirilmez (günlük yenileme ~ değişiklik sayısı kadar)
+- commit(): başarıyla işlenen URL'ler durumuna yazılır; başarısızlar bir sonraki çalıştırmada yeniden gelir.
+  Çağıran taraf commit'i yalnızca index kaydedildikten sonra yapar (scrape-only/başarısız ingest durumu ilerletmez)
+"""
+
+import io
+import os
+import gzip
+import json
+import time
+import xml.etree.ElementTree as ET
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+DEFAULT_STATE_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "cache", "sitemap_state.json")
+_NS = "{http://www.sitemaps.org/schemas/sitemap/0.9}"
+
+
+def _tag(elem) -> Optional[str]:
+    """Sitemap ad alanındaki (veya ad alansız) etiket adı; image:loc gibi diğerleri None."""
+    if elem.tag.startswith(_NS):
+        return elem.tag[len(_NS):]
+    return elem.tag if "}" not in elem.tag else None
+
+
+def iter_sitemap(content: bytes) -> Iterator[Tuple[str, str, Optional[str]]]:
+    """
+    Sitemap/sitemap index gövdesini akış halinde ayrıştırır.
+    Üretir: (tür, loc, lastmod) — tür "url" (urlset) veya "sitemap" (sitemap index)
+    """
+    if content[:2] == b"\x1f\x8b":
+        content = gzip.decompress(content)
+    loc: Optional[str] = None
+    lastmod: Optional[str] = None
+    for _, elem in ET.iterparse(io.BytesIO(content), events=("end",)):
+        tag = _tag(elem)
+        if tag == "loc":
+            loc = (elem.text or "").strip()
+        elif tag == "lastmod":
+            lastmod = (elem.text or "").strip() or None
+        elif tag in ("url", "sitemap"):
+            if loc:
+                yield tag, loc, lastmod
+            loc = lastmod = None
+            elem.clear()
+
+
+class SitemapState:
+    """
+    Kalıcı tarama durumu: {"sitemaps": {sitemap_url: lastmod},
+    "urls": {url: {"lastmod", "sitemap"}}}. Yazımlar atomiktir.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = os.path.abspath(path or DEFAULT_STATE_PATH)
+        self.sitemaps: Dict[str, Optional[str]] = {}
+        self.urls: Dict[str, Dict] = {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.sitemaps = data.get("sitemaps", {})
+            self.urls = data.get("urls", {})
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"⚠️ Sitemap durumu okunamadı, tam tarama yapılacak: {e}")
+
+    def save(self) -> None:
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"sitemaps": self.sitemaps, "urls": self.urls, "updated_at": time.time()},
+                      f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def diff(self, fetcher, index_url: str, url_filter: Optional[Callable[[str], bool]] = None) -> Dict:
+        """
+        Sitemap index'i okuyup önceki durumla karşılaştırır.
+        Dönüş: {"new", "modified", "removed" (URL listeleri), "unchanged" (sayı),
+                "sitemaps_read", "sitemaps_skipped", "_seen", "_sitemaps", "_live"}
+        lastmod'u olmayan URL'ler her seferinde değişmiş sayılır (HTTP önbelleği ucuzlatır).
+        """
+        response = fetcher.get(index_url)
+        response.raise_for_status()
+        entries = list(iter_sitemap(response.content))
+        children = [(loc, lastmod) for kind, loc, lastmod in entries if kind == "sitemap"]
+        # Index yerine doğrudan urlset verildiyse tek sitemap gibi işlenir
+        if not children:
+            children = [(index_url, None)]
+            bodies = {index_url: response.content}
+        else:
+            bodies = {}
+
+        delta: Dict = {"new": [], "modified": [], "removed": [], "unchanged": 0,
+                       "sitemaps_read": 0, "sitemaps_skipped": 0, "_seen": {}, "_sitemaps": {}}
+        read_sitemaps = set()
+        live_sitemaps = {loc for loc, _ in children}
+        delta["_live"] = sorted(live_sitemaps)
+        for sitemap_url, sitemap_lastmod in children:
+            if sitemap_lastmod and self.sitemaps.get(sitemap_url) == sitemap_lastmod:
+                delta["sitemaps_skipped"] += 1
+                continue
+            try:
+                body = bodies.get(sitemap_url)
+                if body is None:
+                    resp = fetcher.get(sitemap_url)
+                    resp.raise_for_status()
+                    body = resp.content
+                entries = iter_sitemap(body)
+                for kind, loc, lastmod in entries:
+                    if kind != "url" or (url_filter is not None and not url_filter(loc)):
+                        continue
+                    delta["_seen"][loc] = {"lastmod": lastmod, "sitemap": sitemap_url}
+            except Exception as e:
+                # Okunamayan sitemap atlanır: URL'leri silinmiş sayılmaz, durumu güncellenmez
+                print(f"❌ Sitemap işleme hatası ({sitemap_url}): {e}")
+                continue
+            read_sitemaps.add(sitemap_url)
+            delta["_sitemaps"][sitemap_url] = sitemap_lastmod
+            delta["sitemaps_read"] += 1
+
+        for url, entry in delta["_seen"].items():
+            previous = self.urls.get(url)
+            if previous is None:
+                delta["new"].append(url)
+            elif entry["lastmod"] is None or previous.get("lastmod") != entry["lastmod"]:
+                delta["modified"].append(url)
+            else:
+                delta["unchanged"] += 1
+        for url, previous in self.urls.items():
+            sitemap_url = previous.get("sitemap")
+            gone_sitemap = sitemap_url not in live_sitemaps
+            if url not in delta["_seen"] and (sitemap_url in read_sitemaps or gone_sitemap):
+                delta["removed"].append(url)
+        return delta
+
+    def commit(self, delta: Dict, failed: Iterable[str] = ()) -> None:
+        """
+        diff sonucunu durum dosyasına yazar. Başarısız URL'lerin eski durumu korunur ve
+        sitemap'lerinin lastmod'u güncellenmez (sonraki çalıştırmada yeniden okunur).
+        """
+        failed = set(failed)
+        blocked_sitemaps = set()
+        for url, entry in delta["_seen"].items():
+            if url in failed:
+                blocked_sitemaps.add(entry["sitemap"])
+                continue
+            self.urls[url] = entry
+        for url in delta["removed"]:
+            self.urls.pop(url, None)
+        for sitemap_url, lastmod in delta["_sitemaps"].items():
+            if sitemap_url not in blocked_sitemaps:
+                self.sitemaps[sitemap_url] = lastmod
+        live = set(delta["_live"])
+        self.sitemaps = {url: lastmod for url, lastmod in self.sitemaps.items() if url in live}
+        self.save()
+
+
+def changed_urls(delta: Dict) -> List[str]:
+    return delta["new"] + delta["modified"]
+
+
+def summarize(delta: Dict) -> str:
+    return (f"{len(delta['new'])} yeni, {len(delta['modified'])} değişmiş, {len(delta['removed'])} silinmiş, "
+            f"{delta['unchanged']} aynı URL; {delta['sitemaps_read']} sitemap okundu, "
+            f"{delta['sitemaps_skipped']} atlandı")
@@ -11,8 +11,23 @@ import os
 from datetime import datetime
 from typing import List, Dict
 
+try:
+    from scraping.fetcher import create_fetcher
+except ImportError:  # script olarak scraping/ içinden çalıştırıldığında
+    from fetcher import create_fetcher
+
 BASE_URL = "https://oktayozdemir.com.tr/"
 
+# Modül genelinde paylaşılan oturum (keep-alive + koşullu istek önbelleği)
+_fetcher = None
+
+
+def get_fetcher():
+    global _fetcher
+    if _fetcher is None:
+        _fetcher = create_fetcher()
+    return _fetcher
+
 def get_blog_links() -> List[str]:
     """
     Blog sayfasından tüm blog yazısı linklerini çeker
@@ -30,7 +45,7 @@ def get_blog_links() -> List[str]:
                 url = f"{BASE_URL}blog/page/{page}/"
             
             print(f"📄 Sayfa {page} kontrol ediliyor: {url}")
-            response = requests.get(url)
+            response = get_fetcher().get(url)
             
             # Sayfa bulunamadıysa dur
             if response.status_code == 404:
@@ -87,7 +102,7 @@ def load_website_docs():
         urls = [BASE_URL] + get_blog_links()
         print(f"Toplam {len(urls)} URL yükleniyor...")
         
-        loader = WebBaseLoader(urls)
+        loader = WebBaseLoader(urls, session=get_fetcher().session)
         docs = loader.load()
         
         print(f"Toplam {len(docs)} doküman yüklendi")
@@ -113,10 +128,12 @@ def save_raw_data(docs, filename: str = None):
     
     # Dokümanları JSON formatına dönüştür
     data_to_save = []
+    cache = get_fetcher().cache
     for doc in docs:
         data_to_save.append({
             "content": doc.page_content,
             "metadata": doc.metadata,
+            "unchanged": bool(cache is not None and cache.is_unchanged(doc.metadata.get("source", ""))),
             "scraped_at": datetime.now().isoformat()
         })
     
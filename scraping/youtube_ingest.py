@@ -1,8 +1,11 @@
 import os
+import time
+import queue
 import tempfile
 import argparse
+import threading
 import requests
-from typing import Optional
+from typing import Callable, Dict, List, Optional, Tuple
 import json
 try:
     import imageio_ffmpeg  # type: ignore
@@ -19,50 +22,403 @@ Gereksinimler:
 Kullanım örnekleri:
   python3 youtube_ingest.py --url https://youtu.be/XXXX --api http://localhost:8000
   python3 youtube_ingest.py --url https://www.youtube.com/playlist?list=YYYY --api http://localhost:8000
+  python3 youtube_ingest.py --url https://www.youtube.com/@kanal/videos --pipeline --download-workers 3 --transcribe-workers 2
 
 Notlar:
   - Sadece ses indirilir (m4a), geçici dosya olarak tutulur ve /ingest/video'a POST edilir
   - Her video için title ve url otomatik doldurulur, clean=true ile normalizasyon uygulanır
+  - Sunucunun kabul ettiği iş kimliği kayıt defterine hemen yazılır (pending); izleme kesilse de
+    sonraki çalıştırma videoyu yeniden yüklemez, aynı işi izlemeye devam eder
+  - --pipeline: indirme (N paralel) → transkripsiyon (en fazla M iş sunucuda) → indeksleme (tek)
+    aşamaları kuyruklarla bağlanır; bir video indekslenirken sonrakiler indirilir/transcribe edilir.
+    Aşama başına throughput sonda raporlanır. Sunucuda INGEST_WORKERS en az M olmalıdır
 """
 
+# Transkripsiyonun bittiğini gösteren iş aşamaları (sonrası temizleme/embedding)
+TRANSCRIBED_STAGES = ('cleaning', 'embedding', 'indexed', 'previewed')
 
-def ingest_file(api_base: str, file_path: str, title: str, url: str, video_id: str, language: str = "tr", dry_run: bool = False) -> Optional[dict]:
+
+def submit_file(api_base: str, file_path: str, title: str, url: str, video_id: str, language: str = "tr",
+                dry_run: bool = False) -> str:
+    """Dosyayı FastAPI /ingest/video'a yükler; sunucu işi kuyruğa alır ve iş kimliğini döndürür."""
+    endpoint = f"{api_base.rstrip('/')}/ingest/video"
+    with open(file_path, 'rb') as f:
+        files = { 'file': (os.path.basename(file_path), f, 'audio/m4a') }
+        data = {
+            'language': language,
+            'title': title,
+            'url': url,
+            'video_id': video_id,
+            'author': 'YouTube',
+            'clean': 'true',
+            'dry_run': 'true' if dry_run else 'false'
+        }
+        resp = requests.post(endpoint, files=files, data=data, timeout=600)
+        resp.raise_for_status()
+        return resp.json()['job_id']
+
+
+def ingest_file(api_base: str, file_path: str, title: str, url: str, video_id: str, language: str = "tr",
+                dry_run: bool = False, on_submit: Optional[Callable[[str], None]] = None) -> Optional[dict]:
     """Dosyayı FastAPI /ingest/video'a yükler ve JSON döndürür.
     dry_run=True → sadece önizleme, FAISS'e eklemez
+    on_submit: sunucu işi kabul edince iş kimliğiyle çağrılır (izleme kesilirse iş kaybolmasın)
     """
-    endpoint = f"{api_base.rstrip('/')}/ingest/video"
     try:
-        with open(file_path, 'rb') as f:
-            files = { 'file': (os.path.basename(file_path), f, 'audio/m4a') }
-            data = {
-                'language': language,
-                'title': title,
-                'url': url,
-                'video_id': video_id,
-                'author': 'YouTube',
-                'clean': 'true',
-                'dry_run': 'true' if dry_run else 'false'
-            }
-            resp = requests.post(endpoint, files=files, data=data, timeout=600)
-            resp.raise_for_status()
-            return resp.json()
+        job_id = submit_file(api_base, file_path, title, url, video_id, language=language, dry_run=dry_run)
     except Exception as e:
         print(f"❌ API yükleme hatası: {title} → {e}")
         return None
-def load_ingested_registry(reg_path: str) -> set:
+    if on_submit:
+        on_submit(job_id)
+    try:
+        # Sunucu işi kuyruğa alır; iş bitene kadar durumunu izle
+        return wait_for_job(api_base, job_id, title)
+    except Exception as e:
+        print(f"❌ İş izlenemedi: {title} (job_id={job_id}) → {e}")
+        return None
+
+
+def resume_job(api_base: str, job_id: str, title: str = "", timeout: Optional[float] = 3600) -> Tuple[Optional[dict], bool]:
+    """
+    Önceki çalıştırmada kabul edilmiş işi izlemeye devam eder.
+    Dönüş: (iş sonucu, iş hâlâ geçerli mi). Sunucu işi tanımıyorsa (4xx) veya iş başarısızsa
+    (None, False): video yeniden yüklenmelidir. Zaman aşımı/geçici hata: (None, True).
+    """
+    try:
+        job = poll_job(api_base, job_id, title, timeout=timeout)
+    except requests.HTTPError as e:
+        print(f"⚠️ Önceki iş bulunamadı: {title} ({job_id}) → {e}")
+        return None, False
+    except Exception as e:
+        print(f"⚠️ Önceki iş izlenemedi: {title} ({job_id}) → {e}")
+        return None, True
+    if job is None:
+        print(f"⚠️ Önceki iş hâlâ sürüyor: {title} ({job_id})")
+        return None, True
+    if job.get('status') == 'failed':
+        print(f"❌ Önceki iş başarısız: {title} → {job.get('error')}")
+        return None, False
+    return {**(job.get('result') or {}), 'job_id': job_id}, True
+
+
+def poll_job(api_base: str, job_id: str, title: str = "", until: Tuple[str, ...] = (), interval: float = 3.0,
+             timeout: Optional[float] = 3600, retries: int = 8) -> Optional[dict]:
+    """
+    /ingest/jobs/{job_id} durumunu iş bitene (veya aşaması until içindekilerden biri olana)
+    kadar yoklar ve iş kaydını döndürür; zaman aşımında None (timeout=None: süresiz).
+    Geçici hatalar (bağlantı, zaman aşımı, 5xx) art arda retries kez'e kadar artan beklemeyle
+    tekrar denenir; sunucudaki iş bu sırada çalışmaya devam eder. 4xx hemen istisna yükseltir.
+    """
+    endpoint = f"{api_base.rstrip('/')}/ingest/jobs/{job_id}"
+    deadline = None if timeout is None else time.monotonic() + timeout
+    last_stage = None
+    failures = 0
+    while deadline is None or time.monotonic() < deadline:
+        job, error = None, None
+        try:
+            resp = requests.get(endpoint, timeout=30)
+            if resp.status_code >= 500:
+                error = f"HTTP {resp.status_code}"
+            else:
+                resp.raise_for_status()
+                job = resp.json()
+        except (requests.ConnectionError, requests.Timeout) as e:
+            error = e
+        if job is None:
+            failures += 1
+            if failures > retries:
+                raise RuntimeError(f"İş durumu alınamadı ({job_id}): {error}")
+            delay = min(60.0, interval * 2 ** failures)
+            print(f"   ⚠️ {title}: iş durumu alınamadı ({error}), {delay:.0f} sn sonra tekrar denenecek")
+            time.sleep(delay)
+            continue
+        failures = 0
+        progress = job.get('progress') or {}
+        stage = (job.get('stage'), progress.get('done'), progress.get('total'))
+        if stage != last_stage:
+            suffix = f" {progress['done']}/{progress['total']}" if 'total' in progress else ""
+            print(f"   ⏳ {title}: {job.get('stage')}{suffix}")
+            last_stage = stage
+        if job.get('status') in ('done', 'failed') or job.get('stage') in until:
+            return job
+        time.sleep(interval)
+    return None
+
+
+def wait_for_job(api_base: str, job_id: str, title: str = "", interval: float = 3.0,
+                 timeout: Optional[float] = 3600) -> Optional[dict]:
+    """/ingest/jobs/{job_id} durumunu iş bitene kadar yoklar; başarılıysa iş sonucunu döndürür."""
+    job = poll_job(api_base, job_id, title, interval=interval, timeout=timeout)
+    if job is None:
+        print(f"❌ İş zaman aşımına uğradı: {title} ({job_id})")
+        return None
+    if job.get('status') == 'failed':
+        print(f"❌ İş başarısız: {title} → {job.get('error')}")
+        return None
+    return {**(job.get('result') or {}), 'job_id': job_id}
+
+
+def ydl_options(outdir: Optional[str] = None) -> dict:
+    return {
+        'quiet': True,
+        'ignoreerrors': True,
+        'extract_flat': False,
+        'outtmpl': os.path.join(outdir or tempfile.gettempdir(), 'yt_%(id)s.%(ext)s'),
+        'format': 'bestaudio/best',
+        'ffmpeg_location': FFMPEG_EXE,
+        'postprocessors': [{
+            'key': 'FFmpegExtractAudio',
+            'preferredcodec': 'm4a',
+            'preferredquality': '192',
+        }]
+    }
+
+
+def find_downloaded_audio(video_id: str, outdir: Optional[str] = None) -> Optional[str]:
+    """Postprocessor'ın ürettiği ses dosyasını bulur (M4A, yoksa alternatif uzantılar)."""
+    tmp_dir = outdir or tempfile.gettempdir()
+    for ext in ('.m4a', '.mp3', '.webm'):
+        candidate = os.path.join(tmp_dir, f"yt_{video_id}{ext}")
+        if os.path.exists(candidate):
+            return candidate
+    return None
+def _read_registry(reg_path: str) -> dict:
     if not os.path.exists(reg_path):
-        return set()
+        return {}
     try:
         with open(reg_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            return set(data.get('video_ids', []))
+            return json.load(f)
     except Exception:
-        return set()
+        return {}
 
-def save_ingested_registry(reg_path: str, ids: set) -> None:
+def load_ingested_registry(reg_path: str) -> set:
+    return set(_read_registry(reg_path).get('video_ids', []))
+
+def load_pending_jobs(reg_path: str) -> Dict[str, str]:
+    """Sunucunun kabul ettiği ama sonucu henüz kaydedilmemiş işler: video_id → job_id."""
+    return dict(_read_registry(reg_path).get('pending', {}))
+
+def save_ingested_registry(reg_path: str, ids: set, pending: Optional[Dict[str, str]] = None) -> None:
+    """pending verilmezse dosyadaki bekleyen işler korunur."""
+    if pending is None:
+        pending = load_pending_jobs(reg_path)
+    pending = {vid: job_id for vid, job_id in pending.items() if vid not in ids}
     os.makedirs(os.path.dirname(reg_path), exist_ok=True)
     with open(reg_path, 'w', encoding='utf-8') as f:
-        json.dump({'video_ids': sorted(list(ids))}, f, ensure_ascii=False, indent=2)
+        json.dump({'video_ids': sorted(list(ids)), 'pending': pending}, f, ensure_ascii=False, indent=2)
+
+
+class StageStats:
+    """Pipeline aşaması sayaçları: iş sayısı, hata, meşgul süre ve ses süresi (thread-safe)."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.done = 0
+        self.failed = 0
+        self.busy_seconds = 0.0
+        self.audio_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, started: float, ok: bool = True, audio_seconds: float = 0.0) -> None:
+        with self._lock:
+            self.busy_seconds += time.perf_counter() - started
+            if ok:
+                self.done += 1
+                self.audio_seconds += audio_seconds or 0.0
+            else:
+                self.failed += 1
+
+    def report(self, wall_seconds: float) -> Dict:
+        return {
+            'stage': self.name,
+            'done': self.done,
+            'failed': self.failed,
+            'busy_seconds': round(self.busy_seconds, 1),
+            'per_minute': round(self.done / wall_seconds * 60, 2) if wall_seconds else None,
+            'avg_seconds': round(self.busy_seconds / (self.done + self.failed), 1) if self.done + self.failed else None,
+            # Video süresi / duvar saati: aşamanın gerçek zamana göre kaç kat hızlı ilerlediği
+            'audio_seconds_per_wall_second': round(self.audio_seconds / wall_seconds, 2) if wall_seconds and self.audio_seconds else None,
+        }
+
+
+def list_entries(yt_dlp, url: str) -> List[dict]:
+    """Playlist/kanal girdilerini indirmeden ve her videoyu tek tek çözümlemeden listeler."""
+    with yt_dlp.YoutubeDL({'quiet': True, 'ignoreerrors': True, 'extract_flat': 'in_playlist'}) as ydl:
+        info = ydl.extract_info(url, download=False)
+    if not info:
+        return []
+    if info.get('_type') == 'playlist':
+        entries: List[dict] = []
+        for entry in info.get('entries') or []:
+            # Kanal sekmeleri iç içe playlist döndürebilir
+            if entry and entry.get('_type') == 'playlist':
+                entries.extend(e for e in entry.get('entries') or [] if e)
+            elif entry:
+                entries.append(entry)
+        return entries
+    return [info]
+
+
+def run_pipeline(args, yt_dlp, registry_path: str, seen_ids: set) -> None:
+    """
+    İndirme (N thread) → transkripsiyon (M thread, sunucudaki iş transkripsiyonu bitirene kadar)
+    → indeksleme (tek thread: iş sonucunu bekler, kayıt defterini yazar). Aşamalar sınırlı
+    kuyruklarla bağlıdır; indirilmiş ama gönderilmemiş dosya sayısı N'i geçmez. Önceki çalıştırmada
+    kabul edilmiş işi olan videolar indirilmeden doğrudan indeksleme aşamasında izlenir.
+    """
+    pending = load_pending_jobs(registry_path)
+    registry_lock = threading.Lock()
+    entries, resumed = [], []
+    for entry in list_entries(yt_dlp, args.url):
+        vid_id = entry.get('id')
+        title = entry.get('title') or 'YouTube Video'
+        if vid_id in seen_ids:
+            print(f"⏭️  Atlandı (daha önce işlendi): {title}")
+            continue
+        url = entry.get('webpage_url') or entry.get('url')
+        if url and not url.startswith('http'):
+            url = f"https://www.youtube.com/watch?v={vid_id}"
+        if vid_id in pending:
+            print(f"🔁 Önceki iş izleniyor: {title} ({pending[vid_id]})")
+            resumed.append({'id': vid_id, 'title': title, 'url': url, 'job_id': pending[vid_id]})
+            continue
+        entries.append({'id': vid_id, 'title': title, 'url': url})
+    if not entries and not resumed:
+        print("İşlenecek yeni video yok")
+        return
+
+    n_download = max(1, args.download_workers)
+    n_transcribe = max(1, args.transcribe_workers)
+    work_dir = tempfile.mkdtemp(prefix='yt_pipeline_')
+    download_q: "queue.Queue" = queue.Queue()
+    upload_q: "queue.Queue" = queue.Queue(maxsize=n_download)
+    index_q: "queue.Queue" = queue.Queue()
+    stats = {name: StageStats(name) for name in ('download', 'transcribe', 'index')}
+    results: List[dict] = []
+    print(f"🚀 Pipeline: {len(entries)} video (+{len(resumed)} süren iş), indirme={n_download}, "
+          f"transkripsiyon={n_transcribe}, indeksleme=1")
+
+    def save_registry():
+        with registry_lock:
+            save_ingested_registry(registry_path, seen_ids, pending)
+
+    def download_worker():
+        # YoutubeDL örnekleri thread'ler arasında paylaşılmaz
+        with yt_dlp.YoutubeDL(ydl_options(work_dir)) as ydl:
+            while True:
+                item = download_q.get()
+                if item is None:
+                    break
+                started = time.perf_counter()
+                try:
+                    info = ydl.extract_info(item['url'], download=True)
+                    path = find_downloaded_audio(info['id'], work_dir) if info else None
+                except Exception as e:
+                    print(f"❌ İndirilemedi: {item['title']} → {e}")
+                    path, info = None, None
+                if not path:
+                    print(f"Geçici ses dosyası bulunamadı: {item['title']}")
+                    stats['download'].record(started, ok=False)
+                    continue
+                item.update(path=path, title=info.get('title') or item['title'],
+                            url=info.get('webpage_url') or item['url'], duration=info.get('duration') or 0)
+                stats['download'].record(started, audio_seconds=item['duration'])
+                print(f"⬇️  İndirildi: {item['title']}")
+                upload_q.put(item)
+
+    def transcribe_worker():
+        while True:
+            item = upload_q.get()
+            if item is None:
+                break
+            started = time.perf_counter()
+            job = None
+            try:
+                item['job_id'] = submit_file(args.api, item['path'], item['title'], item['url'], item['id'],
+                                             language=args.language)
+                # Kabul edilen iş hemen kaydedilir: izleme kesilirse sonraki çalıştırma yeniden yüklemez
+                pending[item['id']] = item['job_id']
+                save_registry()
+            except Exception as e:
+                print(f"❌ API yükleme hatası: {item['title']} → {e}")
+            finally:
+                try:
+                    os.remove(item['path'])
+                except Exception:
+                    pass
+            if item.get('job_id'):
+                try:
+                    job = poll_job(args.api, item['job_id'], item['title'], until=TRANSCRIBED_STAGES)
+                except Exception as e:
+                    # İş sunucuda sürüyor; sonucu indeksleme aşaması bekler
+                    print(f"⚠️ İş izlenemedi: {item['title']} → {e}")
+            failed = job is not None and job.get('status') == 'failed'
+            # Sunucu işi kabul ettiyse (job_id) video, iş bitene kadar indeksleme aşamasında izlenir;
+            # aksi halde sunucuda tamamlanan iş kayıt defterine yazılmaz ve sonraki çalıştırmada tekrar eklenirdi
+            ok = bool(item.get('job_id')) and not failed
+            stats['transcribe'].record(started, ok=ok, audio_seconds=item.get('duration', 0))
+            if ok:
+                index_q.put(item)
+            elif failed:
+                print(f"❌ İş başarısız: {item['title']} → {job.get('error')}")
+            else:
+                print(f"❌ İşlenemedi: {item['title']}")
+
+    def index_worker():
+        while True:
+            item = index_q.get()
+            if item is None:
+                break
+            started = time.perf_counter()
+            # Sunucu işi kalıcıdır (yeniden başlatmada devam eder): süre sınırı olmadan beklenir
+            resp, valid = resume_job(args.api, item['job_id'], item['title'], timeout=None)
+            stats['index'].record(started, ok=resp is not None, audio_seconds=item.get('duration', 0))
+            if not resp:
+                if not valid:
+                    # İş başarısız/bilinmiyor: sonraki çalıştırmada video yeniden yüklenir
+                    pending.pop(item['id'], None)
+                    save_registry()
+                continue
+            print(f"✅ Eklendi: {item['title']} → chunks={resp.get('chunks_added')}")
+            results.append(resp)
+            seen_ids.add(item['id'])
+            pending.pop(item['id'], None)
+            save_registry()
+
+    wall_started = time.perf_counter()
+    for item in entries:
+        download_q.put(item)
+    downloaders = [threading.Thread(target=download_worker, name=f"yt-download-{i}", daemon=True)
+                   for i in range(n_download)]
+    transcribers = [threading.Thread(target=transcribe_worker, name=f"yt-transcribe-{i}", daemon=True)
+                    for i in range(n_transcribe)]
+    indexer = threading.Thread(target=index_worker, name="yt-index", daemon=True)
+    for t in downloaders + transcribers + [indexer]:
+        t.start()
+    for item in resumed:
+        index_q.put(item)
+    try:
+        # Her aşama bitince sonrakine bitiş sinyali gönderilir
+        for _ in downloaders:
+            download_q.put(None)
+        for t in downloaders:
+            t.join()
+        for _ in transcribers:
+            upload_q.put(None)
+        for t in transcribers:
+            t.join()
+        index_q.put(None)
+        indexer.join()
+    finally:
+        try:
+            os.rmdir(work_dir)
+        except OSError:
+            pass
+
+    wall = time.perf_counter() - wall_started
+    print(f"\nToplam eklenen: {len(results)} video ({wall:.0f} sn)")
+    print(json.dumps([s.report(wall) for s in stats.values()], ensure_ascii=False, indent=2))
 
 
 def main():
@@ -72,6 +428,11 @@ def main():
     parser.add_argument('--language', default='tr', help='Dil (whisper)')
     parser.add_argument('--review', action='store_true', help='FAISS eklemeden önce içerik önizle ve onay iste')
     parser.add_argument('--show-full', action='store_true', help='Önizlemede temiz metnin tamamını terminalde göster')
+    parser.add_argument('--pipeline', action='store_true',
+                        help='İndirme/transkripsiyon/indekslemeyi eşzamanlı aşamalarla çalıştır (--review ile kullanılmaz)')
+    parser.add_argument('--download-workers', type=int, default=3, help='Pipeline: paralel indirme sayısı')
+    parser.add_argument('--transcribe-workers', type=int, default=2,
+                        help='Pipeline: sunucuda aynı anda transcribe edilen video sayısı')
     args = parser.parse_args()
 
     try:
@@ -79,25 +440,29 @@ def main():
     except ImportError:
         raise SystemExit("yt-dlp eksik. Kurun: pip install yt-dlp")
 
-    ydl_opts = {
-        'quiet': True,
-        'ignoreerrors': True,
-        'extract_flat': False,
-        'outtmpl': os.path.join(tempfile.gettempdir(), 'yt_%(id)s.%(ext)s'),
-        'format': 'bestaudio/best',
-        'ffmpeg_location': FFMPEG_EXE,
-        'postprocessors': [{
-            'key': 'FFmpegExtractAudio',
-            'preferredcodec': 'm4a',
-            'preferredquality': '192',
-        }]
-    }
+    ydl_opts = ydl_options()
 
     results = []
     # Proje kökü: scraping/.. → data/raw/ingested_videos.json
     project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     registry_path = os.path.join(project_root, 'data', 'raw', 'ingested_videos.json')
     seen_ids = load_ingested_registry(registry_path)
+    pending = load_pending_jobs(registry_path)
+
+    def register(video_id: str) -> None:
+        seen_ids.add(video_id)
+        pending.pop(video_id, None)
+        save_ingested_registry(registry_path, seen_ids, pending)
+
+    def remember(video_id: str):
+        def on_submit(job_id: str) -> None:
+            pending[video_id] = job_id
+            save_ingested_registry(registry_path, seen_ids, pending)
+        return on_submit
+
+    if args.pipeline and not args.review:
+        run_pipeline(args, yt_dlp, registry_path, seen_ids)
+        return
 
     with yt_dlp.YoutubeDL(ydl_opts) as ydl:
         info = ydl.extract_info(args.url, download=False)
@@ -117,27 +482,33 @@ def main():
             if vid_id in seen_ids:
                 print(f"⏭️  Atlandı (daha önce işlendi): {title}")
                 continue
+            if vid_id in pending:
+                # Önceki çalıştırmada sunucu işi kabul etmişti: yeniden yüklemek yerine aynı iş izlenir
+                print(f"🔁 Önceki iş izleniyor: {title} ({pending[vid_id]})")
+                resp, valid = resume_job(args.api, pending[vid_id], title)
+                if resp:
+                    print(f"✅ Eklendi: {title} → chunks={resp.get('chunks_added')}")
+                    results.append(resp)
+                    register(vid_id)
+                    continue
+                if valid:
+                    continue  # İş sürüyor; sonraki çalıştırmada tekrar izlenir
+                pending.pop(vid_id, None)
+                save_ingested_registry(registry_path, seen_ids, pending)
 
             # Videoyu indir
             downloaded_info = ydl.extract_info(vid_url, download=True)
             # M4A yolu postprocessor tarafından üretildi
-            tmp_dir = tempfile.gettempdir()
-            candidate = os.path.join(tmp_dir, f"yt_{downloaded_info['id']}.m4a")
-            if not os.path.exists(candidate):
-                # Alternatif uzantı kontrolü
-                for ext in ('.m4a', '.mp3', '.webm'):
-                    alt = os.path.join(tmp_dir, f"yt_{downloaded_info['id']}{ext}")
-                    if os.path.exists(alt):
-                        candidate = alt
-                        break
-
-            if not os.path.exists(candidate):
+            candidate = find_downloaded_audio(downloaded_info['id']) if downloaded_info else None
+            if not candidate:
                 print(f"Geçici ses dosyası bulunamadı: {title}")
                 continue
+            vid_id = vid_id or downloaded_info['id']
 
             try:
                 # Önce dry-run ile önizleme al
-                resp = ingest_file(args.api, candidate, title, vid_url, downloaded_info['id'], language=args.language, dry_run=args.review)
+                resp = ingest_file(args.api, candidate, title, vid_url, downloaded_info['id'], language=args.language,
+                                   dry_run=args.review, on_submit=None if args.review else remember(vid_id))
                 if not resp:
                     print(f"❌ İşlenemedi (boş yanıt): {title}")
                     continue
@@ -186,7 +557,8 @@ def main():
                         'title': title,
                         'url': vid_url,
                         'author': 'YouTube',
-                        'clean': 'false'  # zaten temiz
+                        'clean': 'false',  # zaten temiz
+                        'wait': 'true'  # iş bitene kadar bekle, sonucu döndür
                     }
                     try:
                         fin = requests.post(endpoint, data=data, timeout=600)
@@ -194,8 +566,7 @@ def main():
                         final_resp = fin.json()
                         print(f"✅ Eklendi: {title} → chunks={final_resp.get('chunks_added', final_resp.get('chars', '?'))}")
                         results.append(final_resp)
-                        seen_ids.add(downloaded_info['id'])
-                        save_ingested_registry(registry_path, seen_ids)
+                        register(vid_id)
                     except Exception as e:
                         print(f"❌ Eklenemedi: {e}")
                         continue
@@ -203,8 +574,7 @@ def main():
                     # İnceleme yoksa doğrudan eklendi kabul edilir
                     print(f"✅ Eklendi: {title} → chunks={resp.get('chunks_added')}")
                     results.append(resp)
-                    seen_ids.add(downloaded_info['id'])
-                    save_ingested_registry(registry_path, seen_ids)
+                    register(vid_id)
             finally:
                 try:
                     os.remove(candidate)
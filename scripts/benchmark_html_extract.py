@@ -0,0 +1,124 @@
+"""
+HTML çıkarım kıyaslama scripti
+Kaydedilmiş bir HTML korpusu üzerinde referans (BeautifulSoup) ve hızlı (lxml) çıkarımı
+çalıştırır; sayfa/sn raporlar ve iki yolun çıktısının birebir aynı olduğunu doğrular
+(herhangi bir farkta 1 ile çıkar). İki ayrıştırıcının ağacı farklı kurduğu bilinen girdiler
+(iç içe <form>, <![CDATA[..]]>) korpusa her zaman eklenir.
+Varsayılan korpus scraper'ların HTTP önbelleğidir (data/cache/http/*.body); bir dizindeki
+*.html dosyaları da verilebilir.
+
+Kullanım:
+  python scripts/benchmark_html_extract.py
+  python scripts/benchmark_html_extract.py kayitli_sayfalar/ --repeat 3
+"""
+
+import os
+import sys
+import json
+import glob
+import time
+import argparse
+
+# Proje kökünü PYTHONPATH'e ekle
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from scraping.html_extract import extract_fast, extract_reference, fast_available
+
+DEFAULT_CORPUS = os.path.join(PROJECT_ROOT, "data", "cache", "http")
+_FILLER = "<p>" + "kelime " * 60 + "</p>"
+REGRESSION_PAGES = [
+    ("<regresyon: iç içe form>",
+     f'<html><body><div class="entry-content">{_FILLER}<form>x<form>y</form>after</form><p>son</p></div></body></html>'),
+    ("<regresyon: p içinde iç içe form>",
+     f'<html><body><div class="entry-content">{_FILLER}<form>a<p>b<form>m</form>after</p>z</form></div></body></html>'),
+    ("<regresyon: CDATA>",
+     f'<html><body><div class="entry-content">{_FILLER}<![CDATA[x]]> kuyruk <![CDATA[a<b]]></div></body></html>'),
+    ("<regresyon: iç içe a>",
+     f'<html><body><div class="entry-content">{_FILLER}</div>'
+     f'<a class="entry-date">x<a class="author-name">y</a></a></body></html>'),
+    ("<regresyon: p içinde blok>",
+     f'<html><body><div class="entry-content"><p>{_FILLER}<div class="sidebar">yan</div>son</p></div></body></html>'),
+    ("<regresyon: yanlış sıralı kapanış>",
+     f'<html><body><div class="entry-content">{_FILLER}<b><i>x</b>y</i><ul><li>a<li>b</ul></div></body></html>'),
+    ("<regresyon: içeriği kapsayan tarih>",
+     f'<html><body><div class="entry-date">d<div class="entry-content">{_FILLER}<span class="ads">r</span>'
+     f'</div></div></body></html>'),
+]
+
+
+def load_corpus(path, limit=None):
+    """(ad, html) listesi; önbellek gövdeleri kayıttaki kodlamayla çözülür."""
+    files = sorted(glob.glob(os.path.join(path, "*.body")) + glob.glob(os.path.join(path, "*.html"))
+                   + glob.glob(os.path.join(path, "*.htm")))
+    pages = []
+    for file_path in files:
+        name, encoding = os.path.basename(file_path), None
+        meta_path = os.path.splitext(file_path)[0] + ".json"
+        if file_path.endswith(".body") and os.path.exists(meta_path):
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            content_type = (meta.get("headers") or {}).get("Content-Type", "")
+            if content_type and "html" not in content_type:
+                continue
+            name, encoding = meta.get("url", name), meta.get("encoding")
+        with open(file_path, "rb") as f:
+            pages.append((name, f.read().decode(encoding or "utf-8", errors="replace")))
+        if limit and len(pages) >= limit:
+            break
+    return pages
+
+
+def run(extract, pages, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        results = [extract(html) for _, html in pages]
+    elapsed = time.perf_counter() - started
+    return results, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTML çıkarım kıyaslama aracı")
+    parser.add_argument("corpus", nargs="?", default=DEFAULT_CORPUS,
+                        help="HTML korpusu dizini (varsayılan: data/cache/http)")
+    parser.add_argument("--repeat", type=int, default=1, help="Korpus kaç kez işlensin")
+    parser.add_argument("--limit", type=int, default=None, help="En fazla bu kadar sayfa")
+    parser.add_argument("--show", type=int, default=5, help="Gösterilecek farklı sayfa sayısı")
+    args = parser.parse_args()
+
+    if not fast_available():
+        print("❌ lxml kurulu değil: pip install lxml")
+        sys.exit(1)
+    pages = load_corpus(args.corpus, args.limit)
+    if not pages:
+        print(f"❌ Korpusta HTML bulunamadı: {args.corpus}")
+        sys.exit(1)
+    pages += REGRESSION_PAGES
+
+    reference, t_reference = run(extract_reference, pages, args.repeat)
+    fast, t_fast = run(extract_fast, pages, args.repeat)
+
+    mismatches = [(name, sorted(k for k in ref if ref[k] != out.get(k)))
+                  for (name, _), ref, out in zip(pages, reference, fast) if ref != out]
+    total = len(pages) * args.repeat
+    total_bytes = sum(len(html.encode("utf-8")) for _, html in pages) * args.repeat
+    report = {
+        "corpus": args.corpus,
+        "pages": len(pages),
+        "repeat": args.repeat,
+        "megabytes": round(total_bytes / 1e6, 2),
+        "reference_pages_per_second": round(total / t_reference, 1),
+        "fast_pages_per_second": round(total / t_fast, 1),
+        "speedup": round(t_reference / t_fast, 2) if t_fast else None,
+        "identical": len(pages) - len(mismatches),
+        "mismatches": len(mismatches),
+    }
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    for name, keys in mismatches[:args.show]:
+        print(f"⚠️ Farklı çıktı: {name} → {', '.join(keys)}")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Transkripsiyon motoru kıyaslama scripti
+Bir ses/video dosyasını /ingest/video ile aynı ön işlemden (FLAC + sessizlik kırpma +
+segment codec) geçirir, seçilen motorla transcribe eder ve throughput raporlar
+(ses-sn / duvar-sn). Yerel motorla ağ bağlantısı gerekmez.
+
+Kullanım:
+  python scripts/benchmark_transcription.py video.mp4 --backend local --model small
+  python scripts/benchmark_transcription.py video.mp4 --backend groq --concurrency 4
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+
+# Proje kökünü PYTHONPATH'e ekle
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from transcription import (
+    RateLimiter, create_transcription_backend, encode_segments, merge_overlapping, plan_segments,
+    prepare_audio, probe_duration, speech_intervals, transcribe_segments, transcription_settings
+)
+
+FFMPEG_CMD = 'ffmpeg'
+try:
+    import imageio_ffmpeg  # ffmpeg ikilisi yoksa gömülü olanı kullanmak için
+    FFMPEG_CMD = imageio_ffmpeg.get_ffmpeg_exe() or 'ffmpeg'
+except Exception:
+    FFMPEG_CMD = 'ffmpeg'
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Transkripsiyon motoru kıyaslama aracı")
+    parser.add_argument("file", help="Ses veya video dosyası")
+    parser.add_argument("--backend", choices=["groq", "local"], default=None,
+                        help="Motor (varsayılan: TRANSCRIBE_BACKEND)")
+    parser.add_argument("--model", default=None, help="Yerel model boyutu (örn. tiny, base, small, medium)")
+    parser.add_argument("--language", default="tr")
+    parser.add_argument("--concurrency", type=int, default=None, help="Eşzamanlı segment sayısı")
+    parser.add_argument("--output", default=None, help="Transkripti bu dosyaya yaz")
+    args = parser.parse_args()
+
+    if args.backend:
+        os.environ["TRANSCRIBE_BACKEND"] = args.backend
+    if args.model:
+        os.environ["LOCAL_WHISPER_MODEL"] = args.model
+    settings = transcription_settings()
+
+    client = None
+    if os.getenv("TRANSCRIBE_BACKEND", "groq").lower() == "groq":
+        from groq import Groq
+        client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+    backend = create_transcription_backend(client)
+
+    work_dir = tempfile.mkdtemp(prefix="bench_transcribe_")
+    try:
+        t0 = time.perf_counter()
+        audio_path = os.path.join(work_dir, "audio.flac")
+        silences = prepare_audio(args.file, audio_path, trim_silence=settings["trim_silence"],
+                                 silence_db=settings["silence_db"], min_silence=settings["min_silence"],
+                                 cmd=FFMPEG_CMD)
+        duration = probe_duration(audio_path, cmd=FFMPEG_CMD)
+        intervals = speech_intervals(duration, silences)
+        plan = plan_segments(intervals, settings["segment_seconds"], settings["overlap_seconds"])
+        segments = encode_segments(audio_path, plan, os.path.join(work_dir, "segments"),
+                                   codec=settings["codec"], cmd=FFMPEG_CMD)
+        t_prep = time.perf_counter() - t0
+
+        t1 = time.perf_counter()
+        limiter = RateLimiter(settings["per_minute"]) if backend.remote else None
+        results = transcribe_segments(
+            segments,
+            lambda path: backend.transcribe(path, args.language),
+            concurrency=backend.concurrency(args.concurrency or settings["concurrency"]),
+            limiter=limiter,
+            retries=settings["retries"] if backend.remote else 0,
+        )
+        t_transcribe = time.perf_counter() - t1
+        text = merge_overlapping([r["text"] for r in results], [s["overlaps_previous"] for s in segments])
+
+        speech = sum(b - a for a, b in intervals)
+        report = {
+            "file": args.file,
+            "backend": backend.name,
+            "model": backend.model_id,
+            "codec": settings["codec"],
+            "duration_seconds": round(duration, 1),
+            "speech_seconds": round(speech, 1),
+            "segments": len(segments),
+            "segment_bytes": sum(os.path.getsize(s["path"]) for s in segments),
+            "preprocess_seconds": round(t_prep, 2),
+            "transcribe_seconds": round(t_transcribe, 2),
+            # Uçtan uca throughput: özgün medya süresi / toplam duvar saati
+            "audio_seconds_per_wall_second": round(duration / (t_prep + t_transcribe), 2) if duration else None,
+            "backend_stats": backend.stats(),
+            "chars": len(text),
+        }
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                f.write(text)
+            print(f"📝 Transkript yazıldı: {args.output}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Cevap biçimlendirici altın set kontrolü
+tests/answer_formatter_golden.json eski regex sürümünün (normalize_bullets / polish_answer)
+kaydedilmiş çıktılarını içerir: kayıtlı test cevapları ve sabit tohumlu rastgele girdiler.
+Her girdi hem tek seferde hem de farklı parça boyutlarıyla akış halinde biçimlendirilir;
+herhangi bir fark varsa script 1 ile çıkar.
+
+Kullanım:
+  python scripts/check_answer_formatter.py
+  python scripts/check_answer_formatter.py --show 10
+"""
+
+import os
+import sys
+import json
+import random
+import argparse
+
+# Proje kökünü PYTHONPATH'e ekle
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from answer_formatter import AnswerPolisher, BulletNormalizer, normalize_bullets, polish_answer
+
+DEFAULT_GOLDEN = os.path.join(PROJECT_ROOT, "tests", "answer_formatter_golden.json")
+
+
+def split_chunks(text, rnd, size=None):
+    """Sabit (size) veya rastgele 1-15 karakterlik parçalar."""
+    chunks, i = [], 0
+    while i < len(text):
+        n = size or rnd.randint(1, 15)
+        chunks.append(text[i:i + n])
+        i += n
+    return chunks
+
+
+def variants(name, text, rnd):
+    """(yol adı, çıktı) çiftleri: tek seferlik fonksiyon ve akış halinde sınıf."""
+    if name == "normalize_bullets":
+        yield "oneshot", normalize_bullets(text)
+        if "\n" in text:
+            return  # Akış sözleşmesi satır sonu içermeyen girdi
+        cls = BulletNormalizer
+    else:
+        yield "oneshot", polish_answer(text)
+        cls = AnswerPolisher
+    for size in (1, 7, None):
+        label = f"stream[{size or 'random'}]"
+        yield label, "".join(cls().stream(split_chunks(text, rnd, size)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="answer_formatter altın set kontrolü")
+    parser.add_argument("golden", nargs="?", default=DEFAULT_GOLDEN, help="Altın set JSON dosyası")
+    parser.add_argument("--show", type=int, default=5, help="Gösterilecek en fazla fark")
+    args = parser.parse_args()
+
+    with open(args.golden, "r", encoding="utf-8") as f:
+        golden = json.load(f)
+
+    rnd = random.Random(0)
+    failures = 0
+    for name, cases in golden.items():
+        checked = 0
+        for case in cases:
+            for label, got in variants(name, case["input"], rnd):
+                checked += 1
+                if got != case["expected"]:
+                    failures += 1
+                    if failures <= args.show:
+                        print(f"❌ {name} ({label})")
+                        print(f"   girdi:    {case['input'][:200]!r}")
+                        print(f"   beklenen: {case['expected'][:200]!r}")
+                        print(f"   çıktı:    {got[:200]!r}")
+        print(f"📋 {name}: {len(cases)} örnek, {checked} karşılaştırma")
+
+    if failures:
+        print(f"❌ {failures} fark bulundu")
+        sys.exit(1)
+    print("✅ Çıktılar altın setle birebir aynı")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Liste sayfalaması kontrolü (tarayıcısız)
+tests/fixtures/listing_site/ altındaki statik siteyi http.server ile yerelde sunar ve
+AdvancedScraper.load_listing / pagination.paginate çıktısını beklenen linklerle karşılaştırır:
+- /blog/: <link rel="next"> / a.next ile 3 sayfalık liste
+- /category/blog/: "Daha fazla yükle" düğmesinin data-url'i üzerinden JSON parçaları
+- Bulunan yazılar load_documents ile indirilip başlıkları kontrol edilir
+Herhangi bir fark varsa script 1 ile çıkar.
+
+Kullanım:
+  python scripts/check_listing_pagination.py
+"""
+
+import os
+import sys
+import threading
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+# Proje kökünü PYTHONPATH'e ekle
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from scraping.fetcher import Fetcher
+from scraping.pagination import paginate, response_soup
+from scraping.selenium_scraper import AdvancedScraper
+
+FIXTURE_SITE = os.path.join(PROJECT_ROOT, "tests", "fixtures", "listing_site")
+
+# liste yolu -> (beklenen yazı numaraları, beklenen okunan sayfa)
+EXPECTED = {
+    "blog/": ({1, 2, 3, 4, 5, 6, 7}, 3),
+    "category/blog/": ({1, 2, 8, 9, 10}, 3),
+}
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(directory):
+    """Fixture sitesini boş bir portta arka planda sunar; (sunucu, taban URL) döner."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), partial(QuietHandler, directory=directory))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/"
+
+
+def post_urls(base_url, numbers):
+    return {f"{base_url}blog/yazi-{n}/" for n in numbers}
+
+
+def main():
+    server, base_url = serve(FIXTURE_SITE)
+    failures = []
+
+    def check(label, got, expected):
+        if got == expected:
+            print(f"✅ {label}")
+        else:
+            failures.append(label)
+            print(f"❌ {label}\n   beklenen: {sorted(expected)}\n   çıktı:    {sorted(got)}")
+
+    try:
+        # Önbelleksiz fetcher: kontrol data/cache/http'ye yazmaz; pool=None ile tarayıcı yalnızca
+        # uç nokta bulunamazsa açılır (bu sitede her listede bulunmalı)
+        fetcher = Fetcher(retries=0, timeout=5)
+        scraper = AdvancedScraper(base_url=base_url, fetcher=fetcher, workers=4)
+        found = set()
+        for path, (numbers, pages) in EXPECTED.items():
+            url = base_url + path
+            links, read = paginate(fetcher, url, scraper.extract_blog_links, max_pages=10)
+            check(f"paginate {path}: linkler", links, post_urls(base_url, numbers))
+            check(f"paginate {path}: {pages} sayfa okundu", read, pages)
+            listing = scraper.load_listing(url)
+            check(f"load_listing {path}", listing, post_urls(base_url, numbers))
+            found |= listing
+
+        # JSON yanıtındaki HTML parçası tek belge olarak ayrıştırılır
+        soup = response_soup(fetcher.get(base_url + "api/yazilar-3.json"))
+        check("response_soup JSON parçaları", scraper.extract_blog_links(soup, base_url),
+              post_urls(base_url, {2, 10}))
+
+        docs = scraper.load_documents(sorted(found))
+        titles = {doc.metadata.get("title", "").split(" - ")[0] for doc in docs}
+        check("load_documents başlıkları", titles, {f"Yazı {n}" for n in range(1, 11)})
+    finally:
+        server.shutdown()
+
+    if failures:
+        print(f"❌ {len(failures)} kontrol başarısız")
+        sys.exit(1)
+    print("✅ Liste sayfalaması beklenen linkleri döndürüyor")
+
+
+if __name__ == "__main__":
+    main()
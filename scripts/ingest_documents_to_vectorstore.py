@@ -8,7 +8,7 @@ import os
 import json
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Optional
 import argparse
 
 # Proje kökünü PYTHONPATH'e ekle
@@ -16,57 +16,15 @@ PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 if PROJECT_ROOT not in sys.path:
     sys.path.append(PROJECT_ROOT)
 
-try:
-    from docx import Document  # python-docx
-except ImportError:
+from document_parser import Document, parse_docx_files
+
+if Document is None:
     print("❌ python-docx paketi gerekli. Kurulum: pip install python-docx")
     sys.exit(1)
 
 from vectorstore.build_store import OptimizedVectorStoreBuilder
 
 
-def docx_to_text(path: Path) -> str:
-    """DOCX dosyasını metin formatına çevirir"""
-    try:
-        doc = Document(str(path))
-        parts = []
-        
-        # Paragrafları işle
-        for p in doc.paragraphs:
-            txt = (p.text or "").strip()
-            if not txt:
-                continue
-                
-            style = (p.style.name or "").lower()
-            if style.startswith("heading"):
-                # Başlıkları markdown formatında
-                level = 2
-                try:
-                    level = int(''.join(ch for ch in p.style.name if ch.isdigit()) or '2')
-                except Exception:
-                    level = 2
-                parts.append(("#" * max(2, min(6, level))) + f" {txt}")
-            elif style.startswith("list") or txt.startswith(("•", "-", "*")):
-                # Liste öğelerini normalize et
-                clean = txt.lstrip("•*- ").strip()
-                parts.append(f"- {clean}")
-            else:
-                parts.append(txt)
-        
-        # Tabloları işle
-        for tbl in doc.tables:
-            for row in tbl.rows:
-                cells = [c.text.strip() for c in row.cells if c.text and c.text.strip()]
-                if cells:
-                    parts.append(" | ".join(cells))
-        
-        return "\n".join(parts).strip()
-        
-    except Exception as e:
-        print(f"❌ DOCX okuma hatası ({path}): {e}")
-        return ""
-
-
 def create_document_data(file_path: Path, title: str, url: str, content: str) -> Dict:
     """Belge verisini blog makaleleriyle aynı formatta oluşturur"""
     return {
@@ -85,8 +43,9 @@ def create_document_data(file_path: Path, title: str, url: str, content: str) ->
     }
 
 
-def process_documents(documents_dir: str, base_url: str = "https://alternativkraft.com/") -> List[Dict]:
-    """Belgeler klasöründeki DOCX dosyalarını işler"""
+def process_documents(documents_dir: str, base_url: str = "https://alternativkraft.com/",
+                      workers: Optional[int] = None) -> List[Dict]:
+    """Belgeler klasöründeki DOCX dosyalarını işler (ayrıştırma süreç havuzunda paralel)"""
     
     # URL eşleştirmeleri
     url_mappings = {
@@ -100,7 +59,7 @@ def process_documents(documents_dir: str, base_url: str = "https://alternativkra
         print(f"❌ Belgeler klasörü bulunamadı: {documents_dir}")
         return []
     
-    docx_files = list(documents_dir.glob("*.docx"))
+    docx_files = sorted(documents_dir.glob("*.docx"))
     if not docx_files:
         print("❌ Hiç DOCX dosyası bulunamadı")
         return []
@@ -109,11 +68,12 @@ def process_documents(documents_dir: str, base_url: str = "https://alternativkra
     
     processed_documents = []
     
-    for file_path in docx_files:
+    for file_path, content, error in parse_docx_files(docx_files, workers=workers):
         print(f"📖 İşleniyor: {file_path.name}")
+        if error:
+            print(f"❌ DOCX okuma hatası ({file_path}): {error}")
+            continue
         
-        # İçeriği çıkar
-        content = docx_to_text(file_path)
         if not content or len(content.strip()) < 100:
             print(f"⚠️  İçerik çok kısa veya boş: {file_path.name}")
             continue
@@ -197,6 +157,8 @@ def main():
                        help="Vectorstore'u baştan oluştur")
     parser.add_argument("--json-file", default=None,
                        help="Belirli bir JSON dosyasını kullan")
+    parser.add_argument("--workers", type=int, default=None,
+                       help="DOCX ayrıştırma süreç sayısı (varsayılan: DOCX_WORKERS veya CPU sayısı)")
     
     args = parser.parse_args()
     
@@ -205,7 +167,7 @@ def main():
         print(f"📄 Mevcut JSON kullanılıyor: {args.json_file}")
         json_path = args.json_file
     else:
-        documents = process_documents(args.documents_dir, args.base_url)
+        documents = process_documents(args.documents_dir, args.base_url, workers=args.workers)
         if not documents:
             print("❌ İşlenecek belge bulunamadı!")
             return
@@ -1,51 +1,35 @@
+"""
+DOCX klasörünü API'ye ingest eder
+- Dosyalar süreç havuzunda paralel ayrıştırılır (document_parser.parse_docx_files, --workers)
+- Varsayılan: tüm belgeler tek istekte /ingest/bulk'a NDJSON olarak akıtılır; sunucu chunk'ları
+  batch'ler halinde embed eder ve FAISS'i batch başına bir kez kaydeder
+- --per-file: eski davranış, her dosya ayrı /ingest/transcript isteği
+"""
+
+import os
+import re
 import sys
+import json
 import pathlib
+import unicodedata
 import requests
-from typing import Optional
+from typing import Dict, Iterator, List, Optional
 import argparse
 
-try:
-    from docx import Document  # python-docx
-except Exception as e:
+# Proje kökünü PYTHONPATH'e ekle
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from document_parser import Document, infer_title, parse_docx_files
+
+if Document is None:
     raise SystemExit("python-docx paketi gerekli. Kurulum: ./chatbot_env/bin/pip install python-docx")
 
 
-def docx_to_text(path: pathlib.Path) -> str:
-    doc = Document(str(path))
-    parts = []
-    # Paragraphs (başlıkları ve listeleri koru)
-    for p in doc.paragraphs:
-        txt = (p.text or "").strip()
-        if not txt:
-            continue
-        style = (p.style.name or "").lower()
-        if style.startswith("heading"):
-            # Vectorstore chunking separatorlarıyla uyumlu başlıklar
-            level = 2
-            try:
-                level = int(''.join(ch for ch in p.style.name if ch.isdigit()) or '2')
-            except Exception:
-                level = 2
-            parts.append(("#" * max(2, min(6, level))) + f" {txt}")
-        elif style.startswith("list") or txt.startswith(("•", "-", "*")):
-            # Madde işaretlerini normalize et
-            clean = txt.lstrip("•*- ").strip()
-            parts.append(f"- {clean}")
-        else:
-            parts.append(txt)
-    # Tables (varsa)
-    for tbl in doc.tables:
-        for row in tbl.rows:
-            cells = [c.text.strip() for c in row.cells if c.text and c.text.strip()]
-            if cells:
-                parts.append(" | ".join(cells))
-    return "\n".join(parts).strip()
-
-
-def infer_title(file_path: pathlib.Path) -> str:
-    title = file_path.stem.replace("_", " ").replace("-", " ").strip()
-    # İlk harfleri büyüt
-    return " ".join(w.capitalize() for w in title.split()) or "Belge"
+def document_text(title: str, text: str) -> str:
+    # Başlığı içeriğin başına da ekleyerek aramada sinyali artır
+    return (f"Başlık: {title}\n\n" + text).strip()
 
 
 def ingest_text(
@@ -57,14 +41,39 @@ def ingest_text(
     clean: bool = True,
 ) -> requests.Response:
     data = {
-        # Başlığı içeriğin başına da ekleyerek aramada sinyali artır
-        "text": (f"Başlık: {title}\n\n" + text).strip(),
+        "text": document_text(title, text),
         "title": title,
         "url": url or "",
         "author": author or "Şirket",
         "clean": str(bool(clean)).lower(),
+        # Sunucu işi kuyruğa alır; wait=true ile iş bitince sonucu döndürür
+        "wait": "true",
     }
-    return requests.post(f"{base_url}/ingest/transcript", data=data, timeout=120)
+    return requests.post(f"{base_url}/ingest/transcript", data=data, timeout=600)
+
+
+def ingest_bulk(base_url: str, records: List[Dict], clean: bool = True) -> requests.Response:
+    """Belgeleri tek istekte NDJSON olarak akıtır; sunucu işi bitirince sonucu döndürür (wait=true)."""
+    def lines() -> Iterator[bytes]:
+        for record in records:
+            yield (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+
+    return requests.post(
+        f"{base_url}/ingest/bulk",
+        params={"clean": str(bool(clean)).lower(), "wait": "true"},
+        data=lines(),
+        headers={"Content-Type": "application/x-ndjson"},
+        timeout=3600,
+    )
+
+
+def slugify(name: str) -> str:
+    s = unicodedata.normalize('NFKD', name)
+    s = ''.join(ch for ch in s if not unicodedata.category(ch).startswith('M'))
+    s = s.lower().strip().replace(' ', '-')
+    s = re.sub(r"[^a-z0-9\-]", "", s)
+    s = re.sub(r"-+", "-", s).strip('-')
+    return s or "belge"
 
 
 def main() -> None:
@@ -74,6 +83,8 @@ def main() -> None:
     parser.add_argument("url_prefix", nargs="?", default="", help="URL prefix veya '@' ile sabit URL")
     parser.add_argument("--only", dest="only", default=None, help="Sadece bu dosya adını işle (tam dosya adı, .docx dahil)")
     parser.add_argument("--url", dest="fixed_url", default=None, help="Yalnızca --only ile birlikte: bu sabit URL'yi kullan")
+    parser.add_argument("--workers", type=int, default=None, help="Ayrıştırma süreç sayısı (vars: DOCX_WORKERS veya CPU sayısı)")
+    parser.add_argument("--per-file", action="store_true", help="Her dosyayı ayrı /ingest/transcript isteğiyle gönder (eski sunucular)")
     args = parser.parse_args()
 
     folder = pathlib.Path(args.folder).expanduser()
@@ -95,50 +106,72 @@ def main() -> None:
 
     print(f"Bulunan .docx dosyaları: {len(docx_files)}")
 
-    ok, fail = 0, 0
-    import unicodedata, re
-
-    def slugify(name: str) -> str:
-        s = unicodedata.normalize('NFKD', name)
-        s = ''.join(ch for ch in s if not unicodedata.category(ch).startswith('M'))
-        s = s.lower().strip().replace(' ', '-')
-        s = re.sub(r"[^a-z0-9\-]", "", s)
-        s = re.sub(r"-+", "-", s).strip('-')
-        return s or "belge"
+    def document_url(fp: pathlib.Path) -> str:
+        # URL üretim:
+        # - Eğer url_prefix '@' ile başlıyorsa sabit URL kullan (slug ekleme)
+        # - Aksi halde prefix + slug uygula
+        if args.fixed_url:
+            return args.fixed_url
+        if url_prefix:
+            if url_prefix.startswith('@'):
+                return url_prefix[1:]
+            return url_prefix.rstrip('/') + "/" + slugify(fp.stem)
+        return ""
 
-    for fp in docx_files:
-        try:
-            title = infer_title(fp)
-            text = docx_to_text(fp)
-            if not text:
-                print(f"[SKIP] Boş içerik: {fp.name}")
+    ok, fail = 0, 0
+    records: List[Dict] = []
+    names: List[str] = []
+    for fp, text, error in parse_docx_files(docx_files, workers=args.workers):
+        if error:
+            fail += 1
+            print(f"[ERR] {fp.name} → {error}")
+            continue
+        if not text:
+            print(f"[SKIP] Boş içerik: {fp.name}")
+            continue
+        title = infer_title(fp)
+        if args.per_file:
+            try:
+                r = ingest_text(base_url, text, title, url=document_url(fp), author="Şirket", clean=True)
+            except Exception as e:
+                fail += 1
+                print(f"[ERR] {fp.name} → {e}")
                 continue
-            # URL üretim:
-            # - Eğer url_prefix '@' ile başlıyorsa sabit URL kullan (slug ekleme)
-            # - Aksi halde prefix + slug uygula
-            gen_url = ""
-            if args.fixed_url:
-                gen_url = args.fixed_url
-            elif url_prefix:
-                if url_prefix.startswith('@'):
-                    gen_url = url_prefix[1:]
-                else:
-                    gen_url = url_prefix.rstrip('/') + "/" + slugify(fp.stem)
-            r = ingest_text(base_url, text, title, url=gen_url, author="Şirket", clean=True)
             if r.ok:
                 ok += 1
                 print(f"[OK] {fp.name} → {title}")
             else:
                 fail += 1
                 print(f"[FAIL] {fp.name} → HTTP {r.status_code} {r.text[:200]}")
+            continue
+        records.append({"text": document_text(title, text), "title": title, "url": document_url(fp),
+                        "author": "Şirket", "source_type": "document", "clean": True})
+        names.append(fp.name)
+
+    if records:
+        print(f"📤 {len(records)} belge tek istekte gönderiliyor: {base_url}/ingest/bulk")
+        try:
+            r = ingest_bulk(base_url, records)
+            if r.ok:
+                result = r.json()
+                rejected = {item["line"] - 1 for item in result.get("rejected", [])}
+                for i, name in enumerate(names):
+                    if i in rejected:
+                        fail += 1
+                        print(f"[FAIL] {name} → reddedildi")
+                    else:
+                        ok += 1
+                        print(f"[OK] {name}")
+                print(f"🧩 {result.get('chunks_added', 0)} chunk, {result.get('batches', 0)} FAISS kaydı")
+            else:
+                fail += len(records)
+                print(f"[FAIL] Toplu ingest → HTTP {r.status_code} {r.text[:200]}")
         except Exception as e:
-            fail += 1
-            print(f"[ERR] {fp.name} → {e}")
+            fail += len(records)
+            print(f"[ERR] Toplu ingest → {e}")
 
     print(f"\nÖZET: başarı={ok} hata={fail}")
 
 
 if __name__ == "__main__":
     main()
-
-
@@ -1,9 +1,14 @@
 import re
 import os
+import time
 import yaml
+import threading
 import unicodedata
 from typing import List, Dict
 
+# Madde normalizasyonu akış destekli biçimlendiricide (answer_formatter.BulletNormalizer)
+from answer_formatter import normalize_bullets
+
 def load_rules(config_path: str) -> Dict:
     with open(config_path, 'r', encoding='utf-8') as f:
         return yaml.safe_load(f) or {}
@@ -23,11 +28,41 @@ def apply_replacements(text: str, replacements: List[Dict[str, str]]) -> str:
             t = re.sub(pat, rep, t, flags=re.IGNORECASE)
     return t
 
+# Zaman damgaları ve boşluk dizileri tek geçişte tek boşluğa indirilir
+# (önceki sıralı \s+ → " " adımından sonra satır sonu kalmadığı için eşdeğerdir)
+_WHITESPACE_RE = re.compile(r"(?:\s|\b\d{1,2}:\d{2}(?::\d{2})?\b)+")
+
 def normalize_whitespace(text: str) -> str:
-    t = re.sub(r"\b\d{1,2}:\d{2}(:\d{2})?\b", " ", text)
-    t = re.sub(r"\s+", " ", t)
-    t = re.sub(r"\s*\n\s*", "\n", t)
-    return t.strip()
+    return _WHITESPACE_RE.sub(" ", text).strip()
+
+# Yaygın confusable karakterler
+_CONFUSABLES = {
+    "“": '"', "”": '"', "„": '"', "‟": '"',
+    "’": "'", "‘": "'", "‚": ",",
+    "–": "-", "—": "-", "−": "-",
+    "•": "- ", "·": "- ", "●": "- ",
+    "\u00a0": " ",  # no-break space
+}
+
+class _CharCleanupTable(dict):
+    """
+    str.translate tablosu: confusable karakterleri sadeleştirir, kontrol (C*)
+    karakterlerini ve ideografik karakterleri (örn. Çince 的) siler.
+    Karakter kategorisi her farklı karakter için yalnızca bir kez hesaplanır.
+    """
+
+    def __missing__(self, code: int):
+        ch = chr(code)
+        if ch in _CONFUSABLES:
+            value = _CONFUSABLES[ch]
+        elif unicodedata.category(ch)[0] == 'C' or 0x4E00 <= code <= 0x9FFF:
+            value = None
+        else:
+            value = code
+        self[code] = value
+        return value
+
+_CHAR_TABLE = _CharCleanupTable()
 
 def normalize_unicode(text: str) -> str:
     """
@@ -36,92 +71,89 @@ def normalize_unicode(text: str) -> str:
     """
     if not text:
         return ""
-    # NFKC ile normalize et
-    t = unicodedata.normalize('NFKC', text)
-    # Yaygın confusable karakterleri sadeleştir
-    replacements = {
-        "“": '"', "”": '"', "„": '"', "‟": '"',
-        "’": "'", "‘": "'", "‚": ",",
-        "–": "-", "—": "-", "−": "-",
-        "•": "- ", "·": "- ", "●": "- ", "*": "*",
-        " ": " ",  # no-break space
-    }
-    for k, v in replacements.items():
-        t = t.replace(k, v)
-
-    # Kontrol karakterlerini sil
-    t = "".join(ch for ch in t if unicodedata.category(ch)[0] != 'C')
-
-    # Türkçe olmayan beklenmedik ideografik karakterleri (örn. Çince 的) temizle
-    t = re.sub(r"[\u4E00-\u9FFF]", "", t)
-    return t
+    # NFKC ile normalize et, ardından tek translate geçişiyle karakter temizliği
+    return unicodedata.normalize('NFKC', text).translate(_CHAR_TABLE)
 
-def normalize_bullets(text: str) -> str:
+class TextRulesEngine:
     """
-    Bozuk madde işaretlerini standart "- " biçimine çevirir ve aynı madde
-    içinde satır kırılmalarını birleştirir.
+    config/text_rules.yaml için derlenmiş kural motoru.
+    Kurallar bir kez yüklenip derlenir; dosya değiştiğinde (mtime) yeniden yüklenir.
+    Desenler config sırasıyla uygulanır (tek alternasyona birleştirmek Python
+    regex motorunda sabit önek optimizasyonunu kaybettirip daha yavaş çalışıyor).
     """
-    if not text:
-        return ""
-    # Gövde içinde geçen "Şartlar:" etiketini kaldır (başlık olarak yeniden oluşturulacak)
-    text = re.sub(r"(?mi)(?<!^)\bŞartlar:\s*", "", text, flags=re.IGNORECASE)
-
-    # Başlıklardan sonra aynı satırda başlayan maddeleri aşağı satıra indir
-    for head in ("Şartlar:", "İstisnalar:", "Adımlar:"):
-        text = re.sub(rf"{head}\s*-\s+", head + "\n- ", text)
-        # Başlık bloğu sonuna kadar, satır içinde bitişik maddeleri alt satıra böl
-        def _split_inline_bullets(block: str) -> str:
-            return re.sub(r"(?<!\n)\s*-\s*(?=\S)", "\n- ", block)
-        text = re.sub(rf"({head}[\s\S]*?)(?=\n\n|$)", lambda m: _split_inline_bullets(m.group(1)), text)
-
-    lines = text.splitlines()
-    normalized: List[str] = []
-    current_bullet = None
-    for ln in lines:
-        # Aynı satırda birden fazla madde varsa satır içi madde ayrıştırma
-        if ln.count("- ") >= 2 or re.search(r"\S-\s*\S", ln):
-            ln = re.sub(r"\s*-\s*(?=\S)", "\n- ", ln)
-
-        # Başta gelen çeşitli madde işaretlerini normalize et
-        m = re.match(r"^\s*([\-\*•])\s*(.*)$", ln)
-        if m:
-            # Yeni bir madde başlıyor
-            if current_bullet is not None:
-                normalized.append(current_bullet.strip())
-            content = m.group(2).strip()
-            # Yıldızla başlayan kalın/italic işaretlerini temizle
-            content = re.sub(r"^\*+\s*", "", content)
-            current_bullet = f"- {content}"
-        else:
-            # Mevcut maddenin devamıysa ekle, değilse normal satır
-            if current_bullet is not None and ln.strip():
-                tail = ln.strip()
-                # Ortadaki çıplak yıldızları temizle
-                tail = re.sub(r"^\*+\s*", "", tail)
-                current_bullet += f" {tail}"
-            else:
-                if current_bullet is not None:
-                    normalized.append(current_bullet.strip())
-                    current_bullet = None
-                if ln.strip():
-                    normalized.append(ln.strip())
-    if current_bullet is not None:
-        normalized.append(current_bullet.strip())
-    out = "\n".join(normalized)
-    # Çift boşlukları sadeleştir
-    out = re.sub(r"\s+", " ", out)
-    out = re.sub(r"\s*\n\s*", "\n", out).strip()
-    return out
+
+    # Dosya değişikliği en fazla bu aralıkla kontrol edilir (saniye)
+    CHECK_INTERVAL = 1.0
+
+    def __init__(self, config_path: str):
+        self.config_path = config_path
+        self._mtime = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self.strip_patterns: List["re.Pattern"] = []
+        self.replacements: List[tuple] = []
+        self._maybe_reload(force=True)
+
+    def _maybe_reload(self, force: bool = False) -> None:
+        now = time.monotonic()
+        if not force and now - self._checked_at < self.CHECK_INTERVAL:
+            return
+        self._checked_at = now
+        try:
+            mtime = os.stat(self.config_path).st_mtime
+        except OSError:
+            mtime = None
+        if not force and mtime == self._mtime:
+            return
+        with self._lock:
+            rules = load_rules(self.config_path) if mtime is not None else {}
+            self._compile(rules)
+            self._mtime = mtime
+
+    def _compile(self, rules: Dict) -> None:
+        strip_patterns = []
+        for pat in rules.get('strip_patterns', []) or []:
+            try:
+                strip_patterns.append(re.compile(pat, re.IGNORECASE | re.MULTILINE))
+            except re.error as e:
+                print(f"⚠️ Geçersiz silme deseni atlandı ({pat}): {e}")
+        replacements = []
+        for item in rules.get('replacements', []) or []:
+            pat = item.get('pattern')
+            if not pat:
+                continue
+            try:
+                replacements.append((re.compile(pat, re.IGNORECASE), item.get('replace', '')))
+            except re.error as e:
+                print(f"⚠️ Geçersiz değiştirme deseni atlandı ({pat}): {e}")
+        # Listeler tek atamayla değişir; okuyan thread yarım derlenmiş kural görmez
+        self.strip_patterns = strip_patterns
+        self.replacements = replacements
+
+    def apply_rules(self, text: str) -> str:
+        self._maybe_reload()
+        t = text
+        for rx in self.strip_patterns:
+            t = rx.sub("", t)
+        for rx, rep in self.replacements:
+            t = rx.sub(rep, t)
+        return t
+
+_engines: Dict[str, TextRulesEngine] = {}
+
+def get_rules_engine(config_path: str) -> TextRulesEngine:
+    """Yol başına tek motor (süreç ömrü boyunca önbellekte)."""
+    key = os.path.abspath(config_path)
+    engine = _engines.get(key)
+    if engine is None:
+        engine = _engines[key] = TextRulesEngine(key)
+    return engine
 
 def normalize_text_pipeline(text: str, config_path: str) -> str:
     if not text:
         return ""
-    rules = load_rules(config_path)
     t = normalize_unicode(text)
-    t = apply_strip_patterns(t, rules.get('strip_patterns', []))
-    t = apply_replacements(t, rules.get('replacements', []))
+    t = get_rules_engine(config_path).apply_rules(t)
     t = normalize_bullets(t)
     t = normalize_whitespace(t)
     return t
-
-
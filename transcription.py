@@ -0,0 +1,726 @@
+"""
+Ses transkripsiyon yardımcıları
+- Medyayı tek geçişte çözer: 16k mono FLAC ara dosya + enerji tabanlı sessizlik tespiti
+- Sessizlik/duraklamaları atıp konuşmayı segmentlere paketler; segmentler sıkıştırılmış
+  codec (FLAC/Opus) ile yazılır, kaynak zamanına eşleme (pieces) segmentle birlikte tutulur
+- Konuşma ortasında kesilen segmentler hafif örtüşür; kelimeler segment sınırında kesilmez
+- Transkripsiyon motoru yapılandırmayla seçilir: Groq Whisper API veya çevrimdışı yerel
+  CPU motoru (faster-whisper, int8); motorlar throughput (ses-sn / duvar-sn) raporlar
+- Segmentleri eşzamanlılık ve dakika başı istek sınırı altında paralel transcribe eder
+- Geçici hatalarda (429, 5xx, ağ) üstel bekleme ile yeniden dener
+- Sonuçları özgün sırayla birleştirir, örtüşme bölgesinde tekrar eden kelimeleri atar
+- Ham transkripti içerik hash'i + parametrelerle kalıcı önbelleğe yazar (tekrar yüklemede anında döner)
+"""
+
+import os
+import re
+import json
+import time
+import random
+import hashlib
+import subprocess
+import threading
+from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional, Tuple
+
+import ffmpeg
+
+try:
+    from faster_whisper import WhisperModel
+except Exception:  # yerel motor opsiyonel; yoksa yalnızca Groq kullanılabilir
+    WhisperModel = None
+
+# Yeniden denenecek ağ hataları (bağlantı kopması, zaman aşımı); kurulu istemcilerin türleri eklenir
+_TRANSPORT_ERRORS: Tuple[type, ...] = (ConnectionError, TimeoutError)
+try:
+    import groq
+    _TRANSPORT_ERRORS += (groq.APIConnectionError,)  # APITimeoutError da bunun alt sınıfı
+except ImportError:
+    pass
+try:
+    import httpx
+    _TRANSPORT_ERRORS += (httpx.TransportError,)
+except ImportError:
+    pass
+try:
+    import requests
+    _TRANSPORT_ERRORS += (requests.ConnectionError, requests.Timeout)
+except ImportError:
+    pass
+
+WHISPER_MODEL = "whisper-large-v3-turbo"
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(__file__), "data", "cache", "transcripts")
+
+# Segment uzunluğu: 413 hatasını önlemek için ~9 dk (540 sn, ham WAV)
+SEGMENT_SECONDS = 540.0
+
+# Segment codec'leri; sıkıştırılmış codec'lerde aynı yükleme sınırına daha uzun konuşma sığar
+CODECS = {
+    "wav": {"ext": "wav", "args": {"acodec": "pcm_s16le", "format": "wav"}, "segment_seconds": SEGMENT_SECONDS},
+    "flac": {"ext": "flac", "args": {"acodec": "flac", "format": "flac"}, "segment_seconds": 900.0},
+    "opus": {"ext": "ogg", "args": {"acodec": "libopus", "audio_bitrate": "24k", "application": "voip",
+                                    "format": "ogg"}, "segment_seconds": 1800.0},
+}
+
+# Yeniden denenecek HTTP durumları (hız sınırı ve sunucu tarafı geçici hatalar)
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+# `ffmpeg -i` çıktısındaki kapsayıcı süresi
+_DURATION_LINE = re.compile(r"Duration:\s*(\d+):(\d+):(\d+(?:\.\d+)?)")
+
+# silencedetect çıktısı
+_SILENCE_START = re.compile(r"silence_start:\s*(-?[\d.]+)")
+_SILENCE_END = re.compile(r"silence_end:\s*(-?[\d.]+)")
+
+# Örtüşme eşleştirmesi için kelime normalizasyonu (noktalama ve büyük/küçük harf farkı yok sayılır)
+_WORD_STRIP = re.compile(r"[^\w]+")
+
+
+class RateLimiter:
+    """Kayan pencere: son 60 saniyede en fazla `per_minute` istek (0 = sınırsız)."""
+
+    def __init__(self, per_minute: int = 0):
+        self.per_minute = max(0, per_minute)
+        self._calls: deque = deque()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        if not self.per_minute:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                while self._calls and now - self._calls[0] >= 60.0:
+                    self._calls.popleft()
+                if len(self._calls) < self.per_minute:
+                    self._calls.append(now)
+                    return
+                wait = 60.0 - (now - self._calls[0])
+            time.sleep(max(wait, 0.05))
+
+
+def _ffprobe_cmd(ffmpeg_cmd: str) -> str:
+    """ffmpeg ile aynı klasördeki ffprobe (yoksa PATH'teki)."""
+    folder, name = os.path.split(ffmpeg_cmd)
+    probe = os.path.join(folder, name.replace("ffmpeg", "ffprobe", 1))
+    return probe if folder and os.path.exists(probe) else "ffprobe"
+
+
+def probe_duration(path: str, cmd: str = "ffmpeg") -> float:
+    """
+    Süreyi kapsayıcı (container) üst verisinden okur; ses çözülmez.
+    ffprobe yoksa (örn. imageio-ffmpeg) `ffmpeg -i` başlık çıktısındaki Duration satırı kullanılır.
+    Okunamazsa 0.0 döner.
+    """
+    try:
+        info = ffmpeg.probe(path, cmd=_ffprobe_cmd(cmd))
+        duration = float(info.get("format", {}).get("duration") or 0)
+        if duration > 0:
+            return duration
+    except Exception:
+        pass
+    try:
+        proc = subprocess.run([cmd, "-hide_banner", "-i", path], capture_output=True, timeout=60)
+        m = _DURATION_LINE.search(proc.stderr.decode("utf-8", "replace"))
+        if m:
+            h, mnt, sec = m.groups()
+            return int(h) * 3600 + int(mnt) * 60 + float(sec)
+    except Exception:
+        pass
+    return 0.0
+
+
+def prepare_audio(source_path: str, out_path: str, trim_silence: bool = True,
+                  silence_db: float = -35.0, min_silence: float = 1.0, cmd: str = "ffmpeg") -> List[Tuple[float, Optional[float]]]:
+    """
+    Yüklenen medyayı tek geçişte çözer: 16k mono FLAC ara dosya yazar (kayıpsız, küçük,
+    çözmesi ucuz) ve aynı geçişte enerji tabanlı sessizlik tespiti (silencedetect) yapar.
+    Dönüş: sessizlik aralıkları [(başlangıç, bitiş | None)], bitiş None ise dosya sonuna kadar.
+    """
+    audio = ffmpeg.input(source_path).audio.filter("aresample", 16000)
+    if trim_silence:
+        split = audio.filter_multi_output("asplit", 2)
+        main_out = split[0].output(out_path, ac=1, ar=16000, acodec="flac", format="flac")
+        detect = (
+            split[1]
+            .filter("silencedetect", noise=f"{silence_db}dB", d=min_silence)
+            .output("-", format="null")
+        )
+        graph = ffmpeg.merge_outputs(main_out, detect)
+    else:
+        graph = audio.output(out_path, ac=1, ar=16000, acodec="flac", format="flac")
+    _, err = (
+        graph
+        .global_args("-nostats", "-loglevel", "info")
+        .overwrite_output()
+        .run(cmd=cmd, capture_stdout=True, capture_stderr=True)
+    )
+    silences: List[Tuple[float, Optional[float]]] = []
+    for line in err.decode("utf-8", "replace").splitlines():
+        m = _SILENCE_START.search(line)
+        if m:
+            silences.append((float(m.group(1)), None))
+            continue
+        m = _SILENCE_END.search(line)
+        if m and silences and silences[-1][1] is None:
+            silences[-1] = (silences[-1][0], float(m.group(1)))
+    return silences
+
+
+def audio_sha256(path: str, cmd: str = "ffmpeg") -> str:
+    """
+    Çözülmüş ses örneklerinin sha256'sı (ffmpeg hash muxer). Kapsayıcıdan, üst veriden ve
+    video akışından bağımsızdır: aynı ses farklı kapsayıcıyla yüklense de aynı hash çıkar.
+    prepare_audio'nun yazdığı 16k mono FLAC üzerinde çalıştırılır (çözmesi ucuz).
+    """
+    out, _ = (
+        ffmpeg.input(path).audio
+        .output("-", format="hash", hash="sha256")
+        .global_args("-nostats", "-loglevel", "error")
+        .run(cmd=cmd, capture_stdout=True, capture_stderr=True)
+    )
+    # Çıktı: "SHA256=<hex>"
+    return out.decode("utf-8", "replace").strip().split("=", 1)[-1].lower()
+
+
+def speech_intervals(duration: float, silences: List[Tuple[float, Optional[float]]],
+                     padding: float = 0.3) -> List[Tuple[float, float]]:
+    """
+    Sessizliklerin tümleyeni: konuşma aralıkları. Her sessizlik iki yandan `padding`
+    kadar daraltılır (kelime başı/sonu kırpılmasın); daraltınca boş kalan sessizlik atılmaz.
+    """
+    if duration <= 0:
+        return []
+    intervals: List[Tuple[float, float]] = []
+    cursor = 0.0
+    for start, end in silences:
+        # Dosya sonuna dayanan sessizlik (silence_end EOF'ta yazılır) sona kadar sayılır
+        end = duration if end is None or end >= duration - 0.1 else end
+        cut_start = max(0.0, start + padding) if start > 0 else 0.0
+        cut_end = min(duration, end - padding) if end < duration else duration
+        if cut_end <= cut_start:
+            continue
+        if cut_start > cursor:
+            intervals.append((cursor, cut_start))
+        cursor = max(cursor, cut_end)
+    if cursor < duration:
+        intervals.append((cursor, duration))
+    return intervals
+
+
+def plan_segments(intervals: List[Tuple[float, float]], segment_seconds: float = SEGMENT_SECONDS,
+                  overlap_seconds: float = 2.0) -> List[Dict]:
+    """
+    Konuşma aralıklarını segmentlere paketler; her segment en fazla segment_seconds
+    konuşma taşır. Mümkünse sessizlik boşluğunda kesilir (örtüşme gerekmez); konuşma
+    ortasında kesilirse sonraki segment overlap_seconds geriden başlar.
+    Segment: {"start", "duration", "pieces": [[segment_ofseti, kaynak_başlangıcı, uzunluk]], "overlaps_previous"}
+    """
+    overlap_seconds = min(overlap_seconds, segment_seconds / 4)
+    segments: List[Dict] = []
+    pieces: List[Tuple[float, float]] = []
+    length = 0.0
+    overlaps = False
+
+    def close() -> None:
+        offset = 0.0
+        mapped = []
+        for a, b in pieces:
+            mapped.append([offset, a, b - a])
+            offset += b - a
+        segments.append({"start": pieces[0][0], "duration": offset, "pieces": mapped,
+                         "overlaps_previous": overlaps})
+
+    for a, b in intervals:
+        while b - a > 1e-6:
+            room = segment_seconds - length
+            if b - a <= room:
+                pieces.append((a, b))
+                length += b - a
+                break
+            if pieces and length >= segment_seconds / 2:
+                # Segment yeterince dolu: sessizlik boşluğunda kes
+                close()
+                pieces, length, overlaps = [], 0.0, False
+                continue
+            pieces.append((a, a + room))
+            close()
+            a = a + room - overlap_seconds
+            pieces, length, overlaps = [], 0.0, True
+    if pieces:
+        close()
+    return segments
+
+
+def encode_segments(audio_path: str, segments: List[Dict], out_dir: str, codec: str = "flac",
+                    cmd: str = "ffmpeg") -> List[Dict]:
+    """
+    Planlanan segmentleri tek ffmpeg geçişinde seçilen codec ile yazar (her parça atrim ile
+    kesilir, parçalar concat ile birleştirilir; atılan sessizlikler dosyaya girmez).
+    Segmentlere "path" eklenmiş listeyi döndürür.
+    """
+    spec = CODECS[codec]
+    os.makedirs(out_dir, exist_ok=True)
+    segments = [dict(seg, path=os.path.join(out_dir, f"part_{i:03d}.{spec['ext']}")) for i, seg in enumerate(segments)]
+    tmp_paths = [os.path.join(out_dir, f"part_{i:03d}.part.{spec['ext']}") for i in range(len(segments))]
+    total_pieces = sum(len(seg["pieces"]) for seg in segments)
+    if not total_pieces:
+        return []
+
+    audio = ffmpeg.input(audio_path).audio
+    split = audio.filter_multi_output("asplit", total_pieces) if total_pieces > 1 else None
+    outputs = []
+    n = 0
+    for seg, tmp in zip(segments, tmp_paths):
+        branches = []
+        for _, source_start, length in seg["pieces"]:
+            stream = split[n] if split is not None else audio
+            n += 1
+            branches.append(
+                stream
+                .filter("atrim", start=source_start, end=source_start + length)
+                .filter("asetpts", "PTS-STARTPTS")
+            )
+        joined = branches[0] if len(branches) == 1 else ffmpeg.concat(*branches, v=0, a=1)
+        outputs.append(joined.output(tmp, ac=1, ar=16000, **spec["args"]))
+    (
+        ffmpeg
+        .merge_outputs(*outputs)
+        .global_args("-loglevel", "error")
+        .overwrite_output()
+        .run(cmd=cmd)
+    )
+    for tmp, seg in zip(tmp_paths, segments):
+        os.replace(tmp, seg["path"])
+    return segments
+
+
+def groq_transcribe(client, path: str, language: str, model: str = WHISPER_MODEL) -> Dict:
+    """Tek segmenti Groq Whisper ile transcribe eder. Dönüş: {"text", "duration"}"""
+    with open(path, "rb") as af:
+        tr = client.audio.transcriptions.create(
+            model=model,
+            file=af,
+            language=language,
+            response_format="verbose_json"
+        )
+    try:
+        duration = float(getattr(tr, "duration", 0) or 0)
+    except Exception:
+        duration = 0.0
+    return {"text": (tr.text or "").strip(), "duration": duration, "segments": _verbose_segments(tr)}
+
+
+def _verbose_segments(tr) -> List[Dict]:
+    """verbose_json zaman damgalı parçaları (segment dosyasına göre saniye): [{"start", "end", "text"}]"""
+    out: List[Dict] = []
+    for item in getattr(tr, "segments", None) or []:
+        get = item.get if isinstance(item, dict) else (lambda k, obj=item: getattr(obj, k, None))
+        try:
+            out.append({"start": float(get("start") or 0), "end": float(get("end") or 0),
+                        "text": (get("text") or "").strip()})
+        except (TypeError, ValueError):
+            continue
+    return out
+
+
+class TranscriptionBackend(ABC):
+    """
+    Transkripsiyon motoru arayüzü. transcribe(path, language) → {"text", "duration", "segments"}
+    Her çağrının ses süresi ve duvar saati süresi toplanır (throughput: ses-sn / duvar-sn).
+    """
+
+    name = "base"
+    # Uzak servis: hız sınırı ve yeniden deneme uygulanır; yerel motor CPU'ya bağlıdır
+    remote = False
+    max_concurrency: Optional[int] = None
+
+    def __init__(self):
+        self.requests = 0
+        self.audio_seconds = 0.0
+        self.wall_seconds = 0.0
+        self._stats_lock = threading.Lock()
+
+    @property
+    @abstractmethod
+    def model_id(self) -> str:
+        """Transkripti etkileyen model kimliği (önbellek anahtarına girer)."""
+
+    @abstractmethod
+    def _transcribe(self, path: str, language: str) -> Dict:
+        """Tek segment dosyasını çözer: {"text", "duration", "segments"}"""
+
+    def transcribe(self, path: str, language: str) -> Dict:
+        started = time.perf_counter()
+        result = self._transcribe(path, language)
+        elapsed = time.perf_counter() - started
+        with self._stats_lock:
+            self.requests += 1
+            self.audio_seconds += result.get("duration") or 0.0
+            self.wall_seconds += elapsed
+        return result
+
+    def concurrency(self, requested: int) -> int:
+        if self.max_concurrency:
+            return max(1, min(requested, self.max_concurrency))
+        return max(1, requested)
+
+    def stats(self) -> Dict:
+        return {
+            "backend": self.name,
+            "model": self.model_id,
+            "requests": self.requests,
+            "audio_seconds": round(self.audio_seconds, 1),
+            "wall_seconds": round(self.wall_seconds, 1),
+            # İstek başına hız; paralel çalışmada toplam hız bunun eşzamanlılık katıdır
+            "audio_seconds_per_wall_second": round(self.audio_seconds / self.wall_seconds, 2) if self.wall_seconds else None,
+        }
+
+
+class GroqBackend(TranscriptionBackend):
+    """Groq Whisper API (ağ gerekir, dakika başı istek sınırı vardır)."""
+
+    name = "groq"
+    remote = True
+
+    def __init__(self, client, model: str = WHISPER_MODEL):
+        super().__init__()
+        self.client = client
+        self.model = model
+
+    @property
+    def model_id(self) -> str:
+        return self.model
+
+    def _transcribe(self, path: str, language: str) -> Dict:
+        return groq_transcribe(self.client, path, language, model=self.model)
+
+
+class LocalWhisperBackend(TranscriptionBackend):
+    """
+    Çevrimdışı yerel CPU motoru: faster-whisper (CTranslate2, int8 nicemlenmiş Whisper).
+    Model ilk kullanımda yüklenir; eşzamanlı çağrı sayısı num_workers ile sınırlıdır.
+    """
+
+    name = "local"
+
+    def __init__(self, model_size: str = "small", compute_type: str = "int8",
+                 cpu_threads: int = 0, num_workers: int = 1, beam_size: int = 1):
+        super().__init__()
+        if WhisperModel is None:
+            raise RuntimeError("faster-whisper kurulu değil (pip install faster-whisper)")
+        self.model_size = model_size
+        self.compute_type = compute_type
+        self.cpu_threads = cpu_threads
+        self.num_workers = max(1, num_workers)
+        self.beam_size = beam_size
+        self.max_concurrency = self.num_workers
+        self._model = None
+        self._load_lock = threading.Lock()
+
+    @property
+    def model_id(self) -> str:
+        return f"faster-whisper:{self.model_size}:{self.compute_type}"
+
+    def _load(self):
+        with self._load_lock:
+            if self._model is None:
+                started = time.perf_counter()
+                self._model = WhisperModel(self.model_size, device="cpu", compute_type=self.compute_type,
+                                           cpu_threads=self.cpu_threads, num_workers=self.num_workers)
+                print(f"✅ Yerel Whisper modeli yüklendi: {self.model_id} ({time.perf_counter() - started:.1f} sn)")
+        return self._model
+
+    def _transcribe(self, path: str, language: str) -> Dict:
+        parts, info = self._load().transcribe(path, language=language, beam_size=self.beam_size)
+        segments = [{"start": float(p.start), "end": float(p.end), "text": p.text.strip()} for p in parts]
+        return {
+            "text": " ".join(p["text"] for p in segments if p["text"]).strip(),
+            "duration": float(getattr(info, "duration", 0) or 0),
+            "segments": segments,
+        }
+
+
+def create_transcription_backend(groq_client=None) -> TranscriptionBackend:
+    """
+    TRANSCRIBE_BACKEND=groq (varsayılan) | local
+    local için: LOCAL_WHISPER_MODEL (varsayılan small), LOCAL_WHISPER_COMPUTE_TYPE (int8),
+    LOCAL_WHISPER_THREADS (0 = otomatik), LOCAL_WHISPER_WORKERS (eşzamanlı segment, varsayılan 1),
+    LOCAL_WHISPER_BEAM_SIZE (varsayılan 1)
+    Yerel motor başlatılamazsa Groq'a düşülür.
+    """
+    backend = os.getenv("TRANSCRIBE_BACKEND", "groq").lower()
+    if backend == "local":
+        try:
+            engine = LocalWhisperBackend(
+                model_size=os.getenv("LOCAL_WHISPER_MODEL", "small"),
+                compute_type=os.getenv("LOCAL_WHISPER_COMPUTE_TYPE", "int8"),
+                cpu_threads=int(os.getenv("LOCAL_WHISPER_THREADS", "0")),
+                num_workers=int(os.getenv("LOCAL_WHISPER_WORKERS", "1")),
+                beam_size=int(os.getenv("LOCAL_WHISPER_BEAM_SIZE", "1")),
+            )
+            print(f"✅ Transkripsiyon motoru: yerel ({engine.model_id})")
+            return engine
+        except Exception as e:
+            print(f"⚠️ Yerel transkripsiyon motoru kullanılamıyor, Groq kullanılacak: {e}")
+    print(f"✅ Transkripsiyon motoru: Groq ({WHISPER_MODEL})")
+    return GroqBackend(groq_client)
+
+
+def _status_code(error: Exception) -> Optional[int]:
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status
+
+
+def _transient(error: Exception) -> bool:
+    """Ağ hatası, zaman aşımı, 429 veya 5xx mi? Diğer her şey (4xx, hatalı yanıt, yerel hata) kalıcıdır."""
+    status = _status_code(error)
+    if status is not None:
+        return status in RETRY_STATUS
+    return isinstance(error, _TRANSPORT_ERRORS)
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if not headers:
+        return None
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def call_with_retry(fn: Callable[[], Dict], retries: int = 3, backoff: float = 2.0,
+                    max_backoff: float = 60.0, limiter: Optional[RateLimiter] = None) -> Dict:
+    """
+    fn'i geçici hatalarda (ağ, zaman aşımı, 429, 5xx) üstel bekleme (+ rastgele sapma) ile
+    yeniden dener. Sunucu Retry-After gönderirse o süre beklenir; diğer hatalar hemen yükseltilir.
+    """
+    attempt = 0
+    while True:
+        if limiter is not None:
+            limiter.acquire()
+        try:
+            return fn()
+        except Exception as e:
+            if not _transient(e) or attempt >= retries:
+                raise
+            delay = _retry_after(e)
+            if delay is None:
+                delay = min(max_backoff, backoff * (2 ** attempt)) * (0.5 + random.random() / 2)
+            attempt += 1
+            print(f"🔁 Transkripsiyon yeniden denenecek ({attempt}/{retries}, {delay:.1f} sn): {e}")
+            time.sleep(delay)
+
+
+def transcribe_segments(segments: List[Dict], transcribe: Callable[[str], Dict],
+                        concurrency: int = 4, limiter: Optional[RateLimiter] = None,
+                        retries: int = 3, done: Optional[Dict[int, Dict]] = None,
+                        on_result: Optional[Callable[[int, Dict], None]] = None) -> List[Dict]:
+    """
+    Segmentleri paralel transcribe eder ve sonuçları segment sırasıyla döndürür.
+    done: önceden tamamlanmış segment sonuçları (indeks → sonuç), tekrar istek atılmaz.
+    on_result(i, sonuç) her segment bittiğinde (worker thread'inden) çağrılır.
+    """
+    results: Dict[int, Dict] = dict(done or {})
+    pending = [i for i in range(len(segments)) if i not in results]
+    if pending:
+        workers = max(1, min(concurrency, len(pending)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="transcribe") as pool:
+            futures = {
+                pool.submit(call_with_retry, lambda p=segments[i]["path"]: transcribe(p),
+                            retries, limiter=limiter): i
+                for i in pending
+            }
+            for future in as_completed(futures):
+                i = futures[future]
+                results[i] = future.result()
+                if on_result is not None:
+                    on_result(i, results[i])
+    return [results[i] for i in range(len(segments))]
+
+
+def _norm_word(word: str) -> str:
+    return _WORD_STRIP.sub("", word.lower())
+
+
+def merge_overlapping(texts: List[str], overlapping: Optional[List[bool]] = None,
+                      max_words: int = 40, edge_words: int = 2, min_match: int = 2) -> str:
+    """
+    Örtüşen segment metinlerini birleştirir. Önceki metnin sonu ile sonrakinin
+    başı arasında en uzun ortak kelime dizisi aranır (sınırda kesik/yanlış duyulmuş
+    edge_words kelimeye kadar tolerans); eşleşme bulunursa tekrar eden kısım atılır.
+    overlapping[i] False ise i. metin öncekiyle örtüşmez (sessizlikte kesilmiş), doğrudan eklenir.
+    """
+    merged: List[str] = []
+    for i, text in enumerate(texts):
+        words = text.split()
+        if not words:
+            continue
+        if not merged or (overlapping is not None and not overlapping[i]):
+            merged.extend(words)
+            continue
+        tail = [_norm_word(w) for w in merged[-max_words:]]
+        head = [_norm_word(w) for w in words[:max_words]]
+        best = None  # (eşleşme uzunluğu, önceki metinden atılacak, sonrakinden atlanacak)
+        for drop_tail in range(edge_words + 1):
+            t = tail[:len(tail) - drop_tail] if drop_tail else tail
+            for skip_head in range(edge_words + 1):
+                h = head[skip_head:]
+                for k in range(min(len(t), len(h)), min_match - 1, -1):
+                    if t[-k:] == h[:k]:
+                        if best is None or k > best[0]:
+                            best = (k, drop_tail, skip_head)
+                        break
+        if best is None:
+            merged.extend(words)
+            continue
+        k, drop_tail, skip_head = best
+        if drop_tail:
+            merged = merged[:-drop_tail]
+        merged.extend(words[skip_head + k:])
+    return " ".join(merged)
+
+
+def source_time(pieces: List[List[float]], t: float) -> float:
+    """
+    Segment dosyasındaki zamanı (sn) özgün medyadaki zamana çevirir. pieces:
+    [[segment içi başlangıç, kaynak başlangıç, uzunluk], ...] (plan_segments çıktısı);
+    boşsa segment kaynağın başından başlar.
+    """
+    if not pieces:
+        return t
+    for offset, src_start, length in pieces:
+        if t < offset + length:
+            return src_start + max(0.0, t - offset)
+    offset, src_start, length = pieces[-1]
+    return src_start + length
+
+
+def timed_parts(segments: List[Dict], min_text: int = 1) -> List[Dict]:
+    """
+    Segment transkriptlerindeki verbose_json parçalarını özgün medya zamanına taşır:
+    [{"start", "end", "text"}]. Örtüşen segmentte, önceki segmentin zaten kapsadığı
+    parçalar (orta noktası önceki son parçanın bitişinden önce olanlar) atılır.
+    Herhangi bir segmentte parça bilgisi yoksa boş liste döner (düz metne geri dönülür).
+    """
+    out: List[Dict] = []
+    last_end = 0.0
+    for seg in segments:
+        parts = seg.get("segments")
+        if not parts:
+            if (seg.get("text") or "").strip():
+                return []
+            continue
+        pieces = seg.get("pieces") or []
+        overlaps = seg.get("overlaps_previous", True)
+        for part in parts:
+            text = (part.get("text") or "").strip()
+            if len(text) < min_text:
+                continue
+            start = source_time(pieces, float(part.get("start") or 0))
+            end = max(start, source_time(pieces, float(part.get("end") or 0)))
+            if out and overlaps and (start + end) / 2 < last_end:
+                continue
+            out.append({"start": round(start, 2), "end": round(end, 2), "text": text})
+            last_end = max(last_end, end)
+    return out
+
+
+def transcript_cache_key(content_hash: str, model: str, language: str, options: Dict) -> str:
+    """
+    Ses içeriği (audio_sha256) + transkripsiyon parametreleri (segment uzunluğu, örtüşme, codec,
+    sessizlik ayarları); biri değişirse önbellek kullanılmaz.
+    """
+    options = {k: float(v) if isinstance(v, (int, float)) and not isinstance(v, bool) else v
+               for k, v in options.items()}
+    payload = json.dumps([content_hash, model, language, options], sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class TranscriptCache:
+    """
+    Kalıcı transkript önbelleği (anahtar başına bir JSON dosyası). Ham verbose
+    transkripti (segmentler, zaman damgaları, birleştirilmiş metin) saklar; aynı
+    medya tekrar yüklendiğinde ffmpeg ve Whisper çağrıları atlanır, temizleme
+    seçenekleri yeniden uygulanabilir.
+    """
+
+    def __init__(self, directory: Optional[str] = None, enabled: bool = True):
+        self.directory = os.path.abspath(directory or DEFAULT_CACHE_DIR)
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key: str) -> Optional[Dict]:
+        if not self.enabled:
+            return None
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                value = json.load(f)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except Exception as e:
+            print(f"⚠️ Transkript önbelleği okunamadı ({key[:12]}): {e}")
+            self.misses += 1
+            return None
+        self.hits += 1
+        return value
+
+    def put(self, key: str, value: Dict) -> None:
+        if not self.enabled:
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = self._path(key) + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(value, f, ensure_ascii=False)
+            os.replace(tmp_path, self._path(key))
+        except Exception as e:
+            print(f"⚠️ Transkript önbelleği yazılamadı ({key[:12]}): {e}")
+
+    def stats(self) -> Dict:
+        return {"enabled": self.enabled, "hits": self.hits, "misses": self.misses, "path": self.directory}
+
+
+def create_transcript_cache() -> TranscriptCache:
+    """TRANSCRIPT_CACHE=0 önbelleği kapatır; TRANSCRIPT_CACHE_DIR konumu değiştirir."""
+    return TranscriptCache(
+        os.getenv("TRANSCRIPT_CACHE_DIR") or None,
+        enabled=os.getenv("TRANSCRIPT_CACHE", "1") != "0",
+    )
+
+
+def transcription_settings() -> Dict:
+    """
+    Ortam değişkenleri:
+      TRANSCRIBE_CONCURRENCY (varsayılan 4), TRANSCRIBE_RPM (dakika başı istek, varsayılan 20, 0 = sınırsız),
+      TRANSCRIBE_RETRIES (varsayılan 3), TRANSCRIBE_OVERLAP_SECONDS (varsayılan 2),
+      TRANSCRIBE_CODEC (flac | opus | wav, varsayılan flac), TRANSCRIBE_SEGMENT_SECONDS (varsayılan codec'e göre),
+      TRANSCRIBE_TRIM_SILENCE (varsayılan 1), TRANSCRIBE_SILENCE_DB (varsayılan -35),
+      TRANSCRIBE_MIN_SILENCE (atılacak en kısa sessizlik, sn, varsayılan 1.0)
+    """
+    codec = os.getenv("TRANSCRIBE_CODEC", "flac").lower()
+    if codec not in CODECS:
+        print(f"⚠️ Bilinmeyen TRANSCRIBE_CODEC={codec}, flac kullanılacak")
+        codec = "flac"
+    return {
+        "concurrency": int(os.getenv("TRANSCRIBE_CONCURRENCY", "4")),
+        "per_minute": int(os.getenv("TRANSCRIBE_RPM", "20")),
+        "retries": int(os.getenv("TRANSCRIBE_RETRIES", "3")),
+        "overlap_seconds": float(os.getenv("TRANSCRIBE_OVERLAP_SECONDS", "2")),
+        "codec": codec,
+        "segment_seconds": float(os.getenv("TRANSCRIBE_SEGMENT_SECONDS") or CODECS[codec]["segment_seconds"]),
+        "trim_silence": os.getenv("TRANSCRIBE_TRIM_SILENCE", "1") != "0",
+        "silence_db": float(os.getenv("TRANSCRIBE_SILENCE_DB", "-35")),
+        "min_silence": float(os.getenv("TRANSCRIBE_MIN_SILENCE", "1.0")),
+    }
@@ -4,14 +4,62 @@ FAISS kullanarak embedding'leri saklama ve arama yapma
 """
 
 import os
+import copy
 import json
-from typing import List, Dict
+import faiss
+from typing import Container, Dict, Iterator, List, Optional, Tuple
 from datetime import datetime
-from langchain.text_splitter import RecursiveCharacterTextSplitter
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
 from langchain_community.embeddings import HuggingFaceEmbeddings
 from langchain_community.vectorstores import FAISS
 from langchain.schema import Document
 
+try:
+    from vectorstore.turkish_splitter import create_text_splitter
+except ImportError:  # script olarak vectorstore/ içinden çalıştırıldığında
+    from turkish_splitter import create_text_splitter
+
+def timestamp_url(url: str, seconds) -> str:
+    """
+    Kaynak bağlantısını verilen saniyeye derin bağlantıya çevirir: YouTube için t=<sn>s
+    parametresi, diğer medya adresleri için #t=<sn> (HTML5 medya parçası).
+    """
+    if not url or seconds is None:
+        return url or ""
+    t = max(0, int(seconds))
+    parts = urlsplit(url)
+    host = parts.netloc.lower()
+    if host.endswith("youtube.com") or host.endswith("youtu.be"):
+        query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k != "t"]
+        query.append(("t", f"{t}s"))
+        return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(query), parts.fragment))
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, parts.query, f"t={t}"))
+
+
+def iter_clean_records(filepath: str) -> Iterator[Dict]:
+    """
+    Temiz veri kayıtlarını tek tek döndürür. .jsonl satır satır akıtılır (dosya belleğe
+    alınmaz, yarım yazılmış son satır atlanır); eski .json dosyaları bütün olarak okunur.
+    """
+    if filepath.endswith(".jsonl"):
+        with open(filepath, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+        return
+    with open(filepath, 'r', encoding='utf-8') as f:
+        yield from json.load(f)
+
+
+def is_clean_data_file(filename: str) -> bool:
+    return filename.startswith('clean_blog_data_') and filename.endswith(('.json', '.jsonl'))
+
+
 class OptimizedVectorStoreBuilder:
     def __init__(self, embedding_model: str = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"):
         """
@@ -22,65 +70,124 @@ class OptimizedVectorStoreBuilder:
         print(f"🤖 Embedding modeli yükleniyor: {embedding_model}")
         self.embeddings = HuggingFaceEmbeddings(model_name=embedding_model)
         
-        # Optimize edilmiş chunking parametreleri
-        # İstek: chunk_size 400–500, overlap 120–150; sayıları/başlıkları kırmayı azalt
-        self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=450,
-            chunk_overlap=120,
-            length_function=len,
-            separators=[
-                "\n\n# ",  # başlık sınırları
-                "\n\n## ",
-                "\n\n",
-                "\n",
-                ". ",
-                ": ",  # madde/başlık bağları
-                ", ",
-                " ",
-                ""
-            ]
-        )
+        # Chunk boyutları embedding modelinin token'larıyla ölçülür (CHUNKER=recursive: eski karakter splitter)
+        self.text_splitter = create_text_splitter(embedding_model)
         print("✅ Text splitter hazırlandı")
     
-    def load_clean_json_data(self, filepath: str) -> List[Document]:
+    def load_clean_json_data(self, filepath: str, indexed_urls: Optional[Container[str]] = None) -> List[Document]:
         """
-        Temiz JSON verisini yükler ve Document objelerine dönüştürür
+        Temiz JSON/JSONL verisini yükler ve Document objelerine dönüştürür
+        indexed_urls (ör. url_index çıktısı): scraper'ın unchanged işaretlediği ve URL'si zaten
+        index'te olan kayıtlar atlanır; incremental ingest yeniden chunk'lamaz/embed etmez.
+        unchanged yalnızca HTTP önbelleğinin aynı gövdeyi daha önce gördüğünü söyler (ör. --scrape-only
+        veya yarım kalan bir ingest sonrası); index'te olmayan sayfa bu yüzden atlanmaz
         """
         print(f"📂 JSON verisi yükleniyor: {filepath}")
         
-        with open(filepath, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        print(f"✅ {len(data)} blog yazısı yüklendi")
-        
         documents = []
         total_words = 0
+        skipped = 0
+        loaded = 0
         
-        for item in data:
-            if item.get('content') and len(item['content'].strip()) > 50:  # Çok kısa içerikleri filtrele
-                # Başlık + İçerik birleştir (daha iyi context için)
-                full_content = f"Başlık: {item.get('title', '')}\n\n{item['content']}"
-                
-                doc = Document(
-                    page_content=full_content,
-                    metadata={
-                        "title": item.get('title', ''),
-                        "author": item.get('author', 'Oktay Özdemir'),
-                        "date": item.get('date', ''),
-                        "url": item.get('url', ''),
-                        "word_count": item.get('word_count', 0),
-                        "content_type": item.get('content_type', 'blog_post'),
-                        "language": item.get('language', 'tr'),
-                        "domain": item.get('domain', 'law_immigration_politics'),
-                        "source_id": item.get('id', len(documents) + 1)
-                    }
-                )
+        for item in iter_clean_records(filepath):
+            loaded += 1
+            if indexed_urls is not None and item.get('unchanged') and item.get('url') in indexed_urls:
+                skipped += 1
+                continue
+            doc = self.record_to_document(item, len(documents) + 1)
+            if doc is not None:
                 documents.append(doc)
                 total_words += item.get('word_count', 0)
         
+        print(f"✅ {loaded} blog yazısı yüklendi")
+        if skipped:
+            print(f"⏭️  {skipped} değişmemiş yazı atlandı")
         print(f"📝 Toplam {total_words:,} kelime işlenecek")
         return documents
 
+    def record_to_document(self, item: Dict, fallback_id: int = 1) -> Optional[Document]:
+        """Temiz veri kaydını Document'e çevirir; çok kısa içerikte None."""
+        if not item.get('content') or len(item['content'].strip()) <= 50:  # Çok kısa içerikleri filtrele
+            return None
+        # Başlık + İçerik birleştir (daha iyi context için)
+        full_content = f"Başlık: {item.get('title', '')}\n\n{item['content']}"
+        return Document(
+            page_content=full_content,
+            metadata={
+                "title": item.get('title', ''),
+                "author": item.get('author', 'Oktay Özdemir'),
+                "date": item.get('date', ''),
+                "url": item.get('url', ''),
+                "word_count": item.get('word_count', 0),
+                "content_type": item.get('content_type', 'blog_post'),
+                "language": item.get('language', 'tr'),
+                "domain": item.get('domain', 'law_immigration_politics'),
+                "source_id": item.get('id', fallback_id)
+            }
+        )
+
+    def remove_documents_by_url(self, vectorstore: FAISS, urls: List[str]) -> int:
+        """
+        Verilen URL'lere ait mevcut chunk'ları FAISS'ten siler (değişen sayfa yeniden
+        eklenmeden önce eski sürümü kalmasın). Dönüş: silinen chunk sayısı
+        """
+        targets = {u for u in urls if u}
+        if not targets:
+            return 0
+        ids = [doc_id for doc_id, doc in vectorstore.docstore._dict.items()
+               if doc.metadata.get("url") in targets]
+        if ids:
+            vectorstore.delete(ids)
+        return len(ids)
+
+    def url_index(self, vectorstore: Optional[FAISS]) -> Dict[str, List[str]]:
+        """Mevcut chunk id'lerinin URL'ye göre haritası (tek geçiş; tekrar tekrar tarama yapmamak için)."""
+        index: Dict[str, List[str]] = {}
+        if vectorstore is None:
+            return index
+        for doc_id, doc in vectorstore.docstore._dict.items():
+            url = doc.metadata.get("url")
+            if url:
+                index.setdefault(url, []).append(doc_id)
+        return index
+
+    def job_index(self, vectorstore: Optional[FAISS], job_id: str) -> Dict[int, List[str]]:
+        """
+        Ingest işinin (metadata job_id) indekse yazılmış chunk id'leri, batch numarasına (job_batch) göre.
+        Kaydedilip checkpoint'e yetişemeyen ekleme yeniden başlatmada tekrar yapılmasın diye kullanılır.
+        """
+        index: Dict[int, List[str]] = {}
+        if vectorstore is None or not job_id:
+            return index
+        for doc_id, doc in vectorstore.docstore._dict.items():
+            if doc.metadata.get("job_id") == job_id:
+                index.setdefault(doc.metadata.get("job_batch", 0), []).append(doc_id)
+        return index
+
+    def copy_vectorstore(self, vectorstore: FAISS) -> FAISS:
+        """
+        Bellekte bağımsız kopya: FAISS indeksi klonlanır, docstore ve pozisyon eşlemesi kopyalanır
+        (Document nesneleri paylaşılır). Yazıcı kopyaya ekler; aramalar sürerken okunan indeks değişmez.
+        """
+        snapshot = copy.copy(vectorstore)
+        snapshot.index = faiss.clone_index(vectorstore.index)
+        snapshot.docstore = copy.copy(vectorstore.docstore)
+        snapshot.docstore._dict = dict(vectorstore.docstore._dict)
+        snapshot.index_to_docstore_id = dict(vectorstore.index_to_docstore_id)
+        return snapshot
+
+    def append_embeddings(self, vectorstore: Optional[FAISS], texts: List[str], vectors: List[List[float]],
+                          metadatas: List[Dict]) -> Tuple[FAISS, List[str]]:
+        """
+        Önceden hesaplanmış embedding'leri ekler; vectorstore yoksa bunlardan oluşturur.
+        Dönüş: (vectorstore, eklenen id'ler)
+        """
+        if vectorstore is None:
+            vectorstore = FAISS.from_embeddings(list(zip(texts, vectors)), self.embeddings, metadatas=metadatas)
+            return vectorstore, list(vectorstore.index_to_docstore_id.values())
+        ids = vectorstore.add_embeddings(list(zip(texts, vectors)), metadatas=metadatas)
+        return vectorstore, ids
+
     def add_texts_with_metadata(self, texts: List[str], metadatas: List[Dict], save_path: str = None):
         """
         Var olan FAISS'e metinleri ekler; yoksa yeni bir FAISS oluşturur.
@@ -103,18 +210,76 @@ class OptimizedVectorStoreBuilder:
         vectorstore.save_local(save_path)
         return True
 
-    def add_transcript_to_vectorstore(self, text: str, meta: Dict | None = None, save_path: str = None) -> int:
+    def split_timed_parts(self, parts: List[Dict]) -> List[Dict]:
         """
-        Video transkript metnini mevcut vectorstore'a ekler.
-        Dönüş: eklenen chunk sayısı
+        Zaman damgalı transkript parçalarını ([{"start", "end", "text"}]) parça sınırlarından
+        chunk'lara paketler; chunk boyutu, örtüşme ve uzunluk ölçüsü (token/karakter) genel splitter
+        ile aynıdır. Örtüşme bütün parçalardan oluşur, tek başına sınırı aşan parça splitter ile bölünür.
+        Dönüş: [{"text", "start", "end"}]
+        """
+        size = self.text_splitter._chunk_size
+        overlap = self.text_splitter._chunk_overlap
+        measure = getattr(self.text_splitter, "_length_function", len)
+        chunks: List[Dict] = []
+        window: List[Dict] = []
+        length = 0
+        fresh = False  # pencerede önceki chunk'ta olmayan parça var mı
+
+        def emit():
+            chunks.append({"text": " ".join(p["text"] for p in window),
+                           "start": window[0]["start"], "end": window[-1]["end"]})
+
+        for part in parts:
+            text = part["text"]
+            n = measure(text)
+            if n > size:
+                if fresh:
+                    emit()
+                for piece in self.text_splitter.split_text(text):
+                    chunks.append({"text": piece, "start": part["start"], "end": part["end"]})
+                window, length, fresh = [], 0, False
+                continue
+            if window and length + 1 + n > size:
+                if fresh:
+                    emit()
+                # Sondaki parçalar örtüşme olarak sonraki chunk'a taşınır
+                keep: List[Dict] = []
+                kept = 0
+                for p in reversed(window):
+                    if kept + p["_n"] + 1 > overlap or kept + p["_n"] + 1 + n > size:
+                        break
+                    keep.insert(0, p)
+                    kept += p["_n"] + 1
+                window, length = keep, max(0, kept - 1)
+            window.append(dict(part, _n=n))
+            length += n + (1 if length else 0)
+            fresh = True
+        if window and fresh:
+            emit()
+        return chunks
+
+    def transcript_chunks(self, text: str, meta: Dict | None = None,
+                          parts: List[Dict] | None = None) -> Tuple[List[str], List[Dict]]:
+        """
+        Transkript/belge metnini chunk'lara ve chunk metadata'larına çevirir (embed etmeden).
+        parts verilirse (zaman damgalı parçalar) chunk'lar parça sınırlarından kesilir ve
+        her chunk'ın metadata'sına start/end (sn) ile o ana giden timestamp_url yazılır.
         """
-        if not text or not text.strip():
-            return 0
         meta = meta or {}
-        chunks = self.text_splitter.split_text(text)
+        if parts:
+            timed = self.split_timed_parts(parts)
+        elif text and text.strip():
+            if hasattr(self.text_splitter, "split_chunks"):
+                # Token splitter: metin içindeki offset'ler ve token sayısı metadata'ya geçer
+                timed = self.text_splitter.split_chunks(text)
+            else:
+                timed = [{"text": c} for c in self.text_splitter.split_text(text)]
+        else:
+            return [], []
+        chunks = [c["text"] for c in timed]
         metadatas: List[Dict] = []
-        for _ in chunks:
-            metadatas.append({
+        for chunk in timed:
+            metadata = {
                 "title": meta.get("title", "Video Transcript"),
                 "url": meta.get("url", ""),
                 "author": meta.get("author", "Video"),
@@ -122,10 +287,51 @@ class OptimizedVectorStoreBuilder:
                 "source_type": meta.get("source_type", "video_transcript"),
                 "video_id": meta.get("video_id"),
                 "duration": meta.get("duration"),
-            })
+            }
+            for key in ("char_start", "char_end", "token_count"):
+                if key in chunk:
+                    metadata[key] = chunk[key]
+            if meta.get("job_id"):
+                # Ingest işi: yeniden başlatmada işin chunk'ları tanınır (job_index)
+                metadata["job_id"] = meta["job_id"]
+            if "start" in chunk:
+                metadata["start"] = chunk["start"]
+                metadata["end"] = chunk["end"]
+                metadata["timestamp_url"] = timestamp_url(metadata["url"], chunk["start"])
+            metadatas.append(metadata)
+        return chunks, metadatas
 
+    def add_transcript_to_vectorstore(self, text: str, meta: Dict | None = None, save_path: str = None,
+                                      parts: List[Dict] | None = None) -> int:
+        """
+        Video transkript metnini mevcut vectorstore'a ekler (chunk'lama: transcript_chunks).
+        Dönüş: eklenen chunk sayısı
+        """
+        chunks, metadatas = self.transcript_chunks(text, meta, parts=parts)
+        if not chunks:
+            return 0
         self.add_texts_with_metadata(chunks, metadatas, save_path=save_path)
         return len(chunks)
+
+    def commit_embeddings(self, texts: List[str], vectors: List[List[float]], metadatas: List[Dict],
+                          save_path: str = None, vectorstore: Optional[FAISS] = None) -> FAISS:
+        """
+        Önceden hesaplanmış embedding'leri FAISS'e ekler ve bir kez kaydeder (yoksa oluşturur).
+        vectorstore: bellekteki yazıcı indeksi; verilirse diskten yüklenmez ve yerinde değiştirilir
+        (aramalarda kullanılan bir indeks verilmemeli, bkz. copy_vectorstore). Verilmezse diskteki
+        indeks yüklenir.
+        """
+        if not save_path:
+            save_path = os.path.join(os.path.dirname(__file__), "..", "data", "vectorstore")
+        os.makedirs(save_path, exist_ok=True)
+        if vectorstore is None:
+            try:
+                vectorstore = FAISS.load_local(save_path, self.embeddings, allow_dangerous_deserialization=True)
+            except Exception:
+                vectorstore = None
+        vectorstore, _ = self.append_embeddings(vectorstore, texts, vectors, metadatas)
+        vectorstore.save_local(save_path)
+        return vectorstore
     
     def split_documents(self, documents: List[Document]) -> List[Document]:
         """
@@ -236,7 +442,7 @@ def test_chunking():
         print("❌ Ham veri klasörü bulunamadı!")
         return
     
-    json_files = [f for f in os.listdir(raw_data_dir) if f.startswith('clean_blog_data_') and f.endswith('.json')]
+    json_files = [f for f in os.listdir(raw_data_dir) if is_clean_data_file(f)]
     if not json_files:
         print("❌ Temiz blog verisi bulunamadı!")
         return
@@ -259,7 +465,7 @@ def test_chunking():
     for i, chunk in enumerate(split_docs[:3], 1):
         print(f"\n--- CHUNK {i} ---")
         print(f"Kaynak: {chunk.metadata.get('title', 'Bilinmiyor')}")
-        print(f"Uzunluk: {len(chunk.page_content)} karakter")
+        print(f"Uzunluk: {len(chunk.page_content)} karakter, {chunk.metadata.get('token_count', '?')} token")
         print(f"İçerik: {chunk.page_content[:200]}...")
 
 def build_full_vectorstore():
@@ -272,7 +478,7 @@ def build_full_vectorstore():
     
     # En son temiz JSON dosyasını bul
     raw_data_dir = os.path.join(os.path.dirname(__file__), "..", "data", "raw")
-    json_files = [f for f in os.listdir(raw_data_dir) if f.startswith('clean_blog_data_') and f.endswith('.json')]
+    json_files = [f for f in os.listdir(raw_data_dir) if is_clean_data_file(f)]
     
     if not json_files:
         print("❌ Temiz blog verisi bulunamadı!")
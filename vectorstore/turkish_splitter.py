@@ -0,0 +1,300 @@
+"""
+Türkçe hukuk metinleri için token tabanlı chunker
+- Boyutlar embedding modelinin token'larıyla ölçülür (MiniLM 128 token'dan sonrasını keser;
+  varsayılan 120 içerik token'ı + 2 özel token)
+- Cümle ve başlık farkındalığı: markdown başlıkları, "Madde 5", "§ 81a" ve büyük harfli satırlar
+  yeni bölüm başlatır; cümleler kısaltmalarda (vb., Dr., Abs., Nr. ...), sıra sayılarında
+  ("5. madde", "1. Pasaport"), sayı biçimlerinde (1.500,50 / 12.03.2024) ve § kodlarında bölünmez
+- Doğrusal zaman: metin bir kez (offset'li) tokenize edilir, sınırlar tek regex geçişiyle bulunur,
+  paketleme iki işaretçiyle yapılır; hiçbir parça yeniden bölünmek üzere tekrar taranmaz
+- Chunk'lar orijinal metnin dilimleridir: metadata'ya char_start/char_end (page_content içinde),
+  token_count ve chunk_index yazılır (paketleme, tekrar ayıklama ve komşu birleştirme için)
+- transformers/tokenizer yoksa token sayısı yaklaşık hesaplanır (harf grupları ~4 karakter)
+"""
+
+import os
+import re
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+from langchain.schema import Document
+
+try:
+    from transformers import AutoTokenizer
+except ImportError:  # yaklaşık token sayacı kullanılır
+    AutoTokenizer = None
+
+DEFAULT_CHUNK_TOKENS = 120
+DEFAULT_OVERLAP_TOKENS = 32
+
+# Noktadan sonra cümle bitmez (küçük harfle karşılaştırılır, sondaki nokta hariç)
+ABBREVIATIONS = {
+    "vb", "vs", "vd", "bkz", "örn", "krş", "yy", "çev", "haz", "ed", "sy", "s", "sn", "no", "nr",
+    "dr", "prof", "doç", "yrd", "av", "hz", "st", "str", "md", "mad", "fık", "bşk", "müd",
+    "abs", "art", "ziff", "satz", "ggf", "bzw", "usw", "z.b", "u.a", "d.h", "i.v.m", "vgl", "gem",
+    "t.c", "a.ş", "ltd", "şti", "alm", "ing", "tel", "apt", "cad", "sok", "mah", "ca", "ab", "bk",
+    "e.v", "gmbh", "inc", "jan", "feb", "mar", "apr", "jun", "jul", "aug", "sep", "okt", "nov", "dez",
+}
+_ROMAN = re.compile(r"[IVXLCivxlc]+")
+_UPPER = "A-ZÇĞİÖŞÜÂÎÛ"
+_LOWER = "a-zçğıöşüâîû"
+# Sınır adayları: satır sonu veya (tırnak/parantezle kapanabilen) cümle sonu noktalaması + boşluk
+_LOWER_START = re.compile(f"[{_LOWER}]")
+_BOUNDARY = re.compile(r"\n|[.!?…]+[\"'”’»)\]]*(?=\s)")
+_HEADING = re.compile(
+    rf"[ \t]*(?:#{{1,6}}[ \t]|§+[ \t]*\d|(?:MADDE|Madde)[ \t]+\d|(?:EK|Ek)[ \t]+\d+[ \t]*[-–:]"
+    rf"|\d{{1,2}}\.\d{{1,2}}(?:\.\d{{1,2}})*\.?[ \t]+[{_UPPER}])"
+)
+_CAPS_LINE = re.compile(rf"[ \t]*[{_UPPER}0-9][{_UPPER}0-9 \t,.;:/&()§'’\-–]{{2,100}}[ \t]*")
+# Yaklaşık token: harf grupları en fazla 4, rakam grupları en fazla 3 karakter, her noktalama ayrı
+_APPROX_TOKEN = re.compile(r"[^\W\d_]{1,4}|\d{1,3}|[^\w\s]")
+
+Offsets = List[Tuple[int, int]]
+
+
+def load_tokenizer(model_name: str) -> Optional[Callable[[str], Offsets]]:
+    """
+    Embedding modelinin hızlı tokenizer'ı → metin için token (başlangıç, bitiş) offset'leri.
+    transformers yoksa veya model yüklenemezse None (yaklaşık sayım kullanılır).
+    """
+    if AutoTokenizer is None:
+        return None
+    try:
+        tokenizer = AutoTokenizer.from_pretrained(model_name, use_fast=True)
+    except Exception as e:
+        print(f"⚠️ Tokenizer yüklenemedi, yaklaşık token sayımı kullanılacak: {e}")
+        return None
+    if not getattr(tokenizer, "is_fast", False):
+        return None
+    # Hızlı tokenizer her çağrıda kesme/doldurma ayarını yazar; eşzamanlı çağrılar "Already borrowed" verir
+    lock = threading.Lock()
+
+    def offsets(text: str) -> Offsets:
+        with lock:
+            encoded = tokenizer(text, add_special_tokens=False, return_offsets_mapping=True, verbose=False)
+        return [(s, e) for s, e in encoded["offset_mapping"] if e > s]
+
+    return offsets
+
+
+def approximate_offsets(text: str) -> Offsets:
+    return [m.span() for m in _APPROX_TOKEN.finditer(text)]
+
+
+def _is_heading(text: str, start: int, end: int) -> bool:
+    """[start, end) satırı bölüm başlığı mı (markdown, Madde/§/Ek, numaralı veya büyük harfli satır)."""
+    if _HEADING.match(text, start, end):
+        return True
+    if end - start > 100 or not _CAPS_LINE.fullmatch(text, start, end):
+        return False
+    letters = sum(1 for ch in text[start:end] if ch.isalpha())
+    return letters >= 3
+
+
+def _sentence_break(text: str, match: re.Match) -> bool:
+    """Noktalama sonrası gerçekten yeni cümle mi başlıyor."""
+    mark = match.group()
+    # Sonraki görünür karakter: küçük harfle devam (vb. gibi, 5. madde) cümle sonu değildir
+    nxt = match.end()
+    length = len(text)
+    while nxt < length and text[nxt] in " \t\r\n":
+        nxt += 1
+    if nxt < length and _LOWER_START.match(text, nxt):
+        return False
+    if not mark.startswith("."):
+        return True
+    # Noktadan önceki kelime: kısaltma, baş harf, sıra sayısı (1-3 hane) veya Roma rakamı
+    start = match.start()
+    word_start = start
+    while word_start > 0 and not text[word_start - 1].isspace() and text[word_start - 1] not in "(\"'“‘":
+        word_start -= 1
+    word = text[word_start:start]
+    if not word:
+        return True
+    if word.lower() in ABBREVIATIONS or (len(word) == 1 and word.isalpha()):
+        return False
+    if word.isdigit() and len(word) <= 3:
+        return False
+    if len(word) <= 4 and _ROMAN.fullmatch(word) and word.isupper():
+        return False
+    # Noktalı kısaltma zinciri (z.B., T.C., i.V.m.)
+    if "." in word and all(len(part) <= 3 for part in word.split(".")):
+        return False
+    return True
+
+
+def split_segments(text: str) -> List[Tuple[int, int, bool]]:
+    """
+    Metni bitişik segmentlere ayırır (satırlar ve cümleler; toplamları metnin tamamı).
+    Dönüş: [(başlangıç, bitiş, başlık_mı)] — başlık_mı: segment bir başlık satırıyla başlıyor
+    """
+    length = len(text)
+
+    def line_heading(pos: int) -> bool:
+        end = text.find("\n", pos)
+        return _is_heading(text, pos, length if end == -1 else end)
+
+    segments: List[Tuple[int, int, bool]] = []
+    start = line_start = 0
+    heading = line_heading(0)
+    for match in _BOUNDARY.finditer(text):
+        newline = match.group() == "\n"
+        if not newline and not _sentence_break(text, match):
+            continue
+        end = match.end()
+        segments.append((start, end, heading and start == line_start))
+        start = end
+        if newline:
+            line_start = end
+            heading = line_heading(end)
+    if start < length:
+        segments.append((start, length, heading and start == line_start))
+    return segments
+
+
+class TurkishTokenSplitter:
+    """
+    LangChain splitter arayüzüyle uyumlu (split_text, split_documents, create_documents);
+    _chunk_size/_chunk_overlap token cinsindendir, _length_function token sayar.
+    """
+
+    def __init__(self, chunk_tokens: int = DEFAULT_CHUNK_TOKENS, overlap_tokens: int = DEFAULT_OVERLAP_TOKENS,
+                 model_name: Optional[str] = None, tokenizer: Optional[Callable[[str], Offsets]] = None,
+                 min_tokens: Optional[int] = None):
+        """
+        tokenizer: metin → token offset'leri (verilmezse model_name'in tokenizer'ı, o da yoksa yaklaşık)
+        min_tokens: bundan kısa chunk başlıkta kesilmez, sonraki bölümle birleşir (varsayılan chunk/4)
+        """
+        self._chunk_size = max(8, chunk_tokens)
+        self._chunk_overlap = max(0, min(overlap_tokens, self._chunk_size // 2))
+        self.min_tokens = self._chunk_size // 4 if min_tokens is None else min_tokens
+        if tokenizer is None and model_name:
+            tokenizer = load_tokenizer(model_name)
+        self.exact = tokenizer is not None
+        self._offsets = tokenizer or approximate_offsets
+        self._length_function = self.count_tokens
+
+    def count_tokens(self, text: str) -> int:
+        return len(self._offsets(text))
+
+    def split_chunks(self, text: str) -> List[Dict]:
+        """
+        Dönüş: [{"text", "char_start", "char_end", "token_count"}]; text == metin[char_start:char_end]
+        """
+        if not text or not text.strip():
+            return []
+        tokens = self._offsets(text)
+        token_starts = [s for s, _ in tokens]
+        segments = split_segments(text)
+        # Segment başına token aralığı (tek geçiş; token başlangıcına göre atanır)
+        bounds: List[Tuple[int, int]] = []
+        t = 0
+        for _, seg_end, _ in segments:
+            first = t
+            while t < len(tokens) and tokens[t][0] < seg_end:
+                t += 1
+            bounds.append((first, t))
+
+        size, overlap = self._chunk_size, self._chunk_overlap
+        chunks: List[Dict] = []
+
+        def emit(first_token: int, last_token: int) -> None:
+            start, end = tokens[first_token][0], tokens[last_token - 1][1]
+            chunks.append({"text": text[start:end], "char_start": start, "char_end": end,
+                           "token_count": last_token - first_token})
+
+        window: List[int] = []  # pencere segmentleri (indeks); baştan kırpma için head işaretçisi
+        head = 0
+        count = 0
+        fresh = False  # pencerede önceki chunk'ta olmayan segment var mı
+
+        def flush() -> None:
+            if fresh and head < len(window):
+                emit(bounds[window[head]][0], bounds[window[-1]][1])
+
+        for i, (_, _, heading) in enumerate(segments):
+            first, last = bounds[i]
+            n = last - first
+            if n == 0:
+                continue
+            if heading and fresh and count >= self.min_tokens:
+                # Yeni bölüm: örtüşme bölüm sınırını geçmez
+                flush()
+                window, head, count, fresh = [], 0, 0, False
+            if n > size:
+                # Tek başına sınırı aşan cümle: token pencereleriyle bölünür
+                flush()
+                step = size - overlap
+                pos = first
+                while True:
+                    emit(pos, min(pos + size, last))
+                    if pos + size >= last:
+                        break
+                    pos += step
+                window, head, count, fresh = [], 0, 0, False
+                continue
+            if count + n > size:
+                flush()
+                fresh = False
+                # Sondaki segmentler örtüşme olarak kalır (toplamı overlap'i ve yeni segmentle size'ı aşmadan)
+                while head < len(window) and (count > overlap or count + n > size):
+                    f, l = bounds[window[head]]
+                    count -= l - f
+                    head += 1
+            window.append(i)
+            count += n
+            fresh = True
+        flush()
+        return chunks
+
+    def split_text(self, text: str) -> List[str]:
+        return [chunk["text"] for chunk in self.split_chunks(text)]
+
+    def create_documents(self, texts: List[str], metadatas: Optional[List[Dict]] = None) -> List[Document]:
+        documents: List[Document] = []
+        for i, text in enumerate(texts):
+            base = (metadatas[i] if metadatas else None) or {}
+            for index, chunk in enumerate(self.split_chunks(text)):
+                metadata = dict(base)
+                metadata.update(chunk_index=index, char_start=chunk["char_start"], char_end=chunk["char_end"],
+                                token_count=chunk["token_count"])
+                documents.append(Document(page_content=chunk["text"], metadata=metadata))
+        return documents
+
+    def split_documents(self, documents: List[Document]) -> List[Document]:
+        return self.create_documents([d.page_content for d in documents], [d.metadata for d in documents])
+
+
+def create_text_splitter(embedding_model: Optional[str] = None):
+    """
+    Ortam değişkenlerine göre splitter:
+      CHUNKER=token (varsayılan; TurkishTokenSplitter) | recursive (eski karakter tabanlı splitter),
+      CHUNK_TOKENS (varsayılan 120), CHUNK_OVERLAP_TOKENS (varsayılan 32)
+    """
+    if os.getenv("CHUNKER", "token").lower() == "recursive":
+        from langchain.text_splitter import RecursiveCharacterTextSplitter
+        # İstek: chunk_size 400–500, overlap 120–150; sayıları/başlıkları kırmayı azalt
+        return RecursiveCharacterTextSplitter(
+            chunk_size=450,
+            chunk_overlap=120,
+            length_function=len,
+            separators=[
+                "\n\n# ",  # başlık sınırları
+                "\n\n## ",
+                "\n\n",
+                "\n",
+                ". ",
+                ": ",  # madde/başlık bağları
+                ", ",
+                " ",
+                ""
+            ]
+        )
+    splitter = TurkishTokenSplitter(
+        chunk_tokens=int(os.getenv("CHUNK_TOKENS", str(DEFAULT_CHUNK_TOKENS))),
+        overlap_tokens=int(os.getenv("CHUNK_OVERLAP_TOKENS", str(DEFAULT_OVERLAP_TOKENS))),
+        model_name=embedding_model,
+    )
+    if not splitter.exact:
+        print("⚠️ Chunk boyutları yaklaşık token sayımıyla ölçülüyor (model tokenizer'ı kullanılamadı)")
+    return splitter